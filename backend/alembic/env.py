@@ -14,14 +14,14 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.core.config import settings
 from app.models.schemas import Base
-from app.models.database import metadata
+from app.models.database import metadata, sync_database_url
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
 
-# Override sqlalchemy.url avec la valeur des settings
-config.set_main_option("sqlalchemy.url", settings.database_url)
+# Override sqlalchemy.url avec la valeur des settings (driver synchrone pour les migrations)
+config.set_main_option("sqlalchemy.url", sync_database_url(settings.database_url).replace("%", "%%"))
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
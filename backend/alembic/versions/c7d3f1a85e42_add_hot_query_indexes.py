@@ -0,0 +1,82 @@
+"""Add indexes for the hot media and index_scores queries
+
+Revision ID: c7d3f1a85e42
+Revises: b41c7e2a9d10
+Create Date: 2026-10-17 21:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d3f1a85e42'
+down_revision: Union[str, Sequence[str], None] = 'b41c7e2a9d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Colonnes lues par les séries et agrégats sur une plage de as_of
+INDEX_SCORE_VALUE_COLUMNS = [
+    'score', 'momentum', 'price_strength', 'volume', 'volatility', 'equity_vs_bonds', 'media_sentiment',
+]
+
+
+def _has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    postgresql = op.get_bind().dialect.name == 'postgresql'
+    # Sur Postgres, création sans verrouiller les écritures (hors transaction)
+    options = {'postgresql_concurrently': True} if postgresql else {}
+
+    # Les tables peuvent ne pas encore exister (créées par create_all avec leurs index)
+    with op.get_context().autocommit_block():
+        if _has_table('media_articles'):
+            # Articles les plus récents (ORDER BY published_at DESC, id DESC + OFFSET / curseur)
+            op.create_index(
+                'ix_media_articles_published_at_id', 'media_articles',
+                [sa.text('published_at DESC'), sa.text('id DESC')],
+                if_not_exists=True, **options,
+            )
+            # Comptage des articles récents (auto-scraping)
+            op.create_index(
+                'ix_media_articles_scraped_at', 'media_articles', ['scraped_at'],
+                if_not_exists=True, **options,
+            )
+            # Comptage par source
+            op.create_index(
+                'ix_media_articles_source_published_at', 'media_articles', ['source', 'published_at'],
+                if_not_exists=True, **options,
+            )
+
+        if _has_table('index_scores'):
+            # Index couvrant : INCLUDE sur Postgres, colonnes ajoutées à la clé sur SQLite
+            if postgresql:
+                op.create_index(
+                    'ix_index_scores_as_of_covering', 'index_scores', ['as_of'],
+                    postgresql_include=INDEX_SCORE_VALUE_COLUMNS,
+                    if_not_exists=True, **options,
+                )
+            else:
+                op.create_index(
+                    'ix_index_scores_as_of_covering', 'index_scores', ['as_of', *INDEX_SCORE_VALUE_COLUMNS],
+                    if_not_exists=True,
+                )
+            # Redondant : même première colonne que l'index couvrant
+            op.drop_index('ix_index_scores_as_of', table_name='index_scores', if_exists=True, **options)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _has_table('index_scores'):
+        op.create_index('ix_index_scores_as_of', 'index_scores', ['as_of'], if_not_exists=True)
+        op.drop_index('ix_index_scores_as_of_covering', table_name='index_scores', if_exists=True)
+
+    if _has_table('media_articles'):
+        op.drop_index('ix_media_articles_source_published_at', table_name='media_articles', if_exists=True)
+        op.drop_index('ix_media_articles_scraped_at', table_name='media_articles', if_exists=True)
+        op.drop_index('ix_media_articles_published_at_id', table_name='media_articles', if_exists=True)
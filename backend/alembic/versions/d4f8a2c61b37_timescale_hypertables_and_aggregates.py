@@ -0,0 +1,39 @@
+"""TimescaleDB hypertables, continuous aggregates and compression
+
+Revision ID: d4f8a2c61b37
+Revises: c7d3f1a85e42
+Create Date: 2026-10-17 23:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.models import timescale
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f8a2c61b37'
+down_revision: Union[str, Sequence[str], None] = 'c7d3f1a85e42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Sans objet hors Postgres ou si TIMESCALE_ENABLED n'est pas activé
+    if not timescale.is_enabled(op.get_bind()):
+        return
+
+    # Rafraîchissement initial des agrégats continus : hors transaction
+    with op.get_context().autocommit_block():
+        timescale.setup(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not timescale.is_enabled(op.get_bind()):
+        return
+
+    with op.get_context().autocommit_block():
+        timescale.teardown(op.get_bind())
@@ -0,0 +1,41 @@
+"""Add media_articles.sentiment_model (model and version of the stored score)
+
+Revision ID: e5a1c9d47f20
+Revises: d4f8a2c61b37
+Create Date: 2026-10-17 23:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a1c9d47f20'
+down_revision: Union[str, Sequence[str], None] = 'd4f8a2c61b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns(table: str) -> set:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return set()
+    return {column['name'] for column in inspector.get_columns(table)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # La table peut ne pas encore exister (créée par create_all avec la colonne)
+    columns = _columns('media_articles')
+    if columns and 'sentiment_model' not in columns:
+        # Scores existants : modèle inconnu (NULL), repris par la ré-analyse
+        op.add_column('media_articles', sa.Column('sentiment_model', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if 'sentiment_model' in _columns('media_articles'):
+        with op.batch_alter_table('media_articles') as batch_op:
+            batch_op.drop_column('sentiment_model')
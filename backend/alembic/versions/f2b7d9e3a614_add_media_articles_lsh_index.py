@@ -0,0 +1,58 @@
+"""Add media_articles.minhash and the media_article_bands LSH index
+
+Revision ID: f2b7d9e3a614
+Revises: e5a1c9d47f20
+Create Date: 2026-10-18 00:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b7d9e3a614'
+down_revision: Union[str, Sequence[str], None] = 'e5a1c9d47f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns(table: str) -> set:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return set()
+    return {column['name'] for column in inspector.get_columns(table)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # La table peut ne pas encore exister (créée par create_all avec la colonne et l'index)
+    columns = _columns('media_articles')
+    if not columns:
+        return
+    if 'minhash' not in columns:
+        # Articles existants : signature calculée par scripts/build_dedup_index.py
+        op.add_column('media_articles', sa.Column('minhash', sa.LargeBinary(), nullable=True))
+
+    if not sa.inspect(op.get_bind()).has_table('media_article_bands'):
+        # Clé primaire (band, bucket, article_id) : sert d'index aux recherches de candidats
+        op.create_table(
+            'media_article_bands',
+            sa.Column('band', sa.SmallInteger(), nullable=False),
+            sa.Column('bucket', sa.BigInteger(), nullable=False),
+            sa.Column('article_id', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['article_id'], ['media_articles.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('band', 'bucket', 'article_id'),
+        )
+        op.create_index('ix_media_article_bands_article_id', 'media_article_bands', ['article_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if sa.inspect(op.get_bind()).has_table('media_article_bands'):
+        op.drop_index('ix_media_article_bands_article_id', table_name='media_article_bands')
+        op.drop_table('media_article_bands')
+    if 'minhash' in _columns('media_articles'):
+        with op.batch_alter_table('media_articles') as batch_op:
+            batch_op.drop_column('minhash')
@@ -0,0 +1,33 @@
+"""Conditional GET (ETag / If-None-Match) for responses served from the latest snapshot."""
+
+from typing import Any, Callable
+
+from fastapi import Request, Response
+
+from app.services.latest_snapshot import LatestSnapshot
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Vrai si l'en-tête If-None-Match du client contient ``etag`` (ou ``*``)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # Comparaison faible (RFC 9110) : le préfixe W/ est ignoré
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def snapshot_response(
+    request: Request,
+    snapshot: LatestSnapshot,
+    name: str,
+    render: Callable[[LatestSnapshot], Any],
+) -> Response:
+    """
+    Réponse JSON ``render(snapshot)`` avec l'ETag de l'instantané, ou 304 sans
+    corps si le client possède déjà cette version
+    """
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body(name, render), media_type="application/json", headers=headers)
@@ -1,11 +1,13 @@
 """Shared FastAPI dependencies."""
 
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from typing import Generator as TypingGenerator
 
 from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.models.database import AsyncSessionLocal
 from app.models.database import get_session as _get_session
 
 
@@ -22,6 +24,16 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency pour obtenir une session async (aiosqlite / asyncpg).
+    Les requêtes ne bloquent pas la boucle d'événements ; la connexion
+    est rendue au pool après la requête.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 # Example dependency usage point for routers
 def get_settings() -> dict:
     from app.core.config import settings
@@ -1,5 +1,6 @@
 from datetime import date, timedelta
 from typing import Optional
+import asyncio
 
 from fastapi import APIRouter, Query
 from pydantic import BaseModel
@@ -53,7 +54,7 @@ async def run_backtest(
     start_date = end_date - timedelta(days=days)
     
     backtest_service = BacktestService()
-    result = backtest_service.run_backtest(start_date, end_date)
+    result = await asyncio.to_thread(backtest_service.run_backtest, start_date, end_date)
     
     return BacktestResponse(
         correlation_t1=result.correlation_t1,
@@ -1,27 +1,32 @@
 from datetime import date
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import desc
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Request, Response
 
-from app.models.database import get_session
-from app.models.schemas import ComponentScoresResponse, IndexScore
+from app.api.conditional import snapshot_response
+from app.models.schemas import ComponentScoresResponse
+from app.services.latest_snapshot import LatestSnapshot, get_snapshot_store
 
 router = APIRouter()
 
 
 @router.get("/latest", summary="Latest component breakdown", response_model=ComponentScoresResponse)
-async def get_latest_components(db: Session = Depends(get_session)) -> ComponentScoresResponse:
-    latest = db.query(IndexScore).order_by(desc(IndexScore.as_of)).first()
-    if latest:
+async def get_latest_components(request: Request) -> Response:
+    """Dernières composantes, servies depuis l'instantané publié par le pipeline (ETag / 304)"""
+    snapshot = await get_snapshot_store().aget()
+    return snapshot_response(request, snapshot, "components:latest", _latest_components)
+
+
+def _latest_components(snapshot: LatestSnapshot) -> ComponentScoresResponse:
+    if snapshot.as_of is not None:
+        components = snapshot.components
         return ComponentScoresResponse(
-            as_of=latest.as_of.date(),
-            momentum=latest.momentum or 50.0,
-            price_strength=latest.price_strength or 50.0,
-            volume=latest.volume or 50.0,
-            volatility=latest.volatility or 50.0,
-            equity_vs_bonds=latest.equity_vs_bonds or 50.0,
-            media_sentiment=latest.media_sentiment or 50.0,
+            as_of=snapshot.as_of.date(),
+            momentum=components["momentum"] or 50.0,
+            price_strength=components["price_strength"] or 50.0,
+            volume=components["volume"] or 50.0,
+            volatility=components["volatility"] or 50.0,
+            equity_vs_bonds=components["equity_vs_bonds"] or 50.0,
+            media_sentiment=components["media_sentiment"] or 50.0,
         )
     else:
         # Return default values if no data
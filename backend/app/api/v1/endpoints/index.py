@@ -1,23 +1,25 @@
 from datetime import date, datetime, timedelta
-from typing import Optional
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import desc
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.database import get_session
-from app.models.schemas import IndexHistoryResponse, IndexScoreResponse, IndexScore
+from app.api.conditional import snapshot_response
+from app.api.dependencies import get_async_db
+from app.core.config import settings
+from app.models.schemas import IndexHistoryPoint, IndexHistoryResponse, IndexScoreResponse
+from app.repositories import index_scores
+from app.services.latest_snapshot import LatestSnapshot, get_snapshot_store
+from app.utils.downsampling import lttb
 
 router = APIRouter()
 
 
-@router.get("/latest", summary="Latest Fear & Greed index value", response_model=IndexScoreResponse)
-async def get_latest_index(db: Session = Depends(get_session)) -> IndexScoreResponse:
-    latest = db.query(IndexScore).order_by(desc(IndexScore.as_of)).first()
-    if latest:
+def _latest_index(snapshot: LatestSnapshot) -> IndexScoreResponse:
+    if snapshot.as_of is not None:
         return IndexScoreResponse(
-            as_of=latest.as_of.date(),
-            score=latest.score
+            as_of=snapshot.as_of.date(),
+            score=snapshot.score
         )
     else:
         # Return default if no data
@@ -27,12 +29,36 @@ async def get_latest_index(db: Session = Depends(get_session)) -> IndexScoreResp
         )
 
 
+@router.get("/latest", summary="Latest Fear & Greed index value", response_model=IndexScoreResponse)
+async def get_latest_index(request: Request) -> Response:
+    """Dernier score, servi depuis l'instantané publié par le pipeline (ETag / 304)"""
+    snapshot = await get_snapshot_store().aget()
+    return snapshot_response(request, snapshot, "index:latest", _latest_index)
+
+
+@router.get("/snapshot", summary="Latest score, components and articles in one response")
+async def get_latest_snapshot(request: Request) -> Response:
+    """
+    Instantané complet publié par le pipeline : score, composantes et articles
+    les plus récents. L'ETag change à chaque nouvelle version ; un client qui
+    interroge régulièrement avec If-None-Match reçoit 304 tant que rien n'a changé.
+    """
+    snapshot = await get_snapshot_store().aget()
+    return snapshot_response(request, snapshot, "index:snapshot", LatestSnapshot.to_dict)
+
+
 @router.get("/history", summary="Time-series of the Fear & Greed index", response_model=IndexHistoryResponse)
 async def get_index_history(
     range: Optional[str] = Query(None, description="Range: 30d, 90d, 180d, 1y, all"),
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    db: Session = Depends(get_session)
+    resolution: Literal["raw", "hour", "day", "week", "lttb"] = Query(
+        "raw", description="raw, hour, day, week or lttb"
+    ),
+    points: int = Query(
+        settings.index_history_chart_points, ge=3, le=5000, description="Point budget of the lttb resolution"
+    ),
+    db: AsyncSession = Depends(get_async_db)
 ) -> IndexHistoryResponse:
     """
     Récupère l'historique des scores Fear & Greed.
@@ -40,11 +66,14 @@ async def get_index_history(
     - **range**: Période prédéfinie (30d, 90d, 180d, 1y, all)
     - **start_date**: Date de début personnalisée
     - **end_date**: Date de fin personnalisée (défaut: aujourd'hui)
+    - **resolution**: `raw` (défaut : scores bruts, plafonnés), `hour` / `day` / `week`
+      (ouverture, clôture, min, max et moyenne par intervalle, calculés en SQL)
+      ou `lttb` (série brute réduite à `points` points pour les graphiques)
     
     Le paramètre `range` a priorité sur start_date/end_date si spécifié.
+    Les points sont renvoyés du plus récent au plus ancien ; pour un
+    intervalle, `score` est la clôture.
     """
-    query = db.query(IndexScore).order_by(desc(IndexScore.as_of))
-    
     # Gérer le paramètre range
     if range:
         if end_date is None:
@@ -63,21 +92,31 @@ async def get_index_history(
             start_date = None
             end_date = None
     
-    if start_date:
-        query = query.filter(IndexScore.as_of >= datetime.combine(start_date, datetime.min.time()))
-    if end_date:
-        query = query.filter(IndexScore.as_of <= datetime.combine(end_date, datetime.max.time()))
-    
-    # Limiter à 365 enregistrements max
-    scores = query.limit(365).all()
-    
-    return IndexHistoryResponse(
-        data=[
-            IndexScoreResponse(
-                as_of=score.as_of.date(),
-                score=score.score
+    start = datetime.combine(start_date, datetime.min.time()) if start_date else None
+    end = datetime.combine(end_date, datetime.max.time()) if end_date else None
+
+    if resolution == "raw":
+        scores = await index_scores.get_series(
+            db, "score", start=start, end=end, limit=settings.index_history_max_raw_points
+        )
+        data = [IndexHistoryPoint(as_of=as_of, score=score) for as_of, score in scores]
+    elif resolution == "lttb":
+        scores = await index_scores.get_series(db, "score", start=start, end=end, ascending=True)
+        data = [IndexHistoryPoint(as_of=as_of, score=score) for as_of, score in reversed(lttb(scores, points))]
+    else:
+        buckets = await index_scores.get_buckets(db, resolution, start=start, end=end)
+        data = [
+            IndexHistoryPoint(
+                as_of=bucket.start,
+                score=bucket.close,
+                open=bucket.open,
+                min=bucket.min,
+                max=bucket.max,
+                mean=bucket.mean,
+                samples=bucket.samples,
             )
-            for score in scores
+            for bucket in buckets
         ]
-    )
+
+    return IndexHistoryResponse(resolution=resolution, data=data)
 
@@ -1,14 +1,16 @@
 from datetime import datetime
+from functools import partial
 from typing import List, Optional
 import asyncio
 
-from fastapi import APIRouter, Depends, Query, BackgroundTasks
-from sqlalchemy import desc
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.schemas import MediaArticle
 from app.core.logging import get_logger
-from app.api.dependencies import get_db
+from app.api.dependencies import get_async_db
+from app.models.database import AsyncSessionLocal, async_engine
+from app.repositories import media_articles
+from app.services.cache_codecs import dumps_json
 from app.services.cache_service import get_cache_service
 
 router = APIRouter()
@@ -21,130 +23,44 @@ cache_service = get_cache_service()
 @router.get("/latest", summary="Latest media articles with sentiment")
 async def get_latest_media(
     limit: int = Query(20, ge=1, le=500, description="Number of articles to return"),
-    offset: int = Query(0, ge=0, description="Offset for pagination"),
-    cursor: Optional[str] = Query(None, description="Cursor for cursor-based pagination (article ID)"),
+    offset: int = Query(0, ge=0, description="Offset for pagination (deprecated: use cursor)", deprecated=True),
+    cursor: Optional[str] = Query(None, description="Opaque cursor returned as pagination.next_cursor"),
     auto_scrape: bool = Query(False, description="Auto-scrape if articles are old"),
-    db: Session = Depends(get_db),
     background_tasks: BackgroundTasks = BackgroundTasks()
-) -> dict:
+) -> Response:
     """
     Récupère les derniers articles médias avec leur analyse de sentiment.
     Déclenche automatiquement le scraping si les articles sont anciens.
     
     - **limit**: Nombre d'articles à retourner (1-500, défaut: 20)
-    - **offset**: Offset pour pagination classique (défaut: 0)
-    - **cursor**: ID de l'article pour pagination cursor-based (plus performant)
+    - **cursor**: Curseur opaque de la page suivante (`pagination.next_cursor`)
+    - **offset**: Ancienne pagination par offset (dépréciée, coût proportionnel à l'offset)
     - **auto_scrape**: Déclencher automatiquement le scraping si nécessaire (défaut: False)
     
-    **Optimisation** : Utilise cursor-based pagination si `cursor` est fourni (plus performant pour grandes listes).
-    Sinon, utilise offset-based pagination classique.
+    **Optimisation** : pagination par clé sur (published_at, id) : chaque page est une
+    recherche dans l'index, au même coût quelle que soit sa profondeur.
+    Seule la première page est mise en cache.
     """
+    after = None
+    if cursor:
+        try:
+            after = media_articles.decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Curseur de pagination invalide")
+
     try:
-        # Vérifier le cache pour les requêtes fréquentes
-        cache_key = f"media:latest:{limit}:{offset}:{cursor or 'none'}"
-        cached_result = cache_service.get(cache_key)
-        if cached_result is not None:
-            logger.debug(f"✅ Cache hit: media articles (limit={limit}, offset={offset})")
-            return cached_result
-        # Vérifier si la table existe, sinon la créer
-        from app.models.schemas import Base
-        from app.models.database import engine
-        Base.metadata.create_all(bind=engine, checkfirst=True)
-        
-        # Vérifier si on a besoin de scraper
-        if auto_scrape:
-            from datetime import timedelta
-            recent_count = db.query(MediaArticle).filter(
-                MediaArticle.scraped_at >= datetime.now() - timedelta(hours=1)
-            ).count()
-            
-            # Si moins de 10 articles récents, déclencher le scraping en arrière-plan
-            if recent_count < 10:
-                logger.info(f"🔄 Déclenchement automatique du scraping (seulement {recent_count} articles récents)")
-                if background_tasks:
-                    background_tasks.add_task(trigger_enhanced_scraping)
-                else:
-                    # Si pas de background_tasks, lancer en arrière-plan
-                    asyncio.create_task(trigger_enhanced_scraping())
-        
-        # Pagination optimisée : cursor-based si cursor fourni, sinon offset-based
-        if cursor:
-            # Cursor-based pagination (plus performant)
-            try:
-                cursor_id = int(cursor)
-                query = (
-                    db.query(MediaArticle)
-                    .filter(MediaArticle.id < cursor_id)  # Articles plus anciens que le cursor
-                    .order_by(desc(MediaArticle.published_at))
-                    .limit(limit + 1)  # +1 pour savoir s'il y a une page suivante
-                )
-            except ValueError:
-                # Cursor invalide, fallback sur offset
-                query = (
-                    db.query(MediaArticle)
-                    .order_by(desc(MediaArticle.published_at))
-                    .offset(offset)
-                    .limit(limit)
-                )
-                cursor = None
-        else:
-            # Offset-based pagination classique
-            query = (
-                db.query(MediaArticle)
-                .order_by(desc(MediaArticle.published_at))
-                .offset(offset)
-                .limit(limit)
+        if after is None and offset == 0:
+            # Première page : requêtes fréquentes, un seul calcul par clé (single-flight), TTL court.
+            # Le corps JSON est mis en cache tel quel et renvoyé sans re-sérialisation.
+            body = await cache_service.aget_or_set_json(
+                f"media:latest:{limit}",
+                partial(_build_latest_media, limit, 0, None, auto_scrape, background_tasks),
+                ttl_seconds=60,  # 1 minute pour les articles
             )
-        
-        articles = query.all()
-        
-        # Pour cursor-based, vérifier s'il y a une page suivante
-        has_next = False
-        next_cursor = None
-        if cursor and len(articles) > limit:
-            has_next = True
-            articles = articles[:limit]
-            next_cursor = str(articles[-1].id) if articles else None
-        
-        result = {
-            "data": [
-                {
-                    "id": article.id,
-                    "source": article.source or "Source inconnue",
-                    "title": article.title or "Titre non disponible",
-                    "url": article.url or "#",
-                    "summary": getattr(article, 'summary', None),
-                    "content": getattr(article, 'content', None),  # Contenu complet
-                    "image_url": getattr(article, 'image_url', None),  # URL de l'image principale
-                    "published_at": article.published_at.isoformat() if article.published_at else None,
-                    "sentiment_score": article.sentiment_score,
-                    "sentiment_label": article.sentiment_label,
-                    "scraped_at": article.scraped_at.isoformat() if article.scraped_at else None,
-                }
-                for article in articles
-            ],
-            "count": len(articles),
-            "limit": limit,
-        }
-        
-        # Ajouter les métadonnées de pagination
-        if cursor:
-            result["pagination"] = {
-                "type": "cursor",
-                "has_next": has_next,
-                "next_cursor": next_cursor,
-            }
         else:
-            result["pagination"] = {
-                "type": "offset",
-                "offset": offset,
-                "has_next": len(articles) == limit,  # Probablement plus de résultats
-            }
-        
-        # Mettre en cache (TTL court pour les données dynamiques)
-        cache_service.set(cache_key, result, ttl_seconds=60)  # 1 minute pour les articles
-        
-        return result
+            # Pages suivantes : pas de cache par curseur (une recherche indexée de `limit` lignes)
+            body = dumps_json(await _build_latest_media(limit, offset, after, auto_scrape, background_tasks))
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         logger.error(f"Error fetching media articles: {e}", exc_info=True)
         
@@ -157,21 +73,110 @@ async def get_latest_media(
         }
 
 
+_tables_ready = False
+
+
+async def _ensure_tables() -> None:
+    """Crée les tables manquantes (une seule fois par processus)"""
+    global _tables_ready
+    if _tables_ready:
+        return
+    from app.models.schemas import Base
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, checkfirst=True)
+    _tables_ready = True
+
+
+async def _build_latest_media(
+    limit: int,
+    offset: int,
+    after: Optional[media_articles.ArticleKey],
+    auto_scrape: bool,
+    background_tasks: BackgroundTasks,
+) -> dict:
+    """Construit la réponse de /media/latest (première page mise en cache par get_latest_media)"""
+    # Vérifier si la table existe, sinon la créer
+    await _ensure_tables()
+
+    # Session propre au calcul : il est partagé entre requêtes et peut se terminer en arrière-plan
+    async with AsyncSessionLocal() as db:
+        return await _query_latest_media(db, limit, offset, after, auto_scrape, background_tasks)
+
+
+async def _query_latest_media(
+    db: AsyncSession,
+    limit: int,
+    offset: int,
+    after: Optional[media_articles.ArticleKey],
+    auto_scrape: bool,
+    background_tasks: BackgroundTasks,
+) -> dict:
+    """Lit les articles de /media/latest et met en forme la réponse"""
+    # Vérifier si on a besoin de scraper
+    if auto_scrape:
+        from datetime import timedelta
+        recent_count = await media_articles.count_scraped_since(db, datetime.now() - timedelta(hours=1))
+
+        # Si moins de 10 articles récents, déclencher le scraping en arrière-plan
+        if recent_count < 10:
+            logger.info(f"🔄 Déclenchement automatique du scraping (seulement {recent_count} articles récents)")
+            if background_tasks:
+                background_tasks.add_task(trigger_enhanced_scraping)
+            else:
+                # Si pas de background_tasks, lancer en arrière-plan
+                asyncio.create_task(trigger_enhanced_scraping())
+
+    # +1 pour savoir s'il y a une page suivante
+    keyset = after is not None or offset == 0
+    if keyset:
+        articles = await media_articles.list_page(db, limit + 1, after)
+    else:
+        # Ancienne pagination par offset (dépréciée)
+        articles = await media_articles.list_latest(db, limit + 1, offset)
+
+    has_next = len(articles) > limit
+    articles = articles[:limit]
+    next_cursor = media_articles.encode_cursor(media_articles.ArticleKey.of(articles[-1])) if has_next else None
+
+    result = {
+        "data": [
+            {
+                "id": article.id,
+                "source": article.source or "Source inconnue",
+                "title": article.title or "Titre non disponible",
+                "url": article.url or "#",
+                "summary": getattr(article, 'summary', None),
+                "content": getattr(article, 'content', None),  # Contenu complet
+                "image_url": getattr(article, 'image_url', None),  # URL de l'image principale
+                "published_at": article.published_at.isoformat() if article.published_at else None,
+                "sentiment_score": article.sentiment_score,
+                "sentiment_label": article.sentiment_label,
+                "scraped_at": article.scraped_at.isoformat() if article.scraped_at else None,
+            }
+            for article in articles
+        ],
+        "count": len(articles),
+        "limit": limit,
+    }
+
+    # Ajouter les métadonnées de pagination (next_cursor permet de quitter l'offset)
+    result["pagination"] = {
+        "type": "cursor" if keyset else "offset",
+        "has_next": has_next,
+        "next_cursor": next_cursor,
+    }
+    if not keyset:
+        result["pagination"]["offset"] = offset
+
+    return result
+
+
 @router.get("/sources", summary="List of media sources")
-async def get_media_sources(db: Session = Depends(get_db)) -> dict:
+async def get_media_sources(db: AsyncSession = Depends(get_async_db)) -> dict:
     """
     Récupère la liste des sources médias avec le nombre d'articles par source.
     """
-    from sqlalchemy import func
-    
-    sources = (
-        db.query(
-            MediaArticle.source,
-            func.count(MediaArticle.id).label("count")
-        )
-        .group_by(MediaArticle.source)
-        .all()
-    )
+    sources = await media_articles.source_counts(db)
     
     return {
         "sources": [
@@ -183,41 +188,25 @@ async def get_media_sources(db: Session = Depends(get_db)) -> dict:
 
 
 @router.get("/sentiment-stats", summary="Sentiment statistics")
-async def get_sentiment_stats(db: Session = Depends(get_db)) -> dict:
+async def get_sentiment_stats(db: AsyncSession = Depends(get_async_db)) -> dict:
     """
     Récupère des statistiques sur le sentiment des articles.
     """
-    from sqlalchemy import func
-    
     # Compter par label de sentiment
-    sentiment_counts = (
-        db.query(
-            MediaArticle.sentiment_label,
-            func.count(MediaArticle.id).label("count")
-        )
-        .filter(MediaArticle.sentiment_label.isnot(None))
-        .group_by(MediaArticle.sentiment_label)
-        .all()
-    )
+    sentiment_counts = await media_articles.sentiment_label_counts(db)
     
     # Statistiques sur les scores
-    sentiment_stats = db.query(
-        func.avg(MediaArticle.sentiment_score).label("avg"),
-        func.min(MediaArticle.sentiment_score).label("min"),
-        func.max(MediaArticle.sentiment_score).label("max"),
-    ).filter(MediaArticle.sentiment_score.isnot(None)).first()
+    sentiment_stats = await media_articles.sentiment_score_stats(db)
     
-    total_articles = db.query(func.count(MediaArticle.id)).scalar()
+    total_articles = await media_articles.count(db)
     
     return {
         "total_articles": total_articles,
-        "sentiment_distribution": {
-            label: count for label, count in sentiment_counts
-        },
+        "sentiment_distribution": sentiment_counts,
         "sentiment_scores": {
-            "average": float(sentiment_stats.avg) if sentiment_stats.avg else None,
-            "min": float(sentiment_stats.min) if sentiment_stats.min else None,
-            "max": float(sentiment_stats.max) if sentiment_stats.max else None,
+            "average": float(sentiment_stats.average) if sentiment_stats.average else None,
+            "min": float(sentiment_stats.minimum) if sentiment_stats.minimum else None,
+            "max": float(sentiment_stats.maximum) if sentiment_stats.maximum else None,
         },
     }
 
@@ -8,8 +8,9 @@ from pydantic import BaseModel
 
 from app.core.monitoring import get_metrics_response
 from app.core.logging import get_logger
-from app.api.dependencies import get_db
-from sqlalchemy.orm import Session
+from app.api.dependencies import get_async_db
+from app.repositories import index_scores, media_articles
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
 router = APIRouter()
@@ -51,7 +52,7 @@ def get_uptime_seconds() -> float:
 
 @router.get("/health", summary="Health check complet", response_model=SystemHealth)
 async def health_check(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> SystemHealth:
     """
     Health check complet du système
@@ -76,7 +77,7 @@ async def health_check(
     )
     
     # Health base de données
-    db_health = check_database_health(db)
+    db_health = await check_database_health(db)
     
     # Health cache
     cache_health = None
@@ -122,13 +123,13 @@ async def health_check(
 
 @router.get("/health/database", summary="Health check base de données", response_model=DatabaseHealth)
 async def database_health_check(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> DatabaseHealth:
     """Vérifie la santé de la base de données"""
-    return check_database_health(db)
+    return await check_database_health(db)
 
 
-def check_database_health(db: Session) -> DatabaseHealth:
+async def check_database_health(db: AsyncSession) -> DatabaseHealth:
     """Vérifie la santé de la base de données"""
     import time
     
@@ -136,8 +137,8 @@ def check_database_health(db: Session) -> DatabaseHealth:
     
     try:
         # Test simple de connexion
-        db.execute(text("SELECT 1"))
-        db.commit()
+        await db.execute(text("SELECT 1"))
+        await db.commit()
         
         response_time = (time.time() - start_time) * 1000  # en ms
         
@@ -178,7 +179,7 @@ async def metrics():
 
 @router.get("/stats", summary="Statistiques du système")
 async def system_stats(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> dict:
     """
     Statistiques détaillées du système
@@ -201,22 +202,20 @@ async def system_stats(
     # Stats base de données
     try:
         # Nombre d'articles
-        result = db.execute(text("SELECT COUNT(*) FROM media_articles"))
-        stats["database"]["media_articles_count"] = result.scalar()
+        stats["database"]["media_articles_count"] = await media_articles.count(db)
         
         # Nombre de scores
-        result = db.execute(text("SELECT COUNT(*) FROM index_scores"))
-        stats["database"]["index_scores_count"] = result.scalar()
+        stats["database"]["index_scores_count"] = await index_scores.count(db)
         
-        # Dernier score
-        result = db.execute(
-            text("SELECT score, as_of FROM index_scores ORDER BY as_of DESC LIMIT 1")
-        )
-        row = result.fetchone()
-        if row:
+        # Dernier score (instantané publié par le pipeline)
+        from app.services.latest_snapshot import get_snapshot_store
+        snapshot = await get_snapshot_store().aget()
+        if snapshot.as_of is not None:
             stats["database"]["latest_score"] = {
-                "score": row[0],
-                "as_of": row[1].isoformat() if row[1] else None
+                "score": snapshot.score,
+                "as_of": snapshot.as_of.isoformat(),
+                "snapshot_version": snapshot.version,
+                "published_at": snapshot.published_at,
             }
     except Exception as e:
         logger.error(f"Error getting database stats: {e}")
@@ -113,7 +113,7 @@ async def test_pipeline() -> dict:
         logger.info("Testing pipeline components")
         
         # Test market scraper
-        market_data = pipeline_service.market_scraper.fetch_historical_data(days=30)
+        market_data = pipeline_service.market_store.get_history(days=30)
         
         # Test media scraper
         media_data = pipeline_service.media_scraper.scrape_all_sources(max_articles_per_source=5)
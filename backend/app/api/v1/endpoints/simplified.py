@@ -5,8 +5,8 @@ from fastapi import APIRouter
 from pydantic import BaseModel
 
 from app.services.simplified_calculator import SimplifiedCalculator
-from app.pipelines.ingestion.market_scraper import CasablancaMarketScraper
 from app.pipelines.ingestion.media_scraper import MediaScraper
+from app.services.market_data_provider import get_market_data_provider
 from app.services.sentiment_service import SentimentAnalyzer
 from app.core.logging import get_logger
 
@@ -42,12 +42,11 @@ async def get_simplified_score():
     try:
         # Initialize calculators
         simplified_calc = SimplifiedCalculator()
-        market_scraper = CasablancaMarketScraper()
         media_scraper = MediaScraper()
         sentiment_analyzer = SentimentAnalyzer()
         
         # Fetch data
-        historical_data = market_scraper.fetch_historical_data(days=30)
+        historical_data = await get_market_data_provider().get_history_async(days=30)
         media_articles = media_scraper.scrape_all_sources(max_articles_per_source=10)
         
         # Analyze sentiment
@@ -85,12 +84,11 @@ async def compare_approaches():
         # Initialize calculators
         simplified_calc = SimplifiedCalculator()
         traditional_calc = ComponentCalculator()
-        market_scraper = CasablancaMarketScraper()
         media_scraper = MediaScraper()
         sentiment_analyzer = SentimentAnalyzer()
         
         # Fetch data
-        historical_data = market_scraper.fetch_historical_data(days=252)
+        historical_data = await get_market_data_provider().get_history_async(days=252)
         media_articles = media_scraper.scrape_all_sources(max_articles_per_source=10)
         
         # Analyze sentiment
@@ -1,13 +1,10 @@
 from datetime import date, datetime, timedelta
 from typing import Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter
 from pydantic import BaseModel
-from sqlalchemy import desc
-from sqlalchemy.orm import Session
 
-from app.models.database import get_session
-from app.models.schemas import IndexScore
+from app.services.latest_snapshot import get_snapshot_store
 from app.services.simplified_index_calculator import SimplifiedIndexCalculator
 from app.core.logging import get_logger
 from app.services.cache_service import get_cache_service
@@ -33,7 +30,7 @@ class SimplifiedScoreResponse(BaseModel):
 
 
 @router.get("/score", summary="Calculate simplified Fear & Greed score", response_model=SimplifiedScoreResponse)
-async def get_simplified_score(db: Session = Depends(get_session)) -> SimplifiedScoreResponse:
+async def get_simplified_score() -> SimplifiedScoreResponse:
     """
     Calcule le score Fear & Greed selon la formule simplifiée :
     
@@ -48,30 +45,32 @@ async def get_simplified_score(db: Session = Depends(get_session)) -> Simplified
     Retourne un score entre 0 (Extreme Fear) et 100 (Extreme Greed).
     
     **Optimisation** : Utilise un cache Redis (ou mémoire) de 5 minutes pour éviter les recalculs fréquents.
-    Si une donnée récente existe en DB, utilise les composants du dernier index.
+    Si un indice récent a été publié (instantané du pipeline), utilise ses composants.
     """
-    cache_key = "simplified:score:v2"
-    
-    # Vérifier le cache
-    cached_data = cache_service.get(cache_key)
-    if cached_data is not None:
-        logger.debug("✅ Cache hit: simplified score")
-        return cached_data
-    
+    # Un seul calcul par clé, même sous une rafale de requêtes (single-flight + stale-while-revalidate)
+    return await cache_service.aget_or_set(
+        "simplified:score:v2",
+        _compute_simplified_score,
+        ttl_seconds=CACHE_DURATION_SECONDS,
+    )
+
+
+async def _compute_simplified_score() -> SimplifiedScoreResponse:
+    """Calcule la réponse de /simplified-v2/score (mise en cache par get_simplified_score)"""
     try:
-        # D'abord, essayer d'utiliser les données de la DB (plus rapide)
-        latest_index = db.query(IndexScore).order_by(desc(IndexScore.as_of)).first()
+        # D'abord, essayer d'utiliser le dernier indice publié (instantané, sans requête SQL)
+        latest_index = await get_snapshot_store().aget()
         
-        if latest_index and latest_index.as_of and \
+        if latest_index.as_of and \
            (datetime.now() - latest_index.as_of.replace(tzinfo=None)).total_seconds() < 600:  # Moins de 10 minutes
-            # Utiliser les composants de la DB pour calculer un score simplifié
-            logger.debug("Using latest index data from DB for simplified score")
+            # Utiliser les composants de l'indice pour calculer un score simplifié
+            logger.debug("Using latest index snapshot for simplified score")
             
             # Estimation basée sur les composants existants
-            volume_score = latest_index.volume or 50.0
-            sentiment_score = latest_index.media_sentiment or 50.0
+            volume_score = latest_index.components["volume"] or 50.0
+            sentiment_score = latest_index.components["media_sentiment"] or 50.0
             # Performance marché estimée à partir du price_strength
-            performance_score = latest_index.price_strength or 50.0
+            performance_score = latest_index.components["price_strength"] or 50.0
             
             # Calcul simplifié basé sur les composants
             nombre_actions = 76  # Valeur fixe pour MASI
@@ -88,13 +87,11 @@ async def get_simplified_score(db: Session = Depends(get_session)) -> Simplified
                 interpretation="Calculé à partir des composants de l'indice principal"
             )
             
-            # Mettre en cache Redis
-            cache_service.set(cache_key, result, ttl_seconds=CACHE_DURATION_SECONDS)
             return result
     except Exception as e:
-        logger.warning(f"Error using DB data for simplified score: {e}, falling back to calculation")
+        logger.warning(f"Error using latest index snapshot for simplified score: {e}, falling back to calculation")
     
-    # Si pas de données récentes en DB, calculer (mais avec cache)
+    # Si pas d'indice récent, calculer (mais avec cache)
     logger.debug("Calculating simplified score from scratch")
     calculator = SimplifiedIndexCalculator()
     result_data = await calculator.calculate_index()
@@ -110,8 +107,6 @@ async def get_simplified_score(db: Session = Depends(get_session)) -> Simplified
         interpretation=result_data.details["interpretation"],
     )
     
-    # Mettre en cache Redis
-    cache_service.set(cache_key, result, ttl_seconds=CACHE_DURATION_SECONDS)
     return result
 
 
@@ -1,29 +1,28 @@
 from datetime import date, datetime, timedelta
+from functools import partial
 from typing import Optional
 
-from fastapi import APIRouter, Query, Depends
-from sqlalchemy import desc
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Query, Response
 
-from app.models.database import get_session
-from app.models.schemas import IndexScore
-from app.pipelines.ingestion.market_scraper import CasablancaMarketScraper
+from app.models.database import AsyncSessionLocal
+from app.repositories import index_scores
 from app.core.logging import get_logger
 from app.services.cache_service import get_cache_service
+from app.services.market_data_provider import get_market_data_provider
 
 router = APIRouter()
 logger = get_logger(__name__)
 
 # Service de cache Redis (avec fallback en mémoire)
 cache_service = get_cache_service()
+market_data = get_market_data_provider()
 CACHE_DURATION_SECONDS = 300  # 5 minutes
 
 
 @router.get("/latest", summary="Latest volume data for heatmap")
 async def get_latest_volume(
     days: int = Query(30, ge=7, le=90, description="Number of days to return"),
-    db: Session = Depends(get_session)
-) -> dict:
+) -> Response:
     """
     Récupère les données de volume récentes pour la heatmap.
     
@@ -33,105 +32,14 @@ async def get_latest_volume(
     """
     cache_key = f"volume:latest:{days}"
     
-    # Vérifier le cache
-    cached_data = cache_service.get(cache_key)
-    if cached_data is not None:
-        logger.debug(f"✅ Cache hit: volume data for {days} days")
-        return cached_data
-    
     try:
-        # D'abord essayer de récupérer depuis la DB (historique des index)
-        # En utilisant les données de volume des index calculés récemment
-        cutoff_date = datetime.now() - timedelta(days=days)
-        recent_indexes = (
-            db.query(IndexScore)
-            .filter(IndexScore.as_of >= cutoff_date)
-            .order_by(IndexScore.as_of.asc())
-            .all()
+        # Un seul calcul par clé, même sous une rafale de requêtes (single-flight + stale-while-revalidate)
+        body = await cache_service.aget_or_set_json(
+            cache_key,
+            partial(_build_latest_volume, days),
+            ttl_seconds=CACHE_DURATION_SECONDS,
         )
-        
-        if recent_indexes and len(recent_indexes) >= 5:
-            # Utiliser les données de volume des index
-            logger.debug(f"Using volume data from {len(recent_indexes)} index records")
-            
-            # Calculer le volume moyen pour la normalisation
-            volumes = [idx.volume for idx in recent_indexes if idx.volume is not None]
-            if volumes:
-                avg_volume = sum(volumes) / len(volumes)
-                volume_max = max(volumes)
-                volume_min = min(volumes)
-                
-                volume_data = []
-                for idx in recent_indexes:
-                    if idx.volume is not None:
-                        # Normaliser le volume (0-100)
-                        if volume_max > volume_min:
-                            normalized = ((idx.volume - volume_min) / (volume_max - volume_min)) * 100
-                        else:
-                            normalized = 100
-                        
-                        volume_data.append({
-                            "date": idx.as_of.date().isoformat(),
-                            "volume": idx.volume,
-                            "normalized_volume": round(normalized, 2),
-                            "close": None,  # Pas disponible dans IndexScore
-                            "change_percent": None,
-                        })
-                
-                result = {
-                    "data": volume_data,
-                    "count": len(volume_data),
-                    "days": days,
-                    "average_volume": avg_volume,
-                }
-                
-                # Mettre en cache Redis
-                cache_service.set(cache_key, result, ttl_seconds=CACHE_DURATION_SECONDS)
-                return result
-        
-        # Fallback: scraper si pas assez de données en DB
-        logger.debug(f"Not enough data in DB, scraping volume data for {days} days")
-        scraper = CasablancaMarketScraper()
-        historical_data = scraper.fetch_historical_data(days=days)
-        
-        if not historical_data:
-            logger.warning(f"No historical data found for {days} days")
-            return {
-                "data": [],
-                "count": 0,
-                "days": days,
-                "average_volume": 0,
-                "message": "No data available"
-            }
-        
-        # Calculer le volume moyen pour la normalisation
-        avg_volume = sum(d.volume for d in historical_data) / len(historical_data)
-        
-        # Convertir en format API
-        volume_data = []
-        for data in historical_data:
-            change_percent = 0
-            if data.open_price > 0:
-                change_percent = ((data.close_price - data.open_price) / data.open_price * 100)
-            
-            volume_data.append({
-                "date": data.date.isoformat(),
-                "volume": data.volume,
-                "normalized_volume": (data.volume / avg_volume) * 100 if avg_volume > 0 else 100,
-                "close": data.close_price,
-                "change_percent": change_percent,
-            })
-        
-        result = {
-            "data": volume_data,
-            "count": len(volume_data),
-            "days": days,
-            "average_volume": avg_volume,
-        }
-        
-        # Mettre en cache Redis
-        cache_service.set(cache_key, result, ttl_seconds=CACHE_DURATION_SECONDS)
-        return result
+        return Response(content=body, media_type="application/json")
     
     except Exception as e:
         logger.error(f"Error fetching volume data: {e}", exc_info=True)
@@ -144,6 +52,94 @@ async def get_latest_volume(
         }
 
 
+async def _build_latest_volume(days: int) -> dict:
+    """Construit la réponse de /volume/latest (mise en cache par get_latest_volume)"""
+    # D'abord essayer de récupérer depuis la DB (historique des index)
+    # En utilisant les données de volume des index calculés récemment
+    cutoff_date = datetime.now() - timedelta(days=days)
+    # Session propre au calcul : il est partagé entre requêtes et peut se terminer en arrière-plan
+    async with AsyncSessionLocal() as db:
+        recent_indexes = await index_scores.get_series(db, "volume", start=cutoff_date, ascending=True)
+
+    if recent_indexes and len(recent_indexes) >= 5:
+        # Utiliser les données de volume des index
+        logger.debug(f"Using volume data from {len(recent_indexes)} index records")
+
+        # Calculer le volume moyen pour la normalisation
+        volumes = [volume for _, volume in recent_indexes if volume is not None]
+        if volumes:
+            avg_volume = sum(volumes) / len(volumes)
+            volume_max = max(volumes)
+            volume_min = min(volumes)
+
+            volume_data = []
+            for as_of, volume in recent_indexes:
+                if volume is not None:
+                    # Normaliser le volume (0-100)
+                    if volume_max > volume_min:
+                        normalized = ((volume - volume_min) / (volume_max - volume_min)) * 100
+                    else:
+                        normalized = 100
+
+                    volume_data.append({
+                        "date": as_of.date().isoformat(),
+                        "volume": volume,
+                        "normalized_volume": round(normalized, 2),
+                        "close": None,  # Pas disponible dans IndexScore
+                        "change_percent": None,
+                    })
+
+            result = {
+                "data": volume_data,
+                "count": len(volume_data),
+                "days": days,
+                "average_volume": avg_volume,
+            }
+
+            return result
+
+    # Fallback: historique OHLCV local si pas assez de scores en DB
+    logger.debug(f"Not enough data in DB, reading volume data for {days} days from shared market series")
+    historical_data = await market_data.get_history_async(days=days)
+
+    if not historical_data:
+        logger.warning(f"No historical data found for {days} days")
+        return {
+            "data": [],
+            "count": 0,
+            "days": days,
+            "average_volume": 0,
+            "message": "No data available"
+        }
+
+    # Calculer le volume moyen pour la normalisation
+    avg_volume = sum(d.volume for d in historical_data) / len(historical_data)
+
+    # Convertir en format API
+    volume_data = []
+    for data in historical_data:
+        change_percent = 0
+        if data.open_price > 0:
+            change_percent = ((data.close_price - data.open_price) / data.open_price * 100)
+
+        volume_data.append({
+            "date": data.date.isoformat(),
+            "volume": data.volume,
+            "normalized_volume": (data.volume / avg_volume) * 100 if avg_volume > 0 else 100,
+            "close": data.close_price,
+            "change_percent": change_percent,
+        })
+
+    result = {
+        "data": volume_data,
+        "count": len(volume_data),
+        "days": days,
+        "average_volume": avg_volume,
+    }
+
+    return result
+
+
 @router.get("/stats", summary="Volume statistics")
 async def get_volume_stats(
     days: int = Query(30, ge=7, le=365, description="Number of days for statistics")
@@ -154,8 +150,7 @@ async def get_volume_stats(
     - **days**: Période d'analyse (7-365 jours, défaut: 30)
     """
     try:
-        scraper = CasablancaMarketScraper()
-        historical_data = scraper.fetch_historical_data(days=days)
+        historical_data = await market_data.get_history_async(days=days)
         
         if not historical_data:
             return {
@@ -204,8 +199,7 @@ async def get_volume_trend() -> dict:
     Analyse la tendance du volume de trading (croissant, décroissant, stable).
     """
     try:
-        scraper = CasablancaMarketScraper()
-        historical_data = scraper.fetch_historical_data(days=30)
+        historical_data = await market_data.get_history_async(days=30)
         
         if len(historical_data) < 2:
             return {
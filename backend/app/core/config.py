@@ -10,6 +10,11 @@ class Settings(BaseSettings):
     environment: str = "development"
     api_v1_prefix: str = "/api/v1"
     database_url: str = "sqlite:///./fear_greed.db"
+    db_pool_size: int = Field(default=5, description="Persistent connections kept by each database engine pool")
+    db_max_overflow: int = Field(default=10, description="Extra connections opened beyond db_pool_size under load")
+    db_pool_timeout: float = Field(default=30.0, description="Seconds to wait for a free pooled connection")
+    db_pool_recycle: int = Field(default=1800, description="Recycle pooled connections older than this (seconds)")
+    db_pool_pre_ping: bool = Field(default=True, description="Check pooled connections before use")
     timescale_enabled: bool = False
     scheduler_timezone: str = "Africa/Casablanca"
     scheduler_daily_run: str = "16:00"
@@ -22,6 +27,28 @@ class Settings(BaseSettings):
     
     # Redis Configuration (optionnel, fallback en mémoire si non configuré)
     redis_url: str | None = Field(default=None, description="Redis URL (ex: redis://localhost:6379/0)")
+    cache_stale_ttl_seconds: int = Field(default=60, description="How long an expired get_or_set value may still be served while it is refreshed")
+    cache_lock_timeout_seconds: float = Field(default=10.0, description="Lifetime of the per-key recompute lock (and maximum wait for another worker)")
+    cache_distributed_lock: bool = Field(default=True, description="Coalesce recomputations across workers with a Redis SET NX lock")
+
+    # Bounded in-memory cache tier (primary without Redis, L1 in front of Redis)
+    cache_memory_max_entries: int = Field(default=10000, description="Maximum number of entries in the in-memory cache tier")
+    cache_memory_max_bytes: int = Field(default=64 * 1024 * 1024, description="Maximum estimated size in bytes of the in-memory cache tier")
+    cache_memory_policy: str = Field(default="lru", description="Eviction policy of the in-memory cache tier: lru or lfu")
+    cache_memory_sweep_interval_seconds: float = Field(default=30.0, description="Interval of the background sweep removing expired entries")
+    cache_namespace_quotas: dict[str, int] = Field(
+        default_factory=lambda: {"rate_limit": 5000, "media": 1000},
+        description="Maximum entries per key namespace (prefix before the first ':')",
+    )
+    cache_l1_enabled: bool = Field(default=True, description="Keep hot Redis keys in the in-memory tier")
+    cache_l1_ttl_seconds: int = Field(default=5, description="Maximum lifetime of a Redis value in the in-memory L1")
+    cache_l1_excluded_namespaces: list[str] = Field(
+        default_factory=lambda: ["rate_limit"],
+        description="Key namespaces always read from Redis (shared counters)",
+    )
+    cache_codec: str = Field(default="orjson", description="Serializer of cached values: orjson, msgpack or pickle")
+    cache_compression: str = Field(default="none", description="Compression of large cached values: zstd, lz4 or none")
+    cache_compression_min_bytes: int = Field(default=1024, description="Cached values smaller than this are stored uncompressed")
     
     # Security Configuration
     secret_key: str = Field(
@@ -33,11 +60,90 @@ class Settings(BaseSettings):
     
     # OpenAI API Key (optionnel)
     openai_api_key: str | None = Field(default=None, description="OpenAI API key for LLM sentiment analysis")
+    openai_base_url: str | None = Field(default=None, description="OpenAI-compatible API base URL (default: api.openai.com)")
+
+    # LLM batch sentiment engine
+    llm_max_concurrency: int = Field(default=8, description="Maximum number of in-flight LLM requests")
+    llm_requests_per_minute: int = Field(default=300, description="Token-bucket rate limit for LLM requests")
+    llm_pack_size: int = Field(default=5, description="Maximum number of short headlines packed into one LLM prompt")
+    llm_pack_max_chars: int = Field(default=400, description="Articles longer than this (title + summary) are analyzed alone")
+    llm_request_timeout_seconds: float = Field(default=30.0, description="Timeout of a single LLM request")
+
+    # Sentiment result cache
+    sentiment_cache_enabled: bool = Field(default=True, description="Reuse sentiment results for unchanged articles")
+    sentiment_cache_ttl_seconds: int = Field(default=7 * 24 * 3600, description="Lifetime of a cached sentiment result")
+    sentiment_cache_max_entries: int = Field(default=20000, description="Maximum entries kept in the in-process sentiment LRU")
+
+    # Bulk re-analysis of stored articles (checkpoint persisted under models_dir)
+    reanalysis_chunk_size: int = Field(default=500, description="Articles read, scored and written back per chunk during re-analysis")
+    reanalysis_workers: int = Field(default=0, description="Scoring processes for dictionary re-analysis (0: one per CPU)")
     
+    # Incremental market components (rolling state persisted under models_dir)
+    incremental_components_enabled: bool = Field(default=True, description="Update market components incrementally from a persisted rolling state")
+
+    # Shared market data (Casablanca Stock Exchange session, local time)
+    market_session_open: str = Field(default="09:30", description="Opening time of the trading session (HH:MM, scheduler timezone)")
+    market_session_close: str = Field(default="15:30", description="Closing time of the trading session (HH:MM, scheduler timezone)")
+    market_data_ttl_seconds: int = Field(default=300, description="Lifetime of the cached market series during the trading session")
+    market_data_history_days: int = Field(default=400, description="Calendar days kept in the shared canonical market series")
+
+    # Index history (/index/history)
+    index_history_max_raw_points: int = Field(default=365, description="Maximum number of raw scores returned by the raw resolution")
+    index_history_chart_points: int = Field(default=500, description="Default point budget of the lttb resolution")
+
+    # Latest snapshot (published by the pipeline, served by the read endpoints)
+    snapshot_top_articles: int = Field(default=10, description="Most recent articles included in the latest snapshot")
+    snapshot_ttl_seconds: int = Field(default=7 * 24 * 3600, description="Lifetime of a published snapshot in the shared cache")
+    snapshot_max_age_seconds: float = Field(default=60.0, description="Age after which a worker re-reads its snapshot from the database (catches scores not published through the store)")
+
+    # Media scraping
+    media_source_timeout_seconds: float = Field(default=60.0, description="Maximum time allowed for a single media source during concurrent scraping")
+    media_host_min_interval_seconds: float = Field(default=2.0, description="Minimum delay between two requests to the same media host")
+    media_upsert_chunk_size: int = Field(default=500, description="Articles written per INSERT ... ON CONFLICT statement")
+    media_max_articles_per_source: int = Field(default=10, description="Articles kept per media source on each pipeline run")
+
+    # HTTP response cache for scrapers (on disk, revalidated with If-None-Match / If-Modified-Since)
+    http_cache_enabled: bool = Field(default=True, description="Cache scraped pages on disk and revalidate them with conditional requests")
+    http_cache_dir: Path | None = Field(default=None, description="Directory of the HTTP response cache (default: models_dir/http_cache)")
+    http_cache_max_bytes: int = Field(default=200 * 1024 * 1024, description="Maximum size of the HTTP response cache; oldest entries are removed first")
+    http_cache_default_freshness_seconds: int = Field(default=0, description="Seconds a cached response is served without revalidation when no rule or max-age applies")
+    http_cache_freshness: dict[str, int] = Field(
+        default_factory=lambda: {
+            "medias24.com": 300,
+            "boursenews.ma": 300,
+            "challenge.ma": 300,
+            "lavieeco.com": 300,
+            "casablanca-bourse.com": 0,
+        },
+        description="Seconds a cached response is served without revalidation, per host (subdomains included)",
+    )
+
+    # Streaming article pipeline (scrape → dedupe → content → sentiment → persist)
+    media_stream_queue_size: int = Field(default=50, description="Articles buffered between two stages of the streaming article pipeline")
+    media_stream_batch_size: int = Field(default=20, description="Articles scored or persisted together by the streaming pipeline")
+    media_stream_linger_seconds: float = Field(default=0.5, description="Maximum wait for a partial batch before it is scored or persisted")
+    media_fetch_content: bool = Field(default=False, description="Download each article page to fill its content before scoring")
+    media_content_concurrency: int = Field(default=4, description="Article pages downloaded concurrently by the content stage")
+
+    # Near-duplicate article detection (MinHash signatures, LSH index stored with media_articles)
+    dedup_similarity_threshold: float = Field(default=0.8, description="Estimated Jaccard similarity above which two articles are duplicates")
+
     # Rate Limiting
     rate_limit_enabled: bool = Field(default=True, description="Enable rate limiting")
     rate_limit_per_minute: int = Field(default=60, description="Requests per minute per IP")
     rate_limit_per_hour: int = Field(default=1000, description="Requests per hour per IP")
+    rate_limit_route_costs: dict[str, int] = Field(
+        default_factory=lambda: {
+            "/api/v1/pipeline/run": 10,
+            "/api/v1/pipeline/run-background": 10,
+            "/api/v1/media/trigger-scraping": 10,
+            "/api/v1/financial-reports/scrape": 10,
+            "/api/v1/backtest/run": 5,
+            "/api/v1/simplified": 3,
+            "/api/v1/simplified-v2": 3,
+        },
+        description="Rate-limit cost per path prefix, matched on whole path segments (other routes cost 1)",
+    )
 
     class Config:
         env_file = ".env"
@@ -1,10 +1,12 @@
 """
 Rate limiting pour protéger l'API contre les abus
 """
-from typing import Optional
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence
 from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
 from datetime import datetime, timedelta
+import math
 import time
 
 from app.core.config import settings
@@ -15,23 +17,177 @@ logger = get_logger(__name__)
 cache_service = get_cache_service()
 
 
+# GCRA (Generic Cell Rate Algorithm) atomique sur plusieurs fenêtres en un seul
+# aller-retour Redis. Pour chaque limite, la clé contient le "theoretical
+# arrival time" (TAT, en ms) ; la requête n'est comptée que si toutes les
+# limites l'autorisent. L'horloge est celle de Redis (cohérente entre workers).
+#   KEYS[i]          : clé de la limite i
+#   ARGV[1]          : coût de la requête
+#   ARGV[2i], [2i+1] : période (ms) et nombre de requêtes de la limite i
+# Retour : {autorisé (0/1), index de la limite dépassée, retry_after (ms), restant}
+GCRA_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + tonumber(time[2]) / 1000
+local cost = tonumber(ARGV[1])
+local tats = {}
+for i = 1, #KEYS do
+    local period = tonumber(ARGV[2 * i])
+    local interval = period / tonumber(ARGV[2 * i + 1])
+    local tat = tonumber(redis.call('GET', KEYS[i])) or now
+    if tat < now then
+        tat = now
+    end
+    local new_tat = tat + interval * cost
+    local allow_at = new_tat - period
+    if allow_at > now then
+        return {0, i, math.ceil(allow_at - now), 0}
+    end
+    tats[i] = new_tat
+end
+local remaining = -1
+for i = 1, #KEYS do
+    local period = tonumber(ARGV[2 * i])
+    local interval = period / tonumber(ARGV[2 * i + 1])
+    redis.call('SET', KEYS[i], string.format('%.3f', tats[i]), 'PX', math.ceil(tats[i] - now))
+    local left = math.floor((period - (tats[i] - now)) / interval)
+    if remaining < 0 or left < remaining then
+        remaining = left
+    end
+end
+return {1, 0, 0, remaining}
+"""
+
+
+@dataclass(slots=True)
+class RateLimit:
+    """Limite de taux : ``limit`` unités de coût par ``period_seconds``"""
+    name: str
+    limit: int
+    period_seconds: int
+
+
+@dataclass(slots=True)
+class RateLimitDecision:
+    allowed: bool
+    remaining: int = 0
+    limit: Optional[RateLimit] = None  # Limite dépassée si refusé
+    retry_after: float = 0.0
+
+    def to_info(self) -> Optional[dict]:
+        if self.allowed or self.limit is None:
+            return None
+        return {
+            "limit_type": self.limit.name,
+            "limit": self.limit.limit,
+            "retry_after": max(1, math.ceil(self.retry_after)),
+        }
+
+
+class LocalGCRALimiter:
+    """
+    GCRA en mémoire (fallback sans Redis)
+
+    Sans verrou : le middleware s'exécute dans la boucle d'événements, chaque
+    décision est une lecture puis une affectation du TAT sans point d'attente.
+    Les TAT échus sont purgés périodiquement pour borner la mémoire.
+    """
+
+    PRUNE_THRESHOLD = 10000
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._tats: Dict[str, float] = {}
+
+    def hit(self, key: str, limits: Sequence[RateLimit], cost: int = 1) -> RateLimitDecision:
+        now = self._clock()
+        new_tats = []
+        for limit in limits:
+            interval = limit.period_seconds / limit.limit
+            tat = max(self._tats.get(f"{key}:{limit.name}", now), now)
+            new_tat = tat + interval * cost
+            allow_at = new_tat - limit.period_seconds
+            if allow_at > now:
+                return RateLimitDecision(False, 0, limit, allow_at - now)
+            new_tats.append((limit, new_tat))
+
+        remaining = None
+        for limit, new_tat in new_tats:
+            self._tats[f"{key}:{limit.name}"] = new_tat
+            left = int((limit.period_seconds - (new_tat - now)) / (limit.period_seconds / limit.limit))
+            remaining = left if remaining is None else min(remaining, left)
+
+        if len(self._tats) > self.PRUNE_THRESHOLD:
+            self._prune(now)
+        return RateLimitDecision(True, remaining or 0)
+
+    def _prune(self, now: float) -> None:
+        for state_key in [k for k, tat in self._tats.items() if tat <= now]:
+            self._tats.pop(state_key, None)
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+
+class RedisGCRALimiter:
+    """GCRA partagé entre workers : un seul EVALSHA par requête"""
+
+    KEY_PREFIX = "rate_limit"
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self._script = redis_client.register_script(GCRA_SCRIPT)
+
+    def hit(self, key: str, limits: Sequence[RateLimit], cost: int = 1) -> RateLimitDecision:
+        keys = [f"{self.KEY_PREFIX}:{limit.name}:{key}" for limit in limits]
+        args: List[int] = [cost]
+        for limit in limits:
+            args.extend([limit.period_seconds * 1000, limit.limit])
+
+        allowed, index, retry_after_ms, remaining = self._script(keys=keys, args=args)
+        if allowed:
+            return RateLimitDecision(True, int(remaining))
+        return RateLimitDecision(False, 0, limits[int(index) - 1], int(retry_after_ms) / 1000)
+
+
 class RateLimiter:
     """
     Rate limiter utilisant Redis (ou mémoire) pour limiter les requêtes par IP
+    
+    Algorithme GCRA sur les fenêtres minute et heure : une seule opération
+    atomique par requête (script Lua sur Redis, fallback en mémoire sinon),
+    avec un coût par route (les endpoints lourds consomment plus de quota).
     """
     
     def __init__(
         self,
         requests_per_minute: Optional[int] = None,
-        requests_per_hour: Optional[int] = None
+        requests_per_hour: Optional[int] = None,
+        route_costs: Optional[Mapping[str, int]] = None,
+        redis_client=None,
     ):
         """
         Args:
             requests_per_minute: Nombre de requêtes par minute (défaut: depuis config)
             requests_per_hour: Nombre de requêtes par heure (défaut: depuis config)
+            route_costs: Coût par préfixe de chemin (défaut: depuis config)
+            redis_client: Client Redis (défaut: celui du CacheService s'il est connecté)
         """
         self.requests_per_minute = requests_per_minute or settings.rate_limit_per_minute
         self.requests_per_hour = requests_per_hour or settings.rate_limit_per_hour
+        self.limits = [
+            RateLimit("minute", self.requests_per_minute, 60),
+            RateLimit("hour", self.requests_per_hour, 3600),
+        ]
+        costs = route_costs if route_costs is not None else settings.rate_limit_route_costs
+        # Préfixes les plus longs d'abord
+        self.route_costs = sorted(costs.items(), key=lambda item: len(item[0]), reverse=True)
+
+        self.local_limiter = LocalGCRALimiter()
+        self.redis_limiter: Optional[RedisGCRALimiter] = None
+        if redis_client is None and cache_service.use_redis:
+            redis_client = cache_service.redis_client
+        if redis_client is not None:
+            self.redis_limiter = RedisGCRALimiter(redis_client)
     
     def get_client_ip(self, request: Request) -> str:
         """
@@ -59,6 +215,16 @@ class RateLimiter:
         
         return "unknown"
     
+    def get_route_cost(self, path: str) -> int:
+        """
+        Coût d'une requête selon le préfixe de route le plus spécifique (défaut: 1).
+        Le préfixe couvre des segments entiers : ``/simplified`` ne couvre pas ``/simplified-v2``.
+        """
+        for prefix, cost in self.route_costs:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return cost
+        return 1
+    
     def check_rate_limit(self, request: Request) -> tuple[bool, Optional[dict]]:
         """
         Vérifie si la requête respecte les limites de taux
@@ -74,36 +240,17 @@ class RateLimiter:
         if not settings.rate_limit_enabled:
             return True, None
         
-        client_ip = self.get_client_ip(request)
-        current_time = time.time()
-        
-        # Clés de cache
-        minute_key = f"rate_limit:minute:{client_ip}"
-        hour_key = f"rate_limit:hour:{client_ip}"
-        
-        # Vérifier la limite par minute
-        minute_count = cache_service.get(minute_key) or 0
-        if minute_count >= self.requests_per_minute:
-            return False, {
-                "limit_type": "minute",
-                "limit": self.requests_per_minute,
-                "retry_after": 60 - int(current_time % 60)
-            }
-        
-        # Vérifier la limite par heure
-        hour_count = cache_service.get(hour_key) or 0
-        if hour_count >= self.requests_per_hour:
-            return False, {
-                "limit_type": "hour",
-                "limit": self.requests_per_hour,
-                "retry_after": 3600 - int(current_time % 3600)
-            }
-        
-        # Incrémenter les compteurs
-        cache_service.set(minute_key, minute_count + 1, ttl_seconds=60)
-        cache_service.set(hour_key, hour_count + 1, ttl_seconds=3600)
-        
-        return True, None
+        decision = self.hit(self.get_client_ip(request), self.get_route_cost(request.url.path))
+        return decision.allowed, decision.to_info()
+    
+    def hit(self, client_key: str, cost: int = 1) -> RateLimitDecision:
+        """Compte une requête de coût ``cost`` pour le client (Redis, sinon mémoire)"""
+        if self.redis_limiter is not None:
+            try:
+                return self.redis_limiter.hit(client_key, self.limits, cost)
+            except Exception as e:
+                logger.warning(f"Erreur rate limiting Redis ({e}), fallback en mémoire")
+        return self.local_limiter.hit(client_key, self.limits, cost)
     
     async def __call__(self, request: Request):
         """
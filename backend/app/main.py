@@ -11,6 +11,7 @@ from app.core.logging import get_logger
 from app.core.rate_limiter import rate_limiter
 from app.core.config import settings
 from app.core.monitoring import metrics_middleware
+from app.models.database import dispose_engines
 
 
 logger = get_logger(__name__)
@@ -53,6 +54,7 @@ async def lifespan(app: FastAPI):
     logger.info("🛑 Shutting down Fear & Greed Index API")
     scheduler_service.shutdown()
     logger.info("✅ Scheduler stopped")
+    await dispose_engines()
 
 
 def create_application() -> FastAPI:
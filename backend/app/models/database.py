@@ -1,6 +1,9 @@
+from collections.abc import AsyncIterator
+
 from sqlalchemy import MetaData, create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
 
@@ -14,25 +17,80 @@ NAMING_CONVENTION = {
 
 metadata = MetaData(naming_convention=NAMING_CONVENTION)
 
-# Use SQLite for development
-if settings.database_url.startswith("sqlite"):
-    engine = create_engine(settings.database_url, echo=False, future=True)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    async_session = None
-else:
-    engine = create_async_engine(settings.database_url, echo=False, future=True)
-    SessionLocal = None
-    async_session = async_sessionmaker(
-        bind=engine,
-        autocommit=False,
-        autoflush=False,
-        expire_on_commit=False,
-        class_=AsyncSession,
-    )
-
-
-def get_session():
-    if settings.database_url.startswith("sqlite"):
-        return SessionLocal()
-    else:
-        return async_session()
\ No newline at end of file
+# Drivers par dialecte : synchrone (pipeline, scripts, services) et async (endpoints)
+SYNC_DRIVERS = {"sqlite": "sqlite", "postgresql": "postgresql+psycopg2"}
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def _with_driver(url: str, drivers: dict[str, str]) -> str:
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "postgres":
+        backend = "postgresql"
+    if backend not in drivers:
+        return url
+    return parsed.set(drivername=drivers[backend]).render_as_string(hide_password=False)
+
+
+def sync_database_url(url: str) -> str:
+    """URL du moteur synchrone (sqlite / psycopg2), quel que soit le driver configuré"""
+    return _with_driver(url, SYNC_DRIVERS)
+
+
+def async_database_url(url: str) -> str:
+    """URL du moteur async (aiosqlite / asyncpg), quel que soit le driver configuré"""
+    return _with_driver(url, ASYNC_DRIVERS)
+
+
+def pool_options(url: str) -> dict:
+    """Paramètres du pool de connexions (ignorés pour une base SQLite en mémoire)"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+# Moteur synchrone : pipeline, scripts et services exécutés hors boucle d'événements
+engine = create_engine(
+    sync_database_url(settings.database_url),
+    echo=False,
+    future=True,
+    **pool_options(settings.database_url),
+)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Moteur async : endpoints de l'API (aiosqlite pour SQLite, asyncpg pour Postgres)
+async_engine = create_async_engine(
+    async_database_url(settings.database_url),
+    echo=False,
+    future=True,
+    **pool_options(settings.database_url),
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+    class_=AsyncSession,
+)
+
+
+def get_session() -> Session:
+    return SessionLocal()
+
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    """Session async fermée automatiquement (dependency FastAPI)"""
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+async def dispose_engines() -> None:
+    """Ferme les connexions des pools (arrêt de l'application)"""
+    await async_engine.dispose()
+    engine.dispose()
@@ -2,18 +2,29 @@ from datetime import date, datetime
 from typing import Optional
 
 from pydantic import BaseModel, Field
-from sqlalchemy import Column, DateTime, Float, Integer, String, create_engine
+from sqlalchemy import (
+    BigInteger, Column, Date, DateTime, Float, ForeignKey, Index, Integer, LargeBinary, SmallInteger, String, create_engine,
+)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import deferred, sessionmaker
 
 Base = declarative_base()
 
+# Colonnes lues par les séries et agrégats sur une plage de dates (index couvrant)
+INDEX_SCORE_VALUE_COLUMNS = (
+    "score", "momentum", "price_strength", "volume", "volatility", "equity_vs_bonds", "media_sentiment",
+)
+
+
+def _not_postgresql(ddl, target, bind, dialect, **kw) -> bool:
+    return dialect.name != "postgresql"
+
 
 class IndexScore(Base):
     __tablename__ = "index_scores"
     
     id = Column(Integer, primary_key=True, index=True)
-    as_of = Column(DateTime, nullable=False, index=True)
+    as_of = Column(DateTime, nullable=False)
     score = Column(Float, nullable=False)
     momentum = Column(Float, nullable=True)
     price_strength = Column(Float, nullable=True)
@@ -23,6 +34,18 @@ class IndexScore(Base):
     media_sentiment = Column(Float, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # Lectures par plage de as_of sans accès à la table : INCLUDE sur Postgres,
+    # colonnes ajoutées à la clé ailleurs (SQLite n'a pas INCLUDE)
+    __table_args__ = (
+        Index(
+            "ix_index_scores_as_of_covering", "as_of",
+            postgresql_include=list(INDEX_SCORE_VALUE_COLUMNS),
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_index_scores_as_of_covering", "as_of", *INDEX_SCORE_VALUE_COLUMNS,
+        ).ddl_if(callable_=_not_postgresql),
+    )
+
 
 class MediaArticle(Base):
     __tablename__ = "media_articles"
@@ -37,9 +60,43 @@ class MediaArticle(Base):
     published_at = Column(DateTime, nullable=True)
     sentiment_score = Column(Float, nullable=True)
     sentiment_label = Column(String, nullable=True)
-    scraped_at = Column(DateTime, default=datetime.utcnow)
+    sentiment_model = Column(String, nullable=True)  # Modèle et version du score ("dictionary:v1", "gpt-4o-mini:v1")
+    # Signature MinHash (uint32 little-endian, voir app.utils.near_duplicates), non chargée par défaut
+    minhash = deferred(Column(LargeBinary, nullable=True))
+    scraped_at = Column(DateTime, default=datetime.utcnow, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Articles les plus récents (offset ou curseur)
+        Index("ix_media_articles_published_at_id", published_at.desc(), id.desc()),
+        # Comptage par source et articles récents d'une source
+        Index("ix_media_articles_source_published_at", source, published_at),
+    )
+
+
+class MediaArticleBand(Base):
+    """Index LSH des articles : une ligne par bande de leur signature MinHash"""
+    __tablename__ = "media_article_bands"
+
+    # Clé primaire (band, bucket, article_id) : sert d'index aux recherches de candidats
+    band = Column(SmallInteger, primary_key=True)
+    bucket = Column(BigInteger, primary_key=True)
+    article_id = Column(Integer, ForeignKey("media_articles.id", ondelete="CASCADE"), primary_key=True, index=True)
+
+
+class MarketBar(Base):
+    """Séance OHLCV d'un indice ou d'un instrument (clé primaire (symbol, date))"""
+    __tablename__ = "market_bars"
+
+    symbol = Column(String, primary_key=True)
+    date = Column(Date, primary_key=True)
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    volume = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 
 # Pydantic schemas for API
 class IndexScoreResponse(BaseModel):
@@ -63,8 +120,20 @@ class ComponentScoresResponse(BaseModel):
         from_attributes = True
 
 
+class IndexHistoryPoint(BaseModel):
+    """Point de l'historique : score brut, ou clôture et statistiques d'un intervalle"""
+    as_of: datetime
+    score: float = Field(..., ge=0.0, le=100.0)
+    open: Optional[float] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+    mean: Optional[float] = None
+    samples: Optional[int] = None
+
+
 class IndexHistoryResponse(BaseModel):
-    data: list[IndexScoreResponse]
+    resolution: str = "raw"
+    data: list[IndexHistoryPoint]
 
 
 class MediaArticleResponse(BaseModel):
@@ -0,0 +1,256 @@
+"""
+TimescaleDB : hypertables, agrégats continus et compression (Postgres uniquement).
+
+Actif lorsque ``settings.timescale_enabled`` est vrai et que la base est
+Postgres (voir ``is_enabled``), les lectures vérifiant en plus que les agrégats
+existent (``aggregates_available``) :
+
+- ``index_scores`` (une ligne toutes les 10 minutes) et ``market_bars``
+  deviennent des hypertables, compressées au-delà d'un certain âge
+- les agrégats continus ``index_scores_daily`` / ``_weekly`` / ``_monthly``
+  matérialisent par intervalle l'ouverture, la clôture, le min, le max, la
+  moyenne et le nombre de valeurs du score et de chaque composante
+
+Les lectures sur de longues périodes (``/index/history?range=all``, fenêtres
+du ``DynamicScalerService``) lisent alors ces agrégats au lieu des lignes
+brutes. La mise en place est faite par la migration Alembic correspondante
+(``setup``), de façon idempotente.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from sqlalchemy import Connection, DateTime, Float, Integer, column, inspect, table, text
+from sqlalchemy.sql.expression import TableClause
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.schemas import INDEX_SCORE_VALUE_COLUMNS
+
+
+logger = get_logger(__name__)
+
+# Statistiques matérialisées pour chaque colonne de valeur : {colonne}_{statistique}
+AGGREGATE_STATISTICS = ("open", "close", "min", "max", "mean", "count")
+
+
+@dataclass(frozen=True, slots=True)
+class Hypertable:
+    """Table convertie en hypertable, découpée en chunks sur ``time_column``"""
+    table: str
+    time_column: str
+    chunk_interval: str
+    compress_after: str
+    segment_by: Optional[str] = None
+
+
+@dataclass(frozen=True, slots=True)
+class ContinuousAggregate:
+    """Agrégat continu de ``index_scores`` par intervalle de ``bucket_width``"""
+    name: str
+    bucket_width: str
+    # Fenêtre rafraîchie par la politique (au moins deux intervalles) ; au-delà
+    # de end_offset, l'agrégation temps réel complète avec les lignes brutes
+    start_offset: str
+    end_offset: str
+    schedule_interval: str
+
+
+HYPERTABLES = (
+    # ~52k lignes par an : chunks mensuels, compressés après 4 mois
+    Hypertable("index_scores", "as_of", chunk_interval="30 days", compress_after="120 days"),
+    # Une séance par jour et par symbole : chunks annuels, segmentés par symbole
+    Hypertable("market_bars", "date", chunk_interval="1 year", compress_after="2 years", segment_by="symbol"),
+)
+
+CONTINUOUS_AGGREGATES: Dict[str, ContinuousAggregate] = {
+    "day": ContinuousAggregate("index_scores_daily", "1 day", "3 days", "1 hour", "30 minutes"),
+    "week": ContinuousAggregate("index_scores_weekly", "1 week", "3 weeks", "1 hour", "6 hours"),
+    "month": ContinuousAggregate("index_scores_monthly", "1 month", "3 months", "1 hour", "1 day"),
+}
+
+
+def is_enabled(bind) -> bool:
+    """Vrai si les hypertables et agrégats continus sont utilisés pour ``bind`` (engine ou connexion)"""
+    return settings.timescale_enabled and bind.dialect.name == "postgresql"
+
+
+# Présence des agrégats continus, vérifiée une fois par base (URL)
+_aggregates_present: Dict[str, bool] = {}
+
+
+def aggregates_available(connection: Connection) -> bool:
+    """
+    Vrai si ``is_enabled`` et si les agrégats continus existent : la migration
+    ne les crée pas si ``timescale_enabled`` était faux lors de sa mise à jour.
+    Sinon les lectures restent sur les lignes brutes.
+    """
+    if not is_enabled(connection):
+        return False
+
+    key = str(connection.engine.url)
+    present = _aggregates_present.get(key)
+    if present is None:
+        # to_regclass ne lève pas d'erreur (transaction intacte) si la vue n'existe pas
+        missing = [
+            aggregate.name
+            for aggregate in CONTINUOUS_AGGREGATES.values()
+            if connection.execute(text("SELECT to_regclass(:name)"), {"name": aggregate.name}).scalar() is None
+        ]
+        present = _aggregates_present[key] = not missing
+        if missing:
+            logger.warning(
+                f"⚠️ Agrégats continus absents ({', '.join(missing)}) : lectures sur les lignes brutes "
+                f"(relancer la migration TimescaleDB avec timescale_enabled)"
+            )
+    return present
+
+
+# ============================================================================
+# LECTURE
+# ============================================================================
+
+def aggregate_table(resolution: str) -> TableClause:
+    """
+    Agrégat continu d'une résolution (``day``, ``week`` ou ``month``) pour les requêtes
+
+    Colonnes : ``bucket``, ``samples`` et ``{colonne}_{statistique}`` pour chaque
+    colonne de ``INDEX_SCORE_VALUE_COLUMNS`` et statistique de ``AGGREGATE_STATISTICS``.
+    """
+    if resolution not in CONTINUOUS_AGGREGATES:
+        raise ValueError(f"Résolution sans agrégat continu: {resolution}")
+
+    columns = [column("bucket", DateTime), column("samples", Integer)]
+    for name in INDEX_SCORE_VALUE_COLUMNS:
+        for statistic in AGGREGATE_STATISTICS:
+            columns.append(column(f"{name}_{statistic}", Integer if statistic == "count" else Float))
+    return table(CONTINUOUS_AGGREGATES[resolution].name, *columns)
+
+
+# ============================================================================
+# MISE EN PLACE (migrations)
+# ============================================================================
+
+def hypertable_statement(hypertable: Hypertable) -> str:
+    """Conversion en hypertable, données existantes incluses"""
+    return (
+        f"SELECT create_hypertable('{hypertable.table}', '{hypertable.time_column}', "
+        f"chunk_time_interval => INTERVAL '{hypertable.chunk_interval}', "
+        f"migrate_data => true, if_not_exists => true)"
+    )
+
+
+def compression_statements(hypertable: Hypertable) -> List[str]:
+    """Activation de la compression et politique de compression des anciens chunks"""
+    options = [
+        "timescaledb.compress",
+        f"timescaledb.compress_orderby = '{hypertable.time_column} DESC'",
+    ]
+    if hypertable.segment_by:
+        options.append(f"timescaledb.compress_segmentby = '{hypertable.segment_by}'")
+
+    return [
+        f"ALTER TABLE {hypertable.table} SET ({', '.join(options)})",
+        f"SELECT add_compression_policy('{hypertable.table}', INTERVAL '{hypertable.compress_after}', "
+        f"if_not_exists => true)",
+    ]
+
+
+def aggregate_statements(aggregate: ContinuousAggregate) -> List[str]:
+    """Création de l'agrégat continu, politique de rafraîchissement et matérialisation initiale"""
+    select_list = [
+        f"time_bucket(INTERVAL '{aggregate.bucket_width}', as_of) AS bucket",
+        "count(*) AS samples",
+    ]
+    for name in INDEX_SCORE_VALUE_COLUMNS:
+        select_list.extend([
+            f"first({name}, as_of) AS {name}_open",
+            f"last({name}, as_of) AS {name}_close",
+            f"min({name}) AS {name}_min",
+            f"max({name}) AS {name}_max",
+            f"avg({name}) AS {name}_mean",
+            f"count({name}) AS {name}_count",
+        ])
+
+    return [
+        f"CREATE MATERIALIZED VIEW IF NOT EXISTS {aggregate.name} "
+        f"WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS "
+        f"SELECT {', '.join(select_list)} FROM index_scores GROUP BY bucket WITH NO DATA",
+        f"SELECT add_continuous_aggregate_policy('{aggregate.name}', "
+        f"start_offset => INTERVAL '{aggregate.start_offset}', "
+        f"end_offset => INTERVAL '{aggregate.end_offset}', "
+        f"schedule_interval => INTERVAL '{aggregate.schedule_interval}', "
+        f"if_not_exists => true)",
+        f"CALL refresh_continuous_aggregate('{aggregate.name}', NULL, NULL)",
+    ]
+
+
+def _primary_key_with_time_column(connection: Connection, hypertable: Hypertable) -> None:
+    # Toute contrainte unique d'une hypertable doit inclure la colonne de temps
+    primary_key = inspect(connection).get_pk_constraint(hypertable.table)
+    columns = primary_key.get("constrained_columns") or []
+    if hypertable.time_column in columns:
+        return
+    connection.execute(text(
+        f"ALTER TABLE {hypertable.table} DROP CONSTRAINT {primary_key['name']}, "
+        f"ADD PRIMARY KEY ({', '.join([*columns, hypertable.time_column])})"
+    ))
+
+
+def _compression_enabled(connection: Connection, hypertable: Hypertable) -> bool:
+    return bool(connection.execute(
+        text("SELECT compression_enabled FROM timescaledb_information.hypertables WHERE hypertable_name = :name"),
+        {"name": hypertable.table},
+    ).scalar())
+
+
+def setup(connection: Connection) -> None:
+    """
+    Met en place hypertables, compression et agrégats continus (idempotent)
+
+    ``connection`` doit être en autocommit : le rafraîchissement initial des
+    agrégats ne peut pas s'exécuter dans une transaction.
+    """
+    connection.execute(text("CREATE EXTENSION IF NOT EXISTS timescaledb"))
+    inspector = inspect(connection)
+
+    for hypertable in HYPERTABLES:
+        if not inspector.has_table(hypertable.table):
+            logger.warning(f"⚠️ Table {hypertable.table} absente, hypertable non créée")
+            continue
+        _primary_key_with_time_column(connection, hypertable)
+        connection.execute(text(hypertable_statement(hypertable)))
+
+        # Les options de compression ne peuvent plus changer une fois des chunks compressés
+        compression_statement, policy_statement = compression_statements(hypertable)
+        if not _compression_enabled(connection, hypertable):
+            connection.execute(text(compression_statement))
+        connection.execute(text(policy_statement))
+        logger.info(f"✅ Hypertable {hypertable.table} (chunks de {hypertable.chunk_interval})")
+
+    if not inspector.has_table("index_scores"):
+        return
+    for aggregate in CONTINUOUS_AGGREGATES.values():
+        for statement in aggregate_statements(aggregate):
+            connection.execute(text(statement))
+        logger.info(f"✅ Agrégat continu {aggregate.name} (intervalle de {aggregate.bucket_width})")
+
+
+def teardown(connection: Connection) -> None:
+    """
+    Supprime agrégats continus et compression (les hypertables restent des
+    hypertables : TimescaleDB ne permet pas de revenir à une table simple)
+    """
+    for aggregate in CONTINUOUS_AGGREGATES.values():
+        connection.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {aggregate.name}"))
+
+    inspector = inspect(connection)
+    for hypertable in HYPERTABLES:
+        if not inspector.has_table(hypertable.table):
+            continue
+        connection.execute(text(f"SELECT remove_compression_policy('{hypertable.table}', if_exists => true)"))
+        connection.execute(text(
+            f"SELECT decompress_chunk(chunk, if_compressed => true) FROM show_chunks('{hypertable.table}') AS chunk"
+        ))
+        connection.execute(text(f"ALTER TABLE {hypertable.table} SET (timescaledb.compress = false)"))
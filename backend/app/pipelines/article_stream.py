@@ -0,0 +1,225 @@
+"""
+Traitement des articles en flux : scraping → dédoublonnage → contenu →
+sentiment → sauvegarde.
+
+Chaque étape est une tâche asyncio reliée à la suivante par une file bornée :
+une étape lente bloque celles qui l'alimentent (contre-pression), et le nombre
+d'articles en mémoire ne dépend que de la taille des files et des lots, pas du
+nombre de sources ni d'articles. Les articles d'une source sont traités dès
+que celle-ci a répondu, pendant que les sources plus lentes téléchargent
+encore. Le sentiment et la sauvegarde travaillent par petits lots (regroupement
+des prompts LLM, un upsert par lot).
+"""
+from __future__ import annotations
+
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence
+import asyncio
+import time
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.pipelines.ingestion.media_scraper import MediaArticle, MediaScraper
+from app.utils.http import HTTPX_AVAILABLE
+from app.utils.near_duplicates import ArticleDeduplicator, to_bytes
+
+
+logger = get_logger(__name__)
+
+# Fin de flux, transmise d'une étape à la suivante
+_DONE = object()
+
+ScoreFunc = Callable[[List[MediaArticle]], Awaitable[List[MediaArticle]]]
+PersistFunc = Callable[[List[MediaArticle]], Awaitable[None]]
+
+
+@dataclass(slots=True)
+class ScoredArticle:
+    """Ce que le calcul des composantes retient d'un article sauvegardé"""
+    published_at: Optional[datetime]
+    sentiment_score: Optional[float]
+
+
+@dataclass(slots=True)
+class StreamStats:
+    scraped: int = 0
+    duplicates: int = 0
+    saved: int = 0
+    source_durations: Dict[str, float] = field(default_factory=dict)
+    first_scored_after: Optional[float] = None  # secondes depuis le début du flux
+
+
+@dataclass(slots=True)
+class StreamResult:
+    articles: List[ScoredArticle]
+    stats: StreamStats
+
+
+class ArticleStream:
+    """Pipeline d'articles en flux, à files bornées entre les étapes"""
+
+    def __init__(
+        self,
+        scraper: MediaScraper,
+        score: ScoreFunc,
+        persist: PersistFunc,
+        max_articles_per_source: int = 10,
+        fetch_content: Optional[bool] = None,
+        queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        linger_seconds: Optional[float] = None,
+        content_concurrency: Optional[int] = None,
+    ):
+        self.scraper = scraper
+        self.score = score
+        self.persist = persist
+        self.max_articles_per_source = max_articles_per_source
+        self.fetch_content = settings.media_fetch_content if fetch_content is None else fetch_content
+        self.queue_size = queue_size or settings.media_stream_queue_size
+        self.batch_size = batch_size or settings.media_stream_batch_size
+        self.linger_seconds = settings.media_stream_linger_seconds if linger_seconds is None else linger_seconds
+        self.content_concurrency = content_concurrency or settings.media_content_concurrency
+
+    async def run(self, sources: Optional[Sequence[str]] = None) -> StreamResult:
+        """Traite toutes les sources (défaut : ``scraper.source_names()``) jusqu'à la sauvegarde"""
+        sources = list(sources) if sources is not None else self.scraper.source_names()
+        stats = StreamStats()
+        scored: List[ScoredArticle] = []
+        started = time.perf_counter()
+
+        scraped = asyncio.Queue(self.queue_size)
+        unique = asyncio.Queue(self.queue_size)
+        completed = asyncio.Queue(self.queue_size) if self.fetch_content else unique
+        analyzed = asyncio.Queue(self.queue_size)
+
+        async with self._client() as client:
+            stages = [
+                self._scrape(sources, client, scraped, stats),
+                self._deduplicate(scraped, unique, stats),
+                *([self._fetch_contents(unique, completed, client)] if self.fetch_content else []),
+                self._score(completed, analyzed, stats, started),
+                self._persist(analyzed, scored, stats),
+            ]
+            await self._run_stages(stages)
+
+        logger.info(
+            f"✅ Flux d'articles terminé en {time.perf_counter() - started:.2f}s : {stats.scraped} collectés, "
+            f"{stats.duplicates} doublons, {stats.saved} sauvegardés"
+        )
+        return StreamResult(articles=scored, stats=stats)
+
+    @staticmethod
+    async def _run_stages(stages: Sequence[Awaitable[None]]) -> None:
+        """
+        Exécute les étapes en parallèle ; si l'une échoue (ou si le flux est
+        annulé), les autres sont annulées et attendues, puis l'erreur est propagée
+        """
+        tasks = [asyncio.ensure_future(stage) for stage in stages]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    def _client(self):
+        """Client httpx partagé par les sources génériques et le téléchargement du contenu"""
+        return self.scraper._async_client() if HTTPX_AVAILABLE else nullcontext(None)
+
+    async def _scrape(self, sources: Sequence[str], client, outbox: asyncio.Queue, stats: StreamStats) -> None:
+        async def scrape_source(source_name: str) -> None:
+            source_started = time.perf_counter()
+            try:
+                articles = await self.scraper.scrape_source_async(
+                    source_name, self.max_articles_per_source, client=client
+                )
+            except Exception as e:
+                logger.error(f"❌ Scraping de {source_name} échoué: {e}")
+                articles = []
+            stats.source_durations[source_name] = round(time.perf_counter() - source_started, 3)
+
+            for article in articles:
+                stats.scraped += 1
+                await outbox.put(article)
+
+        await asyncio.gather(*(scrape_source(source_name) for source_name in sources))
+        await outbox.put(_DONE)
+
+    async def _deduplicate(self, inbox: asyncio.Queue, outbox: asyncio.Queue, stats: StreamStats) -> None:
+        deduplicator = ArticleDeduplicator()
+        while (article := await inbox.get()) is not _DONE:
+            if deduplicator.accept(article):
+                # Signature gardée pour la recherche parmi les articles stockés
+                if deduplicator.signature is not None:
+                    article.minhash = to_bytes(deduplicator.signature)
+                await outbox.put(article)
+            else:
+                stats.duplicates += 1
+        await outbox.put(_DONE)
+
+    async def _fetch_contents(self, inbox: asyncio.Queue, outbox: asyncio.Queue, client) -> None:
+        async def worker() -> None:
+            while (article := await inbox.get()) is not _DONE:
+                if not article.content:
+                    await self.scraper.fetch_content_async(article, client)
+                await outbox.put(article)
+            # Fin de flux transmise aux autres téléchargeurs
+            await inbox.put(_DONE)
+
+        await asyncio.gather(*(worker() for _ in range(self.content_concurrency)))
+        await outbox.put(_DONE)
+
+    async def _score(
+        self,
+        inbox: asyncio.Queue,
+        outbox: asyncio.Queue,
+        stats: StreamStats,
+        started: float,
+    ) -> None:
+        async for batch in self._batches(inbox):
+            analyzed = await self.score(batch)
+            if stats.first_scored_after is None:
+                stats.first_scored_after = time.perf_counter() - started
+            for article in analyzed:
+                await outbox.put(article)
+        await outbox.put(_DONE)
+
+    async def _persist(self, inbox: asyncio.Queue, scored: List[ScoredArticle], stats: StreamStats) -> None:
+        async for batch in self._batches(inbox):
+            await self.persist(batch)
+            stats.saved += len(batch)
+            scored.extend(ScoredArticle(article.published_at, article.sentiment_score) for article in batch)
+
+    async def _batches(self, inbox: asyncio.Queue) -> AsyncIterator[List[MediaArticle]]:
+        """
+        Lots d'au plus ``batch_size`` articles ; un lot incomplet part après
+        ``linger_seconds`` d'attente pour ne pas retenir les premiers articles
+        """
+        loop = asyncio.get_running_loop()
+        finished = False
+        while not finished:
+            article = await inbox.get()
+            if article is _DONE:
+                return
+
+            batch = [article]
+            deadline = loop.time() + self.linger_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    article = inbox.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        article = await asyncio.wait_for(inbox.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if article is _DONE:
+                    finished = True
+                    break
+                batch.append(article)
+            yield batch
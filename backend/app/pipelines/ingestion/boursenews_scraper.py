@@ -16,6 +16,8 @@ import requests
 from bs4 import BeautifulSoup
 
 from app.core.logging import get_logger
+from app.utils.http_cache import cached_get
+from app.utils.near_duplicates import ArticleDeduplicator
 
 
 logger = get_logger(__name__)
@@ -164,10 +166,10 @@ class BourseNewsScraper:
         articles = []
         
         try:
-            # Rotation User-Agent
-            self._update_headers()
-            
-            response = self.session.get(url, timeout=30)  # Augmenté à 30s pour sites lents
+            # Rotation User-Agent avant une requête réseau (page en cache : pas de requête)
+            response = cached_get(
+                self.session, url, before_request=self._update_headers, timeout=30,  # Augmenté à 30s pour sites lents
+            )
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -358,16 +360,8 @@ class BourseNewsScraper:
             return None
     
     def _deduplicate(self, articles: List[BourseNewsArticle]) -> List[BourseNewsArticle]:
-        """Dédupliquer les articles par URL"""
-        seen_urls = set()
-        unique_articles = []
-        
-        for article in articles:
-            if article.url not in seen_urls:
-                seen_urls.add(article.url)
-                unique_articles.append(article)
-        
-        return unique_articles
+        """Dédupliquer les articles par URL et quasi-doublons (signature MinHash)"""
+        return ArticleDeduplicator().unique(articles)
 
 
 # Fonction helper pour compatibilité avec MediaScraper
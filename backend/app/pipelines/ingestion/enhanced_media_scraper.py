@@ -23,6 +23,7 @@ import requests
 from bs4 import BeautifulSoup
 
 from app.core.logging import get_logger
+from app.utils.http_cache import cached_get
 
 logger = get_logger(__name__)
 
@@ -206,6 +207,11 @@ class EnhancedMediaScraper:
         age = now - published_at
         return age <= self.max_article_age
     
+    def _before_request(self):
+        """Délai entre les requêtes et rotation du User-Agent (requêtes réseau uniquement)"""
+        self._respect_rate_limit()
+        self._update_headers()
+
     def _fetch_with_retry(self, url: str, retries: int = None) -> Optional[str]:
         """
         Récupérer le HTML d'une URL avec retry et backoff exponentiel
@@ -215,10 +221,10 @@ class EnhancedMediaScraper:
         
         for attempt in range(retries):
             try:
-                self._respect_rate_limit()
-                self._update_headers()  # Rotation User-Agent
-                
-                response = self.session.get(url, timeout=30, allow_redirects=True)
+                # Page en cache encore fraîche : ni requête ni délai ; sinon requête conditionnelle
+                response = cached_get(
+                    self.session, url, before_request=self._before_request, timeout=30, allow_redirects=True,
+                )
                 response.raise_for_status()
                 
                 # Vérifier que c'est bien du HTML
@@ -11,6 +11,7 @@ import requests
 from bs4 import BeautifulSoup
 
 from app.core.logging import get_logger
+from app.utils.http_cache import cached_get
 
 logger = get_logger(__name__)
 
@@ -64,8 +65,7 @@ class LaVieEcoScraper:
                 break
 
             try:
-                self._respect_rate_limit()
-                response = self.session.get(url, timeout=20)
+                response = cached_get(self.session, url, before_request=self._respect_rate_limit, timeout=20)
                 response.raise_for_status()
 
                 soup = BeautifulSoup(response.content, "html.parser")
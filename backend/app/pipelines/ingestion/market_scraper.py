@@ -11,6 +11,7 @@ from bs4 import BeautifulSoup
 import pandas as pd
 
 from app.core.logging import get_logger
+from app.utils.http_cache import cached_get
 
 
 logger = get_logger(__name__)
@@ -55,7 +56,8 @@ class CasablancaMarketScraper:
         """Fetch current market data"""
         logger.info("Fetching MASI live market data", extra={"url": self.MARKET_URL})
         try:
-            response = self.session.get(self.MARKET_URL, timeout=30)
+            # Revalidation conditionnelle : un 304 renvoie la page en cache
+            response = cached_get(self.session, self.MARKET_URL, timeout=30)
             response.raise_for_status()
             return self._parse_live_data(response.text)
         except Exception as e:
@@ -73,6 +75,13 @@ class CasablancaMarketScraper:
             logger.error(f"Error fetching historical data: {e}")
             return []
 
+    def fetch_historical_since(self, start_date: date) -> list[MASIHistoricalData]:
+        """Fetch historical MASI bars dated on or after ``start_date`` (incremental sync)"""
+        days = (date.today() - start_date).days + 1
+        if days <= 0:
+            return []
+        return [bar for bar in self.fetch_historical_data(days=days) if bar.date >= start_date]
+
     def _parse_live_data(self, html: str) -> list[MarketSnapshot]:
         """Parse live market data from HTML - VERSION AMÉLIORÉE"""
         soup = BeautifulSoup(html, "html.parser")
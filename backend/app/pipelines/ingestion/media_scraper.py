@@ -2,15 +2,24 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import partial
 from typing import List, Optional
+import asyncio
 import re
-import time
 from urllib.parse import urljoin, urlparse
 
 import requests
 from bs4 import BeautifulSoup
 
+from app.core.config import settings
 from app.core.logging import get_logger
+from app.pipelines.ingestion.enhanced_media_scraper import EnhancedMediaScraper
+from app.utils.http import HTTPX_AVAILABLE, HostThrottle
+from app.utils.http_cache import cached_get, cached_get_async
+from app.utils.near_duplicates import ArticleDeduplicator
+
+if HTTPX_AVAILABLE:
+    import httpx
 
 logger = get_logger(__name__)
 
@@ -60,6 +69,9 @@ class MediaArticle:
     content: str = ""
     sentiment_score: Optional[float] = None
     sentiment_label: str = "neutral"
+    sentiment_model: Optional[str] = None
+    minhash: Optional[bytes] = None  # Signature MinHash (app.utils.near_duplicates)
+    duplicate_of: Optional[int] = None  # Article stocké dont le score a été repris
 
 
 class MediaScraper:
@@ -131,6 +143,11 @@ class MediaScraper:
         self.session.verify = False
         import urllib3
         urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+        # Délai de politesse par hôte, partagé entre modes synchrone et asynchrone
+        self.host_throttle = HostThrottle(settings.media_host_min_interval_seconds)
+        # Extraction du contenu complet des pages d'articles (créée au premier besoin)
+        self._content_extractor: Optional[EnhancedMediaScraper] = None
         
         # Keywords for financial content
         self.finance_keywords = [
@@ -140,112 +157,157 @@ class MediaScraper:
             'bancaire', 'crédit', 'capital', 'entreprise', 'secteur', 'performance'
         ]
 
+    # Sources couvertes par un scraper spécialisé (ordre de priorité)
+    SPECIALIZED_SOURCES = ("medias24", "boursenews", "challenge", "lavieeco")
+
+    def source_names(self) -> List[str]:
+        """Liste ordonnée des sources disponibles (spécialisées puis génériques)."""
+        available = {
+            "medias24": MEDIAS24_AVAILABLE,
+            "boursenews": BOURSENEWS_AVAILABLE,
+            "challenge": CHALLENGE_AVAILABLE,
+            "lavieeco": LAVIEECO_AVAILABLE,
+        }
+        names = [name for name in self.SPECIALIZED_SOURCES if available[name]]
+        names.extend(name for name in self.SOURCES if name not in self.SPECIALIZED_SOURCES)
+        return names
+
     def scrape_all_sources(self, max_articles_per_source: int = 10) -> List[MediaArticle]:
         """Scrape articles from all configured sources"""
         all_articles = []
-        
-        # 1. Scraper Medias24 avec le scraper spécialisé (prioritaire - numéro 1 info économique)
-        if MEDIAS24_AVAILABLE:
-            try:
-                logger.info("Scraping Medias24.com with specialized scraper")
-                medias24_scraper = Medias24Scraper(delay_between_requests=2)
-                medias24_articles = medias24_scraper.fetch_articles(max_articles=max_articles_per_source)
-                
-                # Convertir en MediaArticle
-                for m24_article in medias24_articles:
-                    all_articles.append(convert_medias24(m24_article))
-                
-                logger.info(f"✅ Found {len(medias24_articles)} articles from Medias24")
-                
-                # Respecter le délai
-                time.sleep(2)
-                
-            except Exception as e:
-                logger.error(f"Error scraping Medias24: {e}")
-        
-        # 2. Scraper BourseNews avec le scraper spécialisé (très pertinent pour bourse)
-        if BOURSENEWS_AVAILABLE:
-            try:
-                logger.info("Scraping BourseNews.ma Espace Investisseurs with specialized scraper")
-                boursenews_scraper = BourseNewsScraper(delay_between_requests=1)
-                boursenews_articles = boursenews_scraper.fetch_articles(
-                    max_articles=max_articles_per_source,
-                    sections=["espace_investisseurs"]  # Utiliser l'Espace Investisseurs
+
+        for source_name in self.source_names():
+            all_articles.extend(self.scrape_source(source_name, max_articles_per_source))
+
+        return self.finalize_articles(all_articles)
+
+    def scrape_source(self, source_name: str, max_articles: int = 10) -> List[MediaArticle]:
+        """
+        Scrape une seule source (spécialisée ou générique).
+
+        Les erreurs sont journalisées et une liste vide est renvoyée, ce qui
+        permet de scraper les sources indépendamment les unes des autres.
+        """
+        if source_name == "medias24":
+            return self._scrape_medias24(max_articles)
+        if source_name == "boursenews":
+            return self._scrape_boursenews(max_articles)
+        if source_name in ("challenge", "lavieeco"):
+            return self._scrape_specialized(source_name, max_articles)
+
+        source_config = self.SOURCES.get(source_name)
+        if source_config is None:
+            logger.warning(f"Unknown media source: {source_name}")
+            return []
+
+        try:
+            logger.info(f"Scraping {source_name}")
+            articles = self._scrape_source(source_name, source_config, max_articles)
+            logger.info(f"Found {len(articles)} articles from {source_name}")
+            return articles
+        except Exception as e:
+            logger.error(f"Error scraping {source_name}: {e}")
+            return []
+
+    async def scrape_all_sources_async(
+        self,
+        max_articles_per_source: int = 10,
+        source_timeout: Optional[float] = None,
+    ) -> List[MediaArticle]:
+        """
+        Scrape toutes les sources en parallèle (asyncio + httpx).
+
+        Les délais de politesse sont appliqués par hôte et chaque source est
+        bornée par ``source_timeout`` : la durée totale est proche de celle
+        de la source la plus lente plutôt que de la somme de toutes.
+        """
+        async with self._async_client() as client:
+            per_source = await asyncio.gather(*(
+                self.scrape_source_async(
+                    source_name,
+                    max_articles_per_source,
+                    client=client,
+                    timeout=source_timeout,
                 )
-                
-                # Convertir en MediaArticle
-                for bn_article in boursenews_articles:
-                    all_articles.append(convert_boursenews(bn_article))
-                
-                logger.info(f"✅ Found {len(boursenews_articles)} articles from BourseNews.ma")
-                
-                # Respecter le délai
-                time.sleep(1)
-                
-            except requests.exceptions.Timeout:
-                logger.warning("⏱️ BourseNews.ma timeout (>30s) - Site trop lent, passage aux autres sources")
-            except requests.exceptions.ConnectionError:
-                logger.warning("🔌 BourseNews.ma connection error - Site indisponible, passage aux autres sources")
-            except Exception as e:
-                logger.warning(f"⚠️ BourseNews.ma temporairement indisponible: {str(e)[:80]}...")
-        
-        # 3. Scraper Challenge.ma avec le scraper spécialisé
-        if CHALLENGE_AVAILABLE:
-            try:
-                logger.info("Scraping Challenge.ma with specialized scraper")
-                challenge_scraper = ChallengeScraper(delay_between_requests=2)
-                challenge_articles = challenge_scraper.fetch_articles(max_articles=max_articles_per_source)
+                for source_name in self.source_names()
+            ))
 
-                for ch_article in challenge_articles:
-                    converted = self._convert_specialized_article(ch_article, "challenge")
-                    if converted:
-                        all_articles.append(converted)
+        return self.finalize_articles([article for articles in per_source for article in articles])
 
-                logger.info(f"✅ Found {len(challenge_articles)} articles from Challenge.ma")
-                time.sleep(2)
+    async def scrape_source_async(
+        self,
+        source_name: str,
+        max_articles: int = 10,
+        client: Optional["httpx.AsyncClient"] = None,
+        timeout: Optional[float] = None,
+    ) -> List[MediaArticle]:
+        """
+        Version asynchrone de ``scrape_source`` bornée par un timeout.
 
-            except Exception as e:
-                logger.error(f"Error scraping Challenge.ma: {e}")
+        Les sources génériques passent par httpx ; les scrapers spécialisés
+        (synchrones, avec leur propre délai entre requêtes) tournent dans un
+        thread. En cas de dépassement du timeout, la source est ignorée.
+        """
+        if timeout is None:
+            timeout = settings.media_source_timeout_seconds
 
-        # 4. Scraper La Vie Éco avec le scraper spécialisé
-        if LAVIEECO_AVAILABLE:
-            try:
-                logger.info("Scraping LaVieEco.com with specialized scraper")
-                lavieeco_scraper = LaVieEcoScraper(delay_between_requests=2)
-                lavieeco_articles = lavieeco_scraper.fetch_articles(max_articles=max_articles_per_source)
+        try:
+            if source_name in self.SPECIALIZED_SOURCES or not HTTPX_AVAILABLE:
+                return await asyncio.wait_for(
+                    asyncio.to_thread(self.scrape_source, source_name, max_articles),
+                    timeout=timeout,
+                )
 
-                for lv_article in lavieeco_articles:
-                    converted = self._convert_specialized_article(lv_article, "lavieeco")
-                    if converted:
-                        all_articles.append(converted)
+            if client is None:
+                async with self._async_client() as own_client:
+                    return await asyncio.wait_for(
+                        self._scrape_generic_async(source_name, max_articles, own_client),
+                        timeout=timeout,
+                    )
+            return await asyncio.wait_for(
+                self._scrape_generic_async(source_name, max_articles, client),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ {source_name} timeout (>{timeout}s) - source ignorée pour ce run")
+            return []
 
-                logger.info(f"✅ Found {len(lavieeco_articles)} articles from La Vie Éco")
-                time.sleep(2)
+    def _async_client(self) -> "httpx.AsyncClient":
+        return httpx.AsyncClient(
+            headers=dict(self.session.headers),
+            verify=False,
+            follow_redirects=True,
+        )
 
-            except Exception as e:
-                logger.error(f"Error scraping La Vie Éco: {e}")
+    async def _scrape_generic_async(
+        self,
+        source_name: str,
+        max_articles: int,
+        client: "httpx.AsyncClient",
+    ) -> List[MediaArticle]:
+        source_config = self.SOURCES.get(source_name)
+        if source_config is None:
+            logger.warning(f"Unknown media source: {source_name}")
+            return []
 
-        # 5. Scraper les autres sources génériques (L'Économiste, etc.)
-        for source_name, source_config in self.SOURCES.items():
-            # Skip sources déjà scrapées avec scrapers spécialisés
-            if source_name in ["boursenews", "medias24", "challenge", "lavieeco"]:
-                continue
-            
-            try:
-                logger.info(f"Scraping {source_name}")
-                articles = self._scrape_source(source_name, source_config, max_articles_per_source)
-                all_articles.extend(articles)
-                logger.info(f"Found {len(articles)} articles from {source_name}")
-                
-                # Be respectful with delays
-                time.sleep(2)
-                
-            except Exception as e:
-                logger.error(f"Error scraping {source_name}: {e}")
-                continue
-        
-        # Remove duplicates and sort by date
-        unique_articles = self._deduplicate_articles(all_articles)
+        logger.info(f"Scraping {source_name}")
+        try:
+            url = source_config["finance_url"]
+            response = await cached_get_async(
+                client, url, before_request=partial(self.host_throttle.wait_async, url), timeout=30,
+            )
+            response.raise_for_status()
+            articles = self._parse_source_page(response.content, source_name, source_config, max_articles)
+        except Exception as e:
+            logger.error(f"Error scraping {source_name}: {e}")
+            articles = self._get_fallback_articles(source_name)
+
+        logger.info(f"Found {len(articles)} articles from {source_name}")
+        return articles
+
+    def finalize_articles(self, articles: List[MediaArticle]) -> List[MediaArticle]:
+        """Dédoublonne les articles de toutes les sources et les trie par date."""
+        unique_articles = self._deduplicate_articles(articles)
         logger.info(f"✅ Total: {len(unique_articles)} unique articles from all sources")
 
         def _normalize_date(article: MediaArticle) -> datetime:
@@ -257,33 +319,92 @@ class MediaScraper:
 
         return sorted(unique_articles, key=_normalize_date, reverse=True)
 
+    def _scrape_medias24(self, max_articles: int) -> List[MediaArticle]:
+        """Medias24 avec le scraper spécialisé (prioritaire - numéro 1 info économique)"""
+        try:
+            logger.info("Scraping Medias24.com with specialized scraper")
+            medias24_scraper = Medias24Scraper(delay_between_requests=2)
+            medias24_articles = medias24_scraper.fetch_articles(max_articles=max_articles)
+            logger.info(f"✅ Found {len(medias24_articles)} articles from Medias24")
+            return [convert_medias24(m24_article) for m24_article in medias24_articles]
+        except Exception as e:
+            logger.error(f"Error scraping Medias24: {e}")
+            return []
+
+    def _scrape_boursenews(self, max_articles: int) -> List[MediaArticle]:
+        """BourseNews avec le scraper spécialisé (très pertinent pour bourse)"""
+        try:
+            logger.info("Scraping BourseNews.ma Espace Investisseurs with specialized scraper")
+            boursenews_scraper = BourseNewsScraper(delay_between_requests=1)
+            boursenews_articles = boursenews_scraper.fetch_articles(
+                max_articles=max_articles,
+                sections=["espace_investisseurs"]  # Utiliser l'Espace Investisseurs
+            )
+            logger.info(f"✅ Found {len(boursenews_articles)} articles from BourseNews.ma")
+            return [convert_boursenews(bn_article) for bn_article in boursenews_articles]
+        except requests.exceptions.Timeout:
+            logger.warning("⏱️ BourseNews.ma timeout (>30s) - Site trop lent, passage aux autres sources")
+        except requests.exceptions.ConnectionError:
+            logger.warning("🔌 BourseNews.ma connection error - Site indisponible, passage aux autres sources")
+        except Exception as e:
+            logger.warning(f"⚠️ BourseNews.ma temporairement indisponible: {str(e)[:80]}...")
+        return []
+
+    def _scrape_specialized(self, source_name: str, max_articles: int) -> List[MediaArticle]:
+        """Challenge.ma / La Vie Éco avec leurs scrapers spécialisés"""
+        scraper_cls, label = {
+            "challenge": (ChallengeScraper if CHALLENGE_AVAILABLE else None, "Challenge.ma"),
+            "lavieeco": (LaVieEcoScraper if LAVIEECO_AVAILABLE else None, "La Vie Éco"),
+        }[source_name]
+        if scraper_cls is None:
+            return []
+
+        try:
+            logger.info(f"Scraping {label} with specialized scraper")
+            scraper = scraper_cls(delay_between_requests=2)
+            raw_articles = scraper.fetch_articles(max_articles=max_articles)
+
+            articles = []
+            for raw_article in raw_articles:
+                converted = self._convert_specialized_article(raw_article, source_name)
+                if converted:
+                    articles.append(converted)
+
+            logger.info(f"✅ Found {len(raw_articles)} articles from {label}")
+            return articles
+        except Exception as e:
+            logger.error(f"Error scraping {label}: {e}")
+            return []
+
     def _scrape_source(self, source_name: str, source_config: dict, max_articles: int) -> List[MediaArticle]:
         """Scrape articles from a specific source"""
-        articles = []
-        
         try:
-            response = self.session.get(source_config["finance_url"], timeout=30)
+            url = source_config["finance_url"]
+            response = cached_get(self.session, url, before_request=partial(self.host_throttle.wait, url), timeout=30)
             response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Find article containers
-            article_containers = soup.select(source_config["selectors"]["articles"])
-            
-            for container in article_containers[:max_articles]:
-                try:
-                    article = self._extract_article_from_container(container, source_name, source_config)
-                    if article and self._is_financial_content(article):
-                        articles.append(article)
-                except Exception as e:
-                    logger.warning(f"Error extracting article from {source_name}: {e}")
-                    continue
-                    
+            return self._parse_source_page(response.content, source_name, source_config, max_articles)
         except Exception as e:
             logger.error(f"Error scraping {source_name}: {e}")
             # Return fallback articles for development
-            articles = self._get_fallback_articles(source_name)
-        
+            return self._get_fallback_articles(source_name)
+
+    def _parse_source_page(self, content: bytes, source_name: str, source_config: dict, max_articles: int) -> List[MediaArticle]:
+        """Extract articles from a source listing page"""
+        articles = []
+        soup = BeautifulSoup(content, 'html.parser')
+
+        # Find article containers
+        article_containers = soup.select(source_config["selectors"]["articles"])
+
+        for container in article_containers[:max_articles]:
+            try:
+                article = self._extract_article_from_container(container, source_name, source_config)
+                if article and self._is_financial_content(article):
+                    articles.append(article)
+            except Exception as e:
+                logger.warning(f"Error extracting article from {source_name}: {e}")
+                continue
+
         return articles
 
     def _extract_article_from_container(self, container, source_name: str, source_config: dict) -> Optional[MediaArticle]:
@@ -389,32 +510,26 @@ class MediaScraper:
         return keyword_matches >= 1 or len(article.title) > 20
 
     def _deduplicate_articles(self, articles: List[MediaArticle]) -> List[MediaArticle]:
-        """Remove duplicate articles based on URL and title similarity"""
-        seen_urls = set()
-        seen_titles = set()
-        unique_articles = []
-        
-        for article in articles:
-            # Check URL uniqueness
-            if article.url in seen_urls:
-                continue
-            seen_urls.add(article.url)
-            
-            # Check title similarity (simple approach)
-            title_words = set(article.title.lower().split())
-            is_duplicate = False
-            for seen_title in seen_titles:
-                seen_words = set(seen_title.lower().split())
-                # If more than 80% of words match, consider it duplicate
-                if len(title_words & seen_words) / len(title_words | seen_words) > 0.8:
-                    is_duplicate = True
-                    break
-            
-            if not is_duplicate:
-                seen_titles.add(article.title)
-                unique_articles.append(article)
-        
-        return unique_articles
+        """Remove duplicate and near-duplicate articles (URL, MinHash signature)"""
+        return ArticleDeduplicator().unique(articles)
+
+    async def fetch_content_async(self, article: MediaArticle, client: Optional["httpx.AsyncClient"]) -> None:
+        """Complète ``article.content`` avec le texte de sa page (inchangé en cas d'échec)"""
+        if client is None:
+            return
+        try:
+            response = await cached_get_async(
+                client, article.url, before_request=partial(self.host_throttle.wait_async, article.url), timeout=30,
+            )
+            response.raise_for_status()
+            if self._content_extractor is None:
+                self._content_extractor = EnhancedMediaScraper()
+            content = await asyncio.to_thread(self._content_extractor._extract_full_content, response.text, article.url)
+        except Exception as e:
+            logger.warning(f"⚠️ Contenu indisponible pour {article.url}: {e}")
+            return
+        if content:
+            article.content = content
 
     def _get_fallback_articles(self, source_name: str) -> List[MediaArticle]:
         """Generate fallback articles for development"""
@@ -23,6 +23,8 @@ except ImportError:
     cloudscraper = None
 
 from app.core.logging import get_logger
+from app.utils.http_cache import cached_get
+from app.utils.near_duplicates import ArticleDeduplicator
 
 
 logger = get_logger(__name__)
@@ -171,6 +173,15 @@ class Medias24Scraper:
             logger.warning(f"Erreur lors de l'initialisation de la session: {e}")
             return False
     
+    def _before_request(self):
+        """Délai et rotation du User-Agent avant une requête réseau"""
+        # Respecter le délai
+        self._respect_rate_limit()
+        
+        # Rotation User-Agent avant chaque requête importante (seulement si pas cloudscraper)
+        if not self.use_cloudscraper:
+            self._update_headers()
+    
     def _respect_rate_limit(self):
         """Respecter le délai entre les requêtes"""
         now = time.time()
@@ -205,18 +216,16 @@ class Medias24Scraper:
             try:
                 logger.info(f"Scraping Medias24 {description} ({url}) pour {max_articles} articles")
                 
-                # Respecter le délai
-                self._respect_rate_limit()
-                
-                # Rotation User-Agent avant chaque requête importante (seulement si pas cloudscraper)
-                if not self.use_cloudscraper:
-                    self._update_headers()
-                
                 # Pour cloudscraper, ne pas désactiver la vérification SSL
                 if self.use_cloudscraper:
-                    response = self.session.get(url, timeout=25, allow_redirects=True)
+                    request_options = {"timeout": 25}
                 else:
-                    response = self.session.get(url, timeout=20, allow_redirects=True, verify=False)
+                    request_options = {"timeout": 20, "verify": False}
+                
+                # Page en cache encore fraîche : pas de requête ; sinon requête conditionnelle (304)
+                response = cached_get(
+                    self.session, url, before_request=self._before_request, allow_redirects=True, **request_options
+                )
                 
                 # Si 403, essayer Selenium si disponible
                 if response.status_code == 403:
@@ -438,16 +447,8 @@ class Medias24Scraper:
             return datetime.now() - timedelta(hours=2)
     
     def _deduplicate(self, articles: List[Medias24Article]) -> List[Medias24Article]:
-        """Dédupliquer les articles par URL"""
-        seen_urls = set()
-        unique_articles = []
-        
-        for article in articles:
-            if article.url not in seen_urls:
-                seen_urls.add(article.url)
-                unique_articles.append(article)
-        
-        return unique_articles
+        """Dédupliquer les articles par URL et quasi-doublons (signature MinHash)"""
+        return ArticleDeduplicator().unique(articles)
 
 
 # Fonction helper pour compatibilité avec MediaScraper
@@ -0,0 +1,148 @@
+"""
+Exécution concurrente des étapes du pipeline sous forme de graphe (DAG).
+
+Chaque étape déclare ses dépendances ; toutes les étapes dont les dépendances
+sont résolues démarrent immédiatement, les autres attendent uniquement ce dont
+elles ont besoin. Le temps d'exécution de chaque étape est mesuré.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, Mapping, Optional, Tuple
+import asyncio
+import time
+
+from app.core.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+StageFunc = Callable[[Mapping[str, Any]], Awaitable[Any]]
+
+
+class StageSkipped(Exception):
+    """Levée lorsqu'une étape ne peut pas s'exécuter car une dépendance a échoué."""
+
+
+@dataclass(slots=True)
+class Stage:
+    name: str
+    func: StageFunc  # reçoit le dict {nom_dépendance: résultat}
+    depends_on: Tuple[str, ...] = ()
+
+
+@dataclass(slots=True)
+class StageOutcome:
+    name: str
+    result: Any = None
+    duration_seconds: float = 0.0
+    started_at: float = 0.0  # secondes depuis le début du run
+    error: Optional[BaseException] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+@dataclass(slots=True)
+class StageRunResult:
+    outcomes: Dict[str, StageOutcome] = field(default_factory=dict)
+    total_duration_seconds: float = 0.0
+
+    def result(self, name: str) -> Any:
+        return self.outcomes[name].result
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        return {
+            name: round(outcome.duration_seconds, 3)
+            for name, outcome in self.outcomes.items()
+        }
+
+    @property
+    def first_error(self) -> Optional[BaseException]:
+        for outcome in self.outcomes.values():
+            if outcome.error is not None and not isinstance(outcome.error, StageSkipped):
+                return outcome.error
+        return None
+
+
+class StageRunner:
+    """Exécute un ensemble d'étapes en respectant leurs dépendances."""
+
+    def __init__(self, stages: Iterable[Stage]):
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            self.stages[stage.name] = stage
+        self._validate()
+
+    def _validate(self) -> None:
+        for stage in self.stages.values():
+            for dependency in stage.depends_on:
+                if dependency not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dependency}'")
+
+        # Détection de cycle (parcours en profondeur)
+        visiting: set[str] = set()
+        done: set[str] = set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle detected at stage '{name}'")
+            visiting.add(name)
+            for dependency in self.stages[name].depends_on:
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    async def run(self) -> StageRunResult:
+        run_result = StageRunResult()
+        run_start = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def execute(stage: Stage) -> Any:
+            dependencies = {}
+            for dependency in stage.depends_on:
+                try:
+                    dependencies[dependency] = await tasks[dependency]
+                except BaseException as exc:  # noqa: BLE001
+                    error = StageSkipped(f"dependency '{dependency}' failed: {exc}")
+                    run_result.outcomes[stage.name] = StageOutcome(
+                        name=stage.name,
+                        started_at=time.perf_counter() - run_start,
+                        error=error,
+                    )
+                    raise error from exc
+
+            started = time.perf_counter()
+            outcome = StageOutcome(name=stage.name, started_at=started - run_start)
+            run_result.outcomes[stage.name] = outcome
+            try:
+                outcome.result = await stage.func(dependencies)
+                return outcome.result
+            except Exception as exc:
+                outcome.error = exc
+                logger.error("Stage '%s' failed: %s", stage.name, exc)
+                raise
+            finally:
+                outcome.duration_seconds = time.perf_counter() - started
+                logger.debug(
+                    "Stage '%s' finished in %.3fs",
+                    stage.name,
+                    outcome.duration_seconds,
+                )
+
+        for stage in self.stages.values():
+            tasks[stage.name] = asyncio.ensure_future(execute(stage))
+
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        run_result.total_duration_seconds = time.perf_counter() - run_start
+        return run_result
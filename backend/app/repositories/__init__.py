@@ -0,0 +1 @@
+"""Async data-access functions shared by the API endpoints."""
@@ -0,0 +1,232 @@
+"""
+Accès async aux scores de l'indice (table ``index_scores``).
+
+Utilisé par les endpoints avec une ``AsyncSession`` (aiosqlite en
+développement, asyncpg en production).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import DateTime, Select, func, literal_column, select, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import timescale
+from app.models.schemas import INDEX_SCORE_VALUE_COLUMNS, IndexScore
+
+
+async def get_latest(db: AsyncSession) -> Optional[IndexScore]:
+    """Dernier score calculé (ou None si la table est vide)"""
+    result = await db.execute(select(IndexScore).order_by(IndexScore.as_of.desc()).limit(1))
+    return result.scalars().first()
+
+
+async def get_history(
+    db: AsyncSession,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: Optional[int] = None,
+    ascending: bool = False,
+) -> List[IndexScore]:
+    """
+    Scores compris entre ``start`` et ``end`` (bornes incluses)
+
+    Args:
+        db: Session async
+        start: Premier instant inclus
+        end: Dernier instant inclus
+        limit: Nombre maximal de scores
+        ascending: Ordre chronologique (sinon du plus récent au plus ancien)
+    """
+    query = select(IndexScore)
+    if start is not None:
+        query = query.where(IndexScore.as_of >= start)
+    if end is not None:
+        query = query.where(IndexScore.as_of <= end)
+    query = query.order_by(IndexScore.as_of.asc() if ascending else IndexScore.as_of.desc())
+    if limit is not None:
+        query = query.limit(limit)
+
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+async def get_series(
+    db: AsyncSession,
+    column: str = "score",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: Optional[int] = None,
+    ascending: bool = False,
+) -> List[Tuple[datetime, Optional[float]]]:
+    """
+    Couples ``(as_of, valeur)`` d'une seule colonne entre ``start`` et ``end``
+
+    Ne lit que l'index couvrant ``ix_index_scores_as_of_covering``, sans
+    charger les lignes complètes.
+
+    Args:
+        db: Session async
+        column: Score ou composante (voir ``INDEX_SCORE_VALUE_COLUMNS``)
+        start: Premier instant inclus
+        end: Dernier instant inclus
+        limit: Nombre maximal de points
+        ascending: Ordre chronologique (sinon du plus récent au plus ancien)
+    """
+    if column not in INDEX_SCORE_VALUE_COLUMNS:
+        raise ValueError(f"Colonne inconnue: {column}")
+
+    query = select(IndexScore.as_of, getattr(IndexScore, column))
+    if start is not None:
+        query = query.where(IndexScore.as_of >= start)
+    if end is not None:
+        query = query.where(IndexScore.as_of <= end)
+    query = query.order_by(IndexScore.as_of.asc() if ascending else IndexScore.as_of.desc())
+    if limit is not None:
+        query = query.limit(limit)
+
+    result = await db.execute(query)
+    return [(as_of, value) for as_of, value in result.all()]
+
+
+async def has_aggregates(db: AsyncSession) -> bool:
+    """Vrai si les agrégats continus TimescaleDB sont disponibles pour cette session"""
+    if not timescale.is_enabled(db.get_bind()):
+        return False
+    return await db.run_sync(lambda session: timescale.aggregates_available(session.connection()))
+
+
+# ============================================================================
+# AGRÉGATION PAR INTERVALLE
+# ============================================================================
+
+BUCKET_RESOLUTIONS = ("hour", "day", "week")
+
+# SQLite : début d'intervalle formaté par strftime (semaines commençant le lundi,
+# comme date_trunc('week') sur Postgres et time_bucket sur TimescaleDB)
+_SQLITE_BUCKETS = {
+    "hour": ("%Y-%m-%d %H:00:00",),
+    "day": ("%Y-%m-%d 00:00:00",),
+    "week": ("%Y-%m-%d 00:00:00", "weekday 0", "-6 days"),
+}
+
+
+@dataclass(slots=True)
+class ScoreBucket:
+    """Statistiques du score sur un intervalle"""
+    start: datetime
+    open: float
+    close: float
+    min: float
+    max: float
+    mean: float
+    samples: int
+
+
+def _bucket_start(dialect: str, resolution: str):
+    if dialect == "postgresql":
+        return func.date_trunc(resolution, IndexScore.as_of)
+    fmt, *modifiers = _SQLITE_BUCKETS[resolution]
+    return type_coerce(func.strftime(fmt, IndexScore.as_of, *modifiers), DateTime)
+
+
+def _aggregate_buckets_query(resolution: str, start: Optional[datetime], end: Optional[datetime]) -> Select:
+    """
+    Intervalles lus dans l'agrégat continu ; comme pour l'agrégation directe,
+    l'intervalle qui contient ``start`` est renvoyé
+    """
+    aggregate = timescale.aggregate_table(resolution)
+    query = select(
+        aggregate.c.bucket,
+        aggregate.c.score_open,
+        aggregate.c.score_close,
+        aggregate.c.score_min,
+        aggregate.c.score_max,
+        aggregate.c.score_mean,
+        aggregate.c.samples,
+    )
+    if start is not None:
+        width = timescale.CONTINUOUS_AGGREGATES[resolution].bucket_width
+        query = query.where(aggregate.c.bucket >= func.time_bucket(literal_column(f"INTERVAL '{width}'"), start))
+    if end is not None:
+        query = query.where(aggregate.c.bucket <= end)
+    return query.order_by(aggregate.c.bucket.desc())
+
+
+async def get_buckets(
+    db: AsyncSession,
+    resolution: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[ScoreBucket]:
+    """
+    Ouverture, clôture, min, max et moyenne du score par intervalle, du plus
+    récent au plus ancien, calculés par la base
+
+    Sur TimescaleDB, ``day`` et ``week`` sont lus dans les agrégats continus ;
+    ailleurs l'agrégation se fait en une requête (fonctions de fenêtre pour
+    l'ouverture et la clôture).
+
+    Args:
+        db: Session async
+        resolution: hour, day ou week
+        start: Premier instant inclus
+        end: Dernier instant inclus
+    """
+    if resolution not in BUCKET_RESOLUTIONS:
+        raise ValueError(f"Résolution inconnue: {resolution}")
+
+    if resolution in timescale.CONTINUOUS_AGGREGATES and await has_aggregates(db):
+        query = _aggregate_buckets_query(resolution, start, end)
+    else:
+        bucket = _bucket_start(db.get_bind().dialect.name, resolution)
+        scores = select(
+            bucket.label("bucket"),
+            IndexScore.score,
+            func.first_value(IndexScore.score).over(
+                partition_by=bucket, order_by=(IndexScore.as_of.asc(), IndexScore.id.asc())
+            ).label("open"),
+            func.first_value(IndexScore.score).over(
+                partition_by=bucket, order_by=(IndexScore.as_of.desc(), IndexScore.id.desc())
+            ).label("close"),
+        )
+        if start is not None:
+            scores = scores.where(IndexScore.as_of >= start)
+        if end is not None:
+            scores = scores.where(IndexScore.as_of <= end)
+        scores = scores.subquery()
+
+        query = (
+            select(
+                scores.c.bucket,
+                func.min(scores.c.open),
+                func.min(scores.c.close),
+                func.min(scores.c.score),
+                func.max(scores.c.score),
+                func.avg(scores.c.score),
+                func.count(),
+            )
+            .group_by(scores.c.bucket)
+            .order_by(scores.c.bucket.desc())
+        )
+
+    result = await db.execute(query)
+    return [
+        ScoreBucket(
+            start=bucket_start,
+            open=float(open_),
+            close=float(close),
+            min=float(minimum),
+            max=float(maximum),
+            mean=float(mean),
+            samples=int(samples),
+        )
+        for bucket_start, open_, close, minimum, maximum, mean, samples in result.all()
+    ]
+
+
+async def count(db: AsyncSession) -> int:
+    """Nombre total de scores"""
+    return await db.scalar(select(func.count(IndexScore.id))) or 0
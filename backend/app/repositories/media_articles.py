@@ -0,0 +1,379 @@
+"""
+Accès aux articles médias (table ``media_articles``).
+
+- Lectures async pour les endpoints (``AsyncSession`` : aiosqlite en
+  développement, asyncpg en production)
+- Écriture groupée synchrone (``upsert_articles``) pour le pipeline et le
+  scraping : ``INSERT ... ON CONFLICT(url)`` par lots, sans relire la table
+- Lecture par morceaux et mise à jour groupée des scores pour la ré-analyse
+- Index LSH des signatures MinHash (``media_article_bands``) pour retrouver
+  les quasi-doublons d'un article sans parcourir la table
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+import base64
+import binascii
+import json
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import Row, Select, func, insert, literal, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import settings
+from app.models.schemas import MediaArticle, MediaArticleBand
+from app.utils.near_duplicates import band_buckets, from_bytes
+
+
+@dataclass(slots=True)
+class SentimentScoreStats:
+    """Moyenne, minimum et maximum des scores de sentiment"""
+    average: Optional[float]
+    minimum: Optional[float]
+    maximum: Optional[float]
+
+
+def latest_query(limit: int, offset: int = 0) -> Select:
+    """Requête des articles les plus récents (sessions sync ou async)"""
+    return (
+        select(MediaArticle)
+        .order_by(MediaArticle.published_at.desc().nulls_last(), MediaArticle.id.desc())
+        .offset(offset)
+        .limit(limit)
+    )
+
+
+async def list_latest(db: AsyncSession, limit: int, offset: int = 0) -> List[MediaArticle]:
+    """Articles les plus récents (pagination par offset, coût proportionnel à l'offset)"""
+    result = await db.execute(latest_query(limit, offset))
+    return list(result.scalars().all())
+
+
+# ============================================================================
+# PAGINATION PAR CLÉ (KEYSET)
+# ============================================================================
+
+@dataclass(slots=True)
+class ArticleKey:
+    """Position d'un article dans l'ordre (published_at DESC, id DESC), dates nulles en dernier"""
+    published_at: Optional[datetime]
+    id: int
+
+    @classmethod
+    def of(cls, article: MediaArticle) -> "ArticleKey":
+        return cls(article.published_at, article.id)
+
+
+def encode_cursor(key: ArticleKey) -> str:
+    """Curseur opaque (base64 URL-safe) à partir de la position d'un article"""
+    published_at = key.published_at.isoformat() if key.published_at is not None else None
+    payload = json.dumps([published_at, key.id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> ArticleKey:
+    """
+    Décode un curseur produit par ``encode_cursor``
+
+    Raises:
+        ValueError: Curseur invalide
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        published_at, article_id = json.loads(payload)
+        return ArticleKey(
+            published_at=datetime.fromisoformat(published_at) if published_at is not None else None,
+            id=int(article_id),
+        )
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError(f"Curseur invalide: {cursor}") from e
+
+
+async def list_page(db: AsyncSession, limit: int, after: Optional[ArticleKey] = None) -> List[MediaArticle]:
+    """
+    Articles suivant ``after`` dans l'ordre (published_at DESC, id DESC)
+
+    Chaque segment est une recherche dans ``ix_media_articles_published_at_id``
+    qui s'arrête après ``limit`` lignes : le coût ne dépend pas de la
+    profondeur de la page. Les articles sans date viennent en dernier, quel que
+    soit le tri des NULL du dialecte.
+    """
+    articles: List[MediaArticle] = []
+
+    if after is None or after.published_at is not None:
+        query = select(MediaArticle).where(MediaArticle.published_at.isnot(None))
+        if after is not None:
+            query = query.where(
+                tuple_(MediaArticle.published_at, MediaArticle.id) < tuple_(
+                    literal(after.published_at, MediaArticle.published_at.type), literal(after.id)
+                )
+            )
+        result = await db.execute(
+            query.order_by(MediaArticle.published_at.desc(), MediaArticle.id.desc()).limit(limit)
+        )
+        articles.extend(result.scalars().all())
+
+    if len(articles) < limit:
+        query = select(MediaArticle).where(MediaArticle.published_at.is_(None))
+        if after is not None and after.published_at is None:
+            query = query.where(MediaArticle.id < after.id)
+        result = await db.execute(query.order_by(MediaArticle.id.desc()).limit(limit - len(articles)))
+        articles.extend(result.scalars().all())
+
+    return articles
+
+
+async def count(db: AsyncSession) -> int:
+    """Nombre total d'articles"""
+    return await db.scalar(select(func.count(MediaArticle.id))) or 0
+
+
+async def count_scraped_since(db: AsyncSession, since: datetime) -> int:
+    """Nombre d'articles collectés depuis ``since``"""
+    return await db.scalar(
+        select(func.count(MediaArticle.id)).where(MediaArticle.scraped_at >= since)
+    ) or 0
+
+
+async def source_counts(db: AsyncSession) -> List[Tuple[str, int]]:
+    """Nombre d'articles par source"""
+    result = await db.execute(
+        select(MediaArticle.source, func.count(MediaArticle.id)).group_by(MediaArticle.source)
+    )
+    return [(source, article_count) for source, article_count in result.all()]
+
+
+async def sentiment_label_counts(db: AsyncSession) -> Dict[str, int]:
+    """Nombre d'articles par label de sentiment (articles analysés uniquement)"""
+    result = await db.execute(
+        select(MediaArticle.sentiment_label, func.count(MediaArticle.id))
+        .where(MediaArticle.sentiment_label.isnot(None))
+        .group_by(MediaArticle.sentiment_label)
+    )
+    return {label: label_count for label, label_count in result.all()}
+
+
+async def sentiment_score_stats(db: AsyncSession) -> SentimentScoreStats:
+    """Statistiques des scores de sentiment (articles analysés uniquement)"""
+    result = await db.execute(
+        select(
+            func.avg(MediaArticle.sentiment_score),
+            func.min(MediaArticle.sentiment_score),
+            func.max(MediaArticle.sentiment_score),
+        ).where(MediaArticle.sentiment_score.isnot(None))
+    )
+    average, minimum, maximum = result.one()
+    return SentimentScoreStats(average=average, minimum=minimum, maximum=maximum)
+
+
+# ============================================================================
+# ÉCRITURE GROUPÉE
+# ============================================================================
+
+@dataclass(slots=True)
+class UpsertResult:
+    """Bilan d'un upsert groupé"""
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    @property
+    def saved(self) -> int:
+        return self.inserted + self.updated
+
+
+def _dialect_insert(db: Session) -> Callable:
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        raise ValueError(f"Upsert non supporté pour le dialecte {dialect}")
+    return insert
+
+
+def upsert_articles(
+    db: Session,
+    rows: Iterable[Mapping[str, Any]],
+    update_columns: Sequence[str] = (),
+    update_where: Optional[Callable[[Any], ColumnElement]] = None,
+    chunk_size: Optional[int] = None,
+) -> UpsertResult:
+    """
+    Insère des articles par lots avec ``INSERT ... ON CONFLICT(url)``.
+
+    Le coût ne dépend que du nombre d'articles écrits : chaque lot lit
+    uniquement ses propres URLs (index unique) pour distinguer insertions et
+    mises à jour. La transaction reste à la charge de l'appelant (commit).
+
+    Args:
+        db: Session synchrone (SQLite ou Postgres)
+        rows: Colonnes de chaque article (mêmes clés pour toutes les lignes)
+        update_columns: Colonnes mises à jour si l'URL existe (vide : conflit ignoré)
+        update_where: Condition de mise à jour, construite à partir de ``excluded``
+            (les valeurs proposées), ex. ``lambda excluded: MediaArticle.sentiment_score < excluded.sentiment_score``
+        chunk_size: Articles par requête (défaut : ``settings.media_upsert_chunk_size``)
+    """
+    # Une URL par lot : ON CONFLICT ne peut pas toucher deux fois la même ligne
+    unique_rows: Dict[str, Mapping[str, Any]] = {}
+    for row in rows:
+        if row.get("url"):
+            unique_rows.setdefault(row["url"], row)
+
+    result = UpsertResult()
+    if not unique_rows:
+        return result
+
+    insert = _dialect_insert(db)
+    table = MediaArticle.__table__
+    chunk_size = chunk_size or settings.media_upsert_chunk_size
+    pending = list(unique_rows.values())
+
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        urls = [row["url"] for row in chunk]
+        existing = set(db.scalars(select(MediaArticle.url).where(MediaArticle.url.in_(urls))))
+
+        statement = insert(table).values(chunk)
+        if update_columns:
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c.url],
+                set_={column: statement.excluded[column] for column in update_columns},
+                where=update_where(statement.excluded) if update_where is not None else None,
+            )
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=[table.c.url])
+
+        # RETURNING : lignes effectivement insérées ou mises à jour
+        written = set(db.scalars(statement.returning(table.c.url)))
+        result.inserted += len(written - existing)
+        result.updated += len(written & existing)
+        result.unchanged += len(chunk) - len(written)
+
+    return result
+
+
+# ============================================================================
+# RÉ-ANALYSE
+# ============================================================================
+
+def scoring_chunk(
+    db: Session,
+    after_id: int,
+    limit: int,
+    where: Sequence[ColumnElement] = (),
+) -> List[Row]:
+    """
+    Articles d'id supérieur à ``after_id`` (ordre croissant), réduits aux
+    colonnes utiles au scoring : ``id``, ``title``, ``summary``, ``sentiment_score``
+
+    Recherche dans la clé primaire : le coût d'un morceau ne dépend pas de sa
+    position dans la table.
+    """
+    result = db.execute(
+        select(MediaArticle.id, MediaArticle.title, MediaArticle.summary, MediaArticle.sentiment_score)
+        .where(MediaArticle.id > after_id, *where)
+        .order_by(MediaArticle.id)
+        .limit(limit)
+    )
+    return list(result.all())
+
+
+def update_sentiments(db: Session, rows: Sequence[Mapping[str, Any]]) -> None:
+    """
+    Met à jour des articles par clé primaire : une seule requête ``UPDATE``
+    préparée, exécutée pour toutes les lignes (executemany). La transaction
+    reste à la charge de l'appelant (commit).
+
+    Args:
+        rows: ``id`` et colonnes à écrire (mêmes clés pour toutes les lignes)
+    """
+    if rows:
+        db.execute(update(MediaArticle), list(rows))
+
+
+# ============================================================================
+# INDEX DES QUASI-DOUBLONS (LSH)
+# ============================================================================
+
+def lsh_candidates(db: Session, buckets: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], List[int]]:
+    """
+    Articles indexés dans chacun des ``(band, bucket)`` demandés
+
+    Une recherche dans la clé primaire de ``media_article_bands`` par paire :
+    le coût dépend du nombre de candidats, pas de la taille de la table.
+    """
+    pairs = list(set(buckets))
+    candidates: Dict[Tuple[int, int], List[int]] = {}
+    chunk_size = settings.media_upsert_chunk_size
+    for start in range(0, len(pairs), chunk_size):
+        result = db.execute(
+            select(MediaArticleBand.band, MediaArticleBand.bucket, MediaArticleBand.article_id)
+            .where(tuple_(MediaArticleBand.band, MediaArticleBand.bucket).in_(pairs[start:start + chunk_size]))
+        )
+        for band, bucket, article_id in result.all():
+            candidates.setdefault((band, bucket), []).append(article_id)
+    return candidates
+
+
+def signature_rows(db: Session, ids: Iterable[int]) -> List[Row]:
+    """``id``, ``minhash`` et score de sentiment (modèle compris) des articles ``ids``"""
+    ids = list(set(ids))
+    if not ids:
+        return []
+    result = db.execute(
+        select(
+            MediaArticle.id, MediaArticle.minhash, MediaArticle.sentiment_score,
+            MediaArticle.sentiment_label, MediaArticle.sentiment_model,
+        ).where(MediaArticle.id.in_(ids), MediaArticle.minhash.isnot(None))
+    )
+    return list(result.all())
+
+
+def unindexed_chunk(db: Session, after_id: int, limit: int) -> List[Row]:
+    """Articles sans signature d'id supérieur à ``after_id`` : ``id`` et ``title``"""
+    result = db.execute(
+        select(MediaArticle.id, MediaArticle.title)
+        .where(MediaArticle.id > after_id, MediaArticle.minhash.is_(None))
+        .order_by(MediaArticle.id)
+        .limit(limit)
+    )
+    return list(result.all())
+
+
+def index_signatures(db: Session, signatures: Mapping[int, bytes]) -> None:
+    """
+    Enregistre la signature des articles ``id -> minhash`` et leurs bandes LSH.
+    La transaction reste à la charge de l'appelant (commit).
+    """
+    if not signatures:
+        return
+    db.execute(update(MediaArticle), [{"id": article_id, "minhash": data} for article_id, data in signatures.items()])
+    db.execute(
+        insert(MediaArticleBand),
+        [
+            {"band": band, "bucket": bucket, "article_id": article_id}
+            for article_id, data in signatures.items()
+            for band, bucket in enumerate(band_buckets(from_bytes(data)))
+        ],
+    )
+
+
+def index_new_signatures(db: Session, signatures: Mapping[str, bytes]) -> int:
+    """
+    Indexe les articles ``url -> minhash`` qui n'ont pas encore de signature
+    (les articles déjà indexés sont ignorés). Retourne le nombre d'articles indexés.
+    """
+    if not signatures:
+        return 0
+    result = db.execute(
+        select(MediaArticle.id, MediaArticle.url)
+        .where(MediaArticle.url.in_(list(signatures)), MediaArticle.minhash.is_(None))
+    )
+    pending = {article_id: signatures[url] for article_id, url in result.all()}
+    index_signatures(db, pending)
+    return len(pending)
@@ -11,7 +11,7 @@ import numpy as np
 from app.core.logging import get_logger
 from app.models.database import SessionLocal
 from app.models.schemas import IndexScore
-from app.pipelines.ingestion.market_scraper import CasablancaMarketScraper
+from app.services.market_data_provider import get_market_data_provider
 
 
 logger = get_logger(__name__)
@@ -39,7 +39,7 @@ class BacktestService:
     """
 
     def __init__(self):
-        self.market_scraper = CasablancaMarketScraper()
+        self.market_data = get_market_data_provider()
 
     def run_backtest(
         self,
@@ -193,11 +193,13 @@ class BacktestService:
     ) -> pd.DataFrame:
         """Récupère les rendements du marché (MASI)."""
         try:
-            # Étendre la période pour calculer T+5
+            # Étendre la période pour calculer T+5 (fenêtre de la série de marché partagée)
             extended_end = end_date + timedelta(days=10)
-            days_needed = (extended_end - start_date).days + 20
 
-            historical_data = self.market_scraper.fetch_historical_data(days=days_needed)
+            historical_data = self.market_data.get_history(
+                start=start_date - timedelta(days=20),
+                end=extended_end,
+            )
 
             if not historical_data:
                 return pd.DataFrame()
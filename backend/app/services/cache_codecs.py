@@ -0,0 +1,264 @@
+"""
+Sérialisation des valeurs du cache (Redis).
+
+Chaque valeur est encodée dans une trame :
+
+    [MAGIC][codec][compression][flags] (+ fraîcheur si flags & ENTRY) + payload
+
+- codec : ``p`` pickle, ``j`` orjson, ``m`` msgpack, ``b`` octets bruts
+  (réponses pré-sérialisées, renvoyées telles quelles comme corps HTTP)
+- compression : ``-`` aucune, ``z`` zstd, ``l`` lz4 (au-delà d'un seuil)
+- ENTRY : la valeur est un ``CacheEntry`` (stale-while-revalidate), dont la
+  limite de fraîcheur est stockée dans l'en-tête
+
+Les codecs JSON ne prennent que les valeurs qu'ils restituent à l'identique
+(dict à clés str, list, str, int, float fini, bool, None ; voir
+``json_exact``). Toute autre valeur (tuples, NaN/infini, clés non str, dates,
+dataclasses, modèles Pydantic, objets) est stockée en pickle, ce qui garantit
+un aller-retour exact. Les anciennes valeurs pickle sans en-tête restent
+lisibles.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Optional, Tuple
+import json
+import math
+import pickle
+import struct
+
+from pydantic import BaseModel
+
+from app.core.logging import get_logger
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+
+logger = get_logger(__name__)
+
+MAGIC = 0xFC
+FLAG_ENTRY = 0x01
+_HEADER = struct.Struct("!Bccb")
+_FRESHNESS = struct.Struct("!d")
+
+CODEC_PICKLE = b"p"
+CODEC_ORJSON = b"j"
+CODEC_MSGPACK = b"m"
+CODEC_BYTES = b"b"
+
+COMPRESSION_NONE = b"-"
+COMPRESSION_ZSTD = b"z"
+COMPRESSION_LZ4 = b"l"
+
+
+class UnsupportedValue(TypeError):
+    """La valeur n'est pas représentable sans perte par le codec"""
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise UnsupportedValue(type(value).__name__)
+
+
+def dumps_json(value: Any) -> bytes:
+    """Sérialise une réponse d'API en JSON (orjson si disponible)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, default=_json_default)
+    return json.dumps(value, default=_json_default, ensure_ascii=False).encode("utf-8")
+
+
+# ============================================================================
+# CODECS
+# ============================================================================
+
+_JSON_SCALARS = (str, int, bool, type(None))
+
+
+def json_exact(value: Any) -> bool:
+    """
+    Vrai si ``value`` revient identique d'un codec JSON : types exacts
+    seulement (une sous-classe, un tuple ou un modèle reviendraient en
+    dict/list), flottants finis, clés de dict en str
+    """
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        kind = type(item)
+        if kind in _JSON_SCALARS:
+            continue
+        if kind is float:
+            if not math.isfinite(item):
+                return False
+        elif kind is list:
+            stack.extend(item)
+        elif kind is dict:
+            for key, nested in item.items():
+                if type(key) is not str:
+                    return False
+                stack.append(nested)
+        else:
+            return False
+    return True
+
+def _pickle_dumps(value: Any) -> bytes:
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    return orjson.dumps(value)
+
+
+def _msgpack_dumps(value: Any) -> bytes:
+    return msgpack.packb(value, use_bin_type=True)
+
+
+def _msgpack_loads(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+_ENCODERS: dict[bytes, Callable[[Any], bytes]] = {CODEC_PICKLE: _pickle_dumps}
+_DECODERS: dict[bytes, Callable[[bytes], Any]] = {
+    CODEC_PICKLE: pickle.loads,
+    CODEC_BYTES: bytes,
+}
+if ORJSON_AVAILABLE:
+    _ENCODERS[CODEC_ORJSON] = _orjson_dumps
+    _DECODERS[CODEC_ORJSON] = orjson.loads
+if MSGPACK_AVAILABLE:
+    _ENCODERS[CODEC_MSGPACK] = _msgpack_dumps
+    _DECODERS[CODEC_MSGPACK] = _msgpack_loads
+
+CODECS = {"pickle": CODEC_PICKLE, "orjson": CODEC_ORJSON, "msgpack": CODEC_MSGPACK}
+_CODEC_AVAILABLE = {"pickle": True, "orjson": ORJSON_AVAILABLE, "msgpack": MSGPACK_AVAILABLE}
+
+
+# ============================================================================
+# COMPRESSION
+# ============================================================================
+
+def _zstd_compress(data: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=3).compress(data)
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+_COMPRESSORS: dict[bytes, Callable[[bytes], bytes]] = {}
+_DECOMPRESSORS: dict[bytes, Callable[[bytes], bytes]] = {}
+if ZSTD_AVAILABLE:
+    _COMPRESSORS[COMPRESSION_ZSTD] = _zstd_compress
+    _DECOMPRESSORS[COMPRESSION_ZSTD] = _zstd_decompress
+if LZ4_AVAILABLE:
+    _COMPRESSORS[COMPRESSION_LZ4] = lz4.frame.compress
+    _DECOMPRESSORS[COMPRESSION_LZ4] = lz4.frame.decompress
+
+COMPRESSIONS = {"none": COMPRESSION_NONE, "zstd": COMPRESSION_ZSTD, "lz4": COMPRESSION_LZ4}
+_COMPRESSION_AVAILABLE = {"none": True, "zstd": ZSTD_AVAILABLE, "lz4": LZ4_AVAILABLE}
+
+
+class CacheSerializer:
+    """Encode/décode les valeurs du cache selon le codec et la compression configurés."""
+
+    def __init__(
+        self,
+        codec: str = "orjson",
+        compression: str = "none",
+        min_compress_bytes: int = 1024,
+    ):
+        if codec not in CODECS:
+            raise ValueError(f"Codec de cache inconnu: {codec} (attendu: {', '.join(CODECS)})")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Compression inconnue: {compression} (attendu: {', '.join(COMPRESSIONS)})")
+
+        if not _CODEC_AVAILABLE[codec]:
+            logger.warning(f"⚠️ Codec de cache '{codec}' non installé, utilisation de pickle")
+            codec = "pickle"
+        if not _COMPRESSION_AVAILABLE[compression]:
+            logger.warning(f"⚠️ Compression '{compression}' non installée, valeurs stockées sans compression")
+            compression = "none"
+
+        self.codec = codec
+        self.compression = compression
+        self.min_compress_bytes = min_compress_bytes
+        self._codec_tag = CODECS[codec]
+        self._compression_tag = COMPRESSIONS[compression]
+
+    def dumps(self, value: Any, fresh_until: Optional[float] = None) -> bytes:
+        """
+        Encode une valeur
+
+        Args:
+            value: Valeur à encoder
+            fresh_until: Limite de fraîcheur si la valeur provient d'un CacheEntry
+        """
+        codec, payload = self._encode(value)
+
+        compression = COMPRESSION_NONE
+        if self._compression_tag != COMPRESSION_NONE and len(payload) >= self.min_compress_bytes:
+            compressed = _COMPRESSORS[self._compression_tag](payload)
+            if len(compressed) < len(payload):
+                compression, payload = self._compression_tag, compressed
+
+        flags = 0 if fresh_until is None else FLAG_ENTRY
+        header = _HEADER.pack(MAGIC, codec, compression, flags)
+        if fresh_until is not None:
+            header += _FRESHNESS.pack(fresh_until)
+        return header + payload
+
+    def loads(self, data: bytes) -> Tuple[Any, Optional[float]]:
+        """
+        Décode une trame
+
+        Returns:
+            Tuple (valeur, limite de fraîcheur ou None)
+        """
+        if not data or data[0] != MAGIC:
+            # Valeur écrite avant l'introduction des trames (pickle brut)
+            return pickle.loads(data), None
+
+        _, codec, compression, flags = _HEADER.unpack_from(data)
+        offset = _HEADER.size
+        fresh_until = None
+        if flags & FLAG_ENTRY:
+            (fresh_until,) = _FRESHNESS.unpack_from(data, offset)
+            offset += _FRESHNESS.size
+
+        payload = data[offset:]
+        if compression != COMPRESSION_NONE:
+            payload = _DECOMPRESSORS[compression](payload)
+        return _DECODERS[codec](payload), fresh_until
+
+    def _encode(self, value: Any) -> Tuple[bytes, bytes]:
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return CODEC_BYTES, bytes(value)
+        if self._codec_tag != CODEC_PICKLE and json_exact(value):
+            try:
+                return self._codec_tag, _ENCODERS[self._codec_tag](value)
+            except (TypeError, ValueError, OverflowError):
+                # Entier hors de la plage du codec
+                pass
+        # Valeur non représentable à l'identique : pickle garantit un aller-retour exact
+        return CODEC_PICKLE, _pickle_dumps(value)
@@ -3,18 +3,74 @@ Service de cache Redis centralisé pour améliorer les performances
 """
 from __future__ import annotations
 
+import asyncio
+import inspect
 import json
-import pickle
-from typing import Any, Optional
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
 from datetime import timedelta
 import redis
 from redis.exceptions import ConnectionError, TimeoutError
 
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.monitoring import track_cache_hit, track_cache_miss
+from app.services.cache_codecs import CacheSerializer, dumps_json
+from app.services.memory_cache import MemoryCache, key_namespace
 
 logger = get_logger(__name__)
 
+# Libération atomique d'un verrou distribué (seul le détenteur du jeton peut le supprimer)
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Jeton utilisé lorsque seul le verrou local est nécessaire (pas de Redis)
+_LOCAL_LOCK = "local"
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    """Valeur écrite par get_or_set, avec sa limite de fraîcheur (stale-while-revalidate)"""
+    value: Any
+    fresh_until: float
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.fresh_until > time.time()
+
+
+class _KeyedLocks:
+    """Verrous par clé, supprimés dès qu'ils ne sont plus utilisés"""
+
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._locks: Dict[str, list] = {}
+
+    def acquire(self, key: str) -> threading.Lock:
+        with self._guard:
+            item = self._locks.setdefault(key, [threading.Lock(), 0])
+            item[1] += 1
+        item[0].acquire()
+        return item[0]
+
+    def release(self, key: str) -> None:
+        with self._guard:
+            item = self._locks[key]
+            item[0].release()
+            item[1] -= 1
+            if item[1] == 0:
+                del self._locks[key]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
 
 class CacheService:
     """
@@ -31,8 +87,29 @@ class CacheService:
         """
         self.redis_url = redis_url or getattr(settings, 'redis_url', None)
         self.redis_client: Optional[redis.Redis] = None
-        self.memory_cache: dict[str, tuple[Any, float]] = {}  # Fallback en mémoire
+        # Tier mémoire borné : cache principal sans Redis, L1 devant Redis sinon
+        self.memory_cache = MemoryCache(
+            max_entries=settings.cache_memory_max_entries,
+            max_bytes=settings.cache_memory_max_bytes,
+            policy=settings.cache_memory_policy,
+            namespace_quotas=settings.cache_namespace_quotas,
+            sweep_interval_seconds=settings.cache_memory_sweep_interval_seconds,
+        )
+        self.l1_enabled = settings.cache_l1_enabled
+        self.serializer = CacheSerializer(
+            codec=settings.cache_codec,
+            compression=settings.cache_compression,
+            min_compress_bytes=settings.cache_compression_min_bytes,
+        )
         self.use_redis = False
+
+        # Coalescence des recalculs (single-flight) pour get_or_set / aget_or_set
+        self._key_locks = _KeyedLocks()
+        self._refreshing: Set[str] = set()
+        self._refreshing_lock = threading.Lock()
+        self._lock_tokens: Dict[str, str] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._background_tasks: Set[asyncio.Task] = set()
         
         # Tenter de se connecter à Redis
         if self.redis_url:
@@ -67,19 +144,40 @@ class CacheService:
         Returns:
             Valeur en cache ou default
         """
+        cached = self._get_raw(key)
+        if cached is None:
+            return default
+        if isinstance(cached, CacheEntry):
+            # Valeur périmée conservée pour get_or_set : absente pour une lecture simple
+            return cached.value if cached.is_fresh else default
+        return cached
+
+    def _get_raw(self, key: str) -> Any:
+        """Lit la valeur stockée telle quelle (None si absente)"""
         if self.use_redis and self.redis_client:
+            use_l1 = self._use_l1(key)
+            if use_l1:
+                cached = self.memory_cache.get(key)
+                if cached is not None:
+                    track_cache_hit("l1")
+                    return cached
             try:
                 cached = self.redis_client.get(key)
                 if cached:
-                    return pickle.loads(cached)
+                    value = self._decode(cached)
+                    track_cache_hit("redis")
+                    if use_l1:
+                        self.memory_cache.set(key, value, settings.cache_l1_ttl_seconds)
+                    return value
+                track_cache_miss("redis")
             except Exception as e:
                 logger.warning(f"Erreur lecture cache Redis ({key}): {e}")
                 # Fallback en mémoire
-                return self._get_from_memory(key, default)
+                return self._get_from_memory(key)
         else:
-            return self._get_from_memory(key, default)
+            return self._get_from_memory(key)
         
-        return default
+        return None
     
     def set(
         self,
@@ -105,7 +203,9 @@ class CacheService:
         
         if self.use_redis and self.redis_client:
             try:
-                serialized = pickle.dumps(value)
+                serialized = self._encode(value)
+                if self._use_l1(key):
+                    self.memory_cache.set(key, value, min(ttl_seconds, settings.cache_l1_ttl_seconds))
                 return self.redis_client.setex(key, ttl_seconds, serialized)
             except Exception as e:
                 logger.warning(f"Erreur écriture cache Redis ({key}): {e}")
@@ -124,18 +224,15 @@ class CacheService:
         Returns:
             True si succès, False sinon
         """
+        # Supprimer aussi du cache mémoire (copie L1 comprise)
+        memory_deleted = self.memory_cache.delete(key)
         if self.use_redis and self.redis_client:
             try:
                 return bool(self.redis_client.delete(key))
             except Exception as e:
                 logger.warning(f"Erreur suppression cache Redis ({key}): {e}")
         
-        # Supprimer aussi du cache mémoire
-        if key in self.memory_cache:
-            del self.memory_cache[key]
-            return True
-        
-        return False
+        return memory_deleted
     
     def delete_pattern(self, pattern: str) -> int:
         """
@@ -157,18 +254,9 @@ class CacheService:
             except Exception as e:
                 logger.warning(f"Erreur suppression pattern Redis ({pattern}): {e}")
         
-        # Nettoyer aussi le cache mémoire
-        import time
-        current_time = time.time()
-        keys_to_delete = [
-            k for k in self.memory_cache.keys()
-            if self._match_pattern(k, pattern) and self.memory_cache[k][1] < current_time
-        ]
-        for key in keys_to_delete:
-            del self.memory_cache[key]
-            count += 1
-        
-        return count
+        # Nettoyer aussi le cache mémoire (copies L1 comprises, expirées ou non)
+        memory_count = self.memory_cache.delete_pattern(pattern)
+        return count if self.use_redis else memory_count
     
     def exists(self, key: str) -> bool:
         """
@@ -186,44 +274,303 @@ class CacheService:
             except Exception as e:
                 logger.warning(f"Erreur vérification cache Redis ({key}): {e}")
         
-        import time
-        if key in self.memory_cache:
-            _, expiry = self.memory_cache[key]
-            if expiry > time.time():
-                return True
-            else:
-                # Expiré, supprimer
-                del self.memory_cache[key]
-        
-        return False
+        return key in self.memory_cache
     
     def get_or_set(
         self,
         key: str,
         callable_func,
         ttl_seconds: int = 300,
-        ttl: Optional[timedelta] = None
+        ttl: Optional[timedelta] = None,
+        stale_ttl_seconds: Optional[int] = None,
     ) -> Any:
         """
         Récupère une valeur du cache ou l'exécute et la met en cache
         
+        Les appels concurrents sur une même clé sont coalescés : un seul
+        exécute ``callable_func`` (verrou par clé dans le processus, et verrou
+        Redis ``SET NX`` entre workers), les autres attendent son résultat.
+        Une valeur expirée depuis moins de ``stale_ttl_seconds`` est servie
+        immédiatement pendant qu'un seul appelant la rafraîchit en arrière-plan.
+        
         Args:
             key: Clé du cache
             callable_func: Fonction à exécuter si la clé n'existe pas
             ttl_seconds: Durée de vie en secondes
             ttl: Durée de vie en timedelta
+            stale_ttl_seconds: Durée pendant laquelle une valeur expirée peut
+                encore être servie (défaut: settings.cache_stale_ttl_seconds)
+            
+        Returns:
+            Valeur en cache ou résultat de callable_func
+        """
+        ttl_seconds, stale_ttl_seconds = self._resolve_ttls(ttl_seconds, ttl, stale_ttl_seconds)
+
+        entry = self._get_entry(key)
+        if entry is not None and entry.is_fresh:
+            return entry.value
+
+        if entry is not None:
+            # Stale-while-revalidate : un seul rafraîchissement en arrière-plan
+            if self._begin_refresh(key):
+                threading.Thread(
+                    target=self._refresh,
+                    args=(key, callable_func, ttl_seconds, stale_ttl_seconds),
+                    daemon=True,
+                ).start()
+            return entry.value
+
+        self._key_locks.acquire(key)
+        try:
+            # Un autre appelant a pu remplir le cache pendant l'attente du verrou
+            entry = self._get_entry(key)
+            if entry is not None and entry.is_fresh:
+                return entry.value
+
+            token = self._acquire_distributed_lock(key)
+            if token is None:
+                # Un autre worker calcule déjà la valeur
+                entry = self._wait_for_entry(key)
+                if entry is not None:
+                    return entry.value
+
+            try:
+                value = callable_func()
+                self._store_entry(key, value, ttl_seconds, stale_ttl_seconds)
+                return value
+            finally:
+                self._release_distributed_lock(key, token)
+        finally:
+            self._key_locks.release(key)
+
+    async def aget_or_set(
+        self,
+        key: str,
+        callable_func: Callable[[], Any],
+        ttl_seconds: int = 300,
+        ttl: Optional[timedelta] = None,
+        stale_ttl_seconds: Optional[int] = None,
+    ) -> Any:
+        """
+        Variante async de ``get_or_set`` pour les handlers FastAPI
+        
+        ``callable_func`` peut être une fonction coroutine (attendue dans la
+        boucle) ou une fonction synchrone (exécutée dans un thread). Les
+        requêtes concurrentes sur une même clé partagent le même calcul. Les
+        appels Redis (lecture, verrou, écriture) sont faits dans un thread :
+        la boucle n'est jamais bloquée par le réseau.
+        
+        Args:
+            key: Clé du cache
+            callable_func: Fonction (sync ou async) à exécuter si la clé n'existe pas
+            ttl_seconds: Durée de vie en secondes
+            ttl: Durée de vie en timedelta
+            stale_ttl_seconds: Durée pendant laquelle une valeur expirée peut encore être servie
             
         Returns:
             Valeur en cache ou résultat de callable_func
         """
-        cached = self.get(key)
-        if cached is not None:
+        ttl_seconds, stale_ttl_seconds = self._resolve_ttls(ttl_seconds, ttl, stale_ttl_seconds)
+
+        entry = await self._get_entry_async(key)
+        if entry is not None and entry.is_fresh:
+            return entry.value
+
+        if entry is not None:
+            if self._reserve_refresh(key):
+                task = asyncio.create_task(self._refresh_async(key, callable_func, ttl_seconds, stale_ttl_seconds))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+            return entry.value
+
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.create_task(self._compute_async(key, callable_func, ttl_seconds, stale_ttl_seconds))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._inflight.pop(key, None) if self._inflight.get(key) is done else None)
+        # shield : l'annulation d'une requête n'interrompt pas le calcul partagé
+        return await asyncio.shield(task)
+
+    async def aget_or_set_json(
+        self,
+        key: str,
+        callable_func: Callable[[], Any],
+        ttl_seconds: int = 300,
+        ttl: Optional[timedelta] = None,
+        stale_ttl_seconds: Optional[int] = None,
+    ) -> bytes:
+        """
+        Mode "réponse pré-sérialisée" : met en cache le corps JSON de la réponse
+        
+        La valeur produite par ``callable_func`` est sérialisée une seule fois en
+        JSON ; chaque hit renvoie directement ces octets, à utiliser comme corps
+        HTTP (``Response(content=..., media_type="application/json")``) sans
+        désérialisation ni ré-encodage par FastAPI.
+        
+        Returns:
+            Corps JSON de la réponse
+        """
+        async def render() -> bytes:
+            return dumps_json(await self._call_async(callable_func))
+
+        return await self.aget_or_set(key, render, ttl_seconds=ttl_seconds, ttl=ttl, stale_ttl_seconds=stale_ttl_seconds)
+
+    async def _compute_async(self, key: str, callable_func, ttl_seconds: int, stale_ttl_seconds: int) -> Any:
+        token = await self._redis_call(self._acquire_distributed_lock, key)
+        if token is None:
+            entry = await self._wait_for_entry_async(key)
+            if entry is not None:
+                return entry.value
+        try:
+            value = await self._call_async(callable_func)
+            await self._redis_call(self._store_entry, key, value, ttl_seconds, stale_ttl_seconds)
+            return value
+        finally:
+            await self._redis_call(self._release_distributed_lock, key, token)
+
+    async def _refresh_async(self, key: str, callable_func, ttl_seconds: int, stale_ttl_seconds: int) -> None:
+        if not await self._redis_call(self._lock_refresh, key):
+            return
+        try:
+            value = await self._call_async(callable_func)
+            await self._redis_call(self._store_entry, key, value, ttl_seconds, stale_ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Échec du rafraîchissement en arrière-plan ({key}): {e}")
+        finally:
+            await self._redis_call(self._end_refresh, key)
+
+    def _refresh(self, key: str, callable_func, ttl_seconds: int, stale_ttl_seconds: int) -> None:
+        try:
+            value = callable_func()
+            self._store_entry(key, value, ttl_seconds, stale_ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Échec du rafraîchissement en arrière-plan ({key}): {e}")
+        finally:
+            self._end_refresh(key)
+
+    @staticmethod
+    async def _call_async(callable_func) -> Any:
+        if inspect.iscoroutinefunction(callable_func):
+            return await callable_func()
+        result = await asyncio.to_thread(callable_func)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    def _resolve_ttls(self, ttl_seconds: int, ttl: Optional[timedelta], stale_ttl_seconds: Optional[int]) -> tuple[int, int]:
+        if ttl:
+            ttl_seconds = int(ttl.total_seconds())
+        if stale_ttl_seconds is None:
+            stale_ttl_seconds = settings.cache_stale_ttl_seconds
+        return ttl_seconds, max(0, stale_ttl_seconds)
+
+    def _get_entry(self, key: str) -> Optional[CacheEntry]:
+        return self._as_entry(self._get_raw(key))
+
+    async def _get_entry_async(self, key: str) -> Optional[CacheEntry]:
+        """``_get_entry`` sans bloquer la boucle : L1 lu directement, Redis dans un thread"""
+        if self.use_redis and self.redis_client and self._use_l1(key):
+            cached = self.memory_cache.get(key)
+            if cached is not None:
+                track_cache_hit("l1")
+                return self._as_entry(cached)
+        return await self._redis_call(self._get_entry, key)
+
+    @staticmethod
+    def _as_entry(cached: Any) -> Optional[CacheEntry]:
+        if cached is None:
+            return None
+        if isinstance(cached, CacheEntry):
             return cached
+        # Valeur écrite par set() : fraîche tant qu'elle est présente
+        return CacheEntry(cached, float("inf"))
+
+    async def _redis_call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Exécute une opération du cache dans un thread si elle interroge Redis (directement sinon)"""
+        if self.use_redis and self.redis_client:
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+
+    def _store_entry(self, key: str, value: Any, ttl_seconds: int, stale_ttl_seconds: int) -> None:
+        entry = CacheEntry(value, time.time() + ttl_seconds)
+        self.set(key, entry, ttl_seconds=ttl_seconds + stale_ttl_seconds)
+
+    def _begin_refresh(self, key: str) -> bool:
+        """Réserve le rafraîchissement d'une clé (local puis entre workers)"""
+        return self._reserve_refresh(key) and self._lock_refresh(key)
+
+    def _reserve_refresh(self, key: str) -> bool:
+        """Réservation locale : un seul rafraîchissement par clé dans le processus"""
+        with self._refreshing_lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+        return True
+
+    def _lock_refresh(self, key: str) -> bool:
+        """Verrou entre workers d'un rafraîchissement réservé (annule la réservation s'il est pris)"""
+        token = self._acquire_distributed_lock(key)
+        if token is None:
+            with self._refreshing_lock:
+                self._refreshing.discard(key)
+            return False
+        self._lock_tokens[key] = token
+        return True
+
+    def _end_refresh(self, key: str) -> None:
+        self._release_distributed_lock(key, self._lock_tokens.pop(key, None))
+        with self._refreshing_lock:
+            self._refreshing.discard(key)
+
+    def _acquire_distributed_lock(self, key: str) -> Optional[str]:
+        """
+        Pose un verrou Redis ``SET NX PX`` sur la clé
         
-        # Exécuter la fonction et mettre en cache
-        value = callable_func()
-        self.set(key, value, ttl_seconds=ttl_seconds, ttl=ttl)
-        return value
+        Returns:
+            Le jeton du verrou, _LOCAL_LOCK si aucun verrou distribué n'est
+            nécessaire, ou None si un autre worker le détient
+        """
+        if not (self.use_redis and self.redis_client and settings.cache_distributed_lock):
+            return _LOCAL_LOCK
+        token = uuid.uuid4().hex
+        try:
+            acquired = self.redis_client.set(
+                f"lock:{key}",
+                token,
+                nx=True,
+                px=int(settings.cache_lock_timeout_seconds * 1000),
+            )
+        except Exception as e:
+            logger.warning(f"Erreur verrou Redis ({key}): {e}")
+            return _LOCAL_LOCK
+        return token if acquired else None
+
+    def _release_distributed_lock(self, key: str, token: Optional[str]) -> None:
+        if token is None or token == _LOCAL_LOCK or not self.redis_client:
+            return
+        try:
+            self.redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, f"lock:{key}", token)
+        except Exception as e:
+            logger.warning(f"Erreur libération verrou Redis ({key}): {e}")
+
+    def _wait_for_entry(self, key: str) -> Optional[CacheEntry]:
+        """Attend (au plus cache_lock_timeout_seconds) la valeur calculée par un autre worker"""
+        deadline = time.monotonic() + settings.cache_lock_timeout_seconds
+        while time.monotonic() < deadline:
+            entry = self._get_entry(key)
+            if entry is not None:
+                return entry
+            time.sleep(0.05)
+        return None
+
+    async def _wait_for_entry_async(self, key: str) -> Optional[CacheEntry]:
+        deadline = time.monotonic() + settings.cache_lock_timeout_seconds
+        while time.monotonic() < deadline:
+            entry = await self._get_entry_async(key)
+            if entry is not None:
+                return entry
+            await asyncio.sleep(0.05)
+        return None
     
     def clear(self) -> bool:
         """
@@ -232,42 +579,41 @@ class CacheService:
         Returns:
             True si succès
         """
+        # Cache mémoire vidé dans tous les cas (copies L1 comprises)
+        self.memory_cache.clear()
         if self.use_redis and self.redis_client:
             try:
                 self.redis_client.flushdb()
-                return True
             except Exception as e:
                 logger.warning(f"Erreur vidage cache Redis: {e}")
         
-        self.memory_cache.clear()
         return True
     
     def _get_from_memory(self, key: str, default: Any = None) -> Any:
         """Récupère depuis le cache mémoire"""
-        import time
-        current_time = time.time()
-        
-        if key in self.memory_cache:
-            value, expiry = self.memory_cache[key]
-            if expiry > current_time:
-                return value
-            else:
-                # Expiré, supprimer
-                del self.memory_cache[key]
-        
-        return default
+        value = self.memory_cache.get(key, default)
+        if value is default:
+            track_cache_miss("memory")
+        else:
+            track_cache_hit("memory")
+        return value
     
     def _set_in_memory(self, key: str, value: Any, ttl_seconds: int) -> bool:
         """Met en cache mémoire"""
-        import time
-        expiry = time.time() + ttl_seconds
-        self.memory_cache[key] = (value, expiry)
-        return True
+        return self.memory_cache.set(key, value, ttl_seconds)
+    
+    def _encode(self, value: Any) -> bytes:
+        if isinstance(value, CacheEntry):
+            return self.serializer.dumps(value.value, fresh_until=value.fresh_until)
+        return self.serializer.dumps(value)
+    
+    def _decode(self, data: bytes) -> Any:
+        value, fresh_until = self.serializer.loads(data)
+        return value if fresh_until is None else CacheEntry(value, fresh_until)
     
-    def _match_pattern(self, key: str, pattern: str) -> bool:
-        """Vérifie si une clé correspond à un pattern simple"""
-        import fnmatch
-        return fnmatch.fnmatch(key, pattern)
+    def _use_l1(self, key: str) -> bool:
+        """Les compteurs partagés (rate limiting) ne doivent pas être lus depuis un L1 local"""
+        return self.l1_enabled and key_namespace(key) not in settings.cache_l1_excluded_namespaces
     
     def get_stats(self) -> dict:
         """
@@ -279,6 +625,8 @@ class CacheService:
         stats = {
             "backend": "memory" if not self.use_redis else "redis",
             "memory_cache_size": len(self.memory_cache),
+            "memory": self.memory_cache.get_stats(),
+            "l1_enabled": self.use_redis and self.l1_enabled,
         }
         
         if self.use_redis and self.redis_client:
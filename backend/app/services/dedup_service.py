@@ -0,0 +1,142 @@
+"""
+Quasi-doublons parmi les articles déjà stockés.
+
+Chaque article sauvegardé garde sa signature MinHash (``media_articles.minhash``)
+et ses bandes LSH (``media_article_bands``). Un nouvel article est comparé
+uniquement aux articles qui partagent au moins une bande avec lui : le coût
+d'une recherche ne dépend pas de la taille de la table. Une reprise
+(syndication, même dépêche sous une autre URL) récupère le score de l'article
+stocké au lieu d'être ré-analysée par le LLM.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, List, Mapping, Optional, Tuple, TypeVar
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.database import SessionLocal
+from app.repositories import media_articles
+from app.utils.near_duplicates import article_signature, band_buckets, from_bytes, similarity, to_bytes
+
+
+logger = get_logger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+
+
+@dataclass(slots=True)
+class StoredDuplicate:
+    """Article stocké le plus proche d'un nouvel article, et son score"""
+    article_id: int
+    similarity: float
+    sentiment_score: float
+    sentiment_label: Optional[str]
+    sentiment_model: Optional[str]
+
+
+class StoredArticleIndex:
+    """Recherche des quasi-doublons dans l'index LSH persisté avec ``media_articles``"""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, threshold: Optional[float] = None):
+        self.session_factory = session_factory
+        self.threshold = settings.dedup_similarity_threshold if threshold is None else threshold
+
+    def match(self, signatures: Mapping[K, bytes]) -> Dict[K, StoredDuplicate]:
+        """
+        Article stocké et déjà analysé le plus proche de chaque signature, pour
+        celles qui en ont un au-delà du seuil (deux requêtes pour tout le lot)
+        """
+        if not signatures:
+            return {}
+        decoded = {key: from_bytes(data) for key, data in signatures.items()}
+        buckets = {key: list(enumerate(band_buckets(signature))) for key, signature in decoded.items()}
+
+        with self.session_factory() as db:
+            candidates = media_articles.lsh_candidates(db, (pair for pairs in buckets.values() for pair in pairs))
+            if not candidates:
+                return {}
+            stored = {
+                row.id: row
+                for row in media_articles.signature_rows(db, (i for ids in candidates.values() for i in ids))
+                if row.sentiment_score is not None
+            }
+
+        matches: Dict[K, StoredDuplicate] = {}
+        for key, signature in decoded.items():
+            best: Optional[Tuple[float, int]] = None
+            for article_id in {i for pair in buckets[key] for i in candidates.get(pair, ())}:
+                row = stored.get(article_id)
+                if row is None:
+                    continue
+                score = similarity(signature, from_bytes(row.minhash))
+                if score >= self.threshold and (best is None or score > best[0]):
+                    best = (score, article_id)
+            if best is not None:
+                row = stored[best[1]]
+                matches[key] = StoredDuplicate(
+                    article_id=row.id,
+                    similarity=best[0],
+                    sentiment_score=row.sentiment_score,
+                    sentiment_label=row.sentiment_label,
+                    sentiment_model=row.sentiment_model,
+                )
+        return matches
+
+    def backfill(self, chunk_size: Optional[int] = None) -> int:
+        """Calcule et indexe la signature des articles stockés qui n'en ont pas (un commit par morceau)"""
+        chunk_size = chunk_size or settings.reanalysis_chunk_size
+        indexed = 0
+        after_id = 0
+        with self.session_factory() as db:
+            while rows := media_articles.unindexed_chunk(db, after_id, chunk_size):
+                signatures: Dict[int, bytes] = {}
+                for row in rows:
+                    signature = article_signature(row.title)
+                    if signature is not None:
+                        signatures[row.id] = to_bytes(signature)
+                media_articles.index_signatures(db, signatures)
+                db.commit()
+                indexed += len(signatures)
+                after_id = rows[-1].id
+                logger.info(f"📇 {indexed} articles indexés (dernier id {after_id})")
+        return indexed
+
+
+def split_stored_duplicates(articles: List, matches: Mapping[int, StoredDuplicate]) -> List:
+    """
+    Reporte sur les articles ``matches`` (par position) le score de leur
+    doublon stocké ; retourne les articles restant à analyser
+    """
+    remaining = []
+    for position, article in enumerate(articles):
+        duplicate = matches.get(position)
+        if duplicate is None:
+            remaining.append(article)
+            continue
+        article.duplicate_of = duplicate.article_id
+        article.sentiment_score = duplicate.sentiment_score
+        article.sentiment_label = duplicate.sentiment_label or article.sentiment_label
+        article.sentiment_model = duplicate.sentiment_model
+    return remaining
+
+
+# Instance globale de l'index des articles stockés
+_stored_article_index: Optional[StoredArticleIndex] = None
+
+
+def get_stored_article_index() -> StoredArticleIndex:
+    """
+    Retourne l'instance globale de l'index des articles stockés (singleton)
+
+    Returns:
+        Instance de StoredArticleIndex
+    """
+    global _stored_article_index
+
+    if _stored_article_index is None:
+        _stored_article_index = StoredArticleIndex()
+
+    return _stored_article_index
@@ -2,13 +2,14 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import date, timedelta
-from typing import List, Optional
-import statistics
+from typing import Dict, Optional, Tuple
+import threading
+import time
 
-from sklearn.preprocessing import MinMaxScaler
-import numpy as np
+from sqlalchemy import Select, event, func, select
 
 from app.core.logging import get_logger
+from app.models import timescale
 from app.models.database import SessionLocal
 from app.models.schemas import IndexScore
 
@@ -25,6 +26,43 @@ class DynamicScalingResult:
     window_mean: float
 
 
+@dataclass(slots=True)
+class WindowStats:
+    count: int
+    min: Optional[float]
+    max: Optional[float]
+    mean: Optional[float]
+
+
+COMPONENT_COLUMNS = (
+    "momentum",
+    "price_strength",
+    "volume",
+    "volatility",
+    "equity_vs_bonds",
+    "media_sentiment",
+)
+
+# Cache des statistiques de fenêtre : (window_days, date) -> (expiration, {composante: WindowStats})
+# Le TTL borne la péremption lorsque d'autres processus écrivent des IndexScore.
+WINDOW_STATS_TTL_SECONDS = 600
+_window_stats_cache: Dict[Tuple[int, date], Tuple[float, Dict[str, WindowStats]]] = {}
+_window_stats_lock = threading.Lock()
+
+
+def invalidate_window_stats_cache() -> None:
+    """Vide le cache des statistiques de fenêtre (appelé à chaque écriture d'IndexScore)."""
+    with _window_stats_lock:
+        _window_stats_cache.clear()
+
+
+@event.listens_for(IndexScore, "after_insert")
+@event.listens_for(IndexScore, "after_update")
+@event.listens_for(IndexScore, "after_delete")
+def _on_index_score_written(mapper, connection, target) -> None:
+    invalidate_window_stats_cache()
+
+
 class DynamicScalerService:
     """
     Service de normalisation dynamique basé sur des fenêtres glissantes.
@@ -32,9 +70,10 @@ class DynamicScalerService:
     aux conditions actuelles du marché.
     """
 
-    def __init__(self, window_days: int = 90):
+    def __init__(self, window_days: int = 90, use_cache: bool = True):
         self.window_days = window_days
         self.feature_range = (0.0, 100.0)
+        self.use_cache = use_cache
 
     def normalize_component(
         self,
@@ -56,10 +95,16 @@ class DynamicScalerService:
         if current_date is None:
             current_date = date.today()
 
-        # Récupérer l'historique des valeurs de cette composante
-        historical_values = self._get_historical_values(component_name, current_date)
+        stats = self.get_window_stats(current_date).get(component_name)
+        return self._scale(component_name, current_value, stats)
 
-        if not historical_values or len(historical_values) < 2:
+    def _scale(
+        self,
+        component_name: str,
+        current_value: float,
+        stats: Optional[WindowStats],
+    ) -> DynamicScalingResult:
+        if stats is None or stats.count < 2:
             # Pas assez de données : retourner la valeur brute
             logger.warning(
                 "Not enough historical data for %s, returning raw value",
@@ -73,21 +118,16 @@ class DynamicScalerService:
                 window_mean=current_value,
             )
 
-        # Calculer les statistiques de la fenêtre
-        window_min = min(historical_values)
-        window_max = max(historical_values)
-        window_mean = statistics.mean(historical_values)
-
         # Normaliser la valeur actuelle
-        if window_max == window_min:
+        if stats.max == stats.min:
             # Pas de variance : retourner 50 (neutre)
             scaled_value = 50.0
         else:
-            # MinMaxScaler sur la fenêtre
-            scaler = MinMaxScaler(feature_range=self.feature_range)
-            scaler.fit(np.array(historical_values).reshape(-1, 1))
+            # Min-max sur la fenêtre (sans écrêtage, comme MinMaxScaler)
+            range_min, range_max = self.feature_range
             scaled_value = float(
-                scaler.transform([[current_value]])[0][0]
+                range_min
+                + (current_value - stats.min) / (stats.max - stats.min) * (range_max - range_min)
             )
 
         logger.info(
@@ -95,53 +135,91 @@ class DynamicScalerService:
             component_name,
             current_value,
             scaled_value,
-            window_min,
-            window_max,
-            window_mean,
+            stats.min,
+            stats.max,
+            stats.mean,
         )
 
         return DynamicScalingResult(
             raw_value=current_value,
             scaled_value=scaled_value,
-            window_min=window_min,
-            window_max=window_max,
-            window_mean=window_mean,
+            window_min=stats.min,
+            window_max=stats.max,
+            window_mean=stats.mean,
         )
 
-    def _get_historical_values(
-        self,
-        component_name: str,
-        current_date: date,
-    ) -> List[float]:
+    def get_window_stats(self, current_date: date) -> Dict[str, WindowStats]:
         """
-        Récupère les valeurs historiques d'une composante sur la fenêtre glissante.
+        Statistiques (count/min/max/moyenne) de toutes les composantes sur la
+        fenêtre glissante, en une seule requête d'agrégation.
+        """
+        cache_key = (self.window_days, current_date)
+        if self.use_cache:
+            with _window_stats_lock:
+                cached = _window_stats_cache.get(cache_key)
+            if cached is not None and cached[0] > time.monotonic():
+                return cached[1]
 
-        Args:
-            component_name: Nom de la composante
-            current_date: Date de référence
+        stats = self._query_window_stats(current_date)
 
-        Returns:
-            Liste des valeurs historiques
-        """
+        if self.use_cache:
+            with _window_stats_lock:
+                _window_stats_cache[cache_key] = (time.monotonic() + WINDOW_STATS_TTL_SECONDS, stats)
+        return stats
+
+    def _query_window_stats(self, current_date: date) -> Dict[str, WindowStats]:
         cutoff_date = current_date - timedelta(days=self.window_days)
 
         with SessionLocal() as db:
-            records = (
-                db.query(IndexScore)
-                .filter(IndexScore.as_of >= cutoff_date)
-                .filter(IndexScore.as_of <= current_date)
-                .order_by(IndexScore.as_of.asc())
-                .all()
+            if timescale.aggregates_available(db.connection()):
+                row = db.execute(self._daily_aggregate_query(cutoff_date, current_date)).one()
+            else:
+                aggregates = []
+                for name in COMPONENT_COLUMNS:
+                    column = getattr(IndexScore, name)
+                    aggregates.extend([func.count(column), func.min(column), func.max(column), func.avg(column)])
+                row = (
+                    db.query(*aggregates)
+                    .filter(IndexScore.as_of >= cutoff_date)
+                    .filter(IndexScore.as_of <= current_date)
+                    .one()
+                )
+
+        stats = {}
+        for position, name in enumerate(COMPONENT_COLUMNS):
+            count, minimum, maximum, mean = row[position * 4:position * 4 + 4]
+            stats[name] = WindowStats(
+                count=int(count or 0),
+                min=None if minimum is None else float(minimum),
+                max=None if maximum is None else float(maximum),
+                mean=None if mean is None else float(mean),
             )
+        return stats
 
-            # Extraire les valeurs de la composante demandée
-            values = []
-            for record in records:
-                value = getattr(record, component_name, None)
-                if value is not None:
-                    values.append(float(value))
-
-            return values
+    @staticmethod
+    def _daily_aggregate_query(cutoff_date: date, current_date: date) -> Select:
+        """
+        Mêmes statistiques lues dans l'agrégat continu journalier (TimescaleDB) :
+        une ligne par jour de la fenêtre au lieu de toutes les lignes brutes.
+        La moyenne est pondérée par le nombre de valeurs de chaque jour.
+        """
+        daily = timescale.aggregate_table("day")
+        aggregates = []
+        for name in COMPONENT_COLUMNS:
+            count = daily.c[f"{name}_count"]
+            aggregates.extend([
+                func.sum(count),
+                func.min(daily.c[f"{name}_min"]),
+                func.max(daily.c[f"{name}_max"]),
+                func.sum(daily.c[f"{name}_mean"] * count) / func.nullif(func.sum(count), 0),
+            ])
+        # Mêmes bornes que la requête sur les lignes brutes : jour de current_date inclus
+        return (
+            select(*aggregates)
+            .select_from(daily)
+            .where(daily.c.bucket >= cutoff_date)
+            .where(daily.c.bucket <= current_date)
+        )
 
     def normalize_all_components(
         self,
@@ -149,7 +227,7 @@ class DynamicScalerService:
         current_date: Optional[date] = None,
     ) -> dict:
         """
-        Normalise toutes les composantes d'un coup.
+        Normalise toutes les composantes d'un coup (une seule requête).
 
         Args:
             components: Dict {component_name: raw_value}
@@ -158,18 +236,16 @@ class DynamicScalerService:
         Returns:
             Dict {component_name: scaled_value}
         """
+        if current_date is None:
+            current_date = date.today()
+
+        stats = self.get_window_stats(current_date)
+
         normalized = {}
         for component_name, raw_value in components.items():
             if component_name == "as_of":
                 continue
-            result = self.normalize_component(component_name, raw_value, current_date)
+            result = self._scale(component_name, raw_value, stats.get(component_name))
             normalized[component_name] = result.scaled_value
 
         return normalized
-
-
-
-
-
-
-
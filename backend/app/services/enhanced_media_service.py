@@ -9,11 +9,12 @@ import asyncio
 from pathlib import Path
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, func
 
 from app.core.logging import get_logger
 from app.models.database import get_session
 from app.models.schemas import MediaArticle
+from app.repositories.media_articles import upsert_articles
 from app.pipelines.ingestion.enhanced_media_scraper import (
     EnhancedMediaScraper,
     EnhancedMediaArticle
@@ -329,58 +330,41 @@ class EnhancedMediaService:
     async def _save_articles(self, articles: List[EnhancedMediaArticle]) -> int:
         """
         Sauvegarder les articles en base de données
-        Évite les doublons par URL
+        Évite les doublons par URL (upsert groupé, un article existant n'est
+        remplacé que si le nouveau est de meilleure qualité)
         """
-        saved_count = 0
+        rows = [
+            {
+                "title": article.title,
+                "summary": article.summary,
+                "url": article.url,
+                "source": article.source,
+                "published_at": article.published_at,
+                "content": article.content,
+                "image_url": article.image_url,  # Sauvegarder l'image
+                "sentiment_score": article.quality_score,  # Utiliser quality_score temporairement
+                "sentiment_label": article.sentiment_label,
+                "scraped_at": article.scraped_at,
+            }
+            for article in articles
+        ]
         
         # Obtenir une session de base de données
         db: Session = get_session()
         
         try:
-            for article in articles:
-                try:
-                    # Vérifier si l'article existe déjà
-                    existing = db.query(MediaArticle).filter(
-                        MediaArticle.url == article.url
-                    ).first()
-                    
-                    if existing:
-                        # Mettre à jour l'article existant si le nouveau est meilleur
-                        if article.quality_score > (existing.sentiment_score or 0):
-                            existing.title = article.title
-                            existing.summary = article.summary
-                            existing.content = article.content
-                            existing.image_url = article.image_url  # Mettre à jour l'image
-                            existing.published_at = article.published_at
-                            existing.scraped_at = datetime.now()
-                            logger.debug(f"Article mis à jour: {article.url}")
-                        else:
-                            logger.debug(f"Article déjà existant (meilleur): {article.url}")
-                            continue
-                    else:
-                        # Créer un nouvel article
-                        new_article = MediaArticle(
-                            title=article.title,
-                            summary=article.summary,
-                            url=article.url,
-                            source=article.source,
-                            published_at=article.published_at,
-                            content=article.content,
-                            image_url=article.image_url,  # Sauvegarder l'image
-                            sentiment_score=article.quality_score,  # Utiliser quality_score temporairement
-                            sentiment_label=article.sentiment_label,
-                            scraped_at=article.scraped_at
-                        )
-                        db.add(new_article)
-                    
-                    saved_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Erreur sauvegarde article {article.url}: {e}")
-                    continue
-            
+            result = upsert_articles(
+                db,
+                rows,
+                update_columns=("title", "summary", "content", "image_url", "published_at", "scraped_at"),
+                # Mettre à jour l'article existant si le nouveau est meilleur
+                update_where=lambda excluded: func.coalesce(MediaArticle.sentiment_score, 0.0) < excluded.sentiment_score,
+            )
             db.commit()
-            logger.info(f"✅ {saved_count} articles sauvegardés en base de données")
+            logger.info(
+                f"✅ {result.saved} articles sauvegardés en base de données "
+                f"({result.inserted} nouveaux, {result.updated} mis à jour, {result.unchanged} inchangés)"
+            )
             
         except Exception as e:
             db.rollback()
@@ -389,7 +373,7 @@ class EnhancedMediaService:
         finally:
             db.close()
         
-        return saved_count
+        return result.saved
     
     async def scrape_recent_articles(self, hours: int = 24) -> dict:
         """
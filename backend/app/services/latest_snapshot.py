@@ -0,0 +1,237 @@
+"""
+Instantané immuable des dernières valeurs publiées (score, composantes, articles).
+
+Le pipeline publie un ``LatestSnapshot`` après chaque sauvegarde. Sa version
+est une empreinte du contenu : elle sert d'ETag et reste identique d'un worker
+à l'autre. L'instantané est gardé en mémoire et dans le cache partagé (Redis)
+sous ``snapshot:latest:{version}``, la clé ``snapshot:latest:current``
+désignant la version courante. Les endpoints de lecture le servent sans
+requête SQL, avec des corps JSON sérialisés une seule fois par version, et
+répondent 304 aux clients dont le ``If-None-Match`` est à jour.
+
+Un score écrit sans passer par ``publish`` (autre worker sans Redis, script)
+n'est pas perdu : la copie locale n'est servie que pendant
+``snapshot_max_age_seconds``, puis reconstruite depuis la base, comme lorsque
+la clé de version a expiré.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple
+import asyncio
+import hashlib
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.database import AsyncSessionLocal
+from app.models.schemas import INDEX_SCORE_VALUE_COLUMNS, IndexScore, MediaArticle
+from app.repositories import index_scores, media_articles
+from app.services.cache_codecs import dumps_json
+from app.services.cache_service import CacheService, get_cache_service
+
+
+logger = get_logger(__name__)
+
+CURRENT_VERSION_KEY = "snapshot:latest:current"
+COMPONENT_NAMES = tuple(name for name in INDEX_SCORE_VALUE_COLUMNS if name != "score")
+
+
+def _snapshot_key(version: str) -> str:
+    return f"snapshot:latest:{version}"
+
+
+def _article_content(article: MediaArticle) -> Dict[str, Any]:
+    return {
+        "id": article.id,
+        "source": article.source,
+        "title": article.title,
+        "url": article.url,
+        "summary": article.summary,
+        "image_url": article.image_url,
+        "published_at": article.published_at.isoformat() if article.published_at else None,
+        "sentiment_score": article.sentiment_score,
+        "sentiment_label": article.sentiment_label,
+    }
+
+
+@dataclass(frozen=True, slots=True)
+class LatestSnapshot:
+    """Dernier score, ses composantes et les articles les plus récents (valeurs JSON natives)"""
+    version: str
+    published_at: str
+    as_of: Optional[datetime]
+    score: Optional[float]
+    components: Mapping[str, Optional[float]]
+    articles: Tuple[Mapping[str, Any], ...]
+    # Corps JSON déjà rendus, par endpoint (calculés une fois par version et par processus)
+    _bodies: Dict[str, bytes] = field(default_factory=dict, repr=False, compare=False)
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.version}"'
+
+    @classmethod
+    def build(cls, latest: Optional[IndexScore], articles: Iterable[MediaArticle]) -> "LatestSnapshot":
+        """Instantané à partir du dernier score (None si la table est vide) et des articles récents"""
+        content = {
+            "as_of": latest.as_of.isoformat() if latest is not None and latest.as_of else None,
+            "score": latest.score if latest is not None else None,
+            "components": {name: getattr(latest, name) if latest is not None else None for name in COMPONENT_NAMES},
+            "articles": [_article_content(article) for article in articles],
+        }
+        version = hashlib.sha256(dumps_json(content)).hexdigest()[:16]
+        return cls.from_dict({**content, "version": version, "published_at": datetime.now().isoformat()})
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "LatestSnapshot":
+        return cls(
+            version=data["version"],
+            published_at=data["published_at"],
+            as_of=datetime.fromisoformat(data["as_of"]) if data["as_of"] else None,
+            score=data["score"],
+            components=MappingProxyType(dict(data["components"])),
+            articles=tuple(MappingProxyType(dict(article)) for article in data["articles"]),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "published_at": self.published_at,
+            "as_of": self.as_of.isoformat() if self.as_of else None,
+            "score": self.score,
+            "components": dict(self.components),
+            "articles": [dict(article) for article in self.articles],
+        }
+
+    def body(self, name: str, render: Callable[["LatestSnapshot"], Any]) -> bytes:
+        """Corps JSON ``render(self)`` d'un endpoint, sérialisé une seule fois pour cette version"""
+        cached = self._bodies.get(name)
+        if cached is None:
+            cached = self._bodies[name] = dumps_json(render(self))
+        return cached
+
+
+class SnapshotStore:
+    """
+    Instantané courant : copie locale, à jour avec la version publiée dans le
+    cache partagé (un seul GET de la clé de version par lecture, servi par le
+    L1) et reconfirmée depuis la base après ``max_age_seconds``
+    """
+
+    def __init__(
+        self,
+        cache: Optional[CacheService] = None,
+        ttl_seconds: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+    ):
+        self.cache = cache or get_cache_service()
+        self.ttl_seconds = ttl_seconds or settings.snapshot_ttl_seconds
+        self.max_age_seconds = settings.snapshot_max_age_seconds if max_age_seconds is None else max_age_seconds
+        self._current: Optional[LatestSnapshot] = None
+        self._confirmed_at = 0.0  # Dernière confirmation de la copie locale par la base (horloge murale)
+        self._lock = threading.Lock()
+
+    def publish(self, snapshot: LatestSnapshot) -> LatestSnapshot:
+        """Publie ``snapshot`` : contenu d'abord, puis bascule de la version courante"""
+        self.cache.set(_snapshot_key(snapshot.version), snapshot.to_dict(), ttl_seconds=self.ttl_seconds)
+        self.cache.set(CURRENT_VERSION_KEY, snapshot.version, ttl_seconds=self.ttl_seconds)
+        with self._lock:
+            self._current = snapshot
+            self._confirmed_at = time.time()
+        logger.info(f"📸 Instantané publié (version {snapshot.version}, score {snapshot.score})")
+        return snapshot
+
+    def publish_from_db(self, db: Session) -> LatestSnapshot:
+        """Construit l'instantané depuis une session synchrone (pipeline, scripts) et le publie"""
+        latest = db.query(IndexScore).order_by(IndexScore.as_of.desc(), IndexScore.id.desc()).first()
+        articles = db.scalars(media_articles.latest_query(settings.snapshot_top_articles)).all()
+        return self.publish(LatestSnapshot.build(latest, articles))
+
+    def current(self) -> Optional[LatestSnapshot]:
+        """
+        Instantané courant, ou None s'il faut le reconstruire depuis la base :
+        rien de publié, clé de version expirée, ou copie plus vieille que
+        ``max_age_seconds``
+        """
+        version = self.cache.get(CURRENT_VERSION_KEY)
+        if version is None:
+            return None
+        with self._lock:
+            current, confirmed_at = self._current, self._confirmed_at
+
+        if current is None or current.version != version:
+            # Version publiée par un autre worker
+            data = self.cache.get(_snapshot_key(version))
+            if data is None:
+                return None
+            current = LatestSnapshot.from_dict(data)
+            confirmed_at = datetime.fromisoformat(current.published_at).timestamp()
+            with self._lock:
+                self._current, self._confirmed_at = current, confirmed_at
+
+        if time.time() - confirmed_at > self.max_age_seconds:
+            return None
+        return current
+
+    async def aget(self) -> LatestSnapshot:
+        """Instantané courant, reconstruit depuis la base s'il manque ou a expiré"""
+        snapshot = await self._off_loop(self.current)
+        if snapshot is not None:
+            return snapshot
+        return await self.refresh()
+
+    async def refresh(self) -> LatestSnapshot:
+        """
+        Relit le dernier score et les articles récents. Contenu inchangé : la
+        copie locale (et ses corps JSON déjà rendus) est reconfirmée ; sinon le
+        nouvel instantané est publié (idempotent si plusieurs requêtes le font
+        en même temps : même contenu, même version)
+        """
+        async with AsyncSessionLocal() as db:
+            latest = await index_scores.get_latest(db)
+            articles = await media_articles.list_latest(db, settings.snapshot_top_articles)
+        return await self._off_loop(self._confirm_or_publish, LatestSnapshot.build(latest, articles))
+
+    def _confirm_or_publish(self, snapshot: LatestSnapshot) -> LatestSnapshot:
+        with self._lock:
+            current = self._current
+        if (
+            current is not None
+            and current.version == snapshot.version
+            and self.cache.get(CURRENT_VERSION_KEY) == snapshot.version
+        ):
+            with self._lock:
+                self._confirmed_at = time.time()
+            return current
+        return self.publish(snapshot)
+
+    async def _off_loop(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Appel au cache depuis un endpoint : dans un thread si Redis (client synchrone) est utilisé"""
+        if self.cache.use_redis and self.cache.redis_client:
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+
+
+# Instance globale de l'instantané
+_snapshot_store: Optional[SnapshotStore] = None
+
+
+def get_snapshot_store() -> SnapshotStore:
+    """
+    Retourne l'instance globale de l'instantané (singleton)
+
+    Returns:
+        Instance de SnapshotStore
+    """
+    global _snapshot_store
+
+    if _snapshot_store is None:
+        _snapshot_store = SnapshotStore()
+
+    return _snapshot_store
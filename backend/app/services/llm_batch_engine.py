@@ -0,0 +1,272 @@
+"""
+Moteur asynchrone d'analyse de sentiment LLM par lots.
+
+- un client OpenAI partagé (pool de connexions httpx) par boucle d'événements
+- une limite de requêtes simultanées (sémaphore)
+- une limitation de débit par seau à jetons (token bucket)
+- le regroupement de plusieurs titres courts dans un même prompt, avec
+  ré-analyse individuelle des articles absents de la réponse
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+import asyncio
+import re
+import time
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+try:
+    import httpx
+    from openai import AsyncOpenAI
+    ASYNC_OPENAI_AVAILABLE = True
+except ImportError:
+    ASYNC_OPENAI_AVAILABLE = False
+
+if TYPE_CHECKING:
+    from app.services.llm_sentiment_service import LLMSentimentAnalyzer, LLMSentimentResult
+
+
+logger = get_logger(__name__)
+
+_ITEM_HEADER = re.compile(r"^\s*\[(\d+)\]\s*$", re.MULTILINE)
+
+
+class TokenBucket:
+    """Seau à jetons asynchrone : ``rate_per_minute`` jetons, rafale de ``capacity``."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        # L'attente se fait hors du verrou : les autres appelants calculent la leur en parallèle
+        while True:
+            async with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            await asyncio.sleep(wait)
+
+
+@dataclass(slots=True)
+class _LoopResources:
+    loop: asyncio.AbstractEventLoop
+    client: "AsyncOpenAI"
+    semaphore: asyncio.Semaphore
+    bucket: TokenBucket
+
+
+class LLMBatchEngine:
+    """Analyse de sentiment LLM concurrente pour un ``LLMSentimentAnalyzer``."""
+
+    def __init__(
+        self,
+        analyzer: "LLMSentimentAnalyzer",
+        max_concurrency: Optional[int] = None,
+        requests_per_minute: Optional[int] = None,
+        pack_size: Optional[int] = None,
+        pack_max_chars: Optional[int] = None,
+        base_url: Optional[str] = None,
+        request_timeout: Optional[float] = None,
+    ):
+        self.analyzer = analyzer
+        self.max_concurrency = max_concurrency or settings.llm_max_concurrency
+        self.requests_per_minute = requests_per_minute or settings.llm_requests_per_minute
+        self.pack_size = max(1, pack_size or settings.llm_pack_size)
+        self.pack_max_chars = pack_max_chars or settings.llm_pack_max_chars
+        self.base_url = base_url or settings.openai_base_url
+        self.request_timeout = request_timeout or settings.llm_request_timeout_seconds
+        self._resources: Optional[_LoopResources] = None
+        # Clients de boucles précédentes, fermés au prochain appel
+        self._stale_clients: List["AsyncOpenAI"] = []
+        self.requests_sent = 0
+
+    def _get_resources(self) -> _LoopResources:
+        """Ressources liées à la boucle courante (recréées si la boucle change)."""
+        loop = asyncio.get_running_loop()
+        if self._resources is None or self._resources.loop is not loop:
+            if self._resources is not None:
+                self._retire(self._resources)
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+                timeout=self.request_timeout,
+            )
+            client = AsyncOpenAI(
+                api_key=self.analyzer.api_key,
+                base_url=self.base_url,
+                http_client=http_client,
+                max_retries=2,
+            )
+            self._resources = _LoopResources(
+                loop=loop,
+                client=client,
+                semaphore=asyncio.Semaphore(self.max_concurrency),
+                bucket=TokenBucket(self.requests_per_minute, capacity=self.max_concurrency),
+            )
+        return self._resources
+
+    def _retire(self, resources: _LoopResources) -> None:
+        """Client d'une boucle remplacée : fermé sur sa boucle si elle tourne encore, sinon plus tard"""
+        if resources.loop.is_running():
+            asyncio.run_coroutine_threadsafe(resources.client.close(), resources.loop)
+        else:
+            self._stale_clients.append(resources.client)
+
+    async def _close_stale_clients(self) -> None:
+        while self._stale_clients:
+            client = self._stale_clients.pop()
+            try:
+                await client.close()
+            except Exception as e:
+                # Connexions liées à une boucle fermée : libérées avec le client
+                logger.debug(f"Fermeture d'un ancien client LLM: {e}")
+
+    async def aclose(self) -> None:
+        """Ferme le client partagé de la boucle courante (et ceux des boucles précédentes)."""
+        if self._resources is not None:
+            await self._resources.client.close()
+            self._resources = None
+        await self._close_stale_clients()
+
+    async def analyze(self, articles: Sequence[dict]) -> List["LLMSentimentResult"]:
+        """
+        Analyse une liste d'articles (dicts avec 'title', 'summary', 'id').
+
+        Les résultats sont renvoyés dans l'ordre des articles (les articles
+        sans titre sont ignorés, comme dans ``analyze_articles_batch``).
+        """
+        items = [article for article in articles if article.get('title')]
+        if not items:
+            return []
+
+        short, long_ = [], []
+        for index, article in enumerate(items):
+            text = self.analyzer._format_article_text(article.get('title', ''), article.get('summary', ''))
+            (short if len(text) <= self.pack_max_chars else long_).append(index)
+
+        packs = [short[i:i + self.pack_size] for i in range(0, len(short), self.pack_size)]
+        packs.extend([index] for index in long_)
+
+        results: Dict[int, "LLMSentimentResult"] = {}
+        requests_before = self.requests_sent
+        await asyncio.gather(*(self._analyze_pack(items, pack, results) for pack in packs))
+        await self._close_stale_clients()
+
+        logger.info(
+            f"✅ LLM batch: {len(items)} articles analysés en {self.requests_sent - requests_before} requêtes "
+            f"(concurrence {self.max_concurrency}, lots de {self.pack_size})"
+        )
+        return [results[index] for index in range(len(items))]
+
+    async def _analyze_pack(
+        self,
+        items: Sequence[dict],
+        pack: List[int],
+        results: Dict[int, "LLMSentimentResult"],
+    ) -> None:
+        if len(pack) == 1:
+            results[pack[0]] = await self._analyze_single(items[pack[0]])
+            return
+
+        parsed: Dict[int, str] = {}
+        try:
+            texts = [
+                self.analyzer._format_article_text(items[index].get('title', ''), items[index].get('summary', ''))
+                for index in pack
+            ]
+            content = await self._complete(
+                self.analyzer._create_packed_prompt(texts),
+                max_tokens=200 * len(pack),
+            )
+            parsed = split_packed_response(content, len(pack))
+        except Exception as e:
+            logger.warning(f"⚠️ Requête LLM groupée échouée ({len(pack)} articles), analyse individuelle: {e}")
+
+        missing = []
+        for position, index in enumerate(pack, start=1):
+            block = parsed.get(position)
+            if block is None:
+                missing.append(index)
+                continue
+            results[index] = self._build_result(items[index], block)
+
+        if missing:
+            logger.debug(f"{len(missing)} article(s) absent(s) de la réponse groupée, nouvel essai individuel")
+            single_results = await asyncio.gather(*(self._analyze_single(items[index]) for index in missing))
+            for index, result in zip(missing, single_results):
+                results[index] = result
+
+    async def _analyze_single(self, article: dict) -> "LLMSentimentResult":
+        title = article.get('title', '')
+        try:
+            text = self.analyzer._format_article_text(title, article.get('summary', ''))
+            content = await self._complete(self.analyzer._create_sentiment_prompt(text), max_tokens=200)
+            return self._build_result(article, content)
+        except Exception as e:
+            logger.error(f"❌ Error analyzing sentiment with LLM: {e}")
+            return self.analyzer._create_fallback_result(title, article.get('id'))
+
+    async def _complete(self, prompt: str, max_tokens: int) -> str:
+        resources = self._get_resources()
+        async with resources.semaphore:
+            await resources.bucket.acquire()
+            self.requests_sent += 1
+            response = await resources.client.chat.completions.create(
+                model=self.analyzer.model,
+                messages=[
+                    {"role": "system", "content": self.analyzer._get_system_prompt()},
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=0.3,  # Low temperature for consistent results
+                max_tokens=max_tokens,
+            )
+        return (response.choices[0].message.content or "").strip()
+
+    def _build_result(self, article: dict, content: str) -> "LLMSentimentResult":
+        from app.services.llm_sentiment_service import LLMSentimentResult
+
+        sentiment_score, sentiment_label, confidence, reasoning = self.analyzer._parse_llm_response(content)
+        return LLMSentimentResult(
+            article_id=article.get('id'),
+            title=article.get('title', ''),
+            sentiment_score=sentiment_score,
+            sentiment_label=sentiment_label,
+            confidence=confidence,
+            reasoning=reasoning,
+            analyzed_at=datetime.now(),
+        )
+
+
+def split_packed_response(content: str, expected: int) -> Dict[int, str]:
+    """
+    Découpe une réponse groupée en blocs ``[n]`` → texte.
+
+    Seuls les blocs numérotés entre 1 et ``expected`` contenant une ligne
+    ``SCORE:`` sont conservés ; les autres seront ré-analysés individuellement.
+    """
+    blocks: Dict[int, str] = {}
+    headers = list(_ITEM_HEADER.finditer(content))
+    for position, header in enumerate(headers):
+        number = int(header.group(1))
+        end = headers[position + 1].start() if position + 1 < len(headers) else len(content)
+        block = content[header.end():end].strip()
+        if 1 <= number <= expected and number not in blocks and "SCORE:" in block:
+            blocks[number] = block
+    return blocks
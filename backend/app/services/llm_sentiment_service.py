@@ -4,7 +4,9 @@ Uses OpenAI GPT models to analyze sentiment of financial articles
 """
 from __future__ import annotations
 
+import asyncio
 import os
+import threading
 from typing import List, Optional
 from dataclasses import dataclass
 from datetime import datetime
@@ -13,6 +15,9 @@ from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# À incrémenter à chaque modification des prompts ou du parsing (invalide le cache de sentiment)
+PROMPT_VERSION = "v1"
+
 
 @dataclass
 class LLMSentimentResult:
@@ -50,6 +55,32 @@ class LLMSentimentAnalyzer:
         else:
             self.enabled = True
             logger.info(f"✅ LLM Sentiment Analyzer initialized with model: {model}")
+
+        # Client synchrone partagé (pool de connexions) et moteur asynchrone par lots
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._batch_engine = None
+
+    def _get_client(self):
+        """Return the shared synchronous OpenAI client (created on first use)."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    # Import OpenAI here to avoid dependency if not used
+                    from openai import OpenAI
+                    from app.core.config import settings
+
+                    self._client = OpenAI(api_key=self.api_key, base_url=settings.openai_base_url)
+        return self._client
+
+    @property
+    def batch_engine(self):
+        """Async batch engine sharing this analyzer's prompts and parsing."""
+        if self._batch_engine is None:
+            from app.services.llm_batch_engine import LLMBatchEngine
+
+            self._batch_engine = LLMBatchEngine(self)
+        return self._batch_engine
     
     def analyze_article(self, title: str, summary: str = "", article_id: Optional[int] = None) -> LLMSentimentResult:
         """
@@ -68,15 +99,10 @@ class LLMSentimentAnalyzer:
             return self._create_fallback_result(title, article_id)
         
         try:
-            # Import OpenAI here to avoid dependency if not used
-            from openai import OpenAI
-            
-            client = OpenAI(api_key=self.api_key)
+            client = self._get_client()
             
             # Prepare the text for analysis
-            text_to_analyze = f"{title}"
-            if summary:
-                text_to_analyze += f"\n\n{summary}"
+            text_to_analyze = self._format_article_text(title, summary)
             
             # Create the prompt for sentiment analysis
             prompt = self._create_sentiment_prompt(text_to_analyze)
@@ -120,26 +146,56 @@ class LLMSentimentAnalyzer:
         """
         Analyze sentiment for multiple articles
         
+        Uses the async batch engine (concurrency, rate limiting, headline
+        packing) when no event loop is running; inside a running loop, use
+        ``analyze_articles_batch_async`` instead.
+        
         Args:
             articles: List of dicts with 'title', 'summary', and optionally 'id'
             
         Returns:
             List of LLMSentimentResult
         """
-        results = []
+        if self.enabled and self._async_engine_available():
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return asyncio.run(self._run_batch_and_close(articles))
+
+        return self._analyze_sequentially(articles)
+
+    async def analyze_articles_batch_async(self, articles: List[dict]) -> List[LLMSentimentResult]:
+        """
+        Analyze sentiment for multiple articles concurrently
         
-        for article in articles:
-            title = article.get('title', '')
-            summary = article.get('summary', '')
-            article_id = article.get('id')
-            
-            if not title:
-                continue
+        Args:
+            articles: List of dicts with 'title', 'summary', and optionally 'id'
             
-            result = self.analyze_article(title, summary, article_id)
-            results.append(result)
-        
-        return results
+        Returns:
+            List of LLMSentimentResult, in the same order as the articles
+        """
+        if not self.enabled or not self._async_engine_available():
+            return await asyncio.to_thread(self._analyze_sequentially, articles)
+        return await self.batch_engine.analyze(articles)
+
+    async def _run_batch_and_close(self, articles: List[dict]) -> List[LLMSentimentResult]:
+        try:
+            return await self.batch_engine.analyze(articles)
+        finally:
+            await self.batch_engine.aclose()
+
+    def _analyze_sequentially(self, articles: List[dict]) -> List[LLMSentimentResult]:
+        return [
+            self.analyze_article(article.get('title', ''), article.get('summary', ''), article.get('id'))
+            for article in articles
+            if article.get('title')
+        ]
+
+    @staticmethod
+    def _async_engine_available() -> bool:
+        from app.services.llm_batch_engine import ASYNC_OPENAI_AVAILABLE
+
+        return ASYNC_OPENAI_AVAILABLE
     
     def calculate_daily_sentiment_score(self, results: List[LLMSentimentResult]) -> float:
         """
@@ -256,6 +312,22 @@ Questions à te poser :
 
 Fournis ton analyse au format demandé en expliquant pourquoi c'est positif, négatif ou neutre pour le Maroc."""
     
+    def _format_article_text(self, title: str, summary: str = "") -> str:
+        """Text submitted to the LLM for one article"""
+        text = f"{title}"
+        if summary:
+            text += f"\n\n{summary}"
+        return text
+
+    def _create_packed_prompt(self, texts: List[str]) -> str:
+        """Create a user prompt analyzing several short articles at once"""
+        numbered = "\n\n".join(f"[{i}] \"{text}\"" for i, text in enumerate(texts, start=1))
+        return f"""Analyse séparément le sentiment de chacun des {len(texts)} articles suivants en tenant compte de ce qui est BÉNÉFIQUE pour le MAROC :
+
+{numbered}
+
+Pour CHAQUE article, recopie son numéro seul sur une ligne (ex: [1]) puis donne ton analyse au format demandé (SCORE, LABEL, CONFIDENCE, REASONING). Respecte l'ordre et n'omets aucun article."""
+
     def _parse_llm_response(self, response: str) -> tuple[float, str, float, str]:
         """
         Parse the LLM response to extract sentiment information
@@ -0,0 +1,163 @@
+"""
+Fournisseur partagé de données de marché pour les endpoints de l'API.
+
+Une seule série canonique MASI (lue depuis ``MarketDataStore``) est gardée en
+mémoire par processus ; chaque endpoint en extrait sa fenêtre. Les
+rafraîchissements concurrents sont dédupliqués (single-flight) : sous charge,
+N requêtes simultanées déclenchent une seule lecture/synchronisation.
+
+La durée de validité suit les horaires de la Bourse de Casablanca : TTL court
+pendant la séance, et jusqu'à l'ouverture suivante en dehors.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Callable, List, Optional
+from zoneinfo import ZoneInfo
+import asyncio
+import threading
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.pipelines.ingestion.market_scraper import MASIHistoricalData
+from app.services.market_data_store import MarketDataStore, get_market_data_store, market_data_expiry, parse_hhmm
+
+
+logger = get_logger(__name__)
+
+
+@dataclass(slots=True)
+class MarketSeries:
+    """Série canonique en mémoire (ordre chronologique)"""
+    bars: List[MASIHistoricalData]
+    dates: List[date]
+    start: date
+    loaded_at: datetime
+    expires_at: datetime
+
+
+class MarketDataProvider:
+    """Série MASI canonique partagée, avec rafraîchissement single-flight."""
+
+    def __init__(
+        self,
+        store: Optional[MarketDataStore] = None,
+        history_days: Optional[int] = None,
+        clock: Optional[Callable[[], datetime]] = None,
+    ):
+        self.store = store or get_market_data_store()
+        self.history_days = history_days or settings.market_data_history_days
+        self.timezone = ZoneInfo(settings.scheduler_timezone)
+        self.session_open = parse_hhmm(settings.market_session_open)
+        self.session_close = parse_hhmm(settings.market_session_close)
+        self.ttl_seconds = settings.market_data_ttl_seconds
+        self._clock = clock or (lambda: datetime.now(self.timezone))
+        self._series: Optional[MarketSeries] = None
+        self._refresh_lock = threading.Lock()
+        self.loads = 0
+
+    def get_history(
+        self,
+        days: Optional[int] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> List[MASIHistoricalData]:
+        """
+        Retourne une fenêtre de la série canonique.
+
+        Args:
+            days: Nombre de dernières séances (si ``start`` n'est pas fourni)
+            start: Première date incluse
+            end: Dernière date incluse
+        """
+        series = self._current_series()
+        if start is not None and start < series.start:
+            # Fenêtre plus longue que la série canonique : lecture directe du store
+            logger.debug(f"Fenêtre demandée depuis {start} hors série canonique, lecture du store")
+            return self.store.get_history(start=start, end=end)
+        return self._slice(series, days, start, end)
+
+    async def get_history_async(
+        self,
+        days: Optional[int] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> List[MASIHistoricalData]:
+        """Variante async : sans bloquer la boucle d'événements lors d'un rafraîchissement."""
+        series = self._series
+        if series is not None and self._is_fresh(series) and (start is None or start >= series.start):
+            return self._slice(series, days, start, end)
+        return await asyncio.to_thread(self.get_history, days, start, end)
+
+    def invalidate(self) -> None:
+        """Force le rechargement au prochain accès (ex. après le pipeline quotidien)."""
+        self._series = None
+
+    def _current_series(self) -> MarketSeries:
+        series = self._series
+        if series is not None and self._is_fresh(series):
+            return series
+
+        # Single-flight : un seul appelant recharge, les autres attendent puis relisent
+        with self._refresh_lock:
+            series = self._series
+            if series is not None and self._is_fresh(series):
+                return series
+            series = self._load()
+            self._series = series
+            return series
+
+    def _load(self) -> MarketSeries:
+        now = self._clock()
+        start = now.date() - timedelta(days=self.history_days - 1)
+        bars = self.store.get_history(start=start)
+        self.loads += 1
+        expires_at = market_data_expiry(now, self.session_open, self.session_close, self.ttl_seconds)
+        logger.info(f"📊 Série MASI chargée ({len(bars)} séances), valide jusqu'à {expires_at:%Y-%m-%d %H:%M}")
+        return MarketSeries(
+            bars=bars,
+            dates=[bar.date for bar in bars],
+            start=start,
+            loaded_at=now,
+            expires_at=expires_at,
+        )
+
+    def _is_fresh(self, series: MarketSeries) -> bool:
+        return self._clock() < series.expires_at
+
+    @staticmethod
+    def _slice(
+        series: MarketSeries,
+        days: Optional[int],
+        start: Optional[date],
+        end: Optional[date],
+    ) -> List[MASIHistoricalData]:
+        hi = bisect_right(series.dates, end) if end is not None else len(series.bars)
+        if start is not None:
+            lo = bisect_left(series.dates, start)
+        elif days is not None:
+            lo = max(hi - max(days, 0), 0)
+        else:
+            lo = 0
+        return series.bars[lo:hi]
+
+
+# Instance globale du fournisseur de données de marché
+_market_data_provider: Optional[MarketDataProvider] = None
+
+
+def get_market_data_provider() -> MarketDataProvider:
+    """
+    Retourne l'instance globale du fournisseur de données de marché (singleton)
+
+    Returns:
+        Instance de MarketDataProvider
+    """
+    global _market_data_provider
+
+    if _market_data_provider is None:
+        _market_data_provider = MarketDataProvider()
+
+    return _market_data_provider
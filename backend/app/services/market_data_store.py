@@ -0,0 +1,332 @@
+"""
+Stockage local des séances OHLCV (MASI et instruments individuels).
+
+Les séances sont conservées dans la table ``market_bars`` (clé primaire
+``(symbol, date)``). Une synchronisation incrémentale ne récupère que les
+séances à partir de la dernière date stockée ; les lectures se font ensuite
+en une seule requête indexée sur la plage de dates, au lieu de régénérer ou
+re-scraper plusieurs centaines de jours à chaque appel.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+from zoneinfo import ZoneInfo
+import threading
+
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.database import SessionLocal
+from app.models.schemas import MarketBar
+from app.pipelines.ingestion.market_scraper import (
+    CasablancaMarketScraper,
+    MarketSnapshot,
+    MASIHistoricalData,
+)
+
+
+logger = get_logger(__name__)
+
+INDEX_SYMBOL = "MASI"
+
+
+def parse_hhmm(value: str) -> dt_time:
+    hour, minute = map(int, value.split(":"))
+    return dt_time(hour, minute)
+
+
+def market_data_expiry(
+    now: datetime,
+    session_open: dt_time,
+    session_close: dt_time,
+    ttl_seconds: int,
+) -> datetime:
+    """
+    Calcule l'expiration d'une série chargée à ``now`` (heure locale de Casablanca).
+
+    - Pendant la séance (lundi-vendredi) : ``now + ttl``, sans dépasser la clôture
+    - En dehors : jusqu'à l'ouverture de la prochaine séance
+    """
+    if now.weekday() < 5:
+        opens_at = now.replace(hour=session_open.hour, minute=session_open.minute, second=0, microsecond=0)
+        closes_at = now.replace(hour=session_close.hour, minute=session_close.minute, second=0, microsecond=0)
+        if opens_at <= now < closes_at:
+            return min(now + timedelta(seconds=ttl_seconds), closes_at)
+        if now < opens_at:
+            return opens_at
+
+    next_day = now + timedelta(days=1)
+    while next_day.weekday() >= 5:
+        next_day += timedelta(days=1)
+    return next_day.replace(hour=session_open.hour, minute=session_open.minute, second=0, microsecond=0)
+
+
+class MarketDataStore:
+    """
+    Historique OHLCV local avec synchronisation incrémentale.
+
+    Seul l'indice MASI dispose d'une source historique (``sync``) ; les séries
+    par instrument sont alimentées à partir des snapshots live
+    (``record_snapshots``). La table ``market_bars`` est créée par les
+    migrations Alembic.
+    """
+
+    def __init__(
+        self,
+        scraper: Optional[CasablancaMarketScraper] = None,
+        session_factory: Optional[Callable[[], Session]] = None,
+        clock: Optional[Callable[[], datetime]] = None,
+    ):
+        self.scraper = scraper or CasablancaMarketScraper()
+        self.session_factory = session_factory if session_factory is not None else SessionLocal
+        self.session_open = parse_hhmm(settings.market_session_open)
+        self.session_close = parse_hhmm(settings.market_session_close)
+        self.ttl_seconds = settings.market_data_ttl_seconds
+        timezone = ZoneInfo(settings.scheduler_timezone)
+        self._clock = clock or (lambda: datetime.now(timezone))
+        self._lock = threading.Lock()
+        # Validité de la dernière synchronisation et plus ancienne date couverte, par symbole
+        self._synced_until: Dict[str, datetime] = {}
+        self._covered_from: Dict[str, date] = {}
+
+    @property
+    def available(self) -> bool:
+        # Le store repose sur une session synchrone (SQLite en développement)
+        return self.session_factory is not None
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    def get_history(
+        self,
+        days: Optional[int] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        symbol: str = INDEX_SYMBOL,
+        sync: bool = True,
+    ) -> List[MASIHistoricalData]:
+        """
+        Retourne les séances en ordre chronologique.
+
+        Args:
+            days: Nombre de dernières séances (si ``start`` n'est pas fourni)
+            start: Première date incluse
+            end: Dernière date incluse
+            symbol: Indice ou instrument
+            sync: Synchroniser d'abord les séances manquantes
+        """
+        if not self.available:
+            logger.warning("⚠️ Store de marché indisponible, récupération directe de l'historique")
+            return self._fetch_direct(days, start, end)
+
+        try:
+            if sync and symbol == INDEX_SYMBOL:
+                coverage_start = start or (date.today() - timedelta(days=max((days or 1) - 1, 0)))
+                self.ensure_coverage(coverage_start, symbol=symbol)
+
+            with self._session() as db:
+                query = db.query(MarketBar).filter(MarketBar.symbol == symbol)
+                if start is not None:
+                    query = query.filter(MarketBar.date >= start)
+                if end is not None:
+                    query = query.filter(MarketBar.date <= end)
+
+                if start is None and days is not None:
+                    rows = query.order_by(MarketBar.date.desc()).limit(max(days, 0)).all()
+                    rows.reverse()
+                else:
+                    rows = query.order_by(MarketBar.date.asc()).all()
+
+                return [self._to_historical(row) for row in rows]
+        except SQLAlchemyError as e:
+            # Base non migrée (table market_bars absente) ou indisponible
+            logger.warning(f"⚠️ Store de marché illisible ({e.__class__.__name__}), récupération directe de l'historique")
+            if symbol != INDEX_SYMBOL:
+                return []
+            return self._fetch_direct(days, start, end)
+
+    def _fetch_direct(
+        self,
+        days: Optional[int],
+        start: Optional[date],
+        end: Optional[date],
+    ) -> List[MASIHistoricalData]:
+        """Historique MASI lu directement depuis la source, sans le store"""
+        if start is not None:
+            bars = self.scraper.fetch_historical_since(start)
+        else:
+            bars = self.scraper.fetch_historical_data(days=days or 30)
+        return [bar for bar in bars if (start is None or bar.date >= start) and (end is None or bar.date <= end)]
+
+    def last_date(self, symbol: str = INDEX_SYMBOL) -> Optional[date]:
+        with self._session() as db:
+            return db.query(func.max(MarketBar.date)).filter(MarketBar.symbol == symbol).scalar()
+
+    def first_date(self, symbol: str = INDEX_SYMBOL) -> Optional[date]:
+        with self._session() as db:
+            return db.query(func.min(MarketBar.date)).filter(MarketBar.symbol == symbol).scalar()
+
+    # ------------------------------------------------------------------
+    # Synchronisation
+    # ------------------------------------------------------------------
+
+    def sync(self, symbol: str = INDEX_SYMBOL, force: bool = False) -> int:
+        """
+        Récupère les séances à partir de la dernière date stockée, celle-ci
+        comprise : la séance en cours (partielle) est rafraîchie.
+
+        Pendant la séance, une synchronisation reste valable ``ttl_seconds``
+        (sans dépasser la clôture) ; en dehors, jusqu'à l'ouverture suivante.
+
+        Returns:
+            Nombre de séances insérées ou mises à jour
+        """
+        if symbol != INDEX_SYMBOL or not self.available:
+            return 0
+
+        now = self._clock()
+        with self._lock:
+            synced_until = self._synced_until.get(symbol)
+            if not force and synced_until is not None and now < synced_until:
+                return 0
+
+            last = self.last_date(symbol)
+            since = last or now.date()
+            bars = self.scraper.fetch_historical_since(since)
+            written = self.upsert_bars(symbol, bars)
+            self._synced_until[symbol] = market_data_expiry(now, self.session_open, self.session_close, self.ttl_seconds)
+
+        if written:
+            logger.info(f"📈 {symbol}: {written} séance(s) synchronisée(s) depuis {since}")
+        return written
+
+    def ensure_coverage(self, start: date, symbol: str = INDEX_SYMBOL) -> int:
+        """Synchronise les nouvelles séances et complète l'historique jusqu'à ``start``."""
+        written = self.sync(symbol)
+        if symbol != INDEX_SYMBOL or not self.available:
+            return written
+
+        with self._lock:
+            covered = self._covered_from.get(symbol)
+            if covered is not None and covered <= start:
+                return written
+
+            first = self.first_date(symbol)
+            if first is None or first > start:
+                bars = [bar for bar in self.scraper.fetch_historical_since(start) if first is None or bar.date < first]
+                backfilled = self.upsert_bars(symbol, bars)
+                if backfilled:
+                    logger.info(f"📈 {symbol}: historique complété avec {backfilled} séance(s) depuis {start}")
+                written += backfilled
+
+            # Une seule tentative par processus pour une plage donnée (jours fériés, week-ends)
+            self._covered_from[symbol] = min(start, covered) if covered else start
+        return written
+
+    def upsert_bars(self, symbol: str, bars: Iterable[MASIHistoricalData]) -> int:
+        """Insère ou met à jour des séances (une requête pour lire les dates existantes)."""
+        bars = list(bars)
+        if not bars:
+            return 0
+
+        with self._session() as db:
+            dates = [bar.date for bar in bars]
+            existing = {
+                row.date: row
+                for row in db.query(MarketBar).filter(
+                    MarketBar.symbol == symbol,
+                    MarketBar.date >= min(dates),
+                    MarketBar.date <= max(dates),
+                )
+            }
+            for bar in bars:
+                row = existing.get(bar.date)
+                if row is None:
+                    row = MarketBar(symbol=symbol, date=bar.date)
+                    db.add(row)
+                    existing[bar.date] = row
+                row.open = bar.open_price
+                row.high = bar.high_price
+                row.low = bar.low_price
+                row.close = bar.close_price
+                row.volume = int(bar.volume or 0)
+            db.commit()
+        return len(bars)
+
+    def record_snapshots(self, snapshots: Iterable[MarketSnapshot]) -> int:
+        """
+        Alimente les séries par instrument avec les snapshots live du jour.
+
+        L'indice est exclu : sa série est maintenue par ``sync``.
+        """
+        if not self.available:
+            return 0
+
+        written = 0
+        for snapshot in snapshots:
+            if snapshot.symbol == INDEX_SYMBOL or snapshot.last_price <= 0:
+                continue
+            day = snapshot.as_of.date()
+            previous = self._latest_bar(snapshot.symbol, day)
+            if previous is not None:
+                high = max(previous.high_price, snapshot.last_price)
+                low = min(previous.low_price, snapshot.last_price)
+                open_price = previous.open_price
+            else:
+                high = low = open_price = snapshot.last_price
+            written += self.upsert_bars(snapshot.symbol, [MASIHistoricalData(
+                date=day,
+                open_price=open_price,
+                high_price=high,
+                low_price=low,
+                close_price=snapshot.last_price,
+                volume=snapshot.volume,
+            )])
+        return written
+
+    # ------------------------------------------------------------------
+    # Utilitaires
+    # ------------------------------------------------------------------
+
+    def _latest_bar(self, symbol: str, day: date) -> Optional[MASIHistoricalData]:
+        with self._session() as db:
+            row = db.get(MarketBar, (symbol, day))
+            return self._to_historical(row) if row is not None else None
+
+    def _session(self) -> Session:
+        return self.session_factory()
+
+    @staticmethod
+    def _to_historical(row: MarketBar) -> MASIHistoricalData:
+        return MASIHistoricalData(
+            date=row.date,
+            open_price=row.open,
+            high_price=row.high,
+            low_price=row.low,
+            close_price=row.close,
+            volume=row.volume,
+        )
+
+
+# Instance globale du store de marché
+_market_data_store: Optional[MarketDataStore] = None
+
+
+def get_market_data_store() -> MarketDataStore:
+    """
+    Retourne l'instance globale du store de marché (singleton)
+
+    Returns:
+        Instance de MarketDataStore
+    """
+    global _market_data_store
+
+    if _market_data_store is None:
+        _market_data_store = MarketDataStore()
+
+    return _market_data_store
@@ -0,0 +1,264 @@
+"""
+Tier mémoire borné pour CacheService.
+
+Remplace le dictionnaire non borné utilisé en l'absence de Redis, et sert de
+cache L1 devant Redis pour les clés chaudes :
+
+- budget en nombre d'entrées et en octets (taille sérialisée estimée)
+- éviction LRU, ou LFU approximée (échantillon des entrées les plus anciennes)
+- quotas par namespace (préfixe de la clé avant le premier ``:``)
+- balayage périodique des entrées expirées dans un thread d'arrière-plan
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Mapping, Optional
+import fnmatch
+import pickle
+import threading
+import time
+
+from app.core.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+EVICTION_POLICIES = ("lru", "lfu")
+
+# Nombre d'entrées les moins récentes examinées pour l'éviction LFU
+LFU_SAMPLE_SIZE = 8
+
+
+def key_namespace(key: str) -> str:
+    """Namespace d'une clé : préfixe avant le premier ``:``"""
+    return key.split(":", 1)[0]
+
+
+def estimate_size(value: Any) -> int:
+    """Taille approximative d'une valeur en octets (taille sérialisée)"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 64
+
+
+@dataclass(slots=True)
+class _MemoryEntry:
+    value: Any
+    expiry: float
+    size: int
+    namespace: str
+    hits: int = 0
+
+
+class MemoryCache:
+    """Cache mémoire thread-safe, borné en entrées et en octets, avec TTL."""
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        policy: str = "lru",
+        namespace_quotas: Optional[Mapping[str, int]] = None,
+        sweep_interval_seconds: float = 30.0,
+    ):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Politique d'éviction inconnue: {policy} (attendu: {', '.join(EVICTION_POLICIES)})")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.namespace_quotas = dict(namespace_quotas or {})
+        self.sweep_interval_seconds = sweep_interval_seconds
+
+        self._entries: OrderedDict[str, _MemoryEntry] = OrderedDict()
+        self._namespace_counts: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop_sweeper = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Interface type dictionnaire
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry.expiry > time.time()
+
+    def keys(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._entries.keys()))
+
+    # ------------------------------------------------------------------
+    # Opérations
+    # ------------------------------------------------------------------
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if entry.expiry <= time.time():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            entry.hits += 1
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> bool:
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            logger.debug(f"Valeur trop volumineuse pour le cache mémoire ({key}: {size} octets)")
+            self.delete(key)
+            return False
+
+        namespace = key_namespace(key)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _MemoryEntry(value, time.time() + ttl_seconds, size, namespace)
+            self._namespace_counts[namespace] = self._namespace_counts.get(namespace, 0) + 1
+            self.total_bytes += size
+            self._enforce_limits(namespace)
+
+        self._ensure_sweeper()
+        return True
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                return True
+        return False
+
+    def delete_pattern(self, pattern: str) -> int:
+        """Supprime toutes les clés correspondant au pattern (expirées ou non)"""
+        with self._lock:
+            keys = [key for key in self._entries if fnmatch.fnmatch(key, pattern)]
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._namespace_counts.clear()
+            self.total_bytes = 0
+
+    def sweep_expired(self) -> int:
+        """Supprime les entrées expirées (appelé périodiquement par le sweeper)"""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if entry.expiry <= now]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+        return len(expired)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "policy": self.policy,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "namespaces": dict(self._namespace_counts),
+            }
+
+    def close(self) -> None:
+        """Arrête le thread de balayage"""
+        self._stop_sweeper.set()
+
+    # ------------------------------------------------------------------
+    # Éviction
+    # ------------------------------------------------------------------
+
+    def _enforce_limits(self, namespace: str) -> None:
+        quota = self.namespace_quotas.get(namespace)
+        while quota is not None and self._namespace_counts.get(namespace, 0) > quota:
+            self._evict(namespace)
+
+        while self._entries and (len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes):
+            self._evict(None)
+
+    def _evict(self, namespace: Optional[str]) -> None:
+        candidates = (
+            key for key, entry in self._entries.items()
+            if namespace is None or entry.namespace == namespace
+        )
+        now = time.time()
+        victim = None
+        if self.policy == "lru":
+            victim = next(candidates)
+        else:
+            # LFU approximée : la moins utilisée parmi les entrées les moins récentes
+            sample = []
+            for key in candidates:
+                entry = self._entries[key]
+                if entry.expiry <= now:
+                    victim = key
+                    break
+                sample.append((entry.hits, key))
+                if len(sample) >= LFU_SAMPLE_SIZE:
+                    break
+            if victim is None:
+                victim = min(sample)[1]
+
+        self._remove(victim)
+        self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self.total_bytes -= entry.size
+        remaining = self._namespace_counts.get(entry.namespace, 1) - 1
+        if remaining:
+            self._namespace_counts[entry.namespace] = remaining
+        else:
+            self._namespace_counts.pop(entry.namespace, None)
+
+    # ------------------------------------------------------------------
+    # Balayage TTL
+    # ------------------------------------------------------------------
+
+    def _ensure_sweeper(self) -> None:
+        if self._sweeper is not None or self.sweep_interval_seconds <= 0:
+            return
+        with self._lock:
+            if self._sweeper is not None:
+                return
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="memory-cache-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def _sweep_loop(self) -> None:
+        while not self._stop_sweeper.wait(self.sweep_interval_seconds):
+            try:
+                removed = self.sweep_expired()
+                if removed:
+                    logger.debug(f"🧹 Cache mémoire: {removed} entrée(s) expirée(s) supprimée(s)")
+            except Exception as e:
+                logger.warning(f"Erreur lors du balayage du cache mémoire: {e}")
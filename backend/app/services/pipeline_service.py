@@ -1,20 +1,31 @@
 from __future__ import annotations
 
 from datetime import date, datetime
-from typing import Callable, Coroutine, List, Optional, TypeVar
+from typing import Any, Callable, Coroutine, List, Mapping, Optional, TypeVar
 import asyncio
 import time
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.logging import get_logger
 from app.models.database import get_session
 from app.models.schemas import IndexScore, MediaArticle
+from app.repositories.media_articles import UpsertResult, index_new_signatures, upsert_articles
 from app.pipelines.ingestion.market_scraper import CasablancaMarketScraper, MASIHistoricalData
 from app.pipelines.ingestion.media_scraper import MediaScraper
-from app.services.sentiment_service import SentimentAnalyzer
-from app.services.llm_sentiment_service import LLMSentimentAnalyzer
+from app.pipelines.article_stream import ArticleStream, StreamResult
+from app.pipelines.stage_runner import Stage, StageRunner
+from app.services.market_data_provider import get_market_data_provider
+from app.services.market_data_store import get_market_data_store
+from app.services.sentiment_service import LEXICON_VERSION, SentimentAnalyzer
+from app.services.llm_sentiment_service import PROMPT_VERSION, LLMSentimentAnalyzer
+from app.services.sentiment_cache import CachedSentiment, get_sentiment_cache, model_version
+from app.services.latest_snapshot import get_snapshot_store
 from app.services.component_calculator import ComponentCalculator
+from app.services.dedup_service import get_stored_article_index, split_stored_duplicates
+from app.services.rolling_state import RollingComponentState
 from app.pipelines.aggregator import IndexAggregator
+from app.utils.http_cache import get_http_cache
 
 T = TypeVar("T")
 
@@ -27,50 +38,62 @@ class PipelineService:
     
     def __init__(self, use_llm_sentiment: bool = True):
         self.market_scraper = CasablancaMarketScraper()
+        self.market_store = get_market_data_store()
         self.media_scraper = MediaScraper()
         self.sentiment_analyzer = SentimentAnalyzer()  # Fallback
         self.llm_sentiment_analyzer = LLMSentimentAnalyzer() if use_llm_sentiment else None
         self.use_llm_sentiment = use_llm_sentiment
-        self.component_calculator = ComponentCalculator()
+        self.sentiment_cache = get_sentiment_cache() if settings.sentiment_cache_enabled else None
+        self.stored_articles = get_stored_article_index()
+        self.component_calculator = ComponentCalculator(
+            rolling_state=RollingComponentState.load() if settings.incremental_components_enabled else None
+        )
         self.aggregator = IndexAggregator()
         self.max_retries = 3
         self.retry_backoff = 5  # seconds
 
     async def run_full_pipeline(self, target_date: Optional[date] = None) -> dict:
-        """Run the complete Fear & Greed Index pipeline with retries."""
+        """
+        Run the complete Fear & Greed Index pipeline with retries.
+
+        Independent stages (historical market data, live market data and the
+        article stream) start together. Articles are streamed from scraping to
+        the database: each one is deduplicated, scored and saved as soon as its
+        source has answered, while slower sources are still downloading.
+        """
         if target_date is None:
             target_date = date.today()
 
         logger.info("Starting Fear & Greed Index pipeline for %s", target_date)
 
         try:
-            logger.info("Step 1: Collecting market data")
-            market_data = await self._collect_market_data(target_date)
-
-            logger.info("Step 2: Collecting media data")
-            media_data = await self._collect_media_data(target_date)
-
-            logger.info("Step 3: Analyzing media sentiment")
-            analyzed_media = await self._analyze_sentiment(media_data)
+            run_result = await StageRunner(self._build_stages(target_date)).run()
 
-            logger.info("Step 4: Calculating index components")
-            components = await self._calculate_components(market_data, analyzed_media, target_date)
+            error = run_result.first_error
+            if error is not None:
+                raise error
 
-            logger.info("Step 5: Aggregating final score")
-            final_score = await self._aggregate_score(components)
+            market_data = run_result.result("market_history")
+            media = run_result.result("media")
+            components = run_result.result("components")
+            final_score = run_result.result("aggregate")
 
-            logger.info("Step 6: Saving results to database")
-            await self._save_results(components, final_score, analyzed_media, target_date)
-
-            logger.info("Pipeline completed successfully. Final score: %s", final_score)
+            logger.info(
+                "Pipeline completed successfully in %.2fs. Final score: %s",
+                run_result.total_duration_seconds,
+                final_score,
+            )
+            logger.info("⏱️ Stage timings: %s", run_result.timings)
 
             return {
                 "success": True,
                 "final_score": final_score,
                 "components": components,
                 "market_data_count": len(market_data),
-                "media_articles_count": len(analyzed_media),
+                "media_articles_count": len(media.articles),
                 "target_date": target_date,
+                "stage_timings": run_result.timings,
+                "total_duration_seconds": round(run_result.total_duration_seconds, 3),
             }
 
         except Exception as exc:
@@ -81,58 +104,172 @@ class PipelineService:
                 "target_date": target_date,
             }
 
+    def _build_stages(self, target_date: date) -> List[Stage]:
+        """Build the pipeline stage graph for a run."""
+        async def market_history(_deps: Mapping[str, Any]) -> List[MASIHistoricalData]:
+            return await self._collect_historical_market_data()
+
+        async def market_live(_deps: Mapping[str, Any]) -> List[MASIHistoricalData]:
+            return await self._collect_live_market_data()
+
+        async def media(_deps: Mapping[str, Any]) -> StreamResult:
+            return await self._stream_media_articles()
+
+        async def components(deps: Mapping[str, Any]):
+            return await self._calculate_components(deps["market_history"], deps["media"].articles, target_date)
+
+        async def aggregate(deps: Mapping[str, Any]) -> float:
+            return await self._aggregate_score(deps["components"])
+
+        async def save(deps: Mapping[str, Any]) -> None:
+            # Articles déjà sauvegardés par le flux
+            await self._save_results(deps["components"], deps["aggregate"], [], target_date)
+
+        return [
+            Stage("market_history", market_history),
+            Stage("market_live", market_live),
+            Stage("media", media),
+            Stage("components", components, ("market_history", "media")),
+            Stage("aggregate", aggregate, ("components",)),
+            Stage("save", save, ("components", "aggregate")),
+        ]
+
     async def _collect_market_data(self, target_date: date) -> List[MASIHistoricalData]:
-        """Collect market data with retries and detailed logging."""
+        """Collect historical and live market data concurrently (outside the DAG)."""
+        historical_data, _live_data = await asyncio.gather(
+            self._collect_historical_market_data(),
+            self._collect_live_market_data(),
+        )
+        return historical_data
 
+    async def _collect_historical_market_data(self) -> List[MASIHistoricalData]:
+        """Collect historical market data with retries and detailed logging."""
         historical_data: List[MASIHistoricalData] = []
-        live_data: List[MASIHistoricalData] = []
-
         try:
             historical_data = await self._fetch_with_retry(
-                self.market_scraper.fetch_historical_data,
+                self.market_store.get_history,
                 "historical market data",
                 days=252,
             )
         except Exception as exc:
             logger.error("Failed to collect historical market data after retries: %s", exc)
+        else:
+            # Le store vient d'être synchronisé : les endpoints rechargent la série partagée
+            get_market_data_provider().invalidate()
 
+        logger.info("Market data summary — historical: %s", len(historical_data))
+        if not historical_data:
+            logger.warning("Historical market data empty — components will fallback to defaults")
+        return historical_data
+
+    async def _collect_live_market_data(self) -> List[MASIHistoricalData]:
+        """Collect live market data with retries."""
+        live_data: List[MASIHistoricalData] = []
         try:
             live_data = await self._fetch_with_retry(
                 self.market_scraper.fetch_live_data,
                 "live market data",
             )
+            await asyncio.to_thread(self.market_store.record_snapshots, live_data)
         except Exception as exc:
             logger.error("Failed to collect live market data after retries: %s", exc)
 
-        logger.info(
-            "Market data summary — historical: %s, live: %s",
-            len(historical_data),
-            len(live_data),
-        )
-
-        if not historical_data:
-            logger.warning("Historical market data empty — components will fallback to defaults")
+        logger.info("Market data summary — live: %s", len(live_data))
         if not live_data:
             logger.warning("Live market data empty — continuing with historical data only")
-
-        return historical_data
+        return live_data
 
     async def _collect_media_data(self, target_date: date) -> List[MediaArticle]:
-        """Collect media articles with retries and logging."""
+        """Collect media articles from all sources concurrently (outside the stream)."""
         try:
-            articles = await self._fetch_with_retry(
-                self.media_scraper.scrape_all_sources,
-                "media articles",
-                max_articles_per_source=10,
-            )
+            articles = await self.media_scraper.scrape_all_sources_async(max_articles_per_source=10)
 
             logger.info("Collected %s media articles", len(articles))
             return articles
 
         except Exception as exc:
-            logger.error("Media scraping failed after retries: %s", exc)
+            logger.error("Media scraping failed: %s", exc)
             return []
 
+    async def _stream_media_articles(self) -> StreamResult:
+        """Scrape, deduplicate, score and save media articles as a stream."""
+        result = await ArticleStream(
+            self.media_scraper,
+            score=self._score_articles,
+            persist=self._persist_articles,
+            max_articles_per_source=settings.media_max_articles_per_source,
+        ).run()
+        logger.info(
+            "Collected %s media articles (%s duplicates), first scored after %ss",
+            result.stats.saved,
+            result.stats.duplicates,
+            result.stats.first_scored_after,
+        )
+        logger.info("⏱️ Media source timings: %s", result.stats.source_durations)
+        http_stats = get_http_cache().stats
+        logger.info(
+            "🗄️ HTTP cache since start: %s fresh, %s not modified (304), %s downloaded",
+            http_stats.fresh,
+            http_stats.not_modified,
+            http_stats.downloaded,
+        )
+        return result
+
+    async def _score_articles(self, articles: List[MediaArticle]) -> List[MediaArticle]:
+        """Score a batch: copies of stored articles reuse their score, the others are analyzed."""
+        signatures = {position: article.minhash for position, article in enumerate(articles) if article.minhash}
+        try:
+            matches = await asyncio.to_thread(self.stored_articles.match, signatures)
+        except Exception as exc:
+            logger.warning("Stored duplicate lookup failed, scoring the whole batch: %s", exc)
+            matches = {}
+        if matches:
+            logger.info("♻️ %s articles reuse the score of a stored near-duplicate", len(matches))
+
+        remaining = split_stored_duplicates(articles, matches)
+        if remaining:
+            await self._analyze_sentiment(remaining)
+        return articles
+
+    async def _persist_articles(self, articles: List[MediaArticle]) -> None:
+        """
+        Save a batch of scored articles (articles already known by URL are updated).
+
+        A failed batch is logged and skipped: its articles still reach the
+        components stage, so the run produces a score without them being saved.
+        """
+        try:
+            await asyncio.to_thread(self._upsert_articles, articles)
+        except Exception as exc:
+            logger.error("Failed to save %s media articles, continuing without them: %s", len(articles), exc)
+
+    def _upsert_articles(self, articles: List[MediaArticle]) -> UpsertResult:
+        db = get_session()
+        try:
+            saved = upsert_articles(db, (self._article_row(article) for article in articles))
+            # Signatures des nouveaux articles ajoutées à l'index des quasi-doublons
+            index_new_signatures(db, {article.url: article.minhash for article in articles if article.minhash})
+            db.commit()
+            return saved
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _article_row(article: MediaArticle) -> dict:
+        return {
+            "title": article.title,
+            "summary": article.summary,
+            "content": article.content or None,
+            "url": article.url,
+            "source": article.source,
+            "published_at": article.published_at,
+            "sentiment_score": article.sentiment_score,
+            "sentiment_model": article.sentiment_model,
+        }
+
     async def _analyze_sentiment(self, articles: List[MediaArticle]) -> List[MediaArticle]:
         """Analyze sentiment of media articles using LLM or fallback to dictionary"""
         try:
@@ -142,43 +279,70 @@ class PipelineService:
             # Use LLM if available and enabled
             if self.use_llm_sentiment and self.llm_sentiment_analyzer and self.llm_sentiment_analyzer.enabled:
                 logger.info("🤖 Using LLM (GPT) for sentiment analysis...")
-                
-                # Prepare articles for LLM
-                articles_for_llm = [
-                    {
-                        'id': getattr(article, 'id', None),  # id might not exist yet
-                        'title': article.title,
-                        'summary': article.summary or ''
-                    }
-                    for article in articles
-                ]
-                
-                # Analyze with LLM
-                llm_results = self.llm_sentiment_analyzer.analyze_articles_batch(articles_for_llm)
-                
-                # Update articles with LLM results
-                for article, llm_result in zip(articles, llm_results):
-                    article.sentiment_score = llm_result.sentiment_score
-                    article.sentiment_label = llm_result.sentiment_label
-                
-                logger.info("✅ LLM sentiment analysis completed for %s articles", len(articles))
-                
+                model = self.llm_sentiment_analyzer.model
+                pending = self._apply_cached_sentiment(articles, "llm", model, PROMPT_VERSION)
+
+                if pending:
+                    # Prepare articles for LLM
+                    articles_for_llm = [
+                        {
+                            'id': getattr(article, 'id', None),  # id might not exist yet
+                            'title': article.title,
+                            'summary': article.summary or ''
+                        }
+                        for article in pending
+                    ]
+
+                    # Analyze with LLM
+                    llm_results = await self.llm_sentiment_analyzer.analyze_articles_batch_async(articles_for_llm)
+
+                    # Update articles with LLM results
+                    for article, llm_result in zip(pending, llm_results):
+                        article.sentiment_score = llm_result.sentiment_score
+                        article.sentiment_label = llm_result.sentiment_label
+                        article.sentiment_model = None
+                        # Les résultats de repli (erreur LLM) ont une confiance nulle : ne pas les mettre en cache
+                        # ni les attribuer au modèle (la ré-analyse des scores périmés les reprendra)
+                        if llm_result.confidence > 0:
+                            article.sentiment_model = model_version(model, PROMPT_VERSION)
+                            self._store_cached_sentiment(
+                                article, model, PROMPT_VERSION,
+                                confidence=llm_result.confidence,
+                                reasoning=llm_result.reasoning,
+                            )
+
+                logger.info(
+                    "✅ LLM sentiment analysis completed for %s articles (%s from cache)",
+                    len(articles),
+                    len(articles) - len(pending),
+                )
+
                 # Calculate average for logging
-                if llm_results:
-                    avg_sentiment = sum(r.sentiment_score for r in llm_results) / len(llm_results)
+                scores = [a.sentiment_score for a in articles if a.sentiment_score is not None]
+                if scores:
+                    avg_sentiment = sum(scores) / len(scores)
                     normalized_avg = (avg_sentiment + 1.0) * 50.0
                     logger.info(f"📊 Average sentiment (LLM): {avg_sentiment:+.3f} → {normalized_avg:.2f}/100")
                 
             else:
                 # Fallback to dictionary-based analysis
                 logger.warning("⚠️ LLM not available, using dictionary-based sentiment analysis")
-                sentiment_results = self.sentiment_analyzer.analyze_articles(articles)
+                pending = self._apply_cached_sentiment(articles, "dictionary", "dictionary", LEXICON_VERSION)
+                sentiment_results = self.sentiment_analyzer.analyze_articles(pending)
                 
-                for article, sentiment in zip(articles, sentiment_results):
+                for article, sentiment in zip(pending, sentiment_results):
                     article.sentiment_score = sentiment.polarity
                     article.sentiment_label = self.sentiment_analyzer.get_sentiment_label(sentiment.polarity)
+                    article.sentiment_model = model_version("dictionary", LEXICON_VERSION)
+                    self._store_cached_sentiment(
+                        article, "dictionary", LEXICON_VERSION, confidence=sentiment.confidence
+                    )
                 
-                logger.info("✅ Dictionary sentiment analysis completed for %s articles", len(articles))
+                logger.info(
+                    "✅ Dictionary sentiment analysis completed for %s articles (%s from cache)",
+                    len(articles),
+                    len(articles) - len(pending),
+                )
 
             return articles
             
@@ -192,10 +356,56 @@ class PipelineService:
                     for article, sentiment in zip(articles, sentiment_results):
                         article.sentiment_score = sentiment.polarity
                         article.sentiment_label = self.sentiment_analyzer.get_sentiment_label(sentiment.polarity)
+                        article.sentiment_model = model_version("dictionary", LEXICON_VERSION)
                 except:
                     pass
             return articles
 
+    def _apply_cached_sentiment(
+        self,
+        articles: List[MediaArticle],
+        method: str,
+        model: str,
+        version: str,
+    ) -> List[MediaArticle]:
+        """Fill articles from the sentiment cache and return those still to analyze."""
+        if self.sentiment_cache is None:
+            return list(articles)
+
+        pending = []
+        for article in articles:
+            cached = self.sentiment_cache.get(article.title, article.summary or "", model, version, method)
+            if cached is None:
+                pending.append(article)
+                continue
+            article.sentiment_score = cached.score
+            article.sentiment_label = cached.label
+            article.sentiment_model = model_version(model, version)
+        return pending
+
+    def _store_cached_sentiment(
+        self,
+        article: MediaArticle,
+        model: str,
+        version: str,
+        confidence: float = 0.0,
+        reasoning: str = "",
+    ) -> None:
+        if self.sentiment_cache is None or article.sentiment_score is None:
+            return
+        self.sentiment_cache.set(
+            article.title,
+            article.summary or "",
+            model,
+            version,
+            CachedSentiment(
+                score=article.sentiment_score,
+                label=article.sentiment_label,
+                confidence=confidence,
+                reasoning=reasoning,
+            ),
+        )
+
     async def _calculate_components(
         self, 
         market_data: List[MASIHistoricalData], 
@@ -261,10 +471,6 @@ class PipelineService:
         try:
             db = get_session()
 
-            existing_urls = {
-                url for (url,) in db.query(MediaArticle.url).all()
-            }
-
             index_score = IndexScore(
                 as_of=datetime.combine(target_date, datetime.min.time()),
                 score=final_score,
@@ -278,37 +484,35 @@ class PipelineService:
             
             db.add(index_score)
 
-            new_articles = []
-            for article in media_articles:
-                if not article.url or article.url in existing_urls:
-                    continue
-                existing_urls.add(article.url)
-                media_article = MediaArticle(
-                    title=article.title,
-                    summary=article.summary,
-                    url=article.url,
-                    source=article.source,
-                    published_at=article.published_at,
-                    sentiment_score=article.sentiment_score
-                )
-                new_articles.append(media_article)
-
-            if new_articles:
-                db.add_all(new_articles)
+            # Articles déjà connus (même URL) ignorés, sans relire toute la table
+            saved = upsert_articles(db, (self._article_row(article) for article in media_articles))
 
             db.commit()
             logger.info(
                 "Saved results to database",
                 extra={
                     "target_date": target_date,
-                    "media_saved": len(new_articles),
+                    "media_saved": saved.inserted,
+                    "media_skipped": saved.unchanged,
                 },
             )
+
+            self._publish_snapshot(db)
             
         except Exception as e:
             logger.error("Error saving results: %s", e, exc_info=True)
             if 'db' in locals():
                 db.rollback()
+        finally:
+            if 'db' in locals():
+                db.close()
+
+    def _publish_snapshot(self, db: Session) -> None:
+        """Publie l'instantané lu par les endpoints (dernier score, composantes, articles récents)"""
+        try:
+            get_snapshot_store().publish_from_db(db)
+        except Exception as e:
+            logger.error("Error publishing latest snapshot: %s", e, exc_info=True)
 
     async def _fetch_with_retry(
         self,
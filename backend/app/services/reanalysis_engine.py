@@ -0,0 +1,323 @@
+"""
+Ré-analyse du sentiment des articles stockés (après un changement de lexique
+ou de prompt).
+
+- lecture par morceaux de ``reanalysis_chunk_size`` articles, par clé (``id``
+  croissant) : la mémoire ne dépend pas de la taille de la table
+- scoring du dictionnaire réparti sur un ``ProcessPoolExecutor`` (un analyseur
+  par processus), ou moteur LLM asynchrone par lots
+- écriture par ``UPDATE`` groupés, un commit par morceau ; le morceau suivant
+  est lu et envoyé aux processus pendant l'écriture du précédent
+- point de reprise persisté après chaque commit : une exécution interrompue
+  reprend après le dernier article écrit
+"""
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
+import hashlib
+import json
+import os
+import time
+
+from sqlalchemy import Row, or_
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.database import SessionLocal
+from app.models.schemas import MediaArticle
+from app.repositories import media_articles
+from app.services.llm_sentiment_service import PROMPT_VERSION
+from app.services.sentiment_cache import model_version
+from app.services.sentiment_service import LEXICON_VERSION, SentimentAnalyzer
+
+if TYPE_CHECKING:
+    from app.services.llm_sentiment_service import LLMSentimentAnalyzer
+
+
+logger = get_logger(__name__)
+
+CHECKPOINT_VERSION = 1
+
+# Score et label d'un article, None si l'analyse a échoué (score existant conservé)
+Score = Optional[Tuple[float, str]]
+
+
+@dataclass(slots=True)
+class ReanalysisFilters:
+    """Articles à ré-analyser (critères cumulatifs ; par défaut, tous)"""
+    sources: Tuple[str, ...] = ()
+    published_from: Optional[datetime] = None  # inclus
+    published_to: Optional[datetime] = None  # exclu
+    # Modèles ayant produit le score actuel ("dictionary:v1", "gpt-4o-mini:v1")
+    sentiment_models: Tuple[str, ...] = ()
+    # Uniquement les scores qui ne viennent pas du modèle cible (modèle inconnu compris)
+    stale_only: bool = False
+
+    def conditions(self, target_model: str) -> List[ColumnElement]:
+        conditions: List[ColumnElement] = []
+        if self.sources:
+            conditions.append(MediaArticle.source.in_(self.sources))
+        if self.published_from is not None:
+            conditions.append(MediaArticle.published_at >= self.published_from)
+        if self.published_to is not None:
+            conditions.append(MediaArticle.published_at < self.published_to)
+        if self.sentiment_models:
+            conditions.append(MediaArticle.sentiment_model.in_(self.sentiment_models))
+        if self.stale_only:
+            conditions.append(
+                or_(MediaArticle.sentiment_model.is_(None), MediaArticle.sentiment_model != target_model)
+            )
+        return conditions
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sources": sorted(self.sources),
+            "published_from": self.published_from.isoformat() if self.published_from else None,
+            "published_to": self.published_to.isoformat() if self.published_to else None,
+            "sentiment_models": sorted(self.sentiment_models),
+            "stale_only": self.stale_only,
+        }
+
+
+@dataclass(slots=True)
+class ReanalysisReport:
+    """Bilan d'une ré-analyse (cumulé sur ses reprises)"""
+    model: str
+    processed: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    errors: int = 0
+    last_id: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Articles traités par seconde"""
+        return self.processed / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "throughput": round(self.throughput, 1)}
+
+
+class ReanalysisCheckpoint:
+    """Point de reprise JSON : bilan de l'exécution en cours, identifiée par son modèle et ses filtres"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or default_checkpoint_path()
+
+    def load(self, run_key: str) -> Optional[ReanalysisReport]:
+        """Bilan de l'exécution ``run_key`` interrompue, ou None (absente, autre exécution, illisible)"""
+        if not self.path.exists():
+            return None
+        try:
+            data = json.loads(self.path.read_text())
+            if data["version"] != CHECKPOINT_VERSION or data["run"] != run_key:
+                logger.info(f"ℹ️ Point de reprise d'une autre ré-analyse ignoré ({self.path})")
+                return None
+            report = data["report"]
+            report.pop("throughput", None)
+            return ReanalysisReport(**report)
+        except Exception as e:
+            logger.warning(f"⚠️ Point de reprise illisible ({self.path}): {e} — ré-analyse depuis le début")
+            return None
+
+    def save(self, run_key: str, report: ReanalysisReport) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps({"version": CHECKPOINT_VERSION, "run": run_key, "report": report.to_dict()}))
+        tmp_path.replace(self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+def default_checkpoint_path() -> Path:
+    return Path(settings.models_dir) / "reanalysis_checkpoint.json"
+
+
+# Analyseur propre à chaque processus de travail (créé au premier morceau)
+_worker_analyzer: Optional[SentimentAnalyzer] = None
+
+
+def score_with_dictionary(texts: Sequence[str]) -> List[Score]:
+    """Score et label du dictionnaire de chaque texte (exécuté dans les processus de travail)"""
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        _worker_analyzer = SentimentAnalyzer()
+
+    scores: List[Score] = []
+    for text in texts:
+        try:
+            polarity = _worker_analyzer.analyze_text(text).polarity
+            scores.append((polarity, _worker_analyzer.get_sentiment_label(polarity)))
+        except Exception as e:
+            logger.error(f"❌ Erreur d'analyse du sentiment: {e}")
+            scores.append(None)
+    return scores
+
+
+class ReanalysisEngine:
+    """Ré-analyse par morceaux des articles stockés, avec le dictionnaire ou le LLM"""
+
+    def __init__(
+        self,
+        llm_analyzer: Optional["LLMSentimentAnalyzer"] = None,
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+        checkpoint: Optional[ReanalysisCheckpoint] = None,
+    ):
+        if llm_analyzer is not None and not llm_analyzer.enabled:
+            logger.warning("⚠️ LLM indisponible, ré-analyse avec le dictionnaire")
+            llm_analyzer = None
+        self.llm_analyzer = llm_analyzer
+        workers = workers if workers is not None else settings.reanalysis_workers
+        self.workers = workers if workers > 0 else os.cpu_count() or 1
+        self.chunk_size = chunk_size or settings.reanalysis_chunk_size
+        self.session_factory = session_factory
+        self.checkpoint = checkpoint or ReanalysisCheckpoint()
+
+    @property
+    def model(self) -> str:
+        """Modèle et version enregistrés avec les nouveaux scores"""
+        if self.llm_analyzer is not None:
+            return model_version(self.llm_analyzer.model, PROMPT_VERSION)
+        return model_version("dictionary", LEXICON_VERSION)
+
+    def run(self, filters: Optional[ReanalysisFilters] = None, resume: bool = True) -> ReanalysisReport:
+        """
+        Ré-analyse les articles sélectionnés par ``filters``
+
+        Args:
+            filters: Sélection des articles (défaut : tous)
+            resume: Reprendre l'exécution interrompue de même modèle et mêmes filtres
+        """
+        filters = filters or ReanalysisFilters()
+        run_key = hashlib.sha256(
+            json.dumps({"model": self.model, "filters": filters.to_dict()}, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
+
+        report = self.checkpoint.load(run_key) if resume else None
+        if report is not None:
+            logger.info(f"⏯️ Reprise de la ré-analyse après l'article {report.last_id} ({report.processed} déjà traités)")
+        else:
+            report = ReanalysisReport(model=self.model)
+        logger.info(
+            f"🔄 Ré-analyse avec {self.model} (morceaux de {self.chunk_size}, "
+            f"{'LLM' if self.llm_analyzer is not None else f'{self.workers} processus'})"
+        )
+
+        conditions = filters.conditions(self.model)
+        started = time.monotonic() - report.elapsed_seconds
+        executor = (
+            ProcessPoolExecutor(max_workers=self.workers)
+            if self.llm_analyzer is None and self.workers > 1 else None
+        )
+        db = self.session_factory()
+
+        try:
+            pending: Optional[Tuple[List[Row], Callable[[], List[Score]]]] = None
+            after_id = report.last_id
+            while True:
+                rows = media_articles.scoring_chunk(db, after_id, self.chunk_size, conditions)
+                # Scoring du morceau lancé avant l'écriture du précédent
+                scoring = self._score(rows, executor) if rows else None
+
+                if pending is not None:
+                    self._write(db, *pending, report)
+                    report.elapsed_seconds = time.monotonic() - started
+                    self.checkpoint.save(run_key, report)
+                    logger.info(
+                        f"📈 {report.processed} articles ré-analysés ({report.throughput:.0f}/s), "
+                        f"dernier id {report.last_id}"
+                    )
+
+                if not rows:
+                    break
+                after_id = rows[-1].id
+                pending = (rows, scoring)
+
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ Ré-analyse interrompue après l'article {report.last_id} (reprise possible): {e}")
+            raise
+        finally:
+            db.close()
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        self.checkpoint.clear()
+        report.elapsed_seconds = time.monotonic() - started
+        logger.info(
+            f"✅ Ré-analyse terminée : {report.processed} articles en {report.elapsed_seconds:.1f}s "
+            f"({report.throughput:.0f}/s), {report.updated} mis à jour, {report.unchanged} inchangés, "
+            f"{report.errors} erreurs"
+        )
+        return report
+
+    def _score(self, rows: Sequence[Row], executor: Optional[ProcessPoolExecutor]) -> Callable[[], List[Score]]:
+        """Lance le scoring d'un morceau ; la fonction retournée attend ses résultats"""
+        if self.llm_analyzer is not None:
+            return lambda: self._score_with_llm(rows)
+
+        texts = [f"{row.title} {row.summary or ''}" for row in rows]
+        if executor is None:
+            return lambda: score_with_dictionary(texts)
+
+        # Une tranche contiguë par processus
+        size = -(-len(texts) // self.workers)
+        futures = [executor.submit(score_with_dictionary, texts[i:i + size]) for i in range(0, len(texts), size)]
+        return lambda: [score for future in futures for score in future.result()]
+
+    def _score_with_llm(self, rows: Sequence[Row]) -> List[Score]:
+        results = {
+            result.article_id: result
+            for result in self.llm_analyzer.analyze_articles_batch(
+                [{"id": row.id, "title": row.title, "summary": row.summary or ""} for row in rows]
+            )
+        }
+        scores: List[Score] = []
+        for row in rows:
+            result = results.get(row.id)
+            # Résultat de repli (erreur LLM, confiance nulle) : score existant conservé
+            if result is None or result.confidence <= 0:
+                scores.append(None)
+            else:
+                scores.append((result.sentiment_score, result.sentiment_label))
+        return scores
+
+    def _write(
+        self,
+        db: Session,
+        rows: Sequence[Row],
+        scoring: Callable[[], List[Score]],
+        report: ReanalysisReport,
+    ) -> None:
+        """Écrit les scores d'un morceau (UPDATE groupé) et le valide"""
+        updates = []
+        for row, score in zip(rows, scoring()):
+            if score is None:
+                report.errors += 1
+                continue
+            sentiment_score, sentiment_label = score
+            updates.append({
+                "id": row.id,
+                "sentiment_score": sentiment_score,
+                "sentiment_label": sentiment_label,
+                "sentiment_model": self.model,
+            })
+            if row.sentiment_score != sentiment_score:
+                report.updated += 1
+            else:
+                report.unchanged += 1
+
+        media_articles.update_sentiments(db, updates)
+        db.commit()
+        report.processed += len(rows)
+        report.last_id = rows[-1].id
@@ -0,0 +1,435 @@
+"""
+État incrémental des fenêtres glissantes utilisées par les composantes marché.
+
+Au lieu de recalculer moyennes 125/250 jours, plus haut/bas 52 semaines et
+écart-type 30 jours à chaque run, l'état est mis à jour barre par barre :
+
+- sommes courantes pour les moyennes (momentum, volume)
+- deques monotones pour le plus haut / plus bas glissant (price strength)
+- variance de Welford glissante pour la volatilité
+
+Modèle : la dernière barre (« tête ») reste remplaçable — un rafraîchissement
+intraday de la même date la remplace en O(1) ; une barre d'une nouvelle date
+fige la tête précédente dans les fenêtres. L'état est persistable en JSON
+pour qu'un processus redémarré reprenne sans rejouer l'historique.
+"""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Deque, Dict, Optional, Sequence, Tuple
+import json
+import math
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.vectorized_components import (
+    BOND_RETURN,
+    EQUITY_WINDOW,
+    MOMENTUM_WINDOW,
+    NEUTRAL_SCORE,
+    PRICE_STRENGTH_WINDOW,
+    TRADING_DAYS_PER_YEAR,
+    VOLATILITY_WINDOW,
+    VOLUME_WINDOW,
+)
+
+
+logger = get_logger(__name__)
+
+STATE_VERSION = 1
+# Resynchronisation périodique des sommes courantes (dérive flottante), amortie O(1)
+RESYNC_INTERVAL = 1024
+
+
+@dataclass(slots=True)
+class Bar:
+    date: date
+    high: float
+    low: float
+    close: float
+    volume: float
+
+    @classmethod
+    def from_history(cls, row) -> "Bar":
+        return cls(
+            date=row.date,
+            high=float(row.high_price),
+            low=float(row.low_price),
+            close=float(row.close_price),
+            volume=float(row.volume),
+        )
+
+
+def _clamp(value: float) -> float:
+    return float(max(0.0, min(100.0, value)))
+
+
+class _MonotonicWindow:
+    """Maximum (ou minimum) glissant par deque monotone, O(1) amorti."""
+
+    def __init__(self, size: int, keep_max: bool):
+        self.size = size
+        self.keep_max = keep_max
+        self._items: Deque[Tuple[int, float]] = deque()
+
+    def _dominates(self, new: float, old: float) -> bool:
+        return new >= old if self.keep_max else new <= old
+
+    def push(self, index: int, value: float) -> None:
+        while self._items and self._dominates(value, self._items[-1][1]):
+            self._items.pop()
+        self._items.append((index, value))
+        while self._items[0][0] <= index - self.size:
+            self._items.popleft()
+
+    def best(self) -> Optional[float]:
+        return self._items[0][1] if self._items else None
+
+
+class _SlidingWelford:
+    """Moyenne/variance de Welford sur une fenêtre glissante (valeurs None ignorées)."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values: Deque[Optional[float]] = deque()
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def _add(self, x: float) -> None:
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def _remove(self, x: float) -> None:
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        self.count -= 1
+        delta = x - self.mean
+        self.mean -= delta / self.count
+        self.m2 -= delta * (x - self.mean)
+
+    def push(self, value: Optional[float]) -> None:
+        self.values.append(value)
+        if value is not None:
+            self._add(value)
+        if len(self.values) > self.size:
+            old = self.values.popleft()
+            if old is not None:
+                self._remove(old)
+
+    def resync(self) -> None:
+        self.count, self.mean, self.m2 = 0, 0.0, 0.0
+        for value in self.values:
+            if value is not None:
+                self._add(value)
+
+    def stdev_with(self, extra: Optional[float]) -> Optional[float]:
+        """Écart-type (ddof=1) de la fenêtre augmentée de ``extra``, sans la modifier."""
+        count, mean, m2 = self.count, self.mean, self.m2
+        if extra is not None:
+            count += 1
+            delta = extra - mean
+            mean += delta / count
+            m2 += delta * (extra - mean)
+        if count < 2:
+            return None
+        return math.sqrt(max(m2, 0.0) / (count - 1))
+
+
+class RollingComponentState:
+    """Composantes marché maintenues incrémentalement (O(1) par barre)."""
+
+    # Taille des fenêtres sur les barres figées (la tête complète chaque fenêtre)
+    RECENT = MOMENTUM_WINDOW - 1
+    PREVIOUS = MOMENTUM_WINDOW
+    EXTREMES = PRICE_STRENGTH_WINDOW - 1
+    VOLUMES = VOLUME_WINDOW - 1
+    RETURNS = VOLATILITY_WINDOW - 2
+    EQUITY = EQUITY_WINDOW - 1
+    CLOSES = 2 * MOMENTUM_WINDOW - 1
+
+    def __init__(self):
+        self.head: Optional[Bar] = None
+        self.committed = 0  # nombre de barres figées
+        self._pushes_since_resync = 0
+
+        # Fenêtres brutes (persistées)
+        self.closes: Deque[float] = deque(maxlen=self.CLOSES)
+        self.highs: Deque[float] = deque(maxlen=self.EXTREMES)
+        self.lows: Deque[float] = deque(maxlen=self.EXTREMES)
+        self.volumes: Deque[float] = deque(maxlen=self.VOLUMES)
+
+        self._reset_derived()
+
+    def _reset_derived(self) -> None:
+        self._recent: Deque[float] = deque()
+        self._previous: Deque[float] = deque()
+        self._recent_sum = 0.0
+        self._previous_sum = 0.0
+        self._volume_sum = 0.0
+        self._max_high = _MonotonicWindow(self.EXTREMES, keep_max=True)
+        self._min_low = _MonotonicWindow(self.EXTREMES, keep_max=False)
+        self._returns = _SlidingWelford(self.RETURNS)
+
+    def __len__(self) -> int:
+        return self.committed + (1 if self.head is not None else 0)
+
+    # ------------------------------------------------------------------
+    # Mises à jour
+    # ------------------------------------------------------------------
+
+    def update(self, bar: Bar) -> None:
+        """Ajoute une barre (nouvelle date) ou remplace la tête (même date)."""
+        if self.head is not None:
+            if bar.date < self.head.date:
+                raise ValueError(f"Bar {bar.date} is older than the current head {self.head.date}")
+            if bar.date > self.head.date:
+                self._commit(self.head)
+        self.head = bar
+
+    def _commit(self, bar: Bar) -> None:
+        index = self.committed
+        previous_close = self.closes[-1] if self.closes else None
+
+        # Momentum : deux fenêtres consécutives (récente / précédente)
+        self._recent.append(bar.close)
+        self._recent_sum += bar.close
+        if len(self._recent) > self.RECENT:
+            moved = self._recent.popleft()
+            self._recent_sum -= moved
+            self._previous.append(moved)
+            self._previous_sum += moved
+            if len(self._previous) > self.PREVIOUS:
+                self._previous_sum -= self._previous.popleft()
+
+        # Volume : somme courante
+        if len(self.volumes) == self.VOLUMES:
+            self._volume_sum -= self.volumes[0]
+        self._volume_sum += bar.volume
+
+        # Plus haut / plus bas : deques monotones
+        self._max_high.push(index, bar.high)
+        self._min_low.push(index, bar.low)
+
+        # Volatilité : Welford glissant sur les rendements
+        if previous_close is not None:
+            self._returns.push(
+                (bar.close - previous_close) / previous_close if previous_close != 0 else None
+            )
+
+        self.closes.append(bar.close)
+        self.highs.append(bar.high)
+        self.lows.append(bar.low)
+        self.volumes.append(bar.volume)
+        self.committed += 1
+
+        self._pushes_since_resync += 1
+        if self._pushes_since_resync >= RESYNC_INTERVAL:
+            self._resync()
+
+    def _resync(self) -> None:
+        self._recent_sum = math.fsum(self._recent)
+        self._previous_sum = math.fsum(self._previous)
+        self._volume_sum = math.fsum(self.volumes)
+        self._returns.resync()
+        self._pushes_since_resync = 0
+
+    def sync(self, historical_data: Sequence) -> int:
+        """
+        Applique un historique (ordre chronologique) en ne traitant que les
+        barres à partir de la tête courante : l'historique est parcouru depuis
+        la fin, le coût ne dépend donc pas de la profondeur de l'historique.
+        L'état est reconstruit si l'historique ne le prolonge pas (trou, ou
+        barre figée différente).
+
+        Returns:
+            Nombre de barres appliquées
+        """
+        if not historical_data:
+            return 0
+
+        if self.head is not None:
+            new_rows = []
+            anchor = None  # dernière barre antérieure à la tête
+            for row in reversed(historical_data):
+                if row.date < self.head.date:
+                    anchor = row
+                    break
+                new_rows.append(row)
+            new_rows.reverse()
+
+            if self._is_continuation(new_rows, anchor):
+                for row in new_rows:
+                    self.update(Bar.from_history(row))
+                return len(new_rows)
+
+            logger.info("🔁 Historique incompatible avec l'état incrémental, reconstruction")
+            self.reset()
+
+        for row in historical_data:
+            self.update(Bar.from_history(row))
+        return len(historical_data)
+
+    def _is_continuation(self, new_rows: list, anchor) -> bool:
+        if not new_rows or new_rows[0].date != self.head.date:
+            return False  # l'historique s'arrête avant la tête ou ne la contient pas
+        if anchor is None or not self.closes:
+            return True  # historique court commençant à la tête
+        # La dernière barre figée doit correspondre à la barre précédant la tête
+        return math.isclose(float(anchor.close_price), self.closes[-1], rel_tol=1e-9, abs_tol=1e-9)
+
+    def reset(self) -> None:
+        self.head = None
+        self.committed = 0
+        self.closes.clear()
+        self.highs.clear()
+        self.lows.clear()
+        self.volumes.clear()
+        self._pushes_since_resync = 0
+        self._reset_derived()
+
+    # ------------------------------------------------------------------
+    # Composantes (O(1))
+    # ------------------------------------------------------------------
+
+    def components(self) -> Dict[str, float]:
+        return {
+            "momentum": self.momentum(),
+            "price_strength": self.price_strength(),
+            "volume": self.volume(),
+            "volatility": self.volatility(),
+            "equity_vs_bonds": self.equity_vs_bonds(),
+        }
+
+    def momentum(self) -> float:
+        if len(self) < 2 * MOMENTUM_WINDOW:
+            return NEUTRAL_SCORE
+        recent_avg = (self._recent_sum + self.head.close) / MOMENTUM_WINDOW
+        previous_avg = self._previous_sum / MOMENTUM_WINDOW
+        if previous_avg == 0:
+            return NEUTRAL_SCORE
+        return _clamp(50 + (recent_avg - previous_avg) / previous_avg * 100 * 2)
+
+    def price_strength(self) -> float:
+        if len(self) < PRICE_STRENGTH_WINDOW:
+            return NEUTRAL_SCORE
+        high_price = max(self._max_high.best(), self.head.high)
+        low_price = min(self._min_low.best(), self.head.low)
+        if high_price == low_price:
+            return NEUTRAL_SCORE
+        return float((self.head.close - low_price) / (high_price - low_price) * 100)
+
+    def volume(self) -> float:
+        if len(self) < VOLUME_WINDOW:
+            return NEUTRAL_SCORE
+        avg_volume = (self._volume_sum + self.head.volume) / VOLUME_WINDOW
+        if avg_volume == 0:
+            return NEUTRAL_SCORE
+        return _clamp(self.head.volume / avg_volume * 50)
+
+    def volatility(self) -> float:
+        if len(self) < VOLATILITY_WINDOW:
+            return NEUTRAL_SCORE
+        previous_close = self.closes[-1]
+        head_return = (
+            (self.head.close - previous_close) / previous_close if previous_close != 0 else None
+        )
+        stdev = self._returns.stdev_with(head_return)
+        if stdev is None:
+            return NEUTRAL_SCORE
+        return _clamp(100 - stdev * math.sqrt(TRADING_DAYS_PER_YEAR) * 1000)
+
+    def equity_vs_bonds(self) -> float:
+        if len(self) < EQUITY_WINDOW:
+            return NEUTRAL_SCORE
+        first = self.closes[-self.EQUITY]
+        if first == 0:
+            return NEUTRAL_SCORE
+        return _clamp(50 + ((self.head.close - first) / first - BOND_RETURN) * 1000)
+
+    # ------------------------------------------------------------------
+    # Persistance
+    # ------------------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        return {
+            "version": STATE_VERSION,
+            "committed": self.committed,
+            "head": None if self.head is None else {
+                "date": self.head.date.isoformat(),
+                "high": self.head.high,
+                "low": self.head.low,
+                "close": self.head.close,
+                "volume": self.head.volume,
+            },
+            "closes": list(self.closes),
+            "highs": list(self.highs),
+            "lows": list(self.lows),
+            "volumes": list(self.volumes),
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> "RollingComponentState":
+        """Restaure l'état (reconstruction des structures dérivées en O(fenêtre))."""
+        if payload.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported rolling state version: {payload.get('version')}")
+
+        state = cls()
+        committed = payload["committed"]
+        closes = payload["closes"]
+
+        state.closes.extend(closes)
+        state.highs.extend(payload["highs"])
+        state.lows.extend(payload["lows"])
+        state.volumes.extend(payload["volumes"])
+
+        state._recent.extend(closes[-cls.RECENT:])
+        state._previous.extend(closes[:-cls.RECENT][-cls.PREVIOUS:])
+        first_extreme = committed - len(state.highs)
+        for offset, (high, low) in enumerate(zip(state.highs, state.lows)):
+            state._max_high.push(first_extreme + offset, high)
+            state._min_low.push(first_extreme + offset, low)
+        for previous_close, close in zip(closes, closes[1:]):
+            state._returns.push((close - previous_close) / previous_close if previous_close != 0 else None)
+
+        state.committed = committed
+        state._resync()
+        head = payload.get("head")
+        if head is not None:
+            state.head = Bar(
+                date=date.fromisoformat(head["date"]),
+                high=head["high"],
+                low=head["low"],
+                close=head["close"],
+                volume=head["volume"],
+            )
+        return state
+
+    def save(self, path: Optional[Path] = None) -> None:
+        path = path or default_state_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(self.to_dict()))
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "RollingComponentState":
+        """Charge l'état persisté, ou un état vide si absent/illisible."""
+        path = path or default_state_path()
+        if not path.exists():
+            return cls()
+        try:
+            return cls.from_dict(json.loads(path.read_text()))
+        except Exception as e:
+            logger.warning(f"⚠️ État incrémental illisible ({path}): {e} — reconstruction")
+            return cls()
+
+
+def default_state_path() -> Path:
+    return Path(settings.models_dir) / "rolling_components_state.json"
@@ -0,0 +1,167 @@
+"""
+Cache des résultats de sentiment indexé par le contenu des articles.
+
+La clé est un hash SHA-256 du titre et du résumé normalisés, combiné au
+modèle et à la version du prompt (ou du lexique) : changer l'un ou l'autre
+invalide naturellement les entrées existantes.
+
+Deux niveaux :
+- un LRU borné en mémoire (avec TTL) dans le processus
+- le backend de ``CacheService`` (Redis) lorsqu'il est disponible, qui
+  survit aux redémarrages et est partagé entre workers
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Optional
+import hashlib
+import threading
+import time
+import unicodedata
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.monitoring import track_sentiment_analysis
+from app.services.cache_service import CacheService, get_cache_service
+
+
+logger = get_logger(__name__)
+
+
+@dataclass(slots=True)
+class CachedSentiment:
+    score: float
+    label: str
+    confidence: float = 0.0
+    reasoning: str = ""
+
+
+def model_version(model: str, version: str) -> str:
+    """Identifiant ``modèle:version`` enregistré avec chaque score (colonne ``sentiment_model``)."""
+    return f"{model}:{version}"
+
+
+def normalize_article_text(title: str, summary: str = "") -> str:
+    """Normalise titre + résumé (Unicode NFKC, minuscules, espaces réduits)."""
+    text = f"{title or ''}\n{summary or ''}"
+    text = unicodedata.normalize("NFKC", text).lower()
+    return " ".join(text.split())
+
+
+class SentimentCache:
+    """Cache LRU/TTL des scores de sentiment, avec compteurs Prometheus."""
+
+    KEY_PREFIX = "sentiment"
+
+    def __init__(
+        self,
+        cache_service: Optional[CacheService] = None,
+        ttl_seconds: Optional[int] = None,
+        max_entries: Optional[int] = None,
+    ):
+        self.cache_service = cache_service
+        self.ttl_seconds = ttl_seconds or settings.sentiment_cache_ttl_seconds
+        self.max_entries = max_entries or settings.sentiment_cache_max_entries
+        self._entries: OrderedDict[str, tuple[CachedSentiment, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, title: str, summary: str, model: str, version: str) -> str:
+        digest = hashlib.sha256(normalize_article_text(title, summary).encode("utf-8")).hexdigest()
+        return f"{self.KEY_PREFIX}:{model}:{version}:{digest}"
+
+    def get(
+        self,
+        title: str,
+        summary: str,
+        model: str,
+        version: str,
+        method: str,
+    ) -> Optional[CachedSentiment]:
+        """Renvoie le résultat en cache ou None (et met à jour les compteurs)."""
+        key = self.make_key(title, summary, model, version)
+        entry = self._get_local(key)
+
+        if entry is None:
+            backend = self._backend()
+            if backend is not None:
+                payload = backend.get(key)
+                if isinstance(payload, dict):
+                    entry = CachedSentiment(**payload)
+                    self._set_local(key, entry)
+
+        if entry is None:
+            self.misses += 1
+            track_sentiment_analysis(method, "cache_miss")
+        else:
+            self.hits += 1
+            track_sentiment_analysis(method, "cache_hit")
+        return entry
+
+    def set(self, title: str, summary: str, model: str, version: str, entry: CachedSentiment) -> None:
+        key = self.make_key(title, summary, model, version)
+        self._set_local(key, entry)
+        backend = self._backend()
+        if backend is not None:
+            backend.set(key, asdict(entry), ttl_seconds=self.ttl_seconds)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    def _backend(self) -> Optional[CacheService]:
+        # Sans Redis, le cache mémoire de CacheService ferait doublon (et n'est pas borné)
+        service = self.cache_service or get_cache_service()
+        return service if service.use_redis else None
+
+    def _get_local(self, key: str) -> Optional[CachedSentiment]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            entry, expiry = item
+            if expiry <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _set_local(self, key: str, entry: CachedSentiment) -> None:
+        with self._lock:
+            self._entries[key] = (entry, time.time() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# Instance globale du cache de sentiment
+_sentiment_cache: Optional[SentimentCache] = None
+
+
+def get_sentiment_cache() -> SentimentCache:
+    """
+    Retourne l'instance globale du cache de sentiment (singleton)
+
+    Returns:
+        Instance de SentimentCache
+    """
+    global _sentiment_cache
+
+    if _sentiment_cache is None:
+        _sentiment_cache = SentimentCache()
+
+    return _sentiment_cache
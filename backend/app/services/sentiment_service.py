@@ -1,15 +1,65 @@
 from __future__ import annotations
 
 import re
-from typing import List, Dict, Optional
+from bisect import bisect_right
+from functools import lru_cache
+from typing import FrozenSet, List, Dict, Optional
 from dataclasses import dataclass
 import math
 
 from app.core.logging import get_logger
+from app.utils.aho_corasick import AhoCorasick
 
 
 logger = get_logger(__name__)
 
+# À incrémenter à chaque modification des dictionnaires ou du scoring (invalide le cache de sentiment)
+LEXICON_VERSION = "v1"
+
+# Fenêtre de contexte (tokens avant et après)
+CONTEXT_WINDOW = 5
+
+# Mots positifs de résolution (annulent l'effet négatif de mots comme "conflit")
+RESOLUTION_WORDS = frozenset({
+    'résoudre', 'solution', 'régler', 'résolution', 'résout',
+    'résolu', 'dépasser', 'surmonter', 'vaincre', 'terminer',
+    'finir', 'clôturer', 'apaiser', 'pacifier', 'normaliser',
+    'mettre fin', 'tourner la page', 'historique', 'moment historique'
+})
+
+# Mots clés marocains qui changent le contexte (recherchés comme sous-chaînes)
+MOROCCO_CONTEXT = frozenset({
+    'maroc', 'marocain', 'marocaine', 'marocains', 'royaume',
+    'masi', 'casablanca', 'rabat', 'marrakech', 'fes', 'tanger',
+    'sahara marocain', 'province du sud', 'autonomie', 'régions du sud'
+})
+
+# Étiquettes des tokens
+TAG_POSITIVE = 1
+TAG_NEGATIVE = 2
+TAG_POSITIVE_PHRASE = 4
+TAG_NEGATIVE_PHRASE = 8
+TAG_NEGATOR = 16
+TAG_INTENSIFIER = 32
+TAG_RESOLUTION = 64
+TAG_MOROCCO = 128
+
+
+@lru_cache(maxsize=8)
+def _compile_matcher(
+    positive_phrases: FrozenSet[str], negative_phrases: FrozenSet[str], morocco_context: FrozenSet[str]
+) -> AhoCorasick:
+    """Automate des phrases et du contexte marocain (partagé entre les instances de SentimentAnalyzer)"""
+    patterns: Dict[str, int] = {}
+    for phrases, tag in (
+        (positive_phrases, TAG_POSITIVE_PHRASE),
+        (negative_phrases, TAG_NEGATIVE_PHRASE),
+        (morocco_context, TAG_MOROCCO),
+    ):
+        for phrase in phrases:
+            patterns[phrase] = patterns.get(phrase, 0) | tag
+    return AhoCorasick(patterns)
+
 
 @dataclass(slots=True)
 class SentimentResult:
@@ -114,6 +164,11 @@ class SentimentAnalyzer:
             'sans', 'ni', 'nullement', 'guère', 'peu', 'moins', 'déjà'
         }
 
+        # Automate des sous-chaînes du lexique, compilé une fois par jeu de dictionnaires
+        self._matcher = _compile_matcher(
+            frozenset(self.positive_phrases), frozenset(self.negative_phrases), MOROCCO_CONTEXT
+        )
+
     def analyze_text(self, text: str) -> SentimentResult:
         """Analyze sentiment of a text"""
         if not text or not text.strip():
@@ -189,66 +244,103 @@ class SentimentAnalyzer:
         
         return words + phrases
 
+    def _tag_tokens(self, words: List[str]) -> List[int]:
+        """
+        Étiquettes (drapeaux ``TAG_*``) des tokens produits par ``_tokenize`` :
+        les mots, puis leurs bigrammes.
+
+        Les sous-chaînes du lexique sont trouvées en un seul passage de
+        l'automate sur le texte des mots. Une occurrence à l'intérieur d'un mot
+        vaut aussi pour les deux bigrammes qui le contiennent, une occurrence
+        à cheval sur deux mots voisins pour leur bigramme. Aucune clé du lexique
+        ne peut couvrir trois mots : les clés à plusieurs mots contiennent une
+        autre clé ('sahara marocain') ou un mot de deux lettres, écarté par
+        ``_tokenize`` ('province du sud').
+        """
+        tags = [0] * len(words)
+        unigram_count = (len(words) + 1) // 2
+        unigrams = words[:unigram_count]
+
+        starts = []
+        offset = 0
+        for word in unigrams:
+            starts.append(offset)
+            offset += len(word) + 1
+
+        for match_start, match_end, flags in self._matcher.iter_matches(' '.join(unigrams)):
+            first = bisect_right(starts, match_start) - 1
+            last = bisect_right(starts, match_end - 1) - 1
+            if first == last:
+                tags[first] |= flags
+                if first > 0:
+                    tags[unigram_count + first - 1] |= flags
+                if first < unigram_count - 1:
+                    tags[unigram_count + first] |= flags
+            elif last == first + 1:
+                tags[unigram_count + first] |= flags
+
+        for i, word in enumerate(words):
+            tag = tags[i]
+            if word in self.positive_words:
+                tag |= TAG_POSITIVE
+            if word in self.negative_words:
+                tag |= TAG_NEGATIVE
+            if word in self.negators:
+                tag |= TAG_NEGATOR
+            if word in self.intensifiers:
+                tag |= TAG_INTENSIFIER
+            if word in RESOLUTION_WORDS:
+                tag |= TAG_RESOLUTION
+            tags[i] = tag
+
+        return tags
+
     def _calculate_sentiment_scores(self, words: List[str]) -> tuple[float, float]:
         """Calculate positive and negative sentiment scores with Moroccan context"""
         positive_score = 0.0
         negative_score = 0.0
-        
-        # Mots positifs de résolution (annulent l'effet négatif de mots comme "conflit")
-        resolution_words = {'résoudre', 'solution', 'régler', 'résolution', 'résout', 
-                          'résolu', 'dépasser', 'surmonter', 'vaincre', 'terminer',
-                          'finir', 'clôturer', 'apaiser', 'pacifier', 'normaliser',
-                          'mettre fin', 'tourner la page', 'historique', 'moment historique'}
-        
-        # Mots clés marocains qui changent le contexte
-        morocco_positive_context = {'maroc', 'marocain', 'marocaine', 'marocains', 'royaume',
-                                  'masi', 'casablanca', 'rabat', 'marrakech', 'fes', 'tanger',
-                                  'sahara marocain', 'province du sud', 'autonomie', 'régions du sud'}
-        
-        for i, word in enumerate(words):
+
+        tags = self._tag_tokens(words)
+
+        # Sommes préfixes : présence d'un mot de résolution / marocain dans une fenêtre en O(1)
+        resolution_counts = [0]
+        morocco_counts = [0]
+        for tag in tags:
+            resolution_counts.append(resolution_counts[-1] + ((tag & TAG_RESOLUTION) > 0))
+            morocco_counts.append(morocco_counts[-1] + ((tag & TAG_MOROCCO) > 0))
+
+        for i, tag in enumerate(tags):
             base_score = 1.0
-            is_negated = False
-            is_resolution_context = False
-            is_morocco_context = False
-            
+            previous = tags[i - 1] if i > 0 else 0
+
             # Check for negation
-            if i > 0 and words[i-1] in self.negators:
-                is_negated = True
+            is_negated = bool(previous & TAG_NEGATOR)
+            if is_negated:
                 base_score = -1.0
-            
-            # Check for resolution context (3 words before or after)
-            context_window = 5  # Augmenté pour mieux capturer le contexte
-            start_idx = max(0, i - context_window)
-            end_idx = min(len(words), i + context_window + 1)
-            context_words = words[start_idx:end_idx]
-            context_text = ' '.join(context_words)
-            
+
+            # Contexte : CONTEXT_WINDOW tokens avant et après
+            start_idx = max(0, i - CONTEXT_WINDOW)
+            end_idx = min(len(tags), i + CONTEXT_WINDOW + 1)
+
             # Si on trouve un mot de résolution dans le contexte, c'est un contexte positif
-            for ctx_word in context_words:
-                if ctx_word in resolution_words:
-                    is_resolution_context = True
-                    break
-            
+            is_resolution_context = resolution_counts[end_idx] > resolution_counts[start_idx]
+
             # Vérifier le contexte marocain
-            for morocco_word in morocco_positive_context:
-                if morocco_word in context_text:
-                    is_morocco_context = True
-                    break
-            
+            is_morocco_context = morocco_counts[end_idx] > morocco_counts[start_idx]
+
             # Check for intensifiers
-            if i > 0 and words[i-1] in self.intensifiers:
+            if previous & TAG_INTENSIFIER:
                 base_score *= 1.5
-            
+
             # Bonus pour les mots positifs dans un contexte marocain
             if is_morocco_context:
                 base_score *= 1.3  # Bonus de 30% pour le contexte marocain
-            
+
             # Check word sentiment (mots simples et phrases)
-            word_lower = word.lower()
-            is_positive_phrase = word_lower in self.positive_phrases or any(phrase in word_lower for phrase in self.positive_phrases)
-            is_negative_phrase = word_lower in self.negative_phrases or any(phrase in word_lower for phrase in self.negative_phrases)
-            
-            if word in self.positive_words or is_positive_phrase:
+            is_positive_phrase = bool(tag & TAG_POSITIVE_PHRASE)
+            is_negative_phrase = bool(tag & TAG_NEGATIVE_PHRASE)
+
+            if tag & TAG_POSITIVE or is_positive_phrase:
                 if is_negated:
                     negative_score += base_score
                 else:
@@ -259,7 +351,7 @@ class SentimentAnalyzer:
                     # Bonus supplémentaire pour les phrases positives
                     if is_positive_phrase:
                         positive_score += base_score * 0.5  # Bonus pour les phrases complètes
-            elif word in self.negative_words or is_negative_phrase:
+            elif tag & TAG_NEGATIVE or is_negative_phrase:
                 if is_negated:
                     positive_score += base_score
                 elif is_resolution_context:
@@ -270,7 +362,7 @@ class SentimentAnalyzer:
                     # Pénalité si c'est dans un contexte marocain négatif
                     if is_morocco_context and not is_resolution_context:
                         negative_score += base_score * 0.3  # Pénalité supplémentaire
-        
+
         return positive_score, negative_score
 
     def _extract_words_by_sentiment(self, words: List[str], sentiment_type: str) -> List[str]:
@@ -6,8 +6,9 @@ from typing import List, Optional
 import statistics
 
 from app.core.logging import get_logger
-from app.pipelines.ingestion.market_scraper import CasablancaMarketScraper, MASIHistoricalData
+from app.pipelines.ingestion.market_scraper import MASIHistoricalData
 from app.pipelines.ingestion.media_scraper import MediaScraper
+from app.services.market_data_provider import get_market_data_provider
 from app.services.sentiment_service import SentimentAnalyzer
 
 
@@ -40,7 +41,7 @@ class SimplifiedIndexCalculator:
     """
 
     def __init__(self):
-        self.market_scraper = CasablancaMarketScraper()
+        self.market_data = get_market_data_provider()
         self.media_scraper = MediaScraper()
         self.sentiment_analyzer = SentimentAnalyzer()
 
@@ -116,7 +117,7 @@ class SimplifiedIndexCalculator:
         """
         try:
             # Récupérer les 20 derniers jours de données
-            historical_data = self.market_scraper.fetch_historical_data(days=20)
+            historical_data = await self.market_data.get_history_async(days=20)
 
             if not historical_data or len(historical_data) < 5:
                 logger.warning("Not enough historical data for volume calculation")
@@ -220,7 +221,7 @@ class SimplifiedIndexCalculator:
         """
         try:
             # Récupérer les 5 derniers jours pour calculer la tendance
-            historical_data = self.market_scraper.fetch_historical_data(days=5)
+            historical_data = await self.market_data.get_history_async(days=5)
 
             if not historical_data or len(historical_data) < 2:
                 logger.warning("Not enough data for market performance calculation")
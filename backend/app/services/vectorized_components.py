@@ -0,0 +1,228 @@
+"""
+Calcul vectorisé (NumPy) des composantes marché de l'indice Fear & Greed.
+
+L'historique OHLCV est converti une seule fois en colonnes NumPy
+(``MarketArrays``) ; toutes les composantes sont ensuite calculées à partir
+de ces tableaux partagés :
+
+- ``*_score`` : valeur pour la dernière séance (utilisé par ComponentCalculator)
+- ``component_series`` : valeur pour chaque séance de l'historique, en une
+  passe vectorisée (backfills et backtests sur plusieurs années)
+
+Les formules reproduisent celles de ``ComponentCalculator`` (mêmes fenêtres,
+mêmes facteurs d'échelle, même valeur neutre de 50 si l'historique est trop
+court).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+NEUTRAL_SCORE = 50.0
+
+MOMENTUM_WINDOW = 125
+PRICE_STRENGTH_WINDOW = 252
+VOLUME_WINDOW = 30
+VOLATILITY_WINDOW = 30
+EQUITY_WINDOW = 20
+BOND_RETURN = 0.02  # Rendement obligataire supposé (2%)
+TRADING_DAYS_PER_YEAR = 252
+
+
+@dataclass(slots=True)
+class MarketArrays:
+    """Historique OHLCV en colonnes NumPy (ordre chronologique)."""
+
+    dates: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    @classmethod
+    def from_history(cls, historical_data: Iterable) -> "MarketArrays":
+        """Construit les colonnes à partir d'objets ``MASIHistoricalData``."""
+        rows = list(historical_data)
+        return cls(
+            dates=np.array([row.date for row in rows], dtype=object),
+            open=np.fromiter((row.open_price for row in rows), dtype=np.float64, count=len(rows)),
+            high=np.fromiter((row.high_price for row in rows), dtype=np.float64, count=len(rows)),
+            low=np.fromiter((row.low_price for row in rows), dtype=np.float64, count=len(rows)),
+            close=np.fromiter((row.close_price for row in rows), dtype=np.float64, count=len(rows)),
+            volume=np.fromiter((row.volume for row in rows), dtype=np.float64, count=len(rows)),
+        )
+
+    @classmethod
+    def coerce(cls, data) -> "MarketArrays":
+        return data if isinstance(data, cls) else cls.from_history(data)
+
+
+def _clamp(value: float) -> float:
+    return float(max(0.0, min(100.0, value)))
+
+
+# ============================================================================
+# DERNIÈRE SÉANCE
+# ============================================================================
+
+def momentum_score(close: np.ndarray) -> float:
+    """Moyenne des 125 dernières clôtures vs les 125 précédentes."""
+    if len(close) < 2 * MOMENTUM_WINDOW:
+        return NEUTRAL_SCORE
+    recent_avg = close[-MOMENTUM_WINDOW:].mean()
+    previous_avg = close[-2 * MOMENTUM_WINDOW:-MOMENTUM_WINDOW].mean()
+    if previous_avg == 0:
+        return NEUTRAL_SCORE
+    momentum_pct = (recent_avg - previous_avg) / previous_avg * 100
+    return _clamp(50 + momentum_pct * 2)
+
+
+def price_strength_score(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> float:
+    """Position de la clôture entre le plus haut et le plus bas sur 52 semaines."""
+    if len(close) < PRICE_STRENGTH_WINDOW:
+        return NEUTRAL_SCORE
+    high_price = high[-PRICE_STRENGTH_WINDOW:].max()
+    low_price = low[-PRICE_STRENGTH_WINDOW:].min()
+    if high_price == low_price:
+        return NEUTRAL_SCORE
+    return float((close[-1] - low_price) / (high_price - low_price) * 100)
+
+
+def volume_score(volume: np.ndarray) -> float:
+    """Volume de la séance rapporté à la moyenne sur 30 séances."""
+    if len(volume) < VOLUME_WINDOW:
+        return NEUTRAL_SCORE
+    avg_volume = volume[-VOLUME_WINDOW:].mean()
+    if avg_volume == 0:
+        return NEUTRAL_SCORE
+    return _clamp(volume[-1] / avg_volume * 50)
+
+
+def volatility_score(close: np.ndarray) -> float:
+    """Volatilité annualisée des rendements sur 30 séances (relation inverse)."""
+    if len(close) < VOLATILITY_WINDOW:
+        return NEUTRAL_SCORE
+    window = close[-VOLATILITY_WINDOW:]
+    previous = window[:-1]
+    valid = previous != 0
+    if valid.sum() < 2:
+        return NEUTRAL_SCORE
+    returns = (window[1:][valid] - previous[valid]) / previous[valid]
+    volatility = returns.std(ddof=1) * math.sqrt(TRADING_DAYS_PER_YEAR)
+    return _clamp(100 - volatility * 1000)
+
+
+def equity_vs_bonds_score(close: np.ndarray) -> float:
+    """Performance du MASI sur 20 séances vs un rendement obligataire fixe."""
+    if len(close) < EQUITY_WINDOW:
+        return NEUTRAL_SCORE
+    first = close[-EQUITY_WINDOW]
+    if first == 0:
+        return NEUTRAL_SCORE
+    equity_return = (close[-1] - first) / first
+    return _clamp(50 + (equity_return - BOND_RETURN) * 1000)
+
+
+# ============================================================================
+# SÉRIES COMPLÈTES (une valeur par séance)
+# ============================================================================
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Moyenne glissante alignée à droite (NaN tant que la fenêtre est incomplète)."""
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = sliding_window_view(values, window).mean(axis=1)
+    return out
+
+
+def momentum_series(close: np.ndarray) -> np.ndarray:
+    out = np.full(len(close), NEUTRAL_SCORE)
+    means = _rolling_mean(close, MOMENTUM_WINDOW)
+    if len(close) < 2 * MOMENTUM_WINDOW:
+        return out
+    recent = means[2 * MOMENTUM_WINDOW - 1:]
+    previous = means[MOMENTUM_WINDOW - 1:-MOMENTUM_WINDOW]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.clip(50 + (recent - previous) / previous * 100 * 2, 0, 100)
+    out[2 * MOMENTUM_WINDOW - 1:] = np.where(previous == 0, NEUTRAL_SCORE, scores)
+    return out
+
+
+def price_strength_series(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    out = np.full(len(close), NEUTRAL_SCORE)
+    if len(close) < PRICE_STRENGTH_WINDOW:
+        return out
+    highs = sliding_window_view(high, PRICE_STRENGTH_WINDOW).max(axis=1)
+    lows = sliding_window_view(low, PRICE_STRENGTH_WINDOW).min(axis=1)
+    current = close[PRICE_STRENGTH_WINDOW - 1:]
+    span = highs - lows
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = (current - lows) / span * 100
+    out[PRICE_STRENGTH_WINDOW - 1:] = np.where(span == 0, NEUTRAL_SCORE, scores)
+    return out
+
+
+def volume_series(volume: np.ndarray) -> np.ndarray:
+    out = np.full(len(volume), NEUTRAL_SCORE)
+    if len(volume) < VOLUME_WINDOW:
+        return out
+    averages = _rolling_mean(volume, VOLUME_WINDOW)[VOLUME_WINDOW - 1:]
+    current = volume[VOLUME_WINDOW - 1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.clip(current / averages * 50, 0, 100)
+    out[VOLUME_WINDOW - 1:] = np.where(averages == 0, NEUTRAL_SCORE, scores)
+    return out
+
+
+def volatility_series(close: np.ndarray) -> np.ndarray:
+    out = np.full(len(close), NEUTRAL_SCORE)
+    if len(close) < VOLATILITY_WINDOW:
+        return out
+    previous = close[:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(previous != 0, (close[1:] - previous) / previous, np.nan)
+    windows = sliding_window_view(returns, VOLATILITY_WINDOW - 1)
+    counts = np.count_nonzero(~np.isnan(windows), axis=1)
+    enough = counts >= 2
+    stds = np.full(len(windows), np.nan)
+    if enough.any():
+        stds[enough] = np.nanstd(windows[enough], axis=1, ddof=1)
+    scores = np.clip(100 - stds * math.sqrt(TRADING_DAYS_PER_YEAR) * 1000, 0, 100)
+    out[VOLATILITY_WINDOW - 1:] = np.where(enough, scores, NEUTRAL_SCORE)
+    return out
+
+
+def equity_vs_bonds_series(close: np.ndarray) -> np.ndarray:
+    out = np.full(len(close), NEUTRAL_SCORE)
+    if len(close) < EQUITY_WINDOW:
+        return out
+    first = close[:len(close) - EQUITY_WINDOW + 1]
+    last = close[EQUITY_WINDOW - 1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.clip(50 + ((last - first) / first - BOND_RETURN) * 1000, 0, 100)
+    out[EQUITY_WINDOW - 1:] = np.where(first == 0, NEUTRAL_SCORE, scores)
+    return out
+
+
+def component_series(arrays: MarketArrays) -> Dict[str, np.ndarray]:
+    """
+    Composantes marché pour chaque séance, calculées sur l'historique
+    disponible jusqu'à cette séance (équivalent à appeler les ``*_score``
+    sur chaque préfixe, en une seule passe).
+    """
+    return {
+        "momentum": momentum_series(arrays.close),
+        "price_strength": price_strength_series(arrays.high, arrays.low, arrays.close),
+        "volume": volume_series(arrays.volume),
+        "volatility": volatility_series(arrays.close),
+        "equity_vs_bonds": equity_vs_bonds_series(arrays.close),
+    }
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, Iterator, List, Mapping, Tuple
+
+
+class AhoCorasick:
+    """
+    Automate d'Aho-Corasick : toutes les occurrences d'un ensemble de motifs
+    dans un texte, en un seul passage linéaire (indépendant du nombre de motifs).
+
+    Chaque motif porte une valeur entière (ex. des drapeaux combinables).
+    """
+
+    def __init__(self, patterns: Mapping[str, int]):
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[Tuple[int, int]]] = [[]]
+
+        for pattern, value in patterns.items():
+            if not pattern:
+                continue
+            node = 0
+            for char in pattern:
+                child = goto[node].get(char)
+                if child is None:
+                    child = len(goto)
+                    goto.append({})
+                    outputs.append([])
+                    goto[node][char] = child
+                node = child
+            outputs[node].append((len(pattern), value))
+
+        # Parcours en largeur : lien d'échec (plus long suffixe propre qui est aussi
+        # un préfixe) et table de transitions complète, sans retour arrière au scan
+        fail = [0] * len(goto)
+        transitions: List[Dict[str, int]] = [goto[0]] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            transitions[node] = {**transitions[fail[node]], **goto[node]}
+            for char, child in goto[node].items():
+                queue.append(child)
+                fail[child] = transitions[fail[node]].get(char, 0)
+                outputs[child].extend(outputs[fail[child]])
+
+        self._transitions = transitions
+        self._outputs = [tuple(output) for output in outputs]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Occurrences ``(début, fin exclue, valeur)``, chevauchantes comprises"""
+        transitions, outputs = self._transitions, self._outputs
+        node = 0
+        for end, char in enumerate(text, 1):
+            node = transitions[node].get(char, 0)
+            if outputs[node]:
+                for length, value in outputs[node]:
+                    yield end - length, end, value
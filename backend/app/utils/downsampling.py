@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+
+def lttb(points: Sequence[Tuple[datetime, float]], threshold: int) -> List[Tuple[datetime, float]]:
+    """
+    Largest-Triangle-Three-Buckets : réduit une série chronologique à
+    ``threshold`` points en conservant sa forme visuelle (pics et creux).
+
+    Le premier et le dernier point sont toujours conservés ; entre les deux,
+    chaque intervalle garde le point qui forme le plus grand triangle avec le
+    point retenu précédemment et la moyenne de l'intervalle suivant.
+
+    Args:
+        points: Couples ``(instant, valeur)`` en ordre chronologique
+        threshold: Nombre de points à conserver (au moins 3)
+    """
+    n = len(points)
+    if threshold < 3 or n <= threshold:
+        return list(points)
+
+    x = np.fromiter((as_of.timestamp() for as_of, _ in points), dtype=float, count=n)
+    y = np.fromiter((value for _, value in points), dtype=float, count=n)
+
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    anchor = 0
+    for bucket in range(threshold - 2):
+        # Moyenne de l'intervalle suivant (le dernier point pour le dernier intervalle)
+        next_start = int(np.floor((bucket + 1) * every)) + 1
+        next_end = min(int(np.floor((bucket + 2) * every)) + 1, n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        start = int(np.floor(bucket * every)) + 1
+        end = next_start
+        areas = np.abs(
+            (x[anchor] - avg_x) * (y[start:end] - y[anchor])
+            - (x[anchor] - x[start:end]) * (avg_y - y[anchor])
+        )
+        anchor = start + int(np.argmax(areas))
+        selected.append(anchor)
+    selected.append(n - 1)
+
+    return [points[index] for index in selected]
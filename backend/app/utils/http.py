@@ -1,9 +1,19 @@
 from __future__ import annotations
 
-from typing import Any, Mapping
+from typing import Any, Dict, Mapping
+from urllib.parse import urlparse
+import asyncio
+import threading
+import time
 
 import requests
 
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
 from app.core.logging import get_logger
 
 
@@ -18,3 +28,43 @@ def get(url: str, headers: Mapping[str, str] | None = None, timeout: int = 30) -
 
 
 
+
+
+class HostThrottle:
+    """
+    Délai de politesse appliqué par hôte (et non globalement).
+
+    Chaque appel réserve le prochain créneau libre pour l'hôte de l'URL ;
+    des requêtes vers des hôtes différents ne s'attendent donc jamais.
+    L'état est protégé par un verrou de thread, ce qui permet de partager
+    la même instance entre threads et boucles asyncio.
+    """
+
+    def __init__(self, min_interval: float = 2.0):
+        self.min_interval = min_interval
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def reserve(self, url: str) -> float:
+        """Réserve un créneau pour l'hôte et renvoie le temps d'attente (secondes)."""
+        host = self.host_of(url)
+        now = time.monotonic()
+        with self._lock:
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        return slot - now
+
+    def wait(self, url: str) -> None:
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self, url: str) -> None:
+        delay = self.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
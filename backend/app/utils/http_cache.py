@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional
+from urllib.parse import urlparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.utils.http import HTTPX_AVAILABLE
+
+if HTTPX_AVAILABLE:
+    import httpx
+
+
+logger = get_logger(__name__)
+
+CACHE_VERSION = 1
+# En-têtes conservés avec le corps (le corps est stocké décodé : pas de Content-Encoding)
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control", "Date")
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    """Réponse 200 mise en cache : corps, en-têtes utiles et date de dernière validation"""
+    url: str
+    headers: Dict[str, str]
+    content: bytes
+    encoding: Optional[str] = None
+    validated_at: float = field(default_factory=time.time)
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get("ETag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get("Last-Modified")
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now if now is not None else time.time()) - self.validated_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """``If-None-Match`` / ``If-Modified-Since`` pour revalider l'entrée"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def revalidated(self, headers: Mapping[str, str]) -> None:
+        """Entrée confirmée par un 304 : validateurs éventuellement mis à jour"""
+        for name in STORED_HEADERS:
+            if name in headers and name != "Content-Type":
+                self.headers[name] = headers[name]
+        self.validated_at = time.time()
+
+    @classmethod
+    def from_headers(cls, url: str, headers: Mapping[str, str], content: bytes, encoding: Optional[str]) -> "CacheEntry":
+        return cls(
+            url=url,
+            headers={name: headers[name] for name in STORED_HEADERS if name in headers},
+            content=content,
+            encoding=encoding,
+        )
+
+    def to_requests_response(self) -> "CachedResponse":
+        response = CachedResponse()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = self.url
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.encoding = self.encoding
+        response._content = self.content
+        return response
+
+    def to_httpx_response(self, request: "httpx.Request") -> "httpx.Response":
+        response = httpx.Response(200, headers=self.headers, content=self.content, request=request)
+        response.extensions["from_cache"] = True
+        return response
+
+
+class CachedResponse(requests.Response):
+    """Réponse ``requests`` servie depuis le cache (fraîche ou confirmée par un 304)"""
+    from_cache = True
+
+
+@dataclass(slots=True)
+class HttpCacheStats:
+    fresh: int = 0  # Servies sans requête
+    not_modified: int = 0  # Revalidées (304)
+    downloaded: int = 0  # Corps téléchargé (200)
+
+
+class FreshnessPolicy:
+    """
+    Durée pendant laquelle une réponse est servie sans contacter le serveur.
+
+    Règle par hôte (``"medias24.com"`` couvre aussi ``www.medias24.com``),
+    sinon ``max-age`` du ``Cache-Control`` de la réponse, sinon la durée par
+    défaut. Au-delà, la réponse est revalidée par une requête conditionnelle.
+    """
+
+    def __init__(self, rules: Optional[Mapping[str, int]] = None, default_seconds: Optional[int] = None):
+        self.rules = dict(settings.http_cache_freshness if rules is None else rules)
+        self.default_seconds = settings.http_cache_default_freshness_seconds if default_seconds is None else default_seconds
+
+    def fresh_for(self, entry: CacheEntry) -> float:
+        host = urlparse(entry.url).netloc.lower()
+        for suffix, seconds in self.rules.items():
+            if host == suffix or host.endswith("." + suffix):
+                return seconds
+        match = _MAX_AGE.search(entry.headers.get("Cache-Control", ""))
+        if match:
+            return int(match.group(1))
+        return self.default_seconds
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return entry.age() < self.fresh_for(entry)
+
+
+def cacheable(status_code: int, headers: Mapping[str, str]) -> bool:
+    cache_control = headers.get("Cache-Control", "").lower()
+    return status_code == 200 and "no-store" not in cache_control
+
+
+class HttpCache:
+    """
+    Cache disque des réponses HTTP, par URL : un fichier par URL (en-tête JSON
+    sur la première ligne, puis le corps brut), écrit de façon atomique. Taille
+    bornée par ``max_bytes`` : les entrées les plus anciennes sont supprimées.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, max_bytes: Optional[int] = None):
+        self.directory = Path(directory or settings.http_cache_dir or Path(settings.models_dir) / "http_cache")
+        self.max_bytes = max_bytes or settings.http_cache_max_bytes
+        self.stats = HttpCacheStats()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _path(self, url: str) -> Path:
+        return self.directory / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.http"
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        path = self._path(url)
+        try:
+            with path.open("rb") as file:
+                meta = json.loads(file.readline())
+                content = file.read()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️ Entrée du cache HTTP illisible ({path}): {e}")
+            return None
+        if meta.get("version") != CACHE_VERSION or meta.get("url") != url:
+            return None
+        return CacheEntry(
+            url=url, headers=meta["headers"], content=content,
+            encoding=meta.get("encoding"), validated_at=meta["validated_at"],
+        )
+
+    def put(self, entry: CacheEntry) -> None:
+        meta = {
+            "version": CACHE_VERSION,
+            "url": entry.url,
+            "headers": entry.headers,
+            "encoding": entry.encoding,
+            "validated_at": entry.validated_at,
+        }
+        path = self._path(entry.url)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with tmp_path.open("wb") as file:
+                file.write(json.dumps(meta).encode("utf-8") + b"\n")
+                file.write(entry.content)
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"⚠️ Écriture du cache HTTP impossible ({path}): {e}")
+            return
+
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % 100 == 0
+        if prune:
+            self.prune()
+
+    def prune(self) -> int:
+        """Supprime les entrées les plus anciennes au-delà de ``max_bytes`` ; retourne le nombre supprimé"""
+        files = []
+        for path in self.directory.glob("*.http"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+
+def cached_get(
+    session: requests.Session,
+    url: str,
+    cache: Optional[HttpCache] = None,
+    policy: Optional[FreshnessPolicy] = None,
+    before_request: Optional[Callable[[], Any]] = None,
+    **kwargs: Any,
+) -> requests.Response:
+    """
+    GET via ``session`` avec cache disque et revalidation conditionnelle
+
+    - réponse en cache encore fraîche : servie sans requête
+    - sinon ``If-None-Match`` / ``If-Modified-Since`` ; un 304 renvoie le corps en cache
+    - un 200 remplace l'entrée ; les autres statuts sont renvoyés tels quels
+
+    Args:
+        before_request: Appelé juste avant une requête réseau (délai de politesse)
+        **kwargs: Arguments de ``session.get`` (``timeout``, ``headers``...)
+    """
+    if not settings.http_cache_enabled:
+        if before_request is not None:
+            before_request()
+        return session.get(url, **kwargs)
+
+    cache = cache or get_http_cache()
+    policy = policy or get_freshness_policy()
+    entry = cache.get(url)
+    if entry is not None and policy.is_fresh(entry):
+        cache.stats.fresh += 1
+        logger.debug("HTTP cache hit", extra={"url": url})
+        return entry.to_requests_response()
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    if entry is not None:
+        headers.update(entry.conditional_headers())
+    if before_request is not None:
+        before_request()
+    response = session.get(url, headers=headers, **kwargs)
+
+    if response.status_code == 304 and entry is not None:
+        cache.stats.not_modified += 1
+        entry.revalidated(response.headers)
+        cache.put(entry)
+        return entry.to_requests_response()
+
+    if cacheable(response.status_code, response.headers):
+        cache.stats.downloaded += 1
+        cache.put(CacheEntry.from_headers(url, response.headers, response.content, response.encoding))
+    return response
+
+
+async def cached_get_async(
+    client: "httpx.AsyncClient",
+    url: str,
+    cache: Optional[HttpCache] = None,
+    policy: Optional[FreshnessPolicy] = None,
+    before_request: Optional[Callable[[], Awaitable[Any]]] = None,
+    **kwargs: Any,
+) -> "httpx.Response":
+    """Équivalent asynchrone (httpx) de ``cached_get`` ; lecture et écriture du cache hors de la boucle"""
+    if not settings.http_cache_enabled:
+        if before_request is not None:
+            await before_request()
+        return await client.get(url, **kwargs)
+
+    cache = cache or get_http_cache()
+    policy = policy or get_freshness_policy()
+    entry = await asyncio.to_thread(cache.get, url)
+    request = client.build_request("GET", url)
+    if entry is not None and policy.is_fresh(entry):
+        cache.stats.fresh += 1
+        return entry.to_httpx_response(request)
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    if entry is not None:
+        headers.update(entry.conditional_headers())
+    if before_request is not None:
+        await before_request()
+    response = await client.get(url, headers=headers, **kwargs)
+
+    if response.status_code == 304 and entry is not None:
+        cache.stats.not_modified += 1
+        entry.revalidated(response.headers)
+        await asyncio.to_thread(cache.put, entry)
+        return entry.to_httpx_response(request)
+
+    if cacheable(response.status_code, response.headers):
+        cache.stats.downloaded += 1
+        entry = CacheEntry.from_headers(url, response.headers, response.content, response.encoding)
+        await asyncio.to_thread(cache.put, entry)
+    return response
+
+
+# Instances globales du cache HTTP et de la politique de fraîcheur
+_http_cache: Optional[HttpCache] = None
+_freshness_policy: Optional[FreshnessPolicy] = None
+
+
+def get_http_cache() -> HttpCache:
+    """
+    Retourne l'instance globale du cache HTTP (singleton)
+
+    Returns:
+        Instance de HttpCache
+    """
+    global _http_cache
+
+    if _http_cache is None:
+        _http_cache = HttpCache()
+
+    return _http_cache
+
+
+def get_freshness_policy() -> FreshnessPolicy:
+    """Retourne la politique de fraîcheur construite depuis la configuration (singleton)"""
+    global _freshness_policy
+
+    if _freshness_policy is None:
+        _freshness_policy = FreshnessPolicy()
+
+    return _freshness_policy
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Set
+import hashlib
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+
+from app.core.config import settings
+
+
+# Paramètres des signatures persistées : les changer invalide l'index stocké
+NUM_PERM = 120
+BANDS = 20
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+SEED = 1
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize_text(text: str) -> str:
+    """Minuscules, sans accents ni ponctuation, espaces simples"""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _NON_WORD.sub(" ", stripped).strip()
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """Sous-chaînes de ``size`` caractères du texte normalisé (le texte entier s'il est plus court)"""
+    normalized = normalize_text(text)
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+class MinHasher:
+    """
+    Signatures MinHash : ``NUM_PERM`` permutations universelles
+    ``(a·x + b) mod p`` des empreintes CRC32 des shingles. La proportion de
+    positions égales entre deux signatures estime la similarité de Jaccard de
+    leurs ensembles de shingles.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = SEED):
+        generator = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self._a = generator.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)[:, None]
+        self._b = generator.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)[:, None]
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """Signature (uint32) du texte, None s'il n'a aucun shingle"""
+        grams = shingles(text)
+        if not grams:
+            return None
+        hashes = np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint64, count=len(grams))
+        # a, x < 2**32 : produit exact en uint64 (seul l'ajout de b peut déborder, modulo 2**64)
+        permuted = (self._a * hashes + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=1).astype(np.uint32)
+
+
+def similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Similarité de Jaccard estimée entre deux signatures"""
+    return float(np.count_nonzero(first == second)) / len(first)
+
+
+def band_buckets(signature: np.ndarray) -> List[int]:
+    """Empreinte 64 bits signée de chaque bande de ``ROWS`` lignes (clé LSH, stockable en BIGINT)"""
+    data = signature.astype("<u4").tobytes()
+    width = ROWS * 4
+    return [
+        int.from_bytes(hashlib.blake2b(data[i:i + width], digest_size=8).digest(), "little", signed=True)
+        for i in range(0, BANDS * width, width)
+    ]
+
+
+def to_bytes(signature: np.ndarray) -> bytes:
+    return signature.astype("<u4").tobytes()
+
+
+def from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype="<u4").astype(np.uint32)
+
+
+class LSHIndex:
+    """
+    Index LSH en mémoire : deux signatures partageant une bande entière sont
+    candidates. Probabilité d'être candidat ``1 - (1 - s**ROWS)**BANDS`` pour
+    une similarité ``s`` (≈ 1 au-delà de 0,8, ≈ 0,27 à 0,5), vérifiée ensuite
+    sur les signatures : la recherche ne parcourt que les candidats.
+    """
+
+    def __init__(self):
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(BANDS)]
+        self._signatures: List[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def query(self, signature: np.ndarray, threshold: float, buckets: Optional[Sequence[int]] = None) -> Optional[int]:
+        """Position de la signature indexée la plus proche au-delà de ``threshold``, ou None"""
+        buckets = buckets if buckets is not None else band_buckets(signature)
+        candidates = {key for band, bucket in enumerate(buckets) for key in self._buckets[band].get(bucket, ())}
+        best, best_similarity = None, threshold
+        for key in candidates:
+            score = similarity(signature, self._signatures[key])
+            if score >= best_similarity:
+                best, best_similarity = key, score
+        return best
+
+    def add(self, signature: np.ndarray, buckets: Optional[Sequence[int]] = None) -> int:
+        key = len(self._signatures)
+        self._signatures.append(signature)
+        for band, bucket in enumerate(buckets if buckets is not None else band_buckets(signature)):
+            self._buckets[band].setdefault(bucket, []).append(key)
+        return key
+
+
+_hasher: Optional[MinHasher] = None
+
+
+def get_minhasher() -> MinHasher:
+    """Retourne le hacheur partagé (mêmes permutations que l'index persisté)"""
+    global _hasher
+
+    if _hasher is None:
+        _hasher = MinHasher()
+
+    return _hasher
+
+
+def article_signature(title: str) -> Optional[np.ndarray]:
+    """
+    Signature d'un article, calculée sur son seul titre normalisé : le résumé
+    et le contenu (recopie du résumé chez certaines sources, page complète
+    chez d'autres, vide ailleurs) rendraient incomparables les reprises d'une
+    même dépêche d'une source à l'autre
+    """
+    return get_minhasher().signature(title)
+
+
+class ArticleDeduplicator:
+    """
+    Dédoublonnage incrémental : un article est rejeté si son URL a déjà été vue
+    ou si sa signature MinHash est proche (similarité estimée d'au moins
+    ``threshold``) de celle d'un article retenu. Coût constant par article,
+    quel que soit le nombre d'articles déjà vus.
+
+    Fonctionne avec tout objet ayant ``url`` et ``title``.
+    """
+
+    def __init__(self, threshold: Optional[float] = None):
+        self.threshold = settings.dedup_similarity_threshold if threshold is None else threshold
+        self.seen_urls: Set[str] = set()
+        self.index = LSHIndex()
+        self.signature: Optional[np.ndarray] = None  # Signature du dernier article accepté
+
+    def accept(self, article) -> bool:
+        self.signature = None
+        if article.url in self.seen_urls:
+            return False
+        self.seen_urls.add(article.url)
+
+        signature = article_signature(article.title)
+        if signature is None:
+            return True
+        buckets = band_buckets(signature)
+        if self.index.query(signature, self.threshold, buckets) is not None:
+            return False
+        self.index.add(signature, buckets)
+        self.signature = signature
+        return True
+
+    def unique(self, articles: Sequence) -> List:
+        """Articles retenus, dans l'ordre d'arrivée"""
+        return [article for article in articles if self.accept(article)]
@@ -23,8 +23,9 @@ GRANT ALL PRIVILEGES ON SCHEMA public TO fear_greed_user;
 -- Create indexes for better performance (will be created after tables are created)
 -- These will be added by the application after table creation
 
--- Set up TimescaleDB specific configurations
--- These will be applied after the tables are converted to hypertables
+-- Hypertables, continuous aggregates and compression policies are created by the
+-- Alembic migration d4f8a2c61b37 when TIMESCALE_ENABLED=true (see app/models/timescale.py):
+--   alembic upgrade head
 
 COMMENT ON DATABASE fear_greed_db IS 'Fear & Greed Index Database with TimescaleDB for time-series data';
 
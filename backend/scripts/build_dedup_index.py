@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Script pour indexer les articles existants dans l'index des quasi-doublons (MinHash/LSH)
+"""
+import sys
+from pathlib import Path
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.dedup_service import get_stored_article_index
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Indexer les articles sans signature MinHash")
+    parser.add_argument("--chunk-size", type=int, help="Articles lus et écrits par morceau")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("📇 INDEXATION DES ARTICLES (QUASI-DOUBLONS)")
+    print("=" * 80)
+
+    indexed = get_stored_article_index().backfill(chunk_size=args.chunk_size)
+
+    print(f"\n✅ {indexed} articles indexés")
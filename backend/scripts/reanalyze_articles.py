@@ -9,95 +9,39 @@ from pathlib import Path
 # Ajouter le répertoire parent au path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from datetime import datetime
+
 from sqlalchemy.orm import Session
-from app.models.database import get_session, engine
-from app.models.schemas import MediaArticle
-from app.services.sentiment_service import SentimentAnalyzer
-from app.services.llm_sentiment_service import LLMSentimentAnalyzer
 from app.core.logging import get_logger
+from app.services.llm_sentiment_service import LLMSentimentAnalyzer
+from app.services.reanalysis_engine import ReanalysisEngine, ReanalysisFilters
 
 logger = get_logger(__name__)
 
-def reanalyze_articles(use_llm: bool = False):
-    """Réanalyser tous les articles existants avec le nouveau système"""
-    from app.models.database import SessionLocal
-    db: Session = SessionLocal()
-    
-    try:
-        # Récupérer tous les articles
-        articles = db.query(MediaArticle).all()
-        
-        logger.info(f"📰 Réanalyse de {len(articles)} articles avec le nouveau système amélioré...")
-        
-        # Initialiser les analyseurs
-        sentiment_analyzer = SentimentAnalyzer()
-        llm_analyzer = LLMSentimentAnalyzer() if use_llm else None
-        
-        updated_count = 0
-        errors = 0
-        
-        for article in articles:
-            try:
-                # Préparer le texte à analyser
-                text = f"{article.title} {article.summary or ''}"
-                
-                if use_llm and llm_analyzer and llm_analyzer.enabled:
-                    # Utiliser LLM si disponible
-                    result = llm_analyzer.analyze_article(
-                        title=article.title,
-                        summary=article.summary or '',
-                        article_id=article.id
-                    )
-                    new_sentiment_score = result.sentiment_score
-                    new_sentiment_label = result.sentiment_label
-                else:
-                    # Utiliser NLP amélioré
-                    result = sentiment_analyzer.analyze_text(text)
-                    new_sentiment_score = result.polarity
-                    new_sentiment_label = sentiment_analyzer.get_sentiment_label(result.polarity)
-                
-                # Vérifier si le score a changé
-                old_score = article.sentiment_score
-                
-                # Mettre à jour les scores
-                article.sentiment_score = new_sentiment_score
-                article.sentiment_label = new_sentiment_label
-                
-                if old_score != new_sentiment_score:
-                    logger.info(
-                        f"✅ Article {article.id}: {old_score:.3f} → {new_sentiment_score:.3f} "
-                        f"({article.title[:50]}...)"
-                    )
-                    updated_count += 1
-                else:
-                    logger.debug(f"➡️  Article {article.id}: Score inchangé ({new_sentiment_score:.3f})")
-                
-            except Exception as e:
-                logger.error(f"❌ Erreur lors de l'analyse de l'article {article.id}: {e}")
-                errors += 1
-                continue
-        
-        # Sauvegarder les modifications
-        db.commit()
-        
-        logger.info(
-            f"✅ Réanalyse terminée : {updated_count} articles mis à jour, "
-            f"{len(articles) - updated_count} inchangés, {errors} erreurs"
-        )
-        
-        return {
-            "total_articles": len(articles),
-            "updated": updated_count,
-            "unchanged": len(articles) - updated_count,
-            "errors": errors
-        }
-        
-    except Exception as e:
-        logger.error(f"❌ Erreur lors de la réanalyse : {e}", exc_info=True)
-        db.rollback()
-        raise
-    finally:
-        db.close()
+def reanalyze_articles(
+    use_llm: bool = False,
+    filters: ReanalysisFilters | None = None,
+    workers: int | None = None,
+    chunk_size: int | None = None,
+    resume: bool = True,
+):
+    """Réanalyser les articles existants par morceaux (reprise après interruption)"""
+    engine = ReanalysisEngine(
+        llm_analyzer=LLMSentimentAnalyzer() if use_llm else None,
+        workers=workers,
+        chunk_size=chunk_size,
+    )
+    report = engine.run(filters, resume=resume)
+
+    return {
+        "model": report.model,
+        "total_articles": report.processed,
+        "updated": report.updated,
+        "unchanged": report.unchanged,
+        "errors": report.errors,
+        "elapsed_seconds": report.elapsed_seconds,
+        "throughput": report.throughput,
+    }
 
 def recalculate_media_sentiment():
     """Recalculer le media_sentiment avec les nouveaux scores"""
@@ -138,6 +82,27 @@ if __name__ == "__main__":
         action="store_true",
         help="Utiliser LLM (GPT) pour l'analyse au lieu du NLP amélioré"
     )
+    parser.add_argument("--source", action="append", default=[], help="Source à réanalyser (répétable)")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Articles publiés à partir de cette date (ISO)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="Articles publiés avant cette date (ISO)")
+    parser.add_argument(
+        "--model-version",
+        action="append",
+        default=[],
+        help="Articles dont le score vient de ce modèle, ex. dictionary:v1 (répétable)"
+    )
+    parser.add_argument(
+        "--stale-only",
+        action="store_true",
+        help="Uniquement les articles dont le score ne vient pas du modèle utilisé"
+    )
+    parser.add_argument("--workers", type=int, help="Processus de scoring du dictionnaire (défaut : un par CPU)")
+    parser.add_argument("--chunk-size", type=int, help="Articles lus et écrits par morceau")
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignorer le point de reprise d'une exécution interrompue"
+    )
     
     args = parser.parse_args()
     
@@ -148,7 +113,19 @@ if __name__ == "__main__":
     print()
     
     # Réanalyser les articles
-    result = reanalyze_articles(use_llm=args.use_llm)
+    result = reanalyze_articles(
+        use_llm=args.use_llm,
+        filters=ReanalysisFilters(
+            sources=tuple(args.source),
+            published_from=args.since,
+            published_to=args.until,
+            sentiment_models=tuple(args.model_version),
+            stale_only=args.stale_only,
+        ),
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        resume=not args.restart,
+    )
     
     print("\n" + "=" * 80)
     print("📊 RÉSULTATS")
@@ -157,6 +134,7 @@ if __name__ == "__main__":
     print(f"Articles mis à jour : {result['updated']}")
     print(f"Articles inchangés : {result['unchanged']}")
     print(f"Erreurs : {result['errors']}")
+    print(f"Durée : {result['elapsed_seconds']:.1f}s ({result['throughput']:.0f} articles/s, {result['model']})")
     
     # Recalculer le media_sentiment
     print("\n" + "=" * 80)
@@ -14,7 +14,8 @@ from sqlalchemy.orm import Session
 from app.models.database import SessionLocal
 from app.models.schemas import MediaArticle, IndexScore
 from app.services.component_calculator import ComponentCalculator
-from app.pipelines.ingestion.market_scraper import CasablancaMarketScraper
+from app.services.latest_snapshot import get_snapshot_store
+from app.services.market_data_store import get_market_data_store
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -34,8 +35,7 @@ def recalculate_index():
         logger.info(f"📰 Récupération de {len(recent_articles)} articles récents...")
         
         # Récupérer les données du marché
-        scraper = CasablancaMarketScraper()
-        historical_data = scraper.fetch_historical_data(days=252)
+        historical_data = get_market_data_store().get_history(days=252)
         
         logger.info(f"📊 Récupération de {len(historical_data)} points de données du marché...")
         
@@ -69,6 +69,12 @@ def recalculate_index():
         db.commit()
         
         logger.info("✅ Nouveau score sauvegardé dans la base de données")
+
+        # Instantané lu par les endpoints (/index/latest, /components/latest...)
+        try:
+            get_snapshot_store().publish_from_db(db)
+        except Exception as e:
+            logger.warning(f"⚠️ Publication de l'instantané impossible : {e}")
         
         return {
             "final_score": final_score,
@@ -0,0 +1,214 @@
+"""
+Tests unitaires pour le traitement des articles en flux
+"""
+from contextlib import nullcontext
+from datetime import datetime
+import asyncio
+
+import pytest
+
+from app.pipelines.article_stream import ArticleStream
+from app.pipelines.ingestion.media_scraper import MediaArticle
+
+
+WORDS = [
+    "bourse", "casablanca", "hausse", "baisse", "banque", "résultats", "inflation", "dirham",
+    "crédit", "croissance", "exportations", "phosphates", "tourisme", "immobilier", "énergie", "assurances",
+]
+
+
+def _title(source: str, i: int) -> str:
+    """Titres sans mots communs d'un article à l'autre (pas de quasi-doublons)"""
+    offset = i * 3 + sum(map(ord, source)) * 7
+    return f"{source} n°{i} : " + " ".join(f"{WORDS[(offset + k) % len(WORDS)]}{i}" for k in range(3))
+
+
+def _article(source: str, i: int, title: str = "") -> MediaArticle:
+    return MediaArticle(
+        title=title or _title(source, i),
+        summary="Résumé",
+        url=f"https://{source}.example.com/{i}",
+        source=source,
+        published_at=datetime(2024, 6, 10, 9, i),
+    )
+
+
+class FakeScraper:
+    """Sources à délais fixes, sans réseau"""
+
+    def __init__(self, delays, per_source=3, extra=None):
+        self.delays = delays
+        self.per_source = per_source
+        self.extra = extra or {}
+        self.fetched = []
+
+    def source_names(self):
+        return list(self.delays)
+
+    def _async_client(self):
+        return nullcontext(None)
+
+    async def scrape_source_async(self, source_name, max_articles=10, client=None):
+        await asyncio.sleep(self.delays[source_name])
+        if source_name == "broken":
+            raise RuntimeError("source indisponible")
+        articles = [_article(source_name, i) for i in range(min(self.per_source, max_articles))]
+        return articles + self.extra.get(source_name, [])
+
+    async def fetch_content_async(self, article, client):
+        await asyncio.sleep(0.01)
+        article.content = f"Contenu de {article.url}"
+        self.fetched.append(article.url)
+        return article
+
+
+class TestArticleStream:
+    """Tests pour ArticleStream"""
+
+    def setup_method(self):
+        self.scored_batches = []
+        self.saved_batches = []
+
+    async def score(self, batch):
+        self.scored_batches.append([article.url for article in batch])
+        for article in batch:
+            article.sentiment_score = 0.5
+        return batch
+
+    async def persist(self, batch):
+        self.saved_batches.append(list(batch))
+
+    def _stream(self, scraper, **kwargs) -> ArticleStream:
+        options = {"fetch_content": False, "queue_size": 4, "batch_size": 2, "linger_seconds": 0.01}
+        return ArticleStream(scraper, self.score, self.persist, **{**options, **kwargs})
+
+    @pytest.mark.asyncio
+    async def test_scores_before_slow_source_finishes(self):
+        scraper = FakeScraper({"fast": 0.0, "slow": 0.5})
+        result = await self._stream(scraper).run()
+
+        assert result.stats.first_scored_after < 0.3
+        assert result.stats.scraped == result.stats.saved == 6
+        assert len(result.articles) == 6
+        assert all(article.sentiment_score == 0.5 for article in result.articles)
+        assert result.stats.source_durations["slow"] >= 0.5
+
+    @pytest.mark.asyncio
+    async def test_duplicates_dropped(self):
+        copies = {
+            "other": [
+                _article("fast", 0),  # même URL
+                _article("other", 9, title=_title("fast", 1)),  # même titre
+            ],
+        }
+        result = await self._stream(FakeScraper({"fast": 0.0, "other": 0.05}, extra=copies)).run()
+
+        assert result.stats.duplicates == 2
+        assert result.stats.saved == 6
+        urls = [article.url for batch in self.saved_batches for article in batch]
+        assert len(urls) == len(set(urls))
+
+    @pytest.mark.asyncio
+    async def test_batches_bounded(self):
+        await self._stream(FakeScraper({"a": 0.0, "b": 0.0}, per_source=5), batch_size=3).run()
+
+        assert all(1 <= len(batch) <= 3 for batch in self.scored_batches)
+        assert all(1 <= len(batch) <= 3 for batch in self.saved_batches)
+        assert sum(len(batch) for batch in self.saved_batches) == 10
+
+    @pytest.mark.asyncio
+    async def test_backpressure_bounds_articles_in_flight(self):
+        produced = []
+
+        class CountingList(list):
+            """Compte les articles remis par l'étape de scraping"""
+            def __iter__(self):
+                for article in super().__iter__():
+                    produced.append(article)
+                    yield article
+
+        scraper = FakeScraper({"a": 0.0}, per_source=40)
+        original = scraper.scrape_source_async
+
+        async def scrape_source_async(source_name, max_articles=10, client=None):
+            return CountingList(await original(source_name, max_articles, client))
+
+        scraper.scrape_source_async = scrape_source_async
+        in_flight = []
+
+        async def slow_persist(batch):
+            await asyncio.sleep(0.005)
+            self.saved_batches.append(batch)
+            in_flight.append(len(produced) - sum(len(saved) for saved in self.saved_batches))
+
+        stream = self._stream(scraper, max_articles_per_source=40, queue_size=2, batch_size=2, linger_seconds=0.0)
+        stream.persist = slow_persist
+        result = await stream.run(sources=["a"])
+
+        assert result.stats.saved == 40
+        # Trois files de 2 et deux lots de 2, plus un article tenu par étape
+        assert max(in_flight) <= 3 * 2 + 2 * 2 + 4
+
+    @pytest.mark.asyncio
+    async def test_failing_source_skipped(self):
+        result = await self._stream(FakeScraper({"ok": 0.0, "broken": 0.0})).run()
+        assert result.stats.saved == 3
+
+    @pytest.mark.asyncio
+    async def test_persist_error_propagates(self):
+        async def failing_persist(batch):
+            raise RuntimeError("base indisponible")
+
+        stream = self._stream(FakeScraper({"a": 0.0, "b": 0.2}))
+        stream.persist = failing_persist
+        with pytest.raises(RuntimeError, match="base indisponible"):
+            await stream.run()
+
+    @pytest.mark.asyncio
+    async def test_failing_stage_cancels_others(self):
+        async def failing_persist(batch):
+            raise RuntimeError("base indisponible")
+
+        stream = self._stream(FakeScraper({"a": 0.0, "slow": 30.0}))
+        stream.persist = failing_persist
+        with pytest.raises(RuntimeError, match="base indisponible"):
+            # La source lente est annulée au lieu d'être attendue
+            await asyncio.wait_for(stream.run(), timeout=5)
+
+    @pytest.mark.asyncio
+    async def test_fetches_content(self):
+        scraper = FakeScraper({"a": 0.0, "b": 0.0})
+        await self._stream(scraper, fetch_content=True, content_concurrency=3).run()
+
+        saved = [article for batch in self.saved_batches for article in batch]
+        assert len(saved) == 6 == len(scraper.fetched)
+        assert all(article.content == f"Contenu de {article.url}" for article in saved)
+
+
+class TestPipelinePersistence:
+    """Tests pour la sauvegarde des lots par PipelineService"""
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_save_keeps_articles_for_components(self, monkeypatch):
+        from app.services.pipeline_service import PipelineService
+
+        service = PipelineService(use_llm_sentiment=False)
+
+        def failing_upsert(articles):
+            raise RuntimeError("no such table: media_articles")
+
+        monkeypatch.setattr(service, "_upsert_articles", failing_upsert)
+
+        async def score(batch):
+            for article in batch:
+                article.sentiment_score = 0.2
+            return batch
+
+        stream = ArticleStream(
+            FakeScraper({"a": 0.0, "b": 0.0}), score, service._persist_articles,
+            fetch_content=False, queue_size=4, batch_size=2, linger_seconds=0.01,
+        )
+        result = await stream.run()
+
+        assert len(result.articles) == 6
+        assert all(article.sentiment_score == 0.2 for article in result.articles)
@@ -0,0 +1,152 @@
+from datetime import date, datetime
+import json
+import pickle
+
+import pytest
+from pydantic import BaseModel
+
+from app.services.cache_codecs import (
+    CODEC_BYTES,
+    CODEC_ORJSON,
+    CODEC_PICKLE,
+    LZ4_AVAILABLE,
+    MAGIC,
+    MSGPACK_AVAILABLE,
+    ORJSON_AVAILABLE,
+    ZSTD_AVAILABLE,
+    CacheSerializer,
+)
+from app.services.cache_service import CacheEntry, CacheService
+
+
+class Score(BaseModel):
+    score: float
+    date: str
+
+
+class TestCacheSerializer:
+    """Test suite for the cache codec layer"""
+
+    @pytest.mark.skipif(not ORJSON_AVAILABLE, reason="orjson not installed")
+    def test_json_like_values_use_orjson(self):
+        serializer = CacheSerializer(codec="orjson")
+        value = {"data": [{"title": "MASI en hausse", "score": 0.4}], "count": 1, "ok": True, "none": None}
+
+        data = serializer.dumps(value)
+
+        assert data[0] == MAGIC
+        assert data[1:2] == CODEC_ORJSON
+        assert serializer.loads(data) == (value, None)
+        assert len(data) < len(pickle.dumps(value))
+
+    def test_non_json_values_fall_back_to_pickle(self):
+        serializer = CacheSerializer(codec="orjson")
+        value = {"as_of": datetime(2025, 6, 11, 16, 0), "days": {date(2025, 6, 11)}}
+
+        data = serializer.dumps(value)
+
+        assert data[1:2] == CODEC_PICKLE
+        assert serializer.loads(data)[0] == value
+
+    def test_pydantic_models_round_trip(self):
+        serializer = CacheSerializer(codec="orjson")
+        model = Score(score=42.5, date="2025-06-11")
+
+        data = serializer.dumps(model)
+
+        assert data[1:2] == CODEC_PICKLE
+        assert serializer.loads(data)[0] == model
+
+    @pytest.mark.parametrize("codec", ["orjson", "msgpack"])
+    @pytest.mark.parametrize("value", [
+        (1, 2),
+        {"a": (1, 2)},
+        [1.5, float("nan")],
+        {"inf": float("inf"), "ninf": float("-inf")},
+        {1: "clé entière"},
+        {"bornes": {"min": 0, "max": 2 ** 70}},
+        [True, {"models": [Score(score=1.0, date="2025-06-11")]}],
+    ], ids=["tuple", "nested-tuple", "nan", "inf", "int-key", "big-int", "nested-model"])
+    def test_values_json_cannot_represent_round_trip_exactly(self, codec, value):
+        serializer = CacheSerializer(codec=codec)
+
+        data = serializer.dumps(value)
+        decoded = serializer.loads(data)[0]
+
+        assert data[1:2] == CODEC_PICKLE
+        assert type(decoded) is type(value)
+        assert repr(decoded) == repr(value)
+
+    def test_bytes_are_stored_raw(self):
+        serializer = CacheSerializer(codec="orjson")
+        body = b'{"data":[]}'
+
+        data = serializer.dumps(body)
+
+        assert data[1:2] == CODEC_BYTES
+        assert data.endswith(body)
+        assert serializer.loads(data) == (body, None)
+
+    def test_freshness_header(self):
+        serializer = CacheSerializer(codec="orjson")
+
+        assert serializer.loads(serializer.dumps([1, 2], fresh_until=123.5)) == ([1, 2], 123.5)
+
+    def test_legacy_pickle_values_still_readable(self):
+        serializer = CacheSerializer(codec="orjson")
+
+        assert serializer.loads(pickle.dumps({"a": 1})) == ({"a": 1}, None)
+
+    @pytest.mark.parametrize("compression,available", [("zstd", ZSTD_AVAILABLE), ("lz4", LZ4_AVAILABLE)])
+    def test_compression_above_threshold(self, compression, available):
+        if not available:
+            pytest.skip(f"{compression} not installed")
+        serializer = CacheSerializer(codec="orjson", compression=compression, min_compress_bytes=100)
+        small = {"a": 1}
+        large = {"data": ["article " * 20] * 200}
+
+        assert serializer.dumps(small)[2:3] == b"-"
+        data = serializer.dumps(large)
+        assert data[2:3] != b"-"
+        assert len(data) < len(json.dumps(large))
+        assert serializer.loads(data)[0] == large
+
+    def test_missing_optional_codec_falls_back(self):
+        serializer = CacheSerializer(codec="msgpack", compression="zstd")
+
+        assert serializer.codec == ("msgpack" if MSGPACK_AVAILABLE else "pickle")
+        assert serializer.compression == ("zstd" if ZSTD_AVAILABLE else "none")
+        assert serializer.loads(serializer.dumps({"a": [1, 2]}))[0] == {"a": [1, 2]}
+
+    def test_unknown_codec(self):
+        with pytest.raises(ValueError):
+            CacheSerializer(codec="yaml")
+
+
+class TestPreSerializedResponses:
+    """Test suite for CacheService.aget_or_set_json"""
+
+    def setup_method(self):
+        self.cache = CacheService(redis_url=None)
+        self.calls = 0
+
+    @pytest.mark.asyncio
+    async def test_body_is_rendered_once(self):
+        async def build():
+            self.calls += 1
+            return {"data": [{"title": "Attijariwafa", "score": 0.25}], "count": 1}
+
+        first = await self.cache.aget_or_set_json("media:latest:20:0:none", build, ttl_seconds=60)
+        second = await self.cache.aget_or_set_json("media:latest:20:0:none", build, ttl_seconds=60)
+
+        assert isinstance(first, bytes)
+        assert first is second
+        assert json.loads(first) == {"data": [{"title": "Attijariwafa", "score": 0.25}], "count": 1}
+        assert self.calls == 1
+
+    def test_cache_entry_round_trip_through_redis_encoding(self):
+        encoded = self.cache._encode(CacheEntry(b'{"a":1}', 99.0))
+        decoded = self.cache._decode(encoded)
+
+        assert isinstance(decoded, CacheEntry)
+        assert (decoded.value, decoded.fresh_until) == (b'{"a":1}', 99.0)
@@ -0,0 +1,207 @@
+import asyncio
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.cache_service import CacheService
+
+
+class FakeRedis:
+    """Minimal in-process stand-in for the redis commands used by CacheService"""
+
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+        return True
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def flushdb(self):
+        self.data.clear()
+        return True
+
+    def set(self, key, value, nx=False, px=None):
+        with self.lock:
+            if nx and key in self.data:
+                return None
+            self.data[key] = value.encode() if isinstance(value, str) else value
+            return True
+
+    def eval(self, script, numkeys, key, token):
+        if self.data.get(key) == token.encode():
+            del self.data[key]
+            return 1
+        return 0
+
+
+class TestCacheServiceSingleFlight:
+    """Test suite for get_or_set request coalescing"""
+
+    def setup_method(self):
+        self.cache = CacheService(redis_url=None)
+        self.calls = 0
+        self.calls_lock = threading.Lock()
+
+    def _slow(self, value="fresh", delay=0.2):
+        def compute():
+            with self.calls_lock:
+                self.calls += 1
+            time.sleep(delay)
+            return value
+        return compute
+
+    def test_concurrent_misses_run_callable_once(self):
+        func = self._slow()
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            results = list(pool.map(lambda _: self.cache.get_or_set("hot", func, ttl_seconds=60), range(10)))
+
+        assert results == ["fresh"] * 10
+        assert self.calls == 1
+        assert len(self.cache._key_locks) == 0
+
+    def test_stale_value_served_while_refreshing(self):
+        self.cache.get_or_set("hot", lambda: "old", ttl_seconds=0, stale_ttl_seconds=60)
+        assert self.cache.get("hot") is None  # périmée pour une lecture simple
+
+        func = self._slow("new")
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(lambda _: self.cache.get_or_set("hot", func, ttl_seconds=60), range(5)))
+
+        assert results == ["old"] * 5
+        deadline = time.time() + 2
+        while self.cache.get("hot") != "new" and time.time() < deadline:
+            time.sleep(0.02)
+        assert self.cache.get("hot") == "new"
+        assert self.calls == 1
+
+    def test_failed_refresh_keeps_stale_value(self):
+        self.cache.get_or_set("hot", lambda: "old", ttl_seconds=0, stale_ttl_seconds=60)
+
+        def boom():
+            raise RuntimeError("source down")
+
+        assert self.cache.get_or_set("hot", boom) == "old"
+        deadline = time.time() + 2
+        while self.cache._refreshing and time.time() < deadline:
+            time.sleep(0.02)
+
+        # L'échec libère la réservation : un appel suivant peut relancer le rafraîchissement
+        assert not self.cache._refreshing
+        assert self.cache.get_or_set("hot", lambda: "new", ttl_seconds=60) == "old"
+
+    def test_waits_for_value_computed_by_another_worker(self):
+        redis = FakeRedis()
+        self.cache.redis_client = redis
+        self.cache.use_redis = True
+        redis.set("lock:hot", "other-worker")
+
+        def other_worker():
+            time.sleep(0.2)
+            redis.setex("hot", 60, pickle.dumps("from-other-worker"))
+
+        threading.Thread(target=other_worker).start()
+
+        assert self.cache.get_or_set("hot", self._slow("local")) == "from-other-worker"
+        assert self.calls == 0
+
+    def test_distributed_lock_released_after_compute(self):
+        redis = FakeRedis()
+        self.cache.redis_client = redis
+        self.cache.use_redis = True
+
+        assert self.cache.get_or_set("hot", lambda: 42) == 42
+        assert "lock:hot" not in redis.data
+
+    @pytest.mark.asyncio
+    async def test_async_concurrent_misses_share_one_call(self):
+        async def compute():
+            self.calls += 1
+            await asyncio.sleep(0.1)
+            return {"value": 1}
+
+        results = await asyncio.gather(*(self.cache.aget_or_set("hot", compute, ttl_seconds=60) for _ in range(20)))
+
+        assert all(r == {"value": 1} for r in results)
+        assert self.calls == 1
+        assert self.cache._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_async_redis_calls_leave_the_event_loop(self):
+        loop_thread = threading.get_ident()
+        redis_threads = []
+
+        class BlockingRedis(FakeRedis):
+            def get(self, key):
+                redis_threads.append(threading.get_ident())
+                time.sleep(0.05)
+                return super().get(key)
+
+        redis = BlockingRedis()
+        self.cache.redis_client = redis
+        self.cache.use_redis = True
+        self.cache.l1_enabled = False
+        redis.set("lock:hot", "other-worker")
+
+        def other_worker():
+            time.sleep(0.2)
+            redis.setex("hot", 60, self.cache._encode(42))
+
+        threading.Thread(target=other_worker).start()
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while ticks < 100:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        ticking = asyncio.create_task(ticker())
+        assert await self.cache.aget_or_set("hot", lambda: "local") == 42
+        ticking.cancel()
+
+        assert redis_threads and loop_thread not in redis_threads
+        # La boucle a continué de tourner pendant l'attente du verrou
+        assert ticks >= 20
+
+    @pytest.mark.asyncio
+    async def test_async_accepts_sync_callable_and_serves_stale(self):
+        await self.cache.aget_or_set("hot", lambda: "old", ttl_seconds=0, stale_ttl_seconds=60)
+
+        assert await self.cache.aget_or_set("hot", self._slow("new", delay=0.05), ttl_seconds=60) == "old"
+        await asyncio.gather(*self.cache._background_tasks)
+        assert await self.cache.aget_or_set("hot", self._slow("newer"), ttl_seconds=60) == "new"
+        assert self.calls == 1
+
+
+class TestCacheServiceL1Invalidation:
+    """Test suite for delete/clear with the L1 in front of Redis"""
+
+    def setup_method(self):
+        self.cache = CacheService(redis_url=None)
+        self.cache.redis_client = FakeRedis()
+        self.cache.use_redis = True
+        self.cache.l1_enabled = True
+
+    def test_delete_then_get(self):
+        self.cache.set("snapshot:latest:current", "v1", ttl_seconds=60)
+        assert self.cache.get("snapshot:latest:current") == "v1"  # copie L1
+
+        assert self.cache.delete("snapshot:latest:current")
+        assert self.cache.get("snapshot:latest:current") is None
+
+    def test_clear_then_get(self):
+        self.cache.set("media:latest", [1, 2], ttl_seconds=60)
+        assert self.cache.get("media:latest") == [1, 2]
+
+        self.cache.clear()
+        assert self.cache.get("media:latest") is None
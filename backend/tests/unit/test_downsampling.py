@@ -0,0 +1,37 @@
+"""
+Tests unitaires pour la réduction de séries (LTTB)
+"""
+from datetime import datetime, timedelta
+import math
+
+from app.utils.downsampling import lttb
+
+
+class TestLttb:
+    """Tests pour Largest-Triangle-Three-Buckets"""
+
+    def setup_method(self):
+        start = datetime(2024, 1, 1)
+        self.series = [
+            (start + timedelta(minutes=10 * i), 50.0 + 20.0 * math.sin(i / 50.0))
+            for i in range(1000)
+        ]
+
+    def test_point_budget(self):
+        sampled = lttb(self.series, 100)
+        assert len(sampled) == 100
+        assert sampled[0] == self.series[0]
+        assert sampled[-1] == self.series[-1]
+        # Points d'origine, en ordre chronologique
+        assert all(point in self.series for point in sampled)
+        assert [as_of for as_of, _ in sampled] == sorted(as_of for as_of, _ in sampled)
+
+    def test_keeps_extremes(self):
+        spike = list(self.series)
+        spike[437] = (spike[437][0], 99.0)
+        assert spike[437] in lttb(spike, 50)
+
+    def test_short_series_unchanged(self):
+        assert lttb(self.series[:10], 100) == self.series[:10]
+        assert lttb(self.series[:10], 2) == self.series[:10]
+        assert lttb([], 10) == []
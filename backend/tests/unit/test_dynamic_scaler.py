@@ -0,0 +1,98 @@
+from datetime import date, datetime, timedelta
+import statistics
+
+import numpy as np
+import pytest
+from sklearn.preprocessing import MinMaxScaler
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.models.schemas import Base, IndexScore
+from app.services import dynamic_scaler
+from app.services.dynamic_scaler import DynamicScalerService, invalidate_window_stats_cache
+
+
+COMPONENTS = ["momentum", "price_strength", "volume", "volatility", "equity_vs_bonds", "media_sentiment"]
+
+
+class TestDynamicScalerService:
+    """Test suite for the batched dynamic scaler"""
+
+    def setup_method(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.queries = 0
+
+        @event.listens_for(self.engine, "before_cursor_execute")
+        def count_queries(*args):
+            self.queries += 1
+
+        self.today = date(2025, 6, 30)
+        with self.Session() as db:
+            for i in range(1, 40):
+                values = {name: 20 + ((i * (k + 3)) % 17) * 3.5 for k, name in enumerate(COMPONENTS)}
+                db.add(IndexScore(as_of=datetime.combine(self.today - timedelta(days=i), datetime.min.time()), score=50, **values))
+            db.commit()
+        invalidate_window_stats_cache()
+
+    @pytest.fixture(autouse=True)
+    def _patch_session(self, monkeypatch):
+        monkeypatch.setattr(dynamic_scaler, "SessionLocal", self.Session)
+
+    def _reference(self, name, value):
+        with self.Session() as db:
+            rows = db.query(getattr(IndexScore, name)).filter(
+                IndexScore.as_of >= self.today - timedelta(days=90),
+                IndexScore.as_of <= self.today,
+            ).all()
+        history = [float(v) for (v,) in rows]
+        scaler = MinMaxScaler(feature_range=(0.0, 100.0)).fit(np.array(history).reshape(-1, 1))
+        return float(scaler.transform([[value]])[0][0]), statistics.mean(history)
+
+    def test_matches_min_max_scaler(self):
+        """Arithmetic scaling equals sklearn's MinMaxScaler, including out-of-range values"""
+        scaler = DynamicScalerService(window_days=90, use_cache=False)
+        raw = {name: 10.0 + 15 * k for k, name in enumerate(COMPONENTS)}
+
+        normalized = scaler.normalize_all_components(raw, self.today)
+
+        for name, value in raw.items():
+            expected, mean = self._reference(name, value)
+            assert normalized[name] == pytest.approx(expected, abs=1e-9)
+            result = scaler.normalize_component(name, value, self.today)
+            assert result.window_mean == pytest.approx(mean)
+
+    def test_single_query_for_all_components(self):
+        """All six components are normalized with one aggregate query"""
+        scaler = DynamicScalerService(window_days=90, use_cache=False)
+        self.queries = 0
+
+        scaler.normalize_all_components({name: 50.0 for name in COMPONENTS}, self.today)
+
+        assert self.queries == 1
+
+    def test_cache_invalidated_on_new_index_score(self):
+        """Window stats are cached until an IndexScore is written"""
+        scaler = DynamicScalerService(window_days=90)
+        before = scaler.normalize_all_components({"momentum": 50.0}, self.today)
+        self.queries = 0
+        assert scaler.normalize_all_components({"momentum": 50.0}, self.today) == before
+        assert self.queries == 0
+
+        with self.Session() as db:
+            db.add(IndexScore(
+                as_of=datetime.combine(self.today - timedelta(days=1), datetime.min.time()),
+                score=50,
+                **{name: 500.0 for name in COMPONENTS},
+            ))
+            db.commit()
+
+        after = scaler.normalize_all_components({"momentum": 50.0}, self.today)
+        assert after != before
+
+    def test_not_enough_history_returns_raw_value(self):
+        """Without at least two points the raw value is returned"""
+        scaler = DynamicScalerService(window_days=90, use_cache=False)
+
+        assert scaler.normalize_all_components({"momentum": 73.0}, date(2000, 1, 1)) == {"momentum": 73.0}
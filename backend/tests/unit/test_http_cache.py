@@ -0,0 +1,163 @@
+"""
+Tests unitaires pour le cache HTTP des scrapers (requêtes conditionnelles)
+"""
+import os
+import time
+
+import httpx
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from app.core.config import settings
+from app.utils.http_cache import CacheEntry, FreshnessPolicy, HttpCache, cached_get, cached_get_async
+
+
+URL = "https://www.medias24.com/economie/"
+
+
+def _response(status_code: int, content: bytes = b"", headers=None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers or {})
+    response._content = content
+    response.url = URL
+    return response
+
+
+class FakeSession:
+    """Session requests : réponses préparées, en-têtes envoyés enregistrés"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent_headers = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.sent_headers.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+
+class TestCachedGet:
+    """Tests pour cached_get"""
+
+    @pytest.fixture(autouse=True)
+    def cache(self, tmp_path):
+        self.cache = HttpCache(directory=tmp_path / "http_cache")
+        self.revalidate = FreshnessPolicy(rules={}, default_seconds=0)
+
+    def _get(self, session, policy=None, **kwargs):
+        return cached_get(session, URL, cache=self.cache, policy=policy or self.revalidate, **kwargs)
+
+    def test_not_modified_serves_cached_body(self):
+        page = "<html>Économie</html>".encode("utf-8")
+        session = FakeSession(
+            _response(200, page, {"ETag": '"v1"', "Last-Modified": "Mon, 10 Jun 2024 09:00:00 GMT",
+                                  "Content-Type": "text/html; charset=utf-8"}),
+            _response(304, headers={"ETag": '"v1"'}),
+        )
+        first = self._get(session)
+        second = self._get(session)
+
+        assert session.sent_headers[0] == {}
+        assert session.sent_headers[1] == {
+            "If-None-Match": '"v1"', "If-Modified-Since": "Mon, 10 Jun 2024 09:00:00 GMT",
+        }
+        assert first.content == second.content == page
+        assert second.status_code == 200 and second.from_cache
+        assert second.text == "<html>Économie</html>"
+        second.raise_for_status()
+        assert (self.cache.stats.downloaded, self.cache.stats.not_modified) == (1, 1)
+
+    def test_changed_page_replaces_entry(self):
+        session = FakeSession(_response(200, b"v1", {"ETag": '"v1"'}), _response(200, b"v2", {"ETag": '"v2"'}))
+        self._get(session)
+        assert self._get(session).content == b"v2"
+        assert self.cache.get(URL).etag == '"v2"'
+
+    def test_fresh_entry_served_without_request(self):
+        calls = []
+        session = FakeSession(_response(200, b"page"))
+        policy = FreshnessPolicy(rules={"medias24.com": 300})
+        self._get(session, policy, before_request=lambda: calls.append(1))
+        response = self._get(session, policy, before_request=lambda: calls.append(1))
+
+        assert response.content == b"page"
+        assert len(session.sent_headers) == 1 and len(calls) == 1
+        assert self.cache.stats.fresh == 1
+
+    def test_errors_and_no_store_not_cached(self):
+        session = FakeSession(_response(403, b"forbidden"), _response(200, b"page", {"Cache-Control": "no-store"}))
+        assert self._get(session).status_code == 403
+        self._get(session)
+        assert self.cache.get(URL) is None
+
+    def test_disabled(self, monkeypatch):
+        monkeypatch.setattr(settings, "http_cache_enabled", False)
+        session = FakeSession(_response(200, b"page", {"ETag": '"v1"'}), _response(200, b"page", {"ETag": '"v1"'}))
+        self._get(session)
+        self._get(session)
+        assert session.sent_headers == [{}, {}]
+        assert self.cache.get(URL) is None
+
+
+class TestFreshnessPolicy:
+    """Tests pour FreshnessPolicy"""
+
+    def test_rules(self):
+        policy = FreshnessPolicy(rules={"medias24.com": 300, "casablanca-bourse.com": 0}, default_seconds=60)
+        assert policy.fresh_for(CacheEntry(URL, {}, b"")) == 300
+        assert policy.fresh_for(CacheEntry("https://medias24.com/", {}, b"")) == 300
+        assert policy.fresh_for(CacheEntry("https://www.casablanca-bourse.com/", {"Cache-Control": "max-age=600"}, b"")) == 0
+        assert policy.fresh_for(CacheEntry("https://notmedias24.com/", {}, b"")) == 60
+        assert policy.fresh_for(CacheEntry("https://challenge.ma/", {"Cache-Control": "public, max-age=120"}, b"")) == 120
+
+        stale = CacheEntry(URL, {}, b"", validated_at=time.time() - 301)
+        assert not policy.is_fresh(stale)
+
+
+class TestHttpCache:
+    """Tests pour le stockage disque"""
+
+    def test_roundtrip_and_prune(self, tmp_path):
+        cache = HttpCache(directory=tmp_path, max_bytes=2500)
+        for i in range(5):
+            cache.put(CacheEntry(f"https://a.ma/{i}", {"ETag": f'"{i}"'}, bytes(1000), encoding="utf-8"))
+            path = cache._path(f"https://a.ma/{i}")
+            os.utime(path, (i, i))
+
+        entry = cache.get("https://a.ma/4")
+        assert entry.etag == '"4"' and entry.content == bytes(1000) and entry.encoding == "utf-8"
+        assert cache.prune() == 3
+        assert cache.get("https://a.ma/0") is None
+        assert cache.get("https://a.ma/4") is not None
+
+    def test_unreadable_entry_ignored(self, tmp_path):
+        cache = HttpCache(directory=tmp_path)
+        cache.directory.mkdir(exist_ok=True)
+        cache._path(URL).write_bytes(b"not json\n")
+        assert cache.get(URL) is None
+
+
+class TestCachedGetAsync:
+    """Tests pour cached_get_async (httpx)"""
+
+    @pytest.mark.asyncio
+    async def test_not_modified(self, tmp_path):
+        sent = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            sent.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, content=b"page", headers={"ETag": '"v1"'})
+
+        cache = HttpCache(directory=tmp_path)
+        policy = FreshnessPolicy(rules={}, default_seconds=0)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            first = await cached_get_async(client, URL, cache=cache, policy=policy)
+            second = await cached_get_async(client, URL, cache=cache, policy=policy)
+
+        assert sent == [None, '"v1"']
+        assert first.content == second.content == b"page"
+        second.raise_for_status()
+        assert second.extensions["from_cache"]
@@ -0,0 +1,203 @@
+"""
+Tests unitaires pour l'instantané des dernières valeurs et les réponses conditionnelles (ETag)
+"""
+from dataclasses import FrozenInstanceError
+from datetime import datetime
+import json
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.api.conditional import snapshot_response
+from app.models.schemas import IndexScore, MediaArticle
+from app.services.cache_service import CacheService
+from app.services import latest_snapshot
+from app.services.latest_snapshot import LatestSnapshot, SnapshotStore
+
+
+class FakeRedis:
+    """Redis partagé entre deux CacheService (deux workers)"""
+
+    def __init__(self):
+        self.data = {}
+        self.threads = set()
+
+    def get(self, key):
+        self.threads.add(threading.get_ident())
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.threads.add(threading.get_ident())
+        self.data[key] = value
+        return True
+
+
+def _score(score: float) -> IndexScore:
+    return IndexScore(
+        as_of=datetime(2024, 6, 10, 16, 0), score=score, momentum=40.0, price_strength=55.0,
+        volume=60.0, volatility=45.0, equity_vs_bonds=50.0, media_sentiment=65.0,
+    )
+
+
+def _articles():
+    return [
+        MediaArticle(id=1, title="a", url="u1", source="Hespress", published_at=datetime(2024, 6, 10, 9, 0),
+                     sentiment_score=0.4, sentiment_label="positive"),
+    ]
+
+
+def _cache(redis=None) -> CacheService:
+    cache = CacheService()
+    if redis is not None:
+        cache.redis_client = redis
+        cache.use_redis = True
+        cache.l1_enabled = False
+    return cache
+
+
+class TestLatestSnapshot:
+    """Tests pour LatestSnapshot et SnapshotStore"""
+
+    def test_version_is_content_hash(self):
+        first = LatestSnapshot.build(_score(62.0), _articles())
+        again = LatestSnapshot.build(_score(62.0), _articles())
+        changed = LatestSnapshot.build(_score(63.0), _articles())
+
+        assert first.version == again.version
+        assert first.version != changed.version
+        assert first.etag == f'"{first.version}"'
+        assert first.components["media_sentiment"] == 65.0
+        assert first.articles[0]["url"] == "u1"
+
+    def test_immutable(self):
+        snapshot = LatestSnapshot.build(_score(62.0), _articles())
+        with pytest.raises(FrozenInstanceError):
+            snapshot.score = 10.0
+        with pytest.raises(TypeError):
+            snapshot.components["momentum"] = 0.0
+
+    def test_empty_database(self):
+        snapshot = LatestSnapshot.build(None, [])
+        assert snapshot.as_of is None and snapshot.score is None
+        assert LatestSnapshot.from_dict(snapshot.to_dict()).version == snapshot.version
+
+    def test_other_worker_sees_published_version(self):
+        redis = FakeRedis()
+        publisher = SnapshotStore(cache=_cache(redis))
+        reader = SnapshotStore(cache=_cache(redis))
+        assert reader.current() is None
+
+        published = publisher.publish(LatestSnapshot.build(_score(62.0), _articles()))
+        seen = reader.current()
+        assert seen.version == published.version
+        assert seen.to_dict() == published.to_dict()
+        # Copie locale réutilisée tant que la version ne change pas
+        assert reader.current() is seen
+
+        newer = publisher.publish(LatestSnapshot.build(_score(70.0), _articles()))
+        assert reader.current().version == newer.version
+
+    def test_expired_or_old_copy_needs_rebuild(self):
+        redis = FakeRedis()
+        store = SnapshotStore(cache=_cache(redis), max_age_seconds=60)
+        published = store.publish(LatestSnapshot.build(_score(62.0), _articles()))
+        assert store.current() is published
+
+        # Score écrit en base sans publication : la copie n'est plus servie après max_age
+        store._confirmed_at = time.time() - 61
+        assert store.current() is None
+
+        # Clé de version expirée
+        store._confirmed_at = time.time()
+        del redis.data["snapshot:latest:current"]
+        assert store.current() is None
+
+    def test_old_shared_snapshot_not_adopted(self):
+        redis = FakeRedis()
+        publisher = SnapshotStore(cache=_cache(redis))
+        snapshot = LatestSnapshot.build(_score(62.0), _articles())
+        old = LatestSnapshot.from_dict({**snapshot.to_dict(), "published_at": datetime(2024, 6, 10).isoformat()})
+        publisher.publish(old)
+
+        assert SnapshotStore(cache=_cache(redis), max_age_seconds=60).current() is None
+
+    @pytest.mark.asyncio
+    async def test_async_reads_do_not_call_redis_on_event_loop(self, monkeypatch):
+        redis = FakeRedis()
+        store = SnapshotStore(cache=_cache(redis))
+
+        class Session:
+            async def __aenter__(self):
+                return None
+
+            async def __aexit__(self, *exc_info):
+                return False
+
+        async def get_latest(db):
+            return _score(62.0)
+
+        async def list_latest(db, limit):
+            return _articles()
+
+        monkeypatch.setattr(latest_snapshot, "AsyncSessionLocal", Session)
+        monkeypatch.setattr(latest_snapshot.index_scores, "get_latest", get_latest)
+        monkeypatch.setattr(latest_snapshot.media_articles, "list_latest", list_latest)
+
+        # Rien de publié : reconstruit depuis la base puis publié
+        built = await store.aget()
+        assert built.score == 62.0
+        # Publié : servi par la copie locale après lecture de la version
+        assert await store.aget() is built
+        # Contenu inchangé : copie reconfirmée
+        assert await store.refresh() is built
+
+        assert redis.threads
+        assert threading.get_ident() not in redis.threads
+
+    def test_body_rendered_once_per_version(self):
+        snapshot = LatestSnapshot.build(_score(62.0), _articles())
+        calls = []
+
+        def render(value):
+            calls.append(value)
+            return {"score": value.score}
+
+        body = snapshot.body("score", render)
+        assert json.loads(body) == {"score": 62.0}
+        assert snapshot.body("score", render) is body
+        assert len(calls) == 1
+
+
+class TestSnapshotResponse:
+    """Tests pour les réponses conditionnelles (If-None-Match)"""
+
+    def setup_method(self):
+        self.snapshot = LatestSnapshot.build(_score(62.0), _articles())
+        app = FastAPI()
+
+        @app.get("/latest")
+        async def latest(request: Request):
+            return snapshot_response(request, self.snapshot, "latest", lambda s: {"score": s.score})
+
+        self.client = TestClient(app)
+
+    def test_etag_and_not_modified(self):
+        response = self.client.get("/latest")
+        assert response.status_code == 200
+        assert response.json() == {"score": 62.0}
+        etag = response.headers["etag"]
+        assert etag == self.snapshot.etag
+
+        for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+            not_modified = self.client.get("/latest", headers={"If-None-Match": header})
+            assert not_modified.status_code == 304
+            assert not_modified.content == b""
+            assert not_modified.headers["etag"] == etag
+
+    def test_stale_etag_gets_new_body(self):
+        response = self.client.get("/latest", headers={"If-None-Match": '"0000000000000000"'})
+        assert response.status_code == 200
+        assert response.json() == {"score": 62.0}
@@ -0,0 +1,201 @@
+import asyncio
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services.llm_batch_engine import LLMBatchEngine, TokenBucket, split_packed_response
+from app.services.llm_sentiment_service import LLMSentimentAnalyzer
+
+
+class FakeOpenAIServer:
+    """Minimal OpenAI-compatible chat completions server running in a thread"""
+
+    def __init__(self, delay: float = 0.1):
+        self.delay = delay
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with fake._lock:
+                    fake.requests += 1
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                time.sleep(fake.delay)
+                with fake._lock:
+                    fake.in_flight -= 1
+
+                content = fake.answer(body["messages"][-1]["content"])
+                payload = json.dumps({
+                    "id": "chatcmpl-test",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": body["model"],
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/v1"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @staticmethod
+    def _block(text: str) -> str:
+        score = 0.6 if "hausse" in text else -0.4
+        return f"SCORE: {score}\nLABEL: Test\nCONFIDENCE: 0.9\nREASONING: {text[:20]}"
+
+    def answer(self, prompt: str) -> str:
+        items = re.findall(r'^\[(\d+)\] "(.*?)"$', prompt, re.MULTILINE | re.DOTALL)
+        if not items:
+            return self._block(prompt)
+        # Les articles marqués OMIT sont volontairement absents de la réponse groupée
+        return "\n\n".join(
+            f"[{number}]\n{self._block(text)}" for number, text in items if "OMIT" not in text
+        )
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _articles(count: int):
+    return [
+        {"id": i, "title": f"Le MASI en {'hausse' if i % 2 else 'baisse'} séance {i}", "summary": ""}
+        for i in range(count)
+    ]
+
+
+class TestLLMBatchEngine:
+    """Test suite for the async LLM batch engine against a fake server"""
+
+    def setup_method(self):
+        self.analyzer = LLMSentimentAnalyzer(api_key="test-key", model="fake-model")
+
+    def _engine(self, server, **kwargs) -> LLMBatchEngine:
+        options = dict(max_concurrency=4, requests_per_minute=6000, pack_size=4, base_url=server.base_url)
+        options.update(kwargs)
+        return LLMBatchEngine(self.analyzer, **options)
+
+    @pytest.mark.asyncio
+    async def test_headlines_are_packed_and_parsed_back(self):
+        """Short headlines share prompts and keep per-article results in order"""
+        with FakeOpenAIServer() as server:
+            engine = self._engine(server)
+            results = await engine.analyze(_articles(12))
+            await engine.aclose()
+
+        assert server.requests == 3
+        assert [r.article_id for r in results] == list(range(12))
+        assert [r.sentiment_score for r in results] == [0.6 if i % 2 else -0.4 for i in range(12)]
+        assert all(r.confidence == 0.9 for r in results)
+
+    @pytest.mark.asyncio
+    async def test_missing_items_are_retried_individually(self):
+        """Articles missing from a packed answer get their own request"""
+        articles = _articles(4)
+        articles[2]["title"] = "OMIT hausse du MASI"
+
+        with FakeOpenAIServer() as server:
+            engine = self._engine(server)
+            results = await engine.analyze(articles)
+            await engine.aclose()
+
+        assert server.requests == 2
+        assert results[2].sentiment_score == 0.6
+        assert results[2].confidence == 0.9
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit_is_respected(self):
+        """No more than max_concurrency requests are in flight"""
+        with FakeOpenAIServer(delay=0.2) as server:
+            engine = self._engine(server, pack_size=1, max_concurrency=3)
+            start = time.perf_counter()
+            results = await engine.analyze(_articles(9))
+            elapsed = time.perf_counter() - start
+            await engine.aclose()
+
+        assert len(results) == 9
+        assert server.requests == 9
+        assert server.max_in_flight <= 3
+        assert elapsed < 9 * 0.2
+
+    def test_client_of_previous_loop_is_closed(self):
+        """A new event loop gets its own client; the previous one is closed"""
+        with FakeOpenAIServer() as server:
+            engine = self._engine(server)
+            asyncio.run(engine.analyze(_articles(4)))
+            first = engine._resources.client
+            asyncio.run(engine.analyze(_articles(4)))
+
+        assert engine._resources.client is not first
+        assert first.is_closed()
+        assert engine._stale_clients == []
+
+    def test_sync_batch_uses_engine(self, monkeypatch):
+        """The synchronous batch API runs the async engine when no loop is running"""
+        with FakeOpenAIServer() as server:
+            monkeypatch.setattr(self.analyzer, "_batch_engine", self._engine(server))
+            results = self.analyzer.analyze_articles_batch(_articles(8))
+
+        assert server.requests == 2
+        assert len(results) == 8
+
+
+class TestTokenBucket:
+    """Test suite for the async token bucket"""
+
+    @pytest.mark.asyncio
+    async def test_bucket_limits_rate(self):
+        """Tokens beyond the burst capacity are released at the configured rate"""
+        bucket = TokenBucket(rate_per_minute=600, capacity=2)  # 10 tokens/s
+
+        start = time.perf_counter()
+        for _ in range(5):
+            await bucket.acquire()
+        elapsed = time.perf_counter() - start
+
+        assert elapsed == pytest.approx(0.3, abs=0.1)
+
+    @pytest.mark.asyncio
+    async def test_waiters_do_not_hold_the_lock(self):
+        """A waiting caller sleeps outside the lock, so other callers are not serialized behind it"""
+        bucket = TokenBucket(rate_per_minute=600, capacity=1)
+        await bucket.acquire()
+
+        waiter = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0.01)
+        assert not bucket._lock.locked()
+        await waiter
+
+
+def test_split_packed_response_ignores_unknown_blocks():
+    """Blocks without a score or outside the expected range are dropped"""
+    content = "[1]\nSCORE: 0.5\nLABEL: Positive\n\n[2]\nnothing here\n\n[7]\nSCORE: 0.1"
+    blocks = split_packed_response(content, expected=3)
+
+    assert list(blocks) == [1]
+    assert blocks[1].startswith("SCORE: 0.5")
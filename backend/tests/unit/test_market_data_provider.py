@@ -0,0 +1,105 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+import threading
+
+import pytest
+
+from app.pipelines.ingestion.market_scraper import MASIHistoricalData
+from app.services.market_data_provider import MarketDataProvider, market_data_expiry
+
+
+OPEN = time(9, 30)
+CLOSE = time(15, 30)
+
+
+class SlowStore:
+    """Store stub counting range reads"""
+
+    def __init__(self, today: date, delay: float = 0.2):
+        self.today = today
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get_history(self, days=None, start=None, end=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+        threading.Event().wait(self.delay)
+        day = start
+        bars = []
+        while day <= self.today:
+            bars.append(MASIHistoricalData(day, 100.0, 101.0, 99.0, 100.0 + day.toordinal() % 7, 1000))
+            day += timedelta(days=1)
+        return [bar for bar in bars if end is None or bar.date <= end]
+
+
+class TestMarketDataExpiry:
+    """Test suite for the trading-hours aligned TTL"""
+
+    def test_during_session_uses_short_ttl(self):
+        now = datetime(2025, 6, 11, 11, 0)  # mercredi
+        assert market_data_expiry(now, OPEN, CLOSE, 300) == now + timedelta(seconds=300)
+
+    def test_ttl_capped_at_close(self):
+        now = datetime(2025, 6, 11, 15, 28)
+        assert market_data_expiry(now, OPEN, CLOSE, 300) == datetime(2025, 6, 11, 15, 30)
+
+    def test_before_open_waits_until_open(self):
+        now = datetime(2025, 6, 11, 7, 0)
+        assert market_data_expiry(now, OPEN, CLOSE, 300) == datetime(2025, 6, 11, 9, 30)
+
+    def test_friday_evening_lasts_until_monday_open(self):
+        now = datetime(2025, 6, 13, 18, 0)  # vendredi
+        assert market_data_expiry(now, OPEN, CLOSE, 300) == datetime(2025, 6, 16, 9, 30)
+
+
+class TestMarketDataProvider:
+    """Test suite for MarketDataProvider"""
+
+    def setup_method(self):
+        self.now = datetime(2025, 6, 11, 11, 0)
+        self.store = SlowStore(self.now.date())
+        self.provider = MarketDataProvider(store=self.store, history_days=60, clock=lambda: self.now)
+
+    def test_concurrent_requests_share_one_load(self):
+        """N concurrent callers trigger a single store read"""
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda d: self.provider.get_history(days=d), [5, 10, 20, 30] * 4))
+
+        assert self.store.calls == 1
+        assert [len(r) for r in results[:4]] == [5, 10, 20, 30]
+
+    @pytest.mark.asyncio
+    async def test_async_requests_share_one_load(self):
+        import asyncio
+
+        results = await asyncio.gather(*(self.provider.get_history_async(days=20) for _ in range(10)))
+
+        assert self.store.calls == 1
+        assert all(r == results[0] for r in results)
+
+    def test_windows_are_sliced_from_canonical_series(self):
+        full = self.provider.get_history()
+        assert len(full) == 60
+
+        assert self.provider.get_history(days=5) == full[-5:]
+        window = self.provider.get_history(start=date(2025, 6, 1), end=date(2025, 6, 5))
+        assert [bar.date for bar in window] == [date(2025, 6, d) for d in range(1, 6)]
+        assert self.store.calls == 1
+
+    def test_reloads_after_expiry_and_invalidate(self):
+        self.provider.get_history(days=5)
+        self.now += timedelta(seconds=301)
+        self.provider.get_history(days=5)
+        assert self.store.calls == 2
+
+        self.provider.invalidate()
+        self.provider.get_history(days=5)
+        assert self.store.calls == 3
+
+    def test_window_older_than_series_reads_store(self):
+        self.provider.get_history(days=5)
+        bars = self.provider.get_history(start=date(2025, 1, 1))
+
+        assert bars[0].date == date(2025, 1, 1)
+        assert self.store.calls == 2
@@ -0,0 +1,143 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.models.schemas import MarketBar
+from app.pipelines.ingestion.market_scraper import MarketSnapshot, MASIHistoricalData
+from app.services.market_data_store import MarketDataStore
+
+
+def _bar(day: date, close: float = 12000.0) -> MASIHistoricalData:
+    return MASIHistoricalData(
+        date=day,
+        open_price=close - 10,
+        high_price=close + 20,
+        low_price=close - 30,
+        close_price=close,
+        volume=1_000_000,
+    )
+
+
+class FakeScraper:
+    """Historical source recording every requested start date"""
+
+    def __init__(self):
+        self.calls = []
+
+    def fetch_historical_since(self, start_date: date):
+        self.calls.append(start_date)
+        today = date.today()
+        days = (today - start_date).days
+        return [_bar(start_date + timedelta(days=i), 12000.0 + i) for i in range(days + 1)]
+
+    def fetch_historical_data(self, days: int = 30):
+        return self.fetch_historical_since(date.today() - timedelta(days=days - 1))
+
+
+class TestMarketDataStore:
+    """Test suite for MarketDataStore"""
+
+    def setup_method(self):
+        self.engine = create_engine("sqlite://")
+        MarketBar.__table__.create(self.engine)
+        self.scraper = FakeScraper()
+        self.store = MarketDataStore(scraper=self.scraper, session_factory=sessionmaker(bind=self.engine))
+        self.today = date.today()
+
+    def test_first_read_backfills_requested_days(self):
+        """The first read fills the store, later reads are served from it"""
+        bars = self.store.get_history(days=30)
+
+        assert len(bars) == 30
+        assert bars[0].date == self.today - timedelta(days=29)
+        assert bars[-1].date == self.today
+        assert [b.date for b in bars] == sorted(b.date for b in bars)
+
+        calls = len(self.scraper.calls)
+        assert self.store.get_history(days=20) == bars[-20:]
+        assert len(self.scraper.calls) == calls
+
+    def test_sync_only_fetches_bars_after_last_date(self):
+        """Incremental sync starts from the last stored date"""
+        last = self.today - timedelta(days=3)
+        self.store.upsert_bars("MASI", [_bar(last - timedelta(days=i)) for i in range(10)])
+
+        written = self.store.sync()
+
+        assert self.scraper.calls == [last]
+        assert written == 4
+        assert self.store.last_date() == self.today
+        assert self.store.sync() == 0
+        assert self.scraper.calls == [last]
+
+    def test_sync_refreshes_current_session_after_ttl(self):
+        """During the session, today's partial bar is re-fetched once the TTL has elapsed"""
+        clock = [datetime.combine(self.today, datetime.min.time()).replace(hour=11)]
+        while clock[0].weekday() >= 5:
+            clock[0] -= timedelta(days=1)
+        store = MarketDataStore(scraper=self.scraper, session_factory=sessionmaker(bind=self.engine), clock=lambda: clock[0])
+        store.ttl_seconds = 300
+        store.upsert_bars("MASI", [_bar(self.today - timedelta(days=1))])
+
+        store.sync()
+        assert store.sync() == 0
+        clock[0] += timedelta(seconds=301)
+        assert store.sync() == 1
+
+        assert self.scraper.calls == [self.today - timedelta(days=1), self.today]
+
+    def test_missing_table_falls_back_to_scraper(self):
+        """Without the market_bars table (database not migrated), history comes from the source"""
+        store = MarketDataStore(scraper=self.scraper, session_factory=sessionmaker(bind=create_engine("sqlite://")))
+
+        bars = store.get_history(days=10)
+
+        assert len(bars) == 10
+        assert bars[-1].date == self.today
+        assert store.get_history(days=5, symbol="ATW") == []
+
+    def test_range_query(self):
+        """start/end select an inclusive date range"""
+        self.store.upsert_bars("MASI", [_bar(self.today - timedelta(days=i), 100.0 + i) for i in range(15)])
+
+        bars = self.store.get_history(start=self.today - timedelta(days=9), end=self.today - timedelta(days=5), sync=False)
+
+        assert [b.date for b in bars] == [self.today - timedelta(days=i) for i in range(9, 4, -1)]
+        assert bars[0].close_price == 109.0
+
+    def test_history_is_read_in_one_query(self):
+        """A read on an up-to-date store issues a single SELECT"""
+        self.store.get_history(days=30)
+        statements = []
+        event.listen(self.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        self.store.get_history(days=30)
+
+        assert len(statements) == 1
+        assert "market_bars" in statements[0]
+
+    def test_upsert_replaces_existing_bar(self):
+        self.store.upsert_bars("MASI", [_bar(self.today, 100.0)])
+        self.store.upsert_bars("MASI", [_bar(self.today, 105.0)])
+
+        bars = self.store.get_history(days=5, sync=False)
+        assert len(bars) == 1
+        assert bars[0].close_price == 105.0
+
+    def test_record_snapshots_builds_instrument_series(self):
+        """Live snapshots update the daily bar of each instrument, never the index"""
+        now = datetime.now()
+        self.store.record_snapshots([
+            MarketSnapshot(symbol="ATW", last_price=500.0, change_percent=0.0, volume=100, as_of=now),
+            MarketSnapshot(symbol="MASI", last_price=13000.0, change_percent=0.0, volume=0, as_of=now),
+        ])
+        self.store.record_snapshots([
+            MarketSnapshot(symbol="ATW", last_price=480.0, change_percent=0.0, volume=250, as_of=now),
+        ])
+
+        bars = self.store.get_history(days=1, symbol="ATW")
+        assert len(bars) == 1
+        assert (bars[0].open_price, bars[0].high_price, bars[0].low_price, bars[0].close_price) == (500.0, 500.0, 480.0, 480.0)
+        assert self.store.get_history(days=1, sync=False) == []
@@ -0,0 +1,61 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from app.pipelines.ingestion.media_scraper import MediaArticle, MediaScraper
+from app.utils.http import HostThrottle
+
+
+class TestHostThrottle:
+    """Test suite for the per-host politeness delay"""
+
+    def test_same_host_is_spaced(self):
+        """Consecutive requests to the same host wait for the interval"""
+        throttle = HostThrottle(min_interval=1.0)
+
+        assert throttle.reserve("https://example.com/a") == 0
+        assert throttle.reserve("https://example.com/b") == pytest.approx(1.0, abs=0.05)
+
+    def test_different_hosts_do_not_wait(self):
+        """Different hosts never delay each other"""
+        throttle = HostThrottle(min_interval=1.0)
+
+        assert throttle.reserve("https://example.com/a") == 0
+        assert throttle.reserve("https://other.example.org/a") == 0
+
+
+class TestMediaScraperAsync:
+    """Test suite for the concurrent per-source scraping mode"""
+
+    def setup_method(self):
+        self.scraper = MediaScraper()
+
+    @staticmethod
+    def _article(source: str) -> MediaArticle:
+        return MediaArticle(
+            title=f"Article de test publié par {source}",
+            summary="Résumé",
+            url=f"https://{source}.example.com/article",
+            source=source,
+            published_at=datetime.now(),
+        )
+
+    @pytest.mark.asyncio
+    async def test_sources_run_concurrently_with_timeout(self, monkeypatch):
+        """Total time follows the slowest source and slow sources are dropped"""
+        delays = {"medias24": 0.3, "boursenews": 2.5, "challenge": 0.3, "lavieeco": 0.3}
+
+        def fake_scrape_source(source_name, max_articles=10):
+            time.sleep(delays[source_name])
+            return [self._article(source_name)]
+
+        monkeypatch.setattr(self.scraper, "source_names", lambda: list(delays))
+        monkeypatch.setattr(self.scraper, "scrape_source", fake_scrape_source)
+
+        start = time.perf_counter()
+        articles = await self.scraper.scrape_all_sources_async(source_timeout=1.0)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 2.0
+        assert {article.source for article in articles} == {"medias24", "challenge", "lavieeco"}
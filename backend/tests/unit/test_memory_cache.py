@@ -0,0 +1,131 @@
+import time
+
+import pytest
+
+from app.services.cache_service import CacheService
+from app.services.memory_cache import MemoryCache
+
+
+class TestMemoryCache:
+    """Test suite for the bounded in-memory cache tier"""
+
+    def test_lru_eviction_by_entry_count(self):
+        cache = MemoryCache(max_entries=3, sweep_interval_seconds=0)
+        for key in ("a", "b", "c"):
+            cache.set(key, key, ttl_seconds=60)
+        cache.get("a")  # "b" devient la moins récente
+
+        cache.set("d", "d", ttl_seconds=60)
+
+        assert "b" not in cache
+        assert all(key in cache for key in ("a", "c", "d"))
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_lfu_evicts_least_used(self):
+        cache = MemoryCache(max_entries=3, policy="lfu", sweep_interval_seconds=0)
+        for key in ("a", "b", "c"):
+            cache.set(key, key, ttl_seconds=60)
+        for _ in range(3):
+            cache.get("a")
+        cache.get("c")
+
+        cache.set("d", "d", ttl_seconds=60)
+
+        assert "b" not in cache
+        assert "a" in cache
+
+    def test_byte_budget(self):
+        cache = MemoryCache(max_entries=100, max_bytes=1000, sweep_interval_seconds=0)
+        for i in range(10):
+            cache.set(f"k{i}", b"x" * 300, ttl_seconds=60)
+
+        stats = cache.get_stats()
+        assert stats["bytes"] <= 1000
+        assert stats["size"] == 3
+        assert not cache.set("huge", b"x" * 2000, ttl_seconds=60)
+
+    def test_namespace_quota(self):
+        cache = MemoryCache(max_entries=100, namespace_quotas={"rate_limit": 2}, sweep_interval_seconds=0)
+        cache.set("media:latest", 1, ttl_seconds=60)
+        for ip in range(5):
+            cache.set(f"rate_limit:minute:{ip}", ip, ttl_seconds=60)
+
+        stats = cache.get_stats()
+        assert stats["namespaces"] == {"media": 1, "rate_limit": 2}
+        assert "media:latest" in cache
+
+    def test_sweeper_removes_expired_entries(self):
+        cache = MemoryCache(sweep_interval_seconds=0.05)
+        cache.set("short", 1, ttl_seconds=0.01)
+        cache.set("long", 2, ttl_seconds=60)
+
+        deadline = time.time() + 2
+        while len(cache) > 1 and time.time() < deadline:
+            time.sleep(0.02)
+        cache.close()
+
+        assert len(cache) == 1
+        assert cache.get_stats()["expirations"] == 1
+
+    def test_hit_ratio(self):
+        cache = MemoryCache(sweep_interval_seconds=0)
+        cache.set("a", 1, ttl_seconds=60)
+        cache.get("a")
+        cache.get("missing")
+
+        assert cache.get_stats()["hit_ratio"] == 0.5
+
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError):
+            MemoryCache(policy="fifo")
+
+
+class TestCacheServiceMemoryTier:
+    """CacheService behaviour on top of the bounded tier"""
+
+    def setup_method(self):
+        self.cache = CacheService(redis_url=None)
+
+    def test_delete_pattern_removes_unexpired_keys(self):
+        self.cache.set("volume:latest:30", {"a": 1}, ttl_seconds=300)
+        self.cache.set("volume:latest:60", {"a": 2}, ttl_seconds=300)
+        self.cache.set("media:latest:20", {"a": 3}, ttl_seconds=300)
+
+        assert self.cache.delete_pattern("volume:*") == 2
+        assert self.cache.get("volume:latest:30") is None
+        assert self.cache.get("media:latest:20") == {"a": 3}
+
+    def test_stats_expose_memory_tier(self):
+        self.cache.set("k", 1)
+        self.cache.get("k")
+
+        stats = self.cache.get_stats()["memory"]
+        assert stats["size"] == 1
+        assert stats["hits"] == 1
+        assert "evictions" in stats
+
+    def test_l1_in_front_of_redis(self):
+        class CountingRedis:
+            def __init__(self):
+                self.data, self.reads = {}, 0
+
+            def get(self, key):
+                self.reads += 1
+                return self.data.get(key)
+
+            def setex(self, key, ttl, value):
+                self.data[key] = value
+                return True
+
+        redis = CountingRedis()
+        self.cache.redis_client = redis
+        self.cache.use_redis = True
+
+        self.cache.set("media:latest:20", {"a": 1}, ttl_seconds=300)
+        self.cache.set("rate_limit:minute:1.2.3.4", 3, ttl_seconds=60)
+        for _ in range(5):
+            assert self.cache.get("media:latest:20") == {"a": 1}
+            assert self.cache.get("rate_limit:minute:1.2.3.4") == 3
+
+        # Les clés chaudes sont servies par le L1, les compteurs partagés toujours par Redis
+        assert redis.reads == 5
@@ -0,0 +1,153 @@
+"""
+Tests unitaires pour la détection des quasi-doublons (MinHash/LSH)
+"""
+from dataclasses import dataclass
+from datetime import datetime
+import itertools
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models.schemas import Base, MediaArticle, MediaArticleBand
+from app.pipelines.ingestion.media_scraper import MediaArticle as ScrapedArticle
+from app.repositories import media_articles
+from app.services.dedup_service import StoredArticleIndex, split_stored_duplicates
+from app.utils.near_duplicates import (
+    BANDS, ArticleDeduplicator, LSHIndex, MinHasher, article_signature, band_buckets, from_bytes, shingles,
+    similarity, to_bytes,
+)
+
+
+@dataclass
+class Article:
+    url: str
+    title: str
+    content: str = ""
+
+
+TITLES = [
+    "La Bourse de Casablanca termine la semaine en hausse",
+    "Attijariwafa bank publie des résultats semestriels record",
+    "Bank Al-Maghrib maintient son taux directeur à 2,75%",
+    "L'inflation ralentit à 1,2% en glissement annuel",
+    "OCP signe un contrat d'exportation de phosphates avec l'Inde",
+]
+
+
+class TestMinHash:
+    """Tests pour les signatures MinHash et l'index LSH en mémoire"""
+
+    def test_estimates_jaccard(self):
+        hasher = MinHasher()
+        for first, second in itertools.combinations(TITLES + ["la bourse de casablanca termine la semaine en baisse"], 2):
+            exact = len(shingles(first) & shingles(second)) / len(shingles(first) | shingles(second))
+            estimate = similarity(hasher.signature(first), hasher.signature(second))
+            assert estimate == pytest.approx(exact, abs=0.15)
+
+    def test_normalized_text(self):
+        signature = article_signature("La Bourse de Casablanca termine la semaine en hausse")
+        assert similarity(signature, article_signature("la bourse de casablanca : termine la semaine en hausse !")) == 1.0
+        assert article_signature("  ?! ") is None
+
+    def test_bytes_roundtrip(self):
+        signature = article_signature(TITLES[0])
+        assert (from_bytes(to_bytes(signature)) == signature).all()
+        assert len(band_buckets(signature)) == BANDS
+
+    def test_lsh_returns_closest_above_threshold(self):
+        index = LSHIndex()
+        keys = [index.add(article_signature(title)) for title in TITLES]
+        near = article_signature("La Bourse de Casablanca termine la semaine en hausse.")
+        assert index.query(near, 0.8) == keys[0]
+        assert index.query(article_signature("Le dirham s'apprécie face à l'euro"), 0.8) is None
+
+
+class TestArticleDeduplicator:
+    """Tests pour ArticleDeduplicator"""
+
+    def test_duplicates_rejected(self):
+        deduplicator = ArticleDeduplicator(threshold=0.8)
+        articles = [Article(f"https://a.ma/{i}", title) for i, title in enumerate(TITLES)]
+        articles += [
+            Article("https://a.ma/0", "Titre différent, même URL"),
+            Article("https://b.ma/0", "La Bourse de Casablanca termine la semaine en hausse !"),
+            Article("https://c.ma/1", "ATTIJARIWAFA BANK publie des résultats semestriels record"),
+        ]
+        assert deduplicator.unique(articles) == articles[:len(TITLES)]
+
+    def test_summary_in_content_ignored(self):
+        """Même dépêche : résumé recopié dans ``content`` d'un côté, titre seul de l'autre"""
+        deduplicator = ArticleDeduplicator(threshold=0.8)
+        title = "Bank Al-Maghrib maintient son taux directeur à 2,75%"
+        summary = "Le conseil de la banque centrale a décidé mardi de laisser son taux directeur inchangé."
+        challenge = ScrapedArticle(title=title, summary=summary, url="https://www.challenge.ma/1", source="challenge",
+                                   published_at=None, content=summary)
+        medias24 = ScrapedArticle(title=title, summary="", url="https://medias24.com/1", source="medias24",
+                                  published_at=None)
+
+        assert deduplicator.accept(challenge)
+        assert (deduplicator.signature == article_signature(title)).all()
+        assert not deduplicator.accept(medias24)
+
+
+class TestStoredArticleIndex:
+    """Tests pour StoredArticleIndex sur une base SQLite temporaire"""
+
+    @pytest.fixture(autouse=True)
+    def database(self, tmp_path):
+        self.engine = create_engine(f"sqlite:///{tmp_path / 'dedup.db'}")
+        Base.metadata.create_all(self.engine)
+        self.session_factory = sessionmaker(bind=self.engine)
+        self.index = StoredArticleIndex(session_factory=self.session_factory, threshold=0.8)
+        yield
+        self.engine.dispose()
+
+    def _store(self, titles, indexed=True):
+        rows = [
+            {
+                "title": title, "summary": "", "url": f"https://stored.ma/{i}", "source": "medias24",
+                "published_at": datetime(2024, 6, 10, 9, i), "sentiment_score": 0.1 * i,
+                "sentiment_model": "gpt-test:v1",
+            }
+            for i, title in enumerate(titles)
+        ]
+        with self.session_factory() as db:
+            media_articles.upsert_articles(db, rows)
+            if indexed:
+                media_articles.index_new_signatures(db, {row["url"]: to_bytes(article_signature(row["title"])) for row in rows})
+            db.commit()
+
+    def test_syndicated_copy_reuses_stored_score(self):
+        self._store(TITLES)
+        batch = [
+            ScrapedArticle(title="Bank Al-Maghrib maintient son taux directeur à 2,75 %", summary="",
+                           url="https://copie.ma/1", source="lavieeco", published_at=None),
+            ScrapedArticle(title="Le dirham s'apprécie face à l'euro", summary="",
+                           url="https://other.ma/1", source="lavieeco", published_at=None),
+        ]
+        matches = self.index.match({i: to_bytes(article_signature(a.title)) for i, a in enumerate(batch)})
+        assert list(matches) == [0]
+        assert matches[0].sentiment_score == pytest.approx(0.2)
+
+        remaining = split_stored_duplicates(batch, matches)
+        assert remaining == [batch[1]]
+        assert batch[0].duplicate_of == matches[0].article_id
+        assert batch[0].sentiment_model == "gpt-test:v1"
+
+    def test_already_indexed_articles_skipped(self):
+        self._store(TITLES)
+        with self.session_factory() as db:
+            assert media_articles.index_new_signatures(db, {"https://stored.ma/0": to_bytes(article_signature(TITLES[0]))}) == 0
+            assert db.scalar(select(func.count()).select_from(MediaArticleBand)) == len(TITLES) * BANDS
+
+    def test_backfill_indexes_legacy_articles(self):
+        self._store(TITLES, indexed=False)
+        query = {0: to_bytes(article_signature(TITLES[3]))}
+        assert self.index.match(query) == {}
+
+        assert self.index.backfill(chunk_size=2) == len(TITLES)
+        assert self.index.backfill() == 0
+        with self.session_factory() as db:
+            assert db.scalar(select(func.count()).where(MediaArticle.minhash.is_(None))) == 0
+        assert self.index.match(query)[0].similarity == 1.0
@@ -0,0 +1,86 @@
+"""
+Tests de non-régression des plans de requête (EXPLAIN QUERY PLAN, SQLite)
+
+Chaque requête chaude des repositories doit utiliser l'index prévu pour elle,
+sans tri temporaire ni lecture de la table quand l'index est couvrant.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models.schemas import Base
+from app.repositories import index_scores, media_articles
+
+
+class TestQueryPlans:
+    """Plans des requêtes des repositories sur le schéma du modèle"""
+
+    @pytest_asyncio.fixture
+    async def explain(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'plans.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        statements = []
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        async def plan_of(query) -> str:
+            """Exécute ``query(db)`` puis retourne les plans de ses requêtes SQL"""
+            first = len(statements)
+            async with AsyncSession(engine) as db:
+                await query(db)
+            plans = []
+            async with engine.connect() as conn:
+                for statement, parameters in statements[first:]:
+                    rows = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+                    plans.extend(row[-1] for row in rows)
+            return "\n".join(plans)
+
+        yield plan_of
+        await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_latest_articles_use_published_at_index(self, explain):
+        plan = await explain(lambda db: media_articles.list_latest(db, limit=20, offset=40))
+        assert "ix_media_articles_published_at_id" in plan
+        assert "TEMP B-TREE" not in plan
+
+    @pytest.mark.asyncio
+    async def test_keyset_pages_seek_in_published_at_index(self, explain):
+        after = media_articles.ArticleKey(datetime(2024, 6, 10, 12, 0), 1000)
+        plan = await explain(lambda db: media_articles.list_page(db, 20, after))
+        # Segment daté puis segment sans date : deux recherches dans l'index, sans tri
+        assert plan.count("SEARCH media_articles USING INDEX ix_media_articles_published_at_id") == 2
+        assert "TEMP B-TREE" not in plan
+
+    @pytest.mark.asyncio
+    async def test_recent_count_uses_scraped_at_index(self, explain):
+        since = datetime.now() - timedelta(hours=1)
+        plan = await explain(lambda db: media_articles.count_scraped_since(db, since))
+        assert "COVERING INDEX ix_media_articles_scraped_at" in plan
+
+    @pytest.mark.asyncio
+    async def test_source_counts_use_source_index(self, explain):
+        plan = await explain(media_articles.source_counts)
+        assert "COVERING INDEX ix_media_articles_source_published_at" in plan
+        assert "TEMP B-TREE" not in plan
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("column", ["score", "volume"])
+    async def test_index_series_are_index_only(self, explain, column):
+        start = datetime.now() - timedelta(days=30)
+        plan = await explain(lambda db: index_scores.get_series(db, column, start=start, limit=365))
+        assert "COVERING INDEX ix_index_scores_as_of_covering" in plan
+        assert "TEMP B-TREE" not in plan
+
+    @pytest.mark.asyncio
+    async def test_latest_score_uses_as_of_index(self, explain):
+        plan = await explain(index_scores.get_latest)
+        assert "ix_index_scores_as_of_covering" in plan
+        assert "TEMP B-TREE" not in plan
@@ -0,0 +1,172 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.rate_limiter import (
+    GCRA_SCRIPT,
+    LocalGCRALimiter,
+    RateLimit,
+    RateLimiter,
+    RedisGCRALimiter,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingRedis:
+    """Records script invocations; every call is one EVALSHA round trip"""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = []
+
+    def register_script(self, script):
+        assert script == GCRA_SCRIPT
+
+        def run(keys, args):
+            self.calls.append((keys, args))
+            return self.reply
+
+        return run
+
+
+def _request(path="/api/v1/index/latest", ip="10.0.0.1"):
+    return SimpleNamespace(
+        headers={"X-Forwarded-For": ip},
+        client=None,
+        url=SimpleNamespace(path=path),
+    )
+
+
+class TestLocalGCRALimiter:
+    """Test suite for the in-process GCRA fallback"""
+
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.limiter = LocalGCRALimiter(clock=self.clock)
+        self.limits = [RateLimit("minute", 5, 60), RateLimit("hour", 20, 3600)]
+
+    def test_allows_burst_up_to_limit(self):
+        decisions = [self.limiter.hit("ip", self.limits) for _ in range(6)]
+
+        assert [d.allowed for d in decisions] == [True] * 5 + [False]
+        assert [d.remaining for d in decisions[:5]] == [4, 3, 2, 1, 0]
+        assert decisions[-1].limit.name == "minute"
+        assert decisions[-1].retry_after == pytest.approx(12.0)
+
+    def test_rejected_request_is_not_counted(self):
+        for _ in range(5):
+            self.limiter.hit("ip", self.limits)
+        for _ in range(10):
+            assert not self.limiter.hit("ip", self.limits).allowed
+
+        # Un intervalle (60 s / 5) libère exactement une requête
+        self.clock.now += 12
+        assert self.limiter.hit("ip", self.limits).allowed
+        assert not self.limiter.hit("ip", self.limits).allowed
+
+    def test_window_is_not_reset_by_each_request(self):
+        allowed = 0
+        for _ in range(120):
+            allowed += self.limiter.hit("ip", self.limits).allowed
+            self.clock.now += 1
+        # 5 en rafale puis une requête toutes les 12 s
+        assert allowed == 5 + 119 // 12
+
+    def test_hour_limit(self):
+        allowed = 0
+        for _ in range(100):
+            allowed += self.limiter.hit("ip", self.limits).allowed
+            self.clock.now += 12
+        decision = self.limiter.hit("ip", self.limits)
+
+        assert allowed < 100
+        assert decision.limit.name == "hour"
+
+    def test_cost_weights(self):
+        assert self.limiter.hit("ip", self.limits, cost=3).remaining == 2
+        assert not self.limiter.hit("ip", self.limits, cost=3).allowed
+        assert self.limiter.hit("ip", self.limits, cost=2).allowed
+
+    def test_clients_are_independent(self):
+        for _ in range(5):
+            self.limiter.hit("a", self.limits)
+        assert self.limiter.hit("b", self.limits).allowed
+
+    def test_expired_state_is_pruned(self):
+        self.limiter.PRUNE_THRESHOLD = 10
+        for i in range(20):
+            self.limiter.hit(f"ip{i}", self.limits)
+        self.clock.now += 4000
+        self.limiter.hit("late", self.limits)
+
+        assert len(self.limiter) == 2
+
+
+class TestRateLimiter:
+    """Test suite for the request-level limiter"""
+
+    def test_route_costs_use_longest_prefix(self):
+        limiter = RateLimiter(60, 1000, route_costs={"/api/v1/pipeline": 5, "/api/v1/pipeline/run": 10})
+
+        assert limiter.get_route_cost("/api/v1/pipeline/run") == 10
+        assert limiter.get_route_cost("/api/v1/pipeline/status") == 5
+        assert limiter.get_route_cost("/api/v1/index/latest") == 1
+
+    def test_route_costs_match_whole_segments(self):
+        limiter = RateLimiter(60, 1000, route_costs={"/api/v1/simplified": 3, "/api/v1/pipeline/run": 10})
+
+        assert limiter.get_route_cost("/api/v1/simplified") == 3
+        assert limiter.get_route_cost("/api/v1/simplified/score") == 3
+        assert limiter.get_route_cost("/api/v1/simplified-v2/score") == 1
+        assert limiter.get_route_cost("/api/v1/pipeline/run-background") == 1
+
+    def test_heavy_route_exhausts_quota_faster(self):
+        limiter = RateLimiter(10, 1000, route_costs={"/api/v1/pipeline/run": 5})
+
+        assert limiter.check_rate_limit(_request("/api/v1/pipeline/run"))[0]
+        assert limiter.check_rate_limit(_request("/api/v1/pipeline/run"))[0]
+        allowed, info = limiter.check_rate_limit(_request("/api/v1/index/latest"))
+
+        assert not allowed
+        assert info["limit_type"] == "minute"
+        assert info["limit"] == 10
+        assert info["retry_after"] >= 1
+
+    def test_redis_engine_single_round_trip(self):
+        redis = RecordingRedis(reply=[1, 0, 0, 57])
+        limiter = RateLimiter(60, 1000, route_costs={}, redis_client=redis)
+
+        allowed, info = limiter.check_rate_limit(_request(ip="1.2.3.4"))
+
+        assert allowed and info is None
+        assert redis.calls == [(
+            ["rate_limit:minute:1.2.3.4", "rate_limit:hour:1.2.3.4"],
+            [1, 60000, 60, 3600000, 1000],
+        )]
+
+    def test_redis_rejection_is_decoded(self):
+        limiter = RedisGCRALimiter(RecordingRedis(reply=[0, 2, 2500, 0]))
+
+        decision = limiter.hit("ip", [RateLimit("minute", 60, 60), RateLimit("hour", 1000, 3600)])
+
+        assert not decision.allowed
+        assert decision.limit.name == "hour"
+        assert decision.to_info() == {"limit_type": "hour", "limit": 1000, "retry_after": 3}
+
+    def test_falls_back_to_memory_when_redis_fails(self):
+        class BrokenRedis:
+            def register_script(self, script):
+                def run(keys, args):
+                    raise ConnectionError("down")
+                return run
+
+        limiter = RateLimiter(2, 1000, route_costs={}, redis_client=BrokenRedis())
+
+        assert [limiter.check_rate_limit(_request())[0] for _ in range(3)] == [True, True, False]
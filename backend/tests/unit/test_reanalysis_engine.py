@@ -0,0 +1,162 @@
+"""
+Tests unitaires pour la ré-analyse par morceaux des articles stockés
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models.schemas import Base, MediaArticle
+from app.repositories import media_articles
+from app.services.llm_sentiment_service import LLMSentimentResult
+from app.services.reanalysis_engine import ReanalysisCheckpoint, ReanalysisEngine, ReanalysisFilters
+from app.services.sentiment_service import SentimentAnalyzer
+
+
+TITLES = [
+    "Croissance excellente de la bourse de Casablanca",
+    "Crise économique et récession au Maroc",
+    "Le marché fonctionne normalement",
+    "Forte hausse des bénéfices des banques",
+    "Licenciements et fermeture d usine à Tanger",
+    "Le conflit est résolu, moment historique",
+    "Inflation et dévaluation inquiètent les investisseurs",
+]
+
+
+class FakeLLMAnalyzer:
+    """Analyseur LLM minimal : score fixe, repli (confiance nulle) pour les titres contenant 'Crise'"""
+    enabled = True
+    model = "gpt-test"
+
+    def analyze_articles_batch(self, articles):
+        return [
+            LLMSentimentResult(
+                article_id=article["id"], title=article["title"], sentiment_score=0.0 if "Crise" in article["title"] else 0.7,
+                sentiment_label="Neutral" if "Crise" in article["title"] else "Positive",
+                confidence=0.0 if "Crise" in article["title"] else 0.9, reasoning="", analyzed_at=datetime.now(),
+            )
+            for article in articles
+        ]
+
+
+class TestReanalysisEngine:
+    """Tests pour ReanalysisEngine sur une base SQLite temporaire"""
+
+    @pytest.fixture(autouse=True)
+    def database(self, tmp_path):
+        self.engine = create_engine(f"sqlite:///{tmp_path / 'reanalysis.db'}")
+        Base.metadata.create_all(self.engine)
+        self.session_factory = sessionmaker(bind=self.engine)
+        self.checkpoint = ReanalysisCheckpoint(tmp_path / "checkpoint.json")
+
+        start = datetime(2024, 6, 1, 9, 0)
+        with self.session_factory() as db:
+            db.add_all([
+                MediaArticle(
+                    title=title, summary="", url=f"u{i}", source="Hespress" if i % 2 else "Medias24",
+                    published_at=start + timedelta(days=i), sentiment_score=0.0, sentiment_label="Neutral",
+                    sentiment_model="dictionary:v0" if i < 4 else None,
+                )
+                for i, title in enumerate(TITLES)
+            ])
+            db.commit()
+
+        yield
+        self.engine.dispose()
+
+    def _engine(self, **kwargs) -> ReanalysisEngine:
+        options = {"workers": 1, "chunk_size": 3, "session_factory": self.session_factory, "checkpoint": self.checkpoint}
+        return ReanalysisEngine(**{**options, **kwargs})
+
+    def _articles(self):
+        with self.session_factory() as db:
+            return {article.url: article for article in db.scalars(select(MediaArticle))}
+
+    def test_rescores_all_articles_in_chunks(self):
+        report = self._engine().run()
+
+        analyzer = SentimentAnalyzer()
+        articles = self._articles()
+        for article in articles.values():
+            expected = analyzer.analyze_text(f"{article.title} ").polarity
+            assert article.sentiment_score == expected
+            assert article.sentiment_label == analyzer.get_sentiment_label(expected)
+            assert article.sentiment_model == "dictionary:v1"
+
+        assert report.model == "dictionary:v1"
+        assert report.processed == len(TITLES)
+        assert report.updated + report.unchanged == len(TITLES) and report.errors == 0
+        assert report.last_id == max(article.id for article in articles.values())
+        assert not self.checkpoint.path.exists()
+
+    def test_filters(self):
+        filters = ReanalysisFilters(
+            sources=("Hespress",), published_from=datetime(2024, 6, 2), published_to=datetime(2024, 6, 7),
+        )
+        report = self._engine().run(filters)
+        rescored = {url for url, article in self._articles().items() if article.sentiment_model == "dictionary:v1"}
+        assert rescored == {"u1", "u3", "u5"}
+        assert report.processed == 3
+
+        # Scores qui ne viennent pas du modèle courant : les autres articles uniquement
+        report = self._engine().run(ReanalysisFilters(stale_only=True))
+        assert report.processed == len(TITLES) - 3
+
+        report = self._engine().run(ReanalysisFilters(sentiment_models=("dictionary:v0",)))
+        assert report.processed == 0
+
+    def test_resumes_after_interruption(self, monkeypatch):
+        original = media_articles.update_sentiments
+        written = []
+
+        def failing_update(db, rows):
+            if written:
+                raise RuntimeError("connexion perdue")
+            written.append([row["id"] for row in rows])
+            original(db, rows)
+
+        monkeypatch.setattr(media_articles, "update_sentiments", failing_update)
+        with pytest.raises(RuntimeError):
+            self._engine().run()
+        assert self.checkpoint.path.exists()
+
+        # Reprise : seuls les articles après le premier morceau sont relus
+        read_after = []
+        scoring_chunk = media_articles.scoring_chunk
+
+        def tracking_chunk(db, after_id, limit, where=()):
+            read_after.append(after_id)
+            return scoring_chunk(db, after_id, limit, where)
+
+        monkeypatch.setattr(media_articles, "update_sentiments", original)
+        monkeypatch.setattr(media_articles, "scoring_chunk", tracking_chunk)
+        report = self._engine().run()
+
+        assert read_after[0] == max(written[0])
+        assert report.processed == len(TITLES)
+        assert all(article.sentiment_model == "dictionary:v1" for article in self._articles().values())
+        assert not self.checkpoint.path.exists()
+
+    def test_checkpoint_of_other_run_ignored(self):
+        self._engine().run()
+        report = self._engine().run(ReanalysisFilters(sources=("Medias24",)))
+        assert report.processed == 4
+
+    def test_process_pool_matches_single_process(self):
+        self._engine(workers=1).run()
+        single = {url: article.sentiment_score for url, article in self._articles().items()}
+
+        report = self._engine(workers=2, chunk_size=4).run(resume=False)
+        assert {url: article.sentiment_score for url, article in self._articles().items()} == single
+        assert report.unchanged == len(TITLES)
+
+    def test_llm_fallback_keeps_existing_score(self):
+        report = self._engine(llm_analyzer=FakeLLMAnalyzer()).run()
+
+        articles = self._articles()
+        assert report.model == "gpt-test:v1"
+        assert report.errors == 1
+        assert articles["u1"].sentiment_model == "dictionary:v0"
+        assert articles["u0"].sentiment_score == 0.7 and articles["u0"].sentiment_model == "gpt-test:v1"
@@ -0,0 +1,230 @@
+"""
+Tests unitaires pour la couche d'accès async (repositories + moteurs)
+"""
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.models.database import async_database_url, pool_options, sync_database_url
+from app.models.schemas import Base, IndexScore, MediaArticle
+from app.repositories import index_scores, media_articles
+
+
+class TestDatabaseUrls:
+    """Tests pour la sélection des drivers et du pool"""
+
+    def test_sqlite_drivers(self):
+        url = "sqlite:///./fear_greed.db"
+        assert async_database_url(url) == "sqlite+aiosqlite:///./fear_greed.db"
+        assert sync_database_url(url) == url
+
+    def test_postgres_drivers(self):
+        for url in (
+            "postgresql://user:secret@db:5432/fng",
+            "postgres://user:secret@db:5432/fng",
+            "postgresql+asyncpg://user:secret@db:5432/fng",
+        ):
+            assert async_database_url(url) == "postgresql+asyncpg://user:secret@db:5432/fng"
+            assert sync_database_url(url) == "postgresql+psycopg2://user:secret@db:5432/fng"
+
+    def test_pool_options(self):
+        assert pool_options("sqlite://") == {}
+        assert pool_options("sqlite:///:memory:") == {}
+        options = pool_options("postgresql://user:secret@db/fng")
+        assert {"pool_size", "max_overflow", "pool_timeout", "pool_recycle", "pool_pre_ping"} <= set(options)
+
+
+class TestRepositories:
+    """Tests des fonctions de repository sur une base aiosqlite temporaire"""
+
+    @pytest_asyncio.fixture
+    async def session_factory(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'repo.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        factory = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+        now = datetime(2024, 6, 10, 12, 0)
+        async with factory() as db:
+            for i in range(5):
+                db.add(IndexScore(as_of=now - timedelta(days=i), score=50.0 + i, volume=100.0 + i))
+            db.add_all([
+                MediaArticle(title="a", url="u1", source="Hespress", sentiment_score=0.5,
+                             sentiment_label="positive", published_at=now, scraped_at=now),
+                MediaArticle(title="b", url="u2", source="Hespress", sentiment_score=-0.5,
+                             sentiment_label="negative", published_at=now - timedelta(hours=1),
+                             scraped_at=now - timedelta(days=2)),
+                MediaArticle(title="c", url="u3", source="Medias24", published_at=now - timedelta(hours=2),
+                             scraped_at=now),
+            ])
+            await db.commit()
+
+        yield factory
+        await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_index_scores(self, session_factory):
+        async with session_factory() as db:
+            latest = await index_scores.get_latest(db)
+            assert latest.score == 50.0
+            assert await index_scores.count(db) == 5
+
+            history = await index_scores.get_history(db, start=datetime(2024, 6, 8), limit=10)
+            assert [score.score for score in history] == [50.0, 51.0, 52.0]
+
+            ascending = await index_scores.get_history(db, limit=2, ascending=True)
+            assert [score.score for score in ascending] == [54.0, 53.0]
+
+    @pytest.mark.asyncio
+    async def test_index_buckets(self, session_factory):
+        async with session_factory() as db:
+            db.add_all([
+                IndexScore(as_of=datetime(2024, 6, 10, 9, 0), score=40.0),
+                IndexScore(as_of=datetime(2024, 6, 10, 15, 30), score=60.0),
+            ])
+            await db.commit()
+
+            days = await index_scores.get_buckets(db, "day", start=datetime(2024, 6, 9))
+            assert [bucket.start for bucket in days] == [datetime(2024, 6, 10), datetime(2024, 6, 9)]
+            today = days[0]
+            assert (today.open, today.close, today.min, today.max, today.samples) == (40.0, 60.0, 40.0, 60.0, 3)
+            assert today.mean == pytest.approx(50.0)
+
+            hours = await index_scores.get_buckets(db, "hour", start=datetime(2024, 6, 10))
+            assert [bucket.start.hour for bucket in hours] == [15, 12, 9]
+
+            # Semaines commençant le lundi : le 10/06/2024 est un lundi
+            weeks = await index_scores.get_buckets(db, "week")
+            assert [bucket.start for bucket in weeks] == [datetime(2024, 6, 10), datetime(2024, 6, 3)]
+            assert (weeks[1].open, weeks[1].close, weeks[1].samples) == (54.0, 51.0, 4)
+
+            with pytest.raises(ValueError):
+                await index_scores.get_buckets(db, "month")
+
+    @pytest.mark.asyncio
+    async def test_media_articles(self, session_factory):
+        async with session_factory() as db:
+            latest = await media_articles.list_latest(db, limit=2)
+            assert [article.url for article in latest] == ["u1", "u2"]
+            assert [a.url for a in await media_articles.list_latest(db, limit=2, offset=2)] == ["u3"]
+
+            assert await media_articles.count(db) == 3
+            assert await media_articles.count_scraped_since(db, datetime(2024, 6, 10)) == 2
+            assert sorted(await media_articles.source_counts(db)) == [("Hespress", 2), ("Medias24", 1)]
+            assert await media_articles.sentiment_label_counts(db) == {"positive": 1, "negative": 1}
+
+            stats = await media_articles.sentiment_score_stats(db)
+            assert stats.average == pytest.approx(0.0)
+            assert (stats.minimum, stats.maximum) == (-0.5, 0.5)
+
+    @pytest.mark.asyncio
+    async def test_keyset_pages(self, session_factory):
+        async with session_factory() as db:
+            # Deux articles à la même date et un article sans date (toujours en dernier)
+            tied = datetime(2024, 6, 10, 12, 0)
+            db.add_all([
+                MediaArticle(title="d", url="u4", source="Medias24", published_at=tied),
+                MediaArticle(title="e", url="u5", source="Medias24", published_at=None),
+                MediaArticle(title="f", url="u6", source="Medias24", published_at=None),
+            ])
+            await db.commit()
+
+            expected = [a.url for a in await media_articles.list_latest(db, limit=10)]
+            assert expected == ["u4", "u1", "u2", "u3", "u6", "u5"]
+
+            pages, after = [], None
+            while True:
+                page = await media_articles.list_page(db, 2, after)
+                if not page:
+                    break
+                pages.append([a.url for a in page])
+                cursor = media_articles.encode_cursor(media_articles.ArticleKey.of(page[-1]))
+                after = media_articles.decode_cursor(cursor)
+
+            assert pages == [["u4", "u1"], ["u2", "u3"], ["u6", "u5"]]
+
+    def test_cursor_round_trip(self):
+        key = media_articles.ArticleKey(datetime(2024, 6, 10, 12, 0, 0, 123456), 42)
+        cursor = media_articles.encode_cursor(key)
+        assert "=" not in cursor
+        assert media_articles.decode_cursor(cursor) == key
+        assert media_articles.decode_cursor(media_articles.encode_cursor(media_articles.ArticleKey(None, 7))).id == 7
+
+        for invalid in ("42", "not-a-cursor", media_articles.encode_cursor(key)[:-3]):
+            with pytest.raises(ValueError):
+                media_articles.decode_cursor(invalid)
+
+    @pytest.mark.asyncio
+    async def test_empty_tables(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'empty.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        try:
+            async with AsyncSession(engine) as db:
+                assert await index_scores.get_latest(db) is None
+                assert await media_articles.count(db) == 0
+                assert await media_articles.sentiment_label_counts(db) == {}
+        finally:
+            await engine.dispose()
+
+
+class TestUpsertArticles:
+    """Tests de l'upsert groupé INSERT ... ON CONFLICT(url)"""
+
+    def setup_method(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+
+    def teardown_method(self):
+        self.engine.dispose()
+
+    @staticmethod
+    def _row(url, score=0.5, title="titre"):
+        return {"title": title, "url": url, "source": "test", "sentiment_score": score}
+
+    def test_inserts_in_chunks(self):
+        with Session(self.engine) as db:
+            result = media_articles.upsert_articles(db, [self._row(f"u{i}") for i in range(5)], chunk_size=2)
+            db.commit()
+
+            assert (result.inserted, result.updated, result.unchanged) == (5, 0, 0)
+            assert db.scalar(select(func.count(MediaArticle.id))) == 5
+            # Les valeurs par défaut des colonnes sont appliquées à chaque ligne
+            assert db.scalar(select(func.count(MediaArticle.id)).where(MediaArticle.created_at.isnot(None))) == 5
+
+    def test_existing_urls_ignored_without_update_columns(self):
+        with Session(self.engine) as db:
+            media_articles.upsert_articles(db, [self._row("u1", title="original")])
+            result = media_articles.upsert_articles(
+                db, [self._row("u1", title="doublon"), self._row("u2"), self._row("u2")]
+            )
+            db.commit()
+
+            assert (result.inserted, result.updated, result.unchanged) == (1, 0, 1)
+            assert db.scalar(select(MediaArticle.title).where(MediaArticle.url == "u1")) == "original"
+
+    def test_conditional_update(self):
+        better_score = lambda excluded: MediaArticle.sentiment_score < excluded.sentiment_score  # noqa: E731
+        with Session(self.engine) as db:
+            media_articles.upsert_articles(db, [self._row("u1", 0.5), self._row("u2", 0.5)])
+            result = media_articles.upsert_articles(
+                db,
+                [self._row("u1", 0.9, title="meilleur"), self._row("u2", 0.1, title="moins bon"), self._row("u3")],
+                update_columns=("title", "sentiment_score"),
+                update_where=better_score,
+            )
+            db.commit()
+
+            assert (result.inserted, result.updated, result.unchanged) == (1, 1, 1)
+            assert result.saved == 2
+            titles = dict(db.execute(select(MediaArticle.url, MediaArticle.title)).all())
+            assert titles == {"u1": "meilleur", "u2": "titre", "u3": "titre"}
+
+    def test_empty_input(self):
+        with Session(self.engine) as db:
+            result = media_articles.upsert_articles(db, [{"url": None, "title": "x"}])
+            assert result.saved == 0 and result.unchanged == 0
@@ -0,0 +1,103 @@
+import random
+from dataclasses import replace
+from datetime import date, timedelta
+
+import pytest
+
+from app.pipelines.ingestion.market_scraper import MASIHistoricalData
+from app.services.rolling_state import Bar, RollingComponentState
+from app.services.vectorized_components import MarketArrays, component_series
+
+
+def _history(days: int, seed: int = 11):
+    rng = random.Random(seed)
+    price = 12000.0
+    start = date(2021, 1, 4)
+    data = []
+    for i in range(days):
+        price *= 1 + rng.gauss(0.0002, 0.003)
+        data.append(MASIHistoricalData(
+            date=start + timedelta(days=i),
+            open_price=price,
+            high_price=price * (1 + abs(rng.gauss(0, 0.003))),
+            low_price=price * (1 - abs(rng.gauss(0, 0.003))),
+            close_price=price,
+            volume=rng.randint(1_000_000, 20_000_000),
+        ))
+    return data
+
+
+def _assert_matches(state: RollingComponentState, data, t: int):
+    series = component_series(MarketArrays.from_history(data[:t + 1]))
+    for name, value in state.components().items():
+        assert value == pytest.approx(series[name][-1], abs=1e-7), (name, t)
+
+
+class TestRollingComponentState:
+    """The incremental state must match the vectorized computation"""
+
+    def setup_method(self):
+        self.data = _history(700)
+        self.expected = component_series(MarketArrays.from_history(self.data))
+
+    def test_incremental_updates_match_full_recomputation(self):
+        """Every bar-by-bar update equals the full-window computation"""
+        state = RollingComponentState()
+        for t, row in enumerate(self.data):
+            state.update(Bar.from_history(row))
+            for name, value in state.components().items():
+                assert value == pytest.approx(self.expected[name][t], abs=1e-7), (name, t)
+
+    def test_intraday_refresh_replaces_head(self):
+        """A new bar with the same date replaces the head instead of appending"""
+        state = RollingComponentState()
+        for row in self.data[:300]:
+            state.update(Bar.from_history(row))
+
+        refreshed = replace(self.data[299], close_price=self.data[299].close_price * 1.01, volume=42)
+        state.update(Bar.from_history(refreshed))
+
+        assert len(state) == 300
+        _assert_matches(state, self.data[:299] + [refreshed], 299)
+
+    def test_persistence_roundtrip(self, tmp_path):
+        """A restored state continues exactly like the original one"""
+        state = RollingComponentState()
+        for row in self.data[:400]:
+            state.update(Bar.from_history(row))
+
+        path = tmp_path / "state.json"
+        state.save(path)
+        restored = RollingComponentState.load(path)
+
+        assert restored.components() == pytest.approx(state.components())
+        for t in range(400, 700):
+            restored.update(Bar.from_history(self.data[t]))
+        _assert_matches(restored, self.data, 699)
+
+    def test_sync_applies_only_new_bars(self):
+        """sync() only processes bars from the head onwards"""
+        state = RollingComponentState()
+        assert state.sync(self.data[:252]) == 252
+
+        # Run suivant : même fenêtre de 252 barres décalée de 3 séances
+        assert state.sync(self.data[3:255]) == 4
+        _assert_matches(state, self.data, 254)
+
+    def test_sync_rebuilds_on_incompatible_history(self):
+        """A history that does not extend the state triggers a rebuild"""
+        state = RollingComponentState()
+        state.sync(self.data[:300])
+
+        other = _history(300, seed=99)
+        state.sync(other)
+
+        assert len(state) == 300
+        _assert_matches(state, other, 299)
+
+    def test_missing_state_file_gives_empty_state(self, tmp_path):
+        """Loading a missing or corrupt file returns an empty state"""
+        assert len(RollingComponentState.load(tmp_path / "missing.json")) == 0
+        corrupt = tmp_path / "corrupt.json"
+        corrupt.write_text("{not json")
+        assert len(RollingComponentState.load(corrupt)) == 0
@@ -1,5 +1,10 @@
+import random
+
 import pytest
-from app.services.sentiment_service import SentimentAnalyzer, SentimentResult
+from app.services.sentiment_service import (
+    CONTEXT_WINDOW, MOROCCO_CONTEXT, RESOLUTION_WORDS, SentimentAnalyzer, SentimentResult,
+)
+from app.utils.aho_corasick import AhoCorasick
 
 
 class TestSentimentAnalyzer:
@@ -131,3 +136,76 @@ class TestSentimentAnalyzer:
         # Both should have confidence scores (may be equal in some cases)
         assert clear_result.confidence >= 0.0
         assert mixed_result.confidence >= 0.0
+
+
+def _naive_scores(analyzer, words):
+    """Scoring de référence : recherche des sous-chaînes token par token"""
+    positive_score = negative_score = 0.0
+    for i, word in enumerate(words):
+        is_negated = i > 0 and words[i-1] in analyzer.negators
+        base_score = -1.0 if is_negated else 1.0
+        context_words = words[max(0, i - CONTEXT_WINDOW):i + CONTEXT_WINDOW + 1]
+        context_text = ' '.join(context_words)
+        is_resolution_context = any(ctx in RESOLUTION_WORDS for ctx in context_words)
+        is_morocco_context = any(key in context_text for key in MOROCCO_CONTEXT)
+        if i > 0 and words[i-1] in analyzer.intensifiers:
+            base_score *= 1.5
+        if is_morocco_context:
+            base_score *= 1.3
+        is_positive_phrase = any(phrase in word for phrase in analyzer.positive_phrases)
+        is_negative_phrase = any(phrase in word for phrase in analyzer.negative_phrases)
+        if word in analyzer.positive_words or is_positive_phrase:
+            if is_negated:
+                negative_score += base_score
+            else:
+                positive_score += base_score
+                if is_morocco_context:
+                    positive_score += base_score * 0.2
+                if is_positive_phrase:
+                    positive_score += base_score * 0.5
+        elif word in analyzer.negative_words or is_negative_phrase:
+            if is_negated:
+                positive_score += base_score
+            elif is_resolution_context:
+                positive_score += base_score * 1.5
+            else:
+                negative_score += base_score
+                if is_morocco_context:
+                    negative_score += base_score * 0.3
+    return positive_score, negative_score
+
+
+class TestLexiconMatcher:
+    """Tests pour l'automate du lexique (résultats identiques à la recherche naïve)"""
+
+    def setup_method(self):
+        self.analyzer = SentimentAnalyzer()
+
+    def test_overlapping_matches(self):
+        matcher = AhoCorasick({"he": 1, "she": 2, "hers": 4, "his": 8})
+        assert sorted(matcher.iter_matches("ushers")) == [(1, 4, 2), (2, 4, 1), (2, 6, 4)]
+        assert list(matcher.iter_matches("")) == []
+
+    def test_matches_spanning_bigrams(self):
+        # "au maroc" à cheval sur deux mots, 'fes' à l'intérieur d'un mot
+        for text in ("Le bureau Maroc recrute", "Un professionnel sans licenciements", "sahara marocain"):
+            words = self.analyzer._tokenize(self.analyzer._clean_text(text))
+            assert self.analyzer._calculate_sentiment_scores(words) == _naive_scores(self.analyzer, words)
+
+    def test_same_scores_as_naive_search(self):
+        vocabulary = sorted({
+            part
+            for lexicon in (
+                self.analyzer.positive_words, self.analyzer.negative_words, self.analyzer.positive_phrases,
+                self.analyzer.negative_phrases, self.analyzer.intensifiers, self.analyzer.negators,
+                MOROCCO_CONTEXT, RESOLUTION_WORDS,
+            )
+            for phrase in lexicon
+            for part in phrase.split()
+        } | {"bureau", "professionnel", "casablancais", "marché", "Rabat"})
+        rng = random.Random(7)
+
+        for _ in range(300):
+            text = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 60)))
+            words = self.analyzer._tokenize(self.analyzer._clean_text(text))
+            assert self.analyzer._calculate_sentiment_scores(words) == _naive_scores(self.analyzer, words), text
@@ -0,0 +1,66 @@
+import time
+
+from app.core.monitoring import sentiment_analyses_total
+from app.services.sentiment_cache import CachedSentiment, SentimentCache, normalize_article_text
+
+
+class _NoRedis:
+    use_redis = False
+
+
+class TestSentimentCache:
+    """Test suite for the content-hash sentiment cache"""
+
+    def setup_method(self):
+        self.cache = SentimentCache(cache_service=_NoRedis(), ttl_seconds=60, max_entries=3)
+
+    def test_key_ignores_case_and_whitespace(self):
+        """Normalized title + summary produce the same key"""
+        key_a = self.cache.make_key("Le MASI  progresse", "Résumé ", "gpt", "v1")
+        key_b = self.cache.make_key("le masi progresse", "résumé", "gpt", "v1")
+
+        assert key_a == key_b
+        assert normalize_article_text(" A\tB ", "C") == "a b c"
+
+    def test_key_depends_on_model_and_version(self):
+        """Changing the model or prompt version invalidates entries"""
+        base = self.cache.make_key("Titre", "Résumé", "gpt", "v1")
+
+        assert base != self.cache.make_key("Titre", "Résumé", "other", "v1")
+        assert base != self.cache.make_key("Titre", "Résumé", "gpt", "v2")
+
+    def test_hit_and_miss_update_metrics(self):
+        """Lookups increment the sentiment_analyses_total counters"""
+        hits = sentiment_analyses_total.labels(method="llm", status="cache_hit")
+        misses = sentiment_analyses_total.labels(method="llm", status="cache_miss")
+        hits_before, misses_before = hits._value.get(), misses._value.get()
+
+        assert self.cache.get("Titre", "Résumé", "gpt", "v1", "llm") is None
+        self.cache.set("Titre", "Résumé", "gpt", "v1", CachedSentiment(score=0.4, label="Positive"))
+        cached = self.cache.get("titre", "résumé", "gpt", "v1", "llm")
+
+        assert cached.score == 0.4
+        assert misses._value.get() == misses_before + 1
+        assert hits._value.get() == hits_before + 1
+        assert self.cache.get_stats()["hit_ratio"] == 0.5
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted past max_entries"""
+        for title in ("a", "b", "c"):
+            self.cache.set(title, "", "m", "v1", CachedSentiment(score=0.0, label="Neutral"))
+        self.cache.get("a", "", "m", "v1", "dictionary")  # "a" devient le plus récent
+        self.cache.set("d", "", "m", "v1", CachedSentiment(score=0.0, label="Neutral"))
+
+        assert self.cache.get("b", "", "m", "v1", "dictionary") is None
+        assert self.cache.get("a", "", "m", "v1", "dictionary") is not None
+
+    def test_ttl_expiry(self):
+        """Entries older than the TTL are dropped"""
+        cache = SentimentCache(cache_service=_NoRedis(), ttl_seconds=1, max_entries=10)
+        cache.set("Titre", "", "m", "v1", CachedSentiment(score=0.1, label="Neutral"))
+        cache._entries[cache.make_key("Titre", "", "m", "v1")] = (
+            CachedSentiment(score=0.1, label="Neutral"),
+            time.time() - 1,
+        )
+
+        assert cache.get("Titre", "", "m", "v1", "dictionary") is None
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import pytest
+
+from app.pipelines.stage_runner import Stage, StageRunner, StageSkipped
+
+
+def _sleeping_stage(delay: float, value):
+    async def run(_deps):
+        await asyncio.sleep(delay)
+        return value
+    return run
+
+
+class TestStageRunner:
+    """Test suite for the DAG stage runner"""
+
+    @pytest.mark.asyncio
+    async def test_independent_stages_run_concurrently(self):
+        """Independent stages should overlap instead of running back to back"""
+        runner = StageRunner([
+            Stage("a", _sleeping_stage(0.2, 1)),
+            Stage("b", _sleeping_stage(0.2, 2)),
+            Stage("c", _sleeping_stage(0.2, 3)),
+        ])
+
+        start = time.perf_counter()
+        result = await runner.run()
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.5
+        assert [result.result(name) for name in ("a", "b", "c")] == [1, 2, 3]
+        assert set(result.timings) == {"a", "b", "c"}
+        assert all(duration >= 0.19 for duration in result.timings.values())
+
+    @pytest.mark.asyncio
+    async def test_dependant_starts_without_waiting_for_unrelated_stage(self):
+        """A stage only waits for its own dependencies"""
+        async def double(deps):
+            return deps["fast"] * 2
+
+        runner = StageRunner([
+            Stage("fast", _sleeping_stage(0.05, 21)),
+            Stage("slow", _sleeping_stage(0.3, None)),
+            Stage("double", double, ("fast",)),
+        ])
+        result = await runner.run()
+
+        assert result.result("double") == 42
+        assert result.outcomes["double"].started_at < result.outcomes["slow"].duration_seconds
+
+    @pytest.mark.asyncio
+    async def test_failure_skips_dependants(self):
+        """A failing stage reports its error and skips downstream stages"""
+        async def boom(_deps):
+            raise RuntimeError("boom")
+
+        async def never(_deps):
+            raise AssertionError("should not run")
+
+        runner = StageRunner([
+            Stage("boom", boom),
+            Stage("after", never, ("boom",)),
+            Stage("other", _sleeping_stage(0, "ok")),
+        ])
+        result = await runner.run()
+
+        assert isinstance(result.first_error, RuntimeError)
+        assert isinstance(result.outcomes["after"].error, StageSkipped)
+        assert result.result("other") == "ok"
+
+    def test_invalid_graphs_are_rejected(self):
+        """Unknown dependencies and cycles are detected upfront"""
+        with pytest.raises(ValueError):
+            StageRunner([Stage("a", _sleeping_stage(0, 1), ("missing",))])
+
+        with pytest.raises(ValueError):
+            StageRunner([
+                Stage("a", _sleeping_stage(0, 1), ("b",)),
+                Stage("b", _sleeping_stage(0, 1), ("a",)),
+            ])
@@ -0,0 +1,105 @@
+"""
+Tests unitaires pour la mise en place TimescaleDB (SQL généré, sans serveur Postgres)
+"""
+from datetime import date, datetime
+from types import SimpleNamespace
+import re
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.models import timescale
+from app.repositories import index_scores
+from app.services.dynamic_scaler import COMPONENT_COLUMNS, DynamicScalerService
+
+
+class TestTimescale:
+    """Tests pour les hypertables et agrégats continus"""
+
+    def test_enabled_only_on_postgres_with_flag(self, monkeypatch):
+        sqlite = create_engine("sqlite://")
+        pg = create_engine("postgresql+psycopg2://user:secret@db/fng")
+
+        monkeypatch.setattr(settings, "timescale_enabled", False)
+        assert not timescale.is_enabled(pg)
+
+        monkeypatch.setattr(settings, "timescale_enabled", True)
+        assert timescale.is_enabled(pg)
+        assert not timescale.is_enabled(sqlite)
+
+    def test_aggregates_checked_before_use(self, monkeypatch):
+        """Flag turned on after the migration: the missing aggregates are detected once, reads stay raw"""
+        class FakeConnection:
+            dialect = SimpleNamespace(name="postgresql")
+
+            def __init__(self, url, existing):
+                self.engine = SimpleNamespace(url=url)
+                self.existing = existing
+                self.queries = 0
+
+            def execute(self, statement, params):
+                self.queries += 1
+                return SimpleNamespace(scalar=lambda: params["name"] if params["name"] in self.existing else None)
+
+        monkeypatch.setattr(settings, "timescale_enabled", True)
+        monkeypatch.setattr(timescale, "_aggregates_present", {})
+        names = {aggregate.name for aggregate in timescale.CONTINUOUS_AGGREGATES.values()}
+
+        missing = FakeConnection("postgresql://db/old", existing=set())
+        assert not timescale.aggregates_available(missing)
+        queries = missing.queries
+        assert not timescale.aggregates_available(missing)
+        assert missing.queries == queries
+
+        migrated = FakeConnection("postgresql://db/fng", existing=names)
+        assert timescale.aggregates_available(migrated)
+
+        monkeypatch.setattr(settings, "timescale_enabled", False)
+        assert not timescale.aggregates_available(migrated)
+
+    @pytest.mark.parametrize("resolution", sorted(timescale.CONTINUOUS_AGGREGATES))
+    def test_aggregate_columns_match_view(self, resolution):
+        aggregate = timescale.CONTINUOUS_AGGREGATES[resolution]
+        create_view = timescale.aggregate_statements(aggregate)[0]
+
+        aliases = re.findall(r" AS (\w+)", create_view.split(" AS SELECT ", 1)[1])
+        assert aliases == list(timescale.aggregate_table(resolution).c.keys())
+        assert f"time_bucket(INTERVAL '{aggregate.bucket_width}', as_of)" in create_view
+        assert "timescaledb.materialized_only = false" in create_view
+
+    def test_hypertables_are_idempotent(self):
+        for hypertable in timescale.HYPERTABLES:
+            assert "if_not_exists => true" in timescale.hypertable_statement(hypertable)
+            assert "migrate_data => true" in timescale.hypertable_statement(hypertable)
+            assert "if_not_exists => true" in timescale.compression_statements(hypertable)[1]
+
+        market_bars = next(h for h in timescale.HYPERTABLES if h.table == "market_bars")
+        assert "compress_segmentby = 'symbol'" in timescale.compression_statements(market_bars)[0]
+
+    def test_unknown_resolution(self):
+        with pytest.raises(ValueError):
+            timescale.aggregate_table("raw")
+
+    def test_scaler_window_reads_daily_aggregate(self):
+        query = DynamicScalerService._daily_aggregate_query(date(2024, 3, 1), date(2024, 5, 30))
+        sql = str(query.compile(dialect=postgresql.dialect()))
+
+        assert len(query.selected_columns) == 4 * len(COMPONENT_COLUMNS)
+        assert "FROM index_scores_daily" in sql
+        # Moyenne de la fenêtre pondérée par le nombre de valeurs de chaque jour
+        assert "sum(index_scores_daily.momentum_mean * index_scores_daily.momentum_count)" in sql
+        # Bornes des lignes brutes (as_of <= current_date) : le jour courant est inclus
+        assert "index_scores_daily.bucket <= %(bucket_2)s" in sql
+
+    def test_history_buckets_include_partial_first_bucket(self):
+        query = index_scores._aggregate_buckets_query(
+            "week", datetime(2024, 5, 8, 10, 0), datetime(2024, 5, 30, 23, 59)
+        )
+        sql = str(query.compile(dialect=postgresql.dialect()))
+
+        assert "FROM index_scores_weekly" in sql
+        # Même premier intervalle que l'agrégation directe (as_of >= start)
+        assert "index_scores_weekly.bucket >= time_bucket(INTERVAL '1 week', %(time_bucket_1)s::TIMESTAMP WITHOUT TIME ZONE)" in sql
+        assert "index_scores_weekly.bucket <= %(bucket_1)s" in sql
@@ -0,0 +1,126 @@
+import math
+import random
+import statistics
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from app.pipelines.ingestion.market_scraper import MASIHistoricalData
+from app.services.component_calculator import ComponentCalculator
+from app.services.vectorized_components import MarketArrays, component_series
+
+
+def _legacy_components(data):
+    """Reference implementation (list/statistics based) of the market components"""
+    def clamp(value):
+        return max(0, min(100, value))
+
+    momentum = 50.0
+    if len(data) >= 250:
+        recent = statistics.mean(d.close_price for d in data[-125:])
+        previous = statistics.mean(d.close_price for d in data[-250:-125])
+        if previous != 0:
+            momentum = clamp(50 + (recent - previous) / previous * 100 * 2)
+
+    price_strength = 50.0
+    if len(data) >= 252:
+        yearly = data[-252:]
+        high = max(d.high_price for d in yearly)
+        low = min(d.low_price for d in yearly)
+        if high != low:
+            price_strength = (yearly[-1].close_price - low) / (high - low) * 100
+
+    volume = 50.0
+    if len(data) >= 30:
+        avg = statistics.mean(d.volume for d in data[-30:])
+        if avg != 0:
+            volume = clamp(data[-1].volume / avg * 50)
+
+    volatility = 50.0
+    if len(data) >= 30:
+        recent = data[-30:]
+        returns = [
+            (recent[i].close_price - recent[i - 1].close_price) / recent[i - 1].close_price
+            for i in range(1, len(recent))
+            if recent[i - 1].close_price != 0
+        ]
+        if len(returns) >= 2:
+            volatility = clamp(100 - statistics.stdev(returns) * math.sqrt(252) * 1000)
+
+    equity = 50.0
+    if len(data) >= 20:
+        recent = data[-20:]
+        ret = (recent[-1].close_price - recent[0].close_price) / recent[0].close_price
+        equity = clamp(50 + (ret - 0.02) * 1000)
+
+    return {
+        "momentum": momentum,
+        "price_strength": price_strength,
+        "volume": volume,
+        "volatility": volatility,
+        "equity_vs_bonds": equity,
+    }
+
+
+def _history(days: int, seed: int = 7, daily_vol: float = 0.01):
+    rng = random.Random(seed)
+    price = 12000.0
+    start = date(2020, 1, 1)
+    data = []
+    for i in range(days):
+        price *= 1 + rng.gauss(0.0003, daily_vol)
+        high = price * (1 + abs(rng.gauss(0, 0.004)))
+        low = price * (1 - abs(rng.gauss(0, 0.004)))
+        data.append(MASIHistoricalData(
+            date=start + timedelta(days=i),
+            open_price=price,
+            high_price=high,
+            low_price=low,
+            close_price=price,
+            volume=rng.randint(1_000_000, 20_000_000),
+        ))
+    return data
+
+
+class TestVectorizedComponents:
+    """Vectorized components must match the reference implementation"""
+
+    def setup_method(self):
+        self.calculator = ComponentCalculator(use_dynamic_scaling=False)
+
+    @pytest.mark.parametrize("days", [10, 25, 40, 251, 260, 600])
+    @pytest.mark.parametrize("daily_vol", [0.001, 0.01])
+    def test_latest_components_match_reference(self, days, daily_vol):
+        """Latest-session scores match the list-based formulas"""
+        data = _history(days, seed=days, daily_vol=daily_vol)
+
+        expected = _legacy_components(data)
+        actual = self.calculator.calculate_market_components(data)
+
+        for name, value in expected.items():
+            assert actual[name] == pytest.approx(value, abs=1e-9), name
+            assert isinstance(actual[name], float)
+
+    def test_series_match_prefix_computation(self):
+        """component_series[t] equals the scores computed on data[:t+1]"""
+        data = _history(400, seed=3, daily_vol=0.002)
+        series = component_series(MarketArrays.from_history(data))
+
+        for t in [0, 18, 19, 29, 30, 249, 250, 251, 252, 320, 399]:
+            expected = _legacy_components(data[:t + 1])
+            for name, value in expected.items():
+                assert series[name][t] == pytest.approx(value, abs=1e-9), (name, t)
+
+    def test_zero_prices_fall_back_to_neutral(self):
+        """Zero closes are skipped or neutralised like the reference"""
+        data = _history(300)
+        for bar in data[-40:-20]:
+            bar.close_price = 0.0
+        arrays = MarketArrays.from_history(data)
+        series = component_series(arrays)
+        expected = _legacy_components(data)
+
+        for name, value in expected.items():
+            assert series[name][-1] == pytest.approx(value, abs=1e-9), name
+        assert not np.isnan(np.concatenate(list(series.values()))).any()
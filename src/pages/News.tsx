@@ -67,6 +67,8 @@ export default function News() {
   const PAGE_SIZE = 500;
   const [page, setPage] = useState(0);
   const [hasMore, setHasMore] = useState(true);
+  // Curseur opaque de la page suivante (pagination par clé de /media/latest)
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loadingMore, setLoadingMore] = useState(false);
   const { toast } = useToast();
 
@@ -103,7 +105,8 @@ export default function News() {
           setArticles(apiArticles);
           setFilteredArticles(apiArticles);
           setPage(0);
-          setHasMore((apiArticles.length || 0) >= PAGE_SIZE);
+          setNextCursor(result.pagination?.next_cursor ?? null);
+          setHasMore(result.pagination?.has_next ?? (apiArticles.length || 0) >= PAGE_SIZE);
           setInitialLoad(false);
           
           // Ne pas continuer avec Supabase si l'API fonctionne
@@ -168,7 +171,10 @@ export default function News() {
     const API_BASE_URL = '/api/v1';
     
     try {
-      const response = await fetch(`${API_BASE_URL}/media/latest?limit=${PAGE_SIZE}&offset=${(page + 1) * PAGE_SIZE}&auto_scrape=false`);
+      const position = nextCursor
+        ? `cursor=${encodeURIComponent(nextCursor)}`
+        : `offset=${(page + 1) * PAGE_SIZE}`;
+      const response = await fetch(`${API_BASE_URL}/media/latest?limit=${PAGE_SIZE}&${position}&auto_scrape=false`);
       if (response.ok) {
         const result = await response.json();
         const newArticles = (result.data || []).map((article: any) => ({
@@ -188,7 +194,8 @@ export default function News() {
           setArticles(prev => [...prev, ...newArticles]);
           setFilteredArticles(prev => [...prev, ...newArticles]);
           setPage(prev => prev + 1);
-          setHasMore(newArticles.length >= PAGE_SIZE);
+          setNextCursor(result.pagination?.next_cursor ?? null);
+          setHasMore(result.pagination?.has_next ?? newArticles.length >= PAGE_SIZE);
         } else {
           setHasMore(false);
         }